@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark stockage Data Flywheel - 10k interactions capturées
+Compare l'ancien chemin (connexion + commit par ligne) au FlywheelStorageEngine
+(connexion WAL longue durée, écritures groupées sur thread dédié)
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_flywheel_agent import DataFlywheelAgent, InteractionData
+from flywheel_storage import FLYWHEEL_SCHEMA
+
+INTERACTIONS = 10_000
+
+
+def make_interaction(i: int) -> InteractionData:
+    return InteractionData(
+        session_id=f"session_bench_{i % 100}",
+        timestamp=datetime.now(),
+        cv_content=f"Aide-soignant {i} - formation cybersécurité",
+        job_offer=f"Pentester junior {i}",
+        generated_letter=f"Madame, Monsieur, lettre {i}",
+        user_tier="free",
+        provider_used="local_mistral",
+        generation_time=4.2,
+    )
+
+
+def bench_legacy(db_path: Path) -> float:
+    """Ancien chemin: sqlite3.connect + commit pour chaque interaction"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(FLYWHEEL_SCHEMA)
+    conn.close()
+
+    start = time.perf_counter()
+    for i in range(INTERACTIONS):
+        interaction = make_interaction(i)
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            """
+            INSERT INTO interactions
+            (session_id, timestamp, cv_hash, job_hash, letter_hash, user_tier,
+             provider_used, generation_time, quality_score, reconversion_type,
+             success_indicators, user_feedback)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                interaction.session_id,
+                interaction.timestamp.isoformat(),
+                "cv", "job", "letter",
+                interaction.user_tier,
+                interaction.provider_used,
+                interaction.generation_time,
+                7.0, "autre", "[]", "{}",
+            ),
+        )
+        conn.commit()
+        conn.close()
+    return time.perf_counter() - start
+
+
+async def bench_engine(data_dir: str, analysis: dict) -> dict:
+    """Nouveau chemin: _store_interaction met en file, l'écrivain groupe les lignes"""
+    agent = DataFlywheelAgent("http://localhost:11434", data_dir=data_dir)
+
+    start = time.perf_counter()
+    for i in range(INTERACTIONS):
+        agent._store_interaction(make_interaction(i), analysis)
+    enqueue_time = time.perf_counter() - start
+
+    await agent.storage.aflush()
+    total_time = time.perf_counter() - start
+
+    recent = await agent._get_recent_interactions(days=7)
+    stats = agent.storage.get_stats()
+    agent.close()
+
+    return {
+        "enqueue_time": enqueue_time,
+        "total_time": total_time,
+        "rows": len(recent),
+        "avg_batch_size": stats["avg_batch_size"],
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        analysis = {
+            "reconversion_analysis": {"type_detected": "autre"},
+            "quality_assessment": {"overall_quality": 7.0},
+        }
+
+        legacy = bench_legacy(Path(tmp) / "legacy.db")
+        engine = asyncio.run(bench_engine(os.path.join(tmp, "engine"), analysis))
+
+    print(f"⏱️ {INTERACTIONS} interactions capturées")
+    print(f"  • Ancien (connect/commit par ligne): {legacy:.2f}s "
+          f"({INTERACTIONS / legacy:,.0f} ins/s)")
+    print(f"  • Moteur (file + batch): {engine['total_time']:.2f}s "
+          f"({INTERACTIONS / engine['total_time']:,.0f} ins/s), "
+          f"bloquant boucle: {engine['enqueue_time'] * 1000:.0f}ms, "
+          f"batch moyen: {engine['avg_batch_size']:.0f} lignes")
+    print(f"  • Gain: x{legacy / engine['total_time']:.1f} "
+          f"(lignes relues: {engine['rows']})")
+
+
+if __name__ == "__main__":
+    main()
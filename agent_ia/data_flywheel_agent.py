@@ -8,7 +8,6 @@ import hashlib
 import json
 import logging
 import re
-import sqlite3
 from collections import Counter, defaultdict
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
@@ -17,6 +16,9 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+from flywheel_storage import FlywheelStorageEngine
+from local_llm_client import get_local_llm_client
+
 # ========================================
 # 📊 STRUCTURES DE DONNÉES FLYWHEEL
 # ========================================
@@ -85,6 +87,7 @@ class DataFlywheelAgent:
     ):
         self.endpoint = local_ai_endpoint
         self.model = "mistral:7b"
+        self.llm = get_local_llm_client(local_ai_endpoint)
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
 
@@ -110,79 +113,12 @@ class DataFlywheelAgent:
         logging.info("🧠 Data Flywheel Agent initialized")
 
     def _init_database(self):
-        """Initialisation base de données flywheel"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Table interactions
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS interactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                timestamp TEXT,
-                cv_hash TEXT,
-                job_hash TEXT,
-                letter_hash TEXT,
-                user_tier TEXT,
-                provider_used TEXT,
-                generation_time REAL,
-                quality_score REAL,
-                reconversion_type TEXT,
-                success_indicators TEXT,
-                user_feedback TEXT
-            )
-        """
-        )
-
-        # Table patterns appris
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS learned_patterns (
-                pattern_id TEXT PRIMARY KEY,
-                pattern_type TEXT,
-                confidence_score REAL,
-                usage_count INTEGER,
-                success_rate REAL,
-                pattern_data TEXT,
-                created_at TEXT,
-                last_updated TEXT
-            )
-        """
-        )
-
-        # Table optimisations prompts
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS prompt_optimizations (
-                optimization_id TEXT PRIMARY KEY,
-                reconversion_type TEXT,
-                original_prompt TEXT,
-                optimized_prompt TEXT,
-                improvement_score REAL,
-                usage_count INTEGER,
-                created_at TEXT
-            )
-        """
-        )
+        """Initialisation base de données flywheel (schéma + index via le moteur de stockage)"""
+        self.storage = FlywheelStorageEngine(self.db_path)
 
-        # Table insights business
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS business_insights (
-                insight_id TEXT PRIMARY KEY,
-                insight_type TEXT,
-                impact_level TEXT,
-                recommendation TEXT,
-                data_support TEXT,
-                implementation_status TEXT,
-                created_at TEXT
-            )
-        """
-        )
-
-        conn.commit()
-        conn.close()
+    def close(self):
+        """Vide les écritures en attente et ferme le stockage"""
+        self.storage.close()
 
     async def capture_interaction(self, interaction: InteractionData) -> str:
         """
@@ -256,54 +192,41 @@ class DataFlywheelAgent:
         """
 
         try:
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.endpoint}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": analysis_prompt,
-                        "stream": False,
-                        "options": {"temperature": 0.1},
-                    },
-                    timeout=60.0,
-                )
+            result = await self.llm.generate(
+                self.model, analysis_prompt, options={"temperature": 0.1}, timeout=60.0
+            )
+            try:
+                analysis = json.loads(result["response"])
+
+                # Enrichissement avec métriques computationnelles
+                analysis["computed_metrics"] = {
+                    "cv_complexity": self._assess_cv_complexity(
+                        interaction.cv_content
+                    ),
+                    "job_requirements_level": self._assess_job_complexity(
+                        interaction.job_offer
+                    ),
+                    "letter_uniqueness": self._calculate_letter_uniqueness(
+                        interaction.generated_letter
+                    ),
+                    "cost_efficiency": self._calculate_cost_efficiency(
+                        interaction
+                    ),
+                    "generation_speed": (
+                        "fast"
+                        if interaction.generation_time < 5
+                        else (
+                            "medium"
+                            if interaction.generation_time < 10
+                            else "slow"
+                        )
+                    ),
+                }
+
+                return analysis
 
-                if response.status_code == 200:
-                    result = response.json()
-                    try:
-                        analysis = json.loads(result["response"])
-
-                        # Enrichissement avec métriques computationnelles
-                        analysis["computed_metrics"] = {
-                            "cv_complexity": self._assess_cv_complexity(
-                                interaction.cv_content
-                            ),
-                            "job_requirements_level": self._assess_job_complexity(
-                                interaction.job_offer
-                            ),
-                            "letter_uniqueness": self._calculate_letter_uniqueness(
-                                interaction.generated_letter
-                            ),
-                            "cost_efficiency": self._calculate_cost_efficiency(
-                                interaction
-                            ),
-                            "generation_speed": (
-                                "fast"
-                                if interaction.generation_time < 5
-                                else (
-                                    "medium"
-                                    if interaction.generation_time < 10
-                                    else "slow"
-                                )
-                            ),
-                        }
-
-                        return analysis
-
-                    except json.JSONDecodeError:
-                        return self._fallback_analysis(interaction)
+            except json.JSONDecodeError:
+                return self._fallback_analysis(interaction)
         except Exception as e:
             logging.error(f"❌ Interaction analysis failed: {e}")
             return self._fallback_analysis(interaction)
@@ -311,10 +234,7 @@ class DataFlywheelAgent:
     def _store_interaction(
         self, interaction: InteractionData, analysis: Dict[str, Any]
     ) -> str:
-        """Stockage interaction en base"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
+        """Stockage interaction en base (mise en file, écriture groupée en arrière-plan)"""
         # Hachage pour confidentialité
         cv_hash = hashlib.sha256(interaction.cv_content.encode()).hexdigest()[:16]
         job_hash = hashlib.sha256(interaction.job_offer.encode()).hexdigest()[:16]
@@ -324,7 +244,7 @@ class DataFlywheelAgent:
 
         interaction_id = f"int_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{cv_hash[:8]}"
 
-        cursor.execute(
+        self.storage.enqueue(
             """
             INSERT INTO interactions 
             (session_id, timestamp, cv_hash, job_hash, letter_hash, user_tier, 
@@ -348,9 +268,6 @@ class DataFlywheelAgent:
             ),
         )
 
-        conn.commit()
-        conn.close()
-
         return interaction_id
 
     def _update_real_time_metrics(
@@ -511,30 +428,17 @@ class DataFlywheelAgent:
         """
 
         try:
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.endpoint}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": optimization_prompt,
-                        "stream": False,
-                        "options": {"temperature": 0.3},
-                    },
-                    timeout=45.0,
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    optimized_prompt = result["response"].strip()
+            result = await self.llm.generate(
+                self.model, optimization_prompt, options={"temperature": 0.3}, timeout=45.0
+            )
+            optimized_prompt = result["response"].strip()
 
-                    # Validation basique
-                    if (
-                        len(optimized_prompt) > 100
-                        and "reconversion" in optimized_prompt.lower()
-                    ):
-                        return optimized_prompt
+            # Validation basique
+            if (
+                len(optimized_prompt) > 100
+                and "reconversion" in optimized_prompt.lower()
+            ):
+                return optimized_prompt
 
         except Exception as e:
             logging.error(f"❌ Prompt optimization failed: {e}")
@@ -545,14 +449,11 @@ class DataFlywheelAgent:
         self, reconversion_type: str, optimized_prompt: str
     ):
         """Stockage optimisation prompt"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         optimization_id = (
             f"opt_{reconversion_type}_{datetime.now().strftime('%Y%m%d_%H%M')}"
         )
 
-        cursor.execute(
+        self.storage.enqueue(
             """
             INSERT OR REPLACE INTO prompt_optimizations 
             (optimization_id, reconversion_type, optimized_prompt, improvement_score, usage_count, created_at)
@@ -568,16 +469,13 @@ class DataFlywheelAgent:
             ),
         )
 
-        conn.commit()
-        conn.close()
-
         logging.info(f"💡 Prompt optimized for {reconversion_type}")
 
     async def _generate_business_insights(self):
         """Génération insights business automatiques"""
 
         # Analyse tendances dernières 7 jours
-        recent_data = self._get_recent_interactions(days=7)
+        recent_data = await self._get_recent_interactions(days=7)
 
         if len(recent_data) < 10:  # Pas assez de données
             return
@@ -614,38 +512,22 @@ class DataFlywheelAgent:
         """
 
         try:
-            import httpx
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.endpoint}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": insights_prompt,
-                        "stream": False,
-                        "options": {"temperature": 0.2},
-                    },
-                    timeout=60.0,
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    try:
-                        insights = json.loads(result["response"])
-                        await self._store_business_insights(insights)
-                    except json.JSONDecodeError:
-                        pass
+            result = await self.llm.generate(
+                self.model, insights_prompt, options={"temperature": 0.2}, timeout=60.0
+            )
+            try:
+                insights = json.loads(result["response"])
+                await self._store_business_insights(insights)
+            except json.JSONDecodeError:
+                pass
         except Exception as e:
             logging.error(f"❌ Business insights generation failed: {e}")
 
-    def _get_recent_interactions(self, days: int = 7) -> List[Dict[str, Any]]:
+    async def _get_recent_interactions(self, days: int = 7) -> List[Dict[str, Any]]:
         """Récupération interactions récentes"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         since_date = (datetime.now() - timedelta(days=days)).isoformat()
 
-        cursor.execute(
+        return await self.storage.fetchall(
             """
             SELECT * FROM interactions 
             WHERE timestamp > ? 
@@ -654,21 +536,12 @@ class DataFlywheelAgent:
             (since_date,),
         )
 
-        columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-        conn.close()
-        return results
-
     async def _store_business_insights(self, insights: Dict[str, Any]):
         """Stockage insights business"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
         for recommendation in insights.get("strategic_recommendations", []):
             insight_id = f"insight_{datetime.now().strftime('%Y%m%d_%H%M')}_{recommendation['area']}"
 
-            cursor.execute(
+            self.storage.enqueue(
                 """
                 INSERT OR REPLACE INTO business_insights 
                 (insight_id, insight_type, impact_level, recommendation, data_support, implementation_status, created_at)
@@ -685,9 +558,6 @@ class DataFlywheelAgent:
                 ),
             )
 
-        conn.commit()
-        conn.close()
-
     async def _update_knowledge_base(self, analysis: Dict[str, Any]):
         """Mise à jour base de connaissance évolutive"""
 
@@ -733,25 +603,21 @@ class DataFlywheelAgent:
     def _load_existing_patterns(self):
         """Chargement patterns existants au démarrage"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM learned_patterns")
-            for row in cursor.fetchall():
-                pattern_id = row[0]
+            rows = self.storage.fetchall_sync("SELECT * FROM learned_patterns")
+            for row in rows:
+                pattern_id = row["pattern_id"]
                 pattern = LearningPattern(
                     pattern_id=pattern_id,
-                    pattern_type=row[1],
-                    confidence_score=row[2],
-                    usage_count=row[3],
-                    success_rate=row[4],
-                    pattern_data=json.loads(row[5]),
-                    created_at=datetime.fromisoformat(row[6]),
-                    last_updated=datetime.fromisoformat(row[7]),
+                    pattern_type=row["pattern_type"],
+                    confidence_score=row["confidence_score"],
+                    usage_count=row["usage_count"],
+                    success_rate=row["success_rate"],
+                    pattern_data=json.loads(row["pattern_data"]),
+                    created_at=datetime.fromisoformat(row["created_at"]),
+                    last_updated=datetime.fromisoformat(row["last_updated"]),
                 )
                 self.learned_patterns[pattern_id] = pattern
 
-            conn.close()
             logging.info(f"📚 Loaded {len(self.learned_patterns)} existing patterns")
 
         except Exception as e:
@@ -759,10 +625,7 @@ class DataFlywheelAgent:
 
     async def _store_pattern(self, pattern: LearningPattern):
         """Stockage pattern appris"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        self.storage.enqueue(
             """
             INSERT OR REPLACE INTO learned_patterns 
             (pattern_id, pattern_type, confidence_score, usage_count, success_rate, 
@@ -781,9 +644,6 @@ class DataFlywheelAgent:
             ),
         )
 
-        conn.commit()
-        conn.close()
-
     # ========================================
     # 🎯 MÉTHODES UTILITAIRES
     # ========================================
@@ -870,10 +730,7 @@ class DataFlywheelAgent:
 
     async def get_optimized_prompt(self, reconversion_type: str) -> Optional[str]:
         """Récupération prompt optimisé pour type reconversion"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        result = await self.storage.fetchone(
             """
             SELECT optimized_prompt FROM prompt_optimizations 
             WHERE reconversion_type = ? 
@@ -883,10 +740,7 @@ class DataFlywheelAgent:
             (reconversion_type,),
         )
 
-        result = cursor.fetchone()
-        conn.close()
-
-        return result[0] if result else None
+        return result["optimized_prompt"] if result else None
 
     def get_flywheel_metrics(self) -> Dict[str, Any]:
         """Métriques flywheel pour dashboard Phoenix"""
@@ -895,6 +749,8 @@ class DataFlywheelAgent:
             "learned_patterns_count": len(self.learned_patterns),
             "knowledge_base_coverage": len(self.knowledge_base),
             "optimization_pipeline": len(self.optimization_queue),
+            "storage": self.storage.get_stats(),
+            "local_llm": self.llm.get_metrics(),
             "last_update": datetime.now().isoformat(),
         }
 
@@ -932,10 +788,7 @@ class DataFlywheelAgent:
         """Génération recommandations spécifiques"""
 
         # Récupération données historiques
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        rows = await self.storage.fetchall(
             """
             SELECT AVG(quality_score), AVG(generation_time), provider_used
             FROM interactions 
@@ -944,9 +797,7 @@ class DataFlywheelAgent:
         """,
             (reconversion_type,),
         )
-
-        provider_stats = cursor.fetchall()
-        conn.close()
+        provider_stats = [tuple(row.values()) for row in rows]
 
         recommendations = []
 
@@ -0,0 +1,269 @@
+"""
+🧮 PHOENIX EVENT DEDUP INDEX - Index de déduplication persistant et borné
+Hashes d'événements traités stockés dans SQLite local, regroupés par bucket horaire
+avec expiration, précédés de filtres de Bloom en mémoire (un par jour, rotatifs)
+pour les lookups négatifs
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class BloomFilter:
+    """Filtre de Bloom compact sur bytearray (faux positifs possibles, jamais de faux négatifs)"""
+
+    def __init__(self, expected_items: int, false_positive_rate: float = 0.001):
+        expected_items = max(1, expected_items)
+        self.size_bits = max(
+            8, int(-expected_items * math.log(false_positive_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.size_bits / expected_items * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing (Kirsch-Mitzenmacher) à partir d'un seul digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def might_contain(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+@dataclass
+class DedupIndexStats:
+    """Métriques de l'index de déduplication"""
+    lookups: int = 0
+    hits: int = 0
+    misses: int = 0
+    bloom_negatives: int = 0
+    bloom_false_positives: int = 0
+    inserts: int = 0
+    expired: int = 0
+    synced_rows: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def false_positive_rate(self) -> float:
+        # Proportion des lookups "peut-être présents" démentis par SQLite
+        maybe = self.lookups - self.bloom_negatives
+        return self.bloom_false_positives / maybe if maybe else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = self.hit_rate
+        data["false_positive_rate"] = self.false_positive_rate
+        return data
+
+
+class EventDedupIndex:
+    """
+    🧮 Index de hashes d'événements traités, persistant entre les cycles:
+
+    ✅ Stockage SQLite local (WAL) - survit aux redémarrages
+    ✅ Buckets horaires avec expiration (rétention bornée)
+    ✅ Filtres de Bloom rotatifs en mémoire - lookups négatifs sans I/O
+    ✅ Watermark keyset (ai_processed_at, event_id) - seules les nouvelles lignes sont rapatriées
+
+    Un filtre de Bloom ne supporte pas la suppression: plutôt que de le
+    reconstruire par scan complet à chaque expiration, l'index tient une
+    génération de filtre par jour et jette les générations sorties de la
+    rétention.
+    """
+
+    BUCKET_SECONDS = 3600
+    GENERATION_BUCKETS = 24
+
+    def __init__(
+        self,
+        db_path: str = "./phoenix_event_dedup.db",
+        retention_days: int = 7,
+        expected_items: int = 500_000,
+        false_positive_rate: float = 0.001,
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention_days = retention_days
+        self.expected_items = expected_items
+        self.false_positive_rate = false_positive_rate
+        self.stats = DedupIndexStats()
+
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_hashes (
+                event_hash TEXT PRIMARY KEY,
+                bucket INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_processed_hashes_bucket ON processed_hashes(bucket)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dedup_meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+        # Une génération par jour de rétention (+ la génération en cours);
+        # le taux de faux positifs cible est réparti entre elles
+        generations = retention_days + 1
+        self._generation_items = max(1, expected_items // max(1, retention_days))
+        self._generation_fp_rate = false_positive_rate / generations
+        self._blooms: "OrderedDict[int, BloomFilter]" = OrderedDict()
+
+        self.expire()
+        self._load_blooms()
+
+        logger.info("✅ EventDedupIndex initialisé",
+                   db_path=str(self.db_path),
+                   entries=sum(bloom.count for bloom in self._blooms.values()),
+                   retention_days=retention_days)
+
+    def _current_bucket(self, now: Optional[float] = None) -> int:
+        return int((now if now is not None else time.time()) // self.BUCKET_SECONDS)
+
+    def _bloom_for(self, bucket: int) -> BloomFilter:
+        """Filtre de la génération (jour) contenant le bucket"""
+        generation = bucket // self.GENERATION_BUCKETS
+        bloom = self._blooms.get(generation)
+        if bloom is None:
+            bloom = BloomFilter(self._generation_items, self._generation_fp_rate)
+            self._blooms[generation] = bloom
+            self._blooms = OrderedDict(sorted(self._blooms.items()))
+        return bloom
+
+    def _load_blooms(self) -> None:
+        """Construit les filtres depuis SQLite (une seule fois, au démarrage)"""
+        self._blooms.clear()
+        for event_hash, bucket in self._conn.execute(
+            "SELECT event_hash, bucket FROM processed_hashes"
+        ):
+            self._bloom_for(bucket).add(event_hash)
+
+    def _might_contain(self, event_hash: str) -> bool:
+        return any(bloom.might_contain(event_hash) for bloom in self._blooms.values())
+
+    def contains(self, event_hash: str) -> bool:
+        """Vérifie si un hash a déjà été traité"""
+        self.stats.lookups += 1
+
+        if not self._might_contain(event_hash):
+            self.stats.bloom_negatives += 1
+            self.stats.misses += 1
+            return False
+
+        row = self._conn.execute(
+            "SELECT 1 FROM processed_hashes WHERE event_hash = ?", (event_hash,)
+        ).fetchone()
+        if row:
+            self.stats.hits += 1
+            return True
+
+        self.stats.bloom_false_positives += 1
+        self.stats.misses += 1
+        return False
+
+    def add(self, event_hash: str) -> None:
+        """Enregistre un hash traité dans le bucket courant"""
+        self.add_many([event_hash])
+
+    def add_many(self, event_hashes: Iterable[str]) -> int:
+        """Enregistre plusieurs hashes en une seule transaction"""
+        bucket = self._current_bucket()
+        rows = [(h, bucket) for h in event_hashes]
+        if not rows:
+            return 0
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO processed_hashes (event_hash, bucket) VALUES (?, ?)",
+                rows,
+            )
+        bloom = self._bloom_for(bucket)
+        for event_hash, _ in rows:
+            bloom.add(event_hash)
+        self.stats.inserts += len(rows)
+        return len(rows)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Supprime les buckets plus anciens que la rétention"""
+        cutoff = self._current_bucket(now) - self.retention_days * 24
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM processed_hashes WHERE bucket < ?", (cutoff,)
+            )
+        deleted = cursor.rowcount
+        if deleted > 0:
+            self.stats.expired += deleted
+
+        # Rotation: une génération entièrement sortie de la rétention est jetée.
+        # Les hashes expirés d'une génération encore vivante restent des faux
+        # positifs du filtre, démentis par SQLite.
+        while self._blooms:
+            generation = next(iter(self._blooms))
+            if (generation + 1) * self.GENERATION_BUCKETS > cutoff:
+                break
+            del self._blooms[generation]
+        return deleted
+
+    @property
+    def watermark(self) -> Optional[Tuple[str, Optional[str]]]:
+        """Dernière position (ai_processed_at, event_id) synchronisée depuis Supabase"""
+        row = self._conn.execute(
+            "SELECT value FROM dedup_meta WHERE key = 'watermark'"
+        ).fetchone()
+        if not row:
+            return None
+        try:
+            processed_at, event_id = json.loads(row[0])
+        except (ValueError, TypeError):
+            # Ancien format: ai_processed_at seul
+            return row[0], None
+        return processed_at, event_id
+
+    @watermark.setter
+    def watermark(self, value: Tuple[str, Optional[str]]) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dedup_meta (key, value) VALUES ('watermark', ?)",
+                (json.dumps(list(value)),),
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques de l'index pour le monitoring"""
+        entries = self._conn.execute("SELECT COUNT(*) FROM processed_hashes").fetchone()[0]
+        return {
+            **self.stats.to_dict(),
+            "entries": entries,
+            "watermark": self.watermark,
+            "bloom_generations": len(self._blooms),
+            "bloom_size_bytes": sum(len(bloom._bits) for bloom in self._blooms.values()),
+        }
+
+    def close(self) -> None:
+        self._conn.close()
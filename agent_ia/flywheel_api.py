@@ -13,6 +13,7 @@ import uvicorn
 from data_flywheel_agent import InteractionData, PhoenixFlywheelIntegration
 from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from local_llm_client import close_local_llm_clients
 from pydantic import BaseModel
 
 # Configuration logging
@@ -149,6 +150,8 @@ async def shutdown_event():
     """Nettoyage au shutdown"""
     logger.info("🔄 Shutting down Phoenix Data Flywheel API...")
 
+    await close_local_llm_clients()
+
 
 # ========================================
 # 🧠 ENDPOINTS DATA FLYWHEEL
@@ -0,0 +1,282 @@
+"""
+🗄️ FLYWHEEL STORAGE ENGINE - Stockage SQLite dédié au Data Flywheel
+Connexion longue durée en WAL, écritures groupées sur un thread dédié,
+lectures via executor pour ne jamais bloquer la boucle asyncio
+"""
+
+import asyncio
+import atexit
+import itertools
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# ========================================
+# 📐 SCHÉMA FLYWHEEL
+# ========================================
+
+FLYWHEEL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    timestamp TEXT,
+    cv_hash TEXT,
+    job_hash TEXT,
+    letter_hash TEXT,
+    user_tier TEXT,
+    provider_used TEXT,
+    generation_time REAL,
+    quality_score REAL,
+    reconversion_type TEXT,
+    success_indicators TEXT,
+    user_feedback TEXT
+);
+
+CREATE TABLE IF NOT EXISTS learned_patterns (
+    pattern_id TEXT PRIMARY KEY,
+    pattern_type TEXT,
+    confidence_score REAL,
+    usage_count INTEGER,
+    success_rate REAL,
+    pattern_data TEXT,
+    created_at TEXT,
+    last_updated TEXT
+);
+
+CREATE TABLE IF NOT EXISTS prompt_optimizations (
+    optimization_id TEXT PRIMARY KEY,
+    reconversion_type TEXT,
+    original_prompt TEXT,
+    optimized_prompt TEXT,
+    improvement_score REAL,
+    usage_count INTEGER,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS business_insights (
+    insight_id TEXT PRIMARY KEY,
+    insight_type TEXT,
+    impact_level TEXT,
+    recommendation TEXT,
+    data_support TEXT,
+    implementation_status TEXT,
+    created_at TEXT
+);
+
+-- Index pour les requêtes analytiques 7 jours et par type de reconversion
+CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_reconversion_type ON interactions(reconversion_type);
+CREATE INDEX IF NOT EXISTS idx_prompt_optimizations_type ON prompt_optimizations(reconversion_type);
+"""
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+_STOP = object()
+
+
+class FlywheelStorageEngine:
+    """
+    🗄️ Moteur de stockage du flywheel
+
+    ✅ Une connexion d'écriture longue durée (WAL + pragmas)
+    ✅ Thread écrivain dédié: file d'insertions regroupées en transactions multi-lignes
+    ✅ Lignes en erreur isolées: un lot qui échoue est rejoué ligne par ligne
+    ✅ Lectures async via executor (lecture cohérente après les écritures déjà en file)
+    """
+
+    def __init__(self, db_path: Path, max_batch_size: int = 500):
+        self.db_path = Path(db_path)
+        self.max_batch_size = max_batch_size
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        # Numéros de séquence des écritures: une lecture attend seulement les
+        # écritures mises en file avant elle, pas un état "file vide"
+        self._enqueue_lock = threading.Lock()
+        self._next_seq = itertools.count(1)
+        self._enqueued_seq = 0
+        self._committed_seq = 0
+        self._committed = threading.Condition()
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="flywheel-reader"
+        )
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self._closed = False
+
+        self.stats = {
+            "rows_written": 0,
+            "transactions": 0,
+            "largest_batch": 0,
+            "write_errors": 0,
+            "batch_retries": 0,
+            "reads": 0,
+        }
+
+        # Schéma créé de façon synchrone avant de démarrer l'écrivain
+        conn = self._connect()
+        conn.executescript(FLYWHEEL_SCHEMA)
+        conn.commit()
+        conn.close()
+
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="flywheel-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    # ========================================
+    # ✍️ ÉCRITURES
+    # ========================================
+
+    def enqueue(self, sql: str, params: Sequence[Any]):
+        """Met une écriture en file (O(1), ne bloque jamais l'appelant)"""
+        if self._closed:
+            raise RuntimeError("FlywheelStorageEngine fermé")
+        with self._enqueue_lock:
+            seq = next(self._next_seq)
+            self._enqueued_seq = seq
+            self._queue.put((seq, sql, tuple(params)))
+
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                writes = [item for item in batch if item is not _STOP]
+                if writes:
+                    self._write_batch(conn, writes)
+                    with self._committed:
+                        self._committed_seq = writes[-1][0]
+                        self._committed.notify_all()
+
+                for _ in batch:
+                    self._queue.task_done()
+
+                if len(writes) != len(batch):
+                    return
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, writes: List[Tuple[int, str, tuple]]):
+        """Écrit un lot en une transaction, executemany par requête consécutive"""
+        try:
+            with conn:
+                for sql, group in itertools.groupby(writes, key=lambda item: item[1]):
+                    conn.executemany(sql, [params for _, _, params in group])
+            self.stats["rows_written"] += len(writes)
+            self.stats["transactions"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(writes))
+        except sqlite3.Error as e:
+            # Le rollback a annulé tout le lot: on rejoue ligne par ligne pour
+            # ne perdre que les lignes fautives
+            self.stats["batch_retries"] += 1
+            logging.warning(f"⚠️ Flywheel batch write failed ({len(writes)} rows), retrying row by row: {e}")
+            for write in writes:
+                self._write_row(conn, write)
+
+    def _write_row(self, conn: sqlite3.Connection, write: Tuple[int, str, tuple]):
+        seq, sql, params = write
+        try:
+            with conn:
+                conn.execute(sql, params)
+            self.stats["rows_written"] += 1
+            self.stats["transactions"] += 1
+        except sqlite3.Error as e:
+            self.stats["write_errors"] += 1
+            logging.error(f"❌ Flywheel write #{seq} dropped: {e} | {sql.split('(')[0].strip()}")
+
+    def flush(self):
+        """Attend que les écritures mises en file avant l'appel soient commitées"""
+        target = self._enqueued_seq
+        with self._committed:
+            while self._committed_seq < target:
+                if not self._writer.is_alive():
+                    raise RuntimeError("Écrivain flywheel arrêté avant la fin des écritures")
+                self._committed.wait(timeout=0.5)
+
+    async def aflush(self):
+        """Version async de flush (exécutée hors boucle)"""
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    # ========================================
+    # 📖 LECTURES
+    # ========================================
+
+    def fetchall_sync(
+        self, sql: str, params: Sequence[Any] = (), wait_for_writes: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Lecture synchrone (démarrage, scripts)"""
+        if wait_for_writes:
+            self.flush()
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect()
+            cursor = self._read_conn.execute(sql, tuple(params))
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+        self.stats["reads"] += 1
+        return [dict(zip(columns, row)) for row in rows]
+
+    async def fetchall(
+        self, sql: str, params: Sequence[Any] = (), wait_for_writes: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Lecture async sur le thread lecteur dédié"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._read_executor, self.fetchall_sync, sql, params, wait_for_writes
+        )
+
+    async def fetchone(
+        self, sql: str, params: Sequence[Any] = (), wait_for_writes: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        rows = await self.fetchall(sql, params, wait_for_writes)
+        return rows[0] if rows else None
+
+    # ========================================
+    # 🔚 CYCLE DE VIE
+    # ========================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending_writes": self._queue.qsize(),
+            "avg_batch_size": (
+                self.stats["rows_written"] / self.stats["transactions"]
+                if self.stats["transactions"]
+                else 0.0
+            ),
+        }
+
+    def close(self, timeout: float = 10.0):
+        """Vide la file, arrête l'écrivain et ferme les connexions"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout=timeout)
+        self._read_executor.shutdown(wait=True)
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
@@ -0,0 +1,319 @@
+"""
+🔌 LOCAL LLM CLIENT - Client Ollama partagé pour les agents IA Phoenix
+Pool de connexions keep-alive, limite de concurrence par modèle,
+coalescence des prompts identiques en vol, streaming optionnel
+et histogrammes de latence par modèle
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Bornes (secondes) des histogrammes de latence
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+
+class LocalLLMError(Exception):
+    """Réponse non exploitable du serveur LLM local"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LatencyHistogram:
+    """Histogramme de latences à buckets fixes (style Prometheus)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimation du quantile (borne supérieure du bucket atteint)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(self.buckets, self.counts)
+            },
+        }
+
+
+class LocalLLMClient:
+    """
+    🔌 Client partagé vers l'API Ollama (/api/generate)
+
+    ✅ Un seul httpx.AsyncClient keep-alive par endpoint et par boucle asyncio
+    ✅ Sémaphore par modèle (évite de saturer la RAM d'un modèle local)
+    ✅ Single-flight: les prompts identiques en vol partagent une seule requête
+    ✅ Streaming token par token optionnel
+    ✅ Histogrammes de latence par modèle
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:11434",
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        per_model_concurrency: int = 2,
+        default_timeout: float = 60.0,
+    ):
+        self.endpoint = endpoint.rstrip("/")
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.per_model_concurrency = per_model_concurrency
+        self.default_timeout = default_timeout
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._model_limits: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+        self.stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "streamed": 0,
+            "errors": 0,
+        }
+
+    # ========================================
+    # 🔧 CYCLE DE VIE
+    # ========================================
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        """Client et primitives asyncio liés à la boucle courante"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            # Nouvelle boucle (ex: asyncio.run successifs): repartir d'un pool propre
+            self._client = httpx.AsyncClient(
+                base_url=self.endpoint,
+                timeout=httpx.Timeout(self.default_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+            )
+            self._loop = loop
+            self._model_limits = {}
+            self._inflight = {}
+        return self._client
+
+    def _model_limit(self, model: str) -> asyncio.Semaphore:
+        if model not in self._model_limits:
+            self._model_limits[model] = asyncio.Semaphore(self.per_model_concurrency)
+        return self._model_limits[model]
+
+    async def aclose(self):
+        """Ferme le pool de connexions"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    # ========================================
+    # 🚀 REQUÊTES
+    # ========================================
+
+    async def get(self, path: str, timeout: float = 5.0) -> httpx.Response:
+        """GET simple sur le pool partagé (/api/version, /api/tags...)"""
+        return await self._ensure_client().get(path, timeout=timeout)
+
+    @staticmethod
+    def _request_key(model: str, prompt: str, options: Dict[str, Any]) -> str:
+        payload = json.dumps([model, prompt, options], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        on_token: Optional[Callable[[str], Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Génération non-streamée (réponse JSON Ollama complète).
+
+        Si on_token est fourni, la génération est streamée et chaque fragment
+        est transmis au callback; le résultat agrégé est retourné à la fin.
+        """
+        options = options or {}
+        self._ensure_client()
+
+        if on_token is not None:
+            return await self._generate_streamed(model, prompt, options, timeout, on_token)
+
+        key = self._request_key(model, prompt, options)
+        request = self._inflight.get(key)
+        if request is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # La requête vit dans sa propre tâche: l'annulation d'un appelant
+            # (même le premier) n'annule pas la réponse attendue par les autres
+            request = asyncio.ensure_future(self._post_generate(model, prompt, options, timeout))
+            self._inflight[key] = request
+            request.add_done_callback(lambda done, key=key: self._forget_inflight(key, done))
+        return await asyncio.shield(request)
+
+    def _forget_inflight(self, key: str, request: asyncio.Future):
+        if self._inflight.get(key) is request:
+            del self._inflight[key]
+        if not request.cancelled():
+            # Évite l'avertissement "exception never retrieved" sans abonné
+            request.exception()
+
+    async def _post_generate(
+        self, model: str, prompt: str, options: Dict[str, Any], timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        client = self._ensure_client()
+        async with self._model_limit(model):
+            start = time.perf_counter()
+            self.stats["requests"] += 1
+            try:
+                response = await client.post(
+                    "/api/generate",
+                    json={"model": model, "prompt": prompt, "stream": False, "options": options},
+                    timeout=timeout or self.default_timeout,
+                )
+                if response.status_code != 200:
+                    raise LocalLLMError(
+                        f"HTTP {response.status_code}: {response.text}", response.status_code
+                    )
+                return response.json()
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+            finally:
+                self._histogram(model).observe(time.perf_counter() - start)
+
+    async def stream(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Génération streamée: produit chaque fragment JSON Ollama au fil de l'eau"""
+        client = self._ensure_client()
+        async with self._model_limit(model):
+            start = time.perf_counter()
+            self.stats["requests"] += 1
+            self.stats["streamed"] += 1
+            try:
+                async with client.stream(
+                    "POST",
+                    "/api/generate",
+                    json={"model": model, "prompt": prompt, "stream": True, "options": options or {}},
+                    timeout=timeout or self.default_timeout,
+                ) as response:
+                    if response.status_code != 200:
+                        body = await response.aread()
+                        raise LocalLLMError(
+                            f"HTTP {response.status_code}: {body.decode(errors='replace')}",
+                            response.status_code,
+                        )
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield json.loads(line)
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+            finally:
+                self._histogram(model).observe(time.perf_counter() - start)
+
+    async def _generate_streamed(
+        self,
+        model: str,
+        prompt: str,
+        options: Dict[str, Any],
+        timeout: Optional[float],
+        on_token: Callable[[str], Any],
+    ) -> Dict[str, Any]:
+        fragments: List[str] = []
+        final: Dict[str, Any] = {}
+        async for chunk in self.stream(model, prompt, options, timeout):
+            token = chunk.get("response", "")
+            if token:
+                fragments.append(token)
+                outcome = on_token(token)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+            if chunk.get("done"):
+                final = chunk
+        return {**final, "response": "".join(fragments)}
+
+    # ========================================
+    # 📊 MÉTRIQUES
+    # ========================================
+
+    def _histogram(self, model: str) -> LatencyHistogram:
+        if model not in self._histograms:
+            self._histograms[model] = LatencyHistogram()
+        return self._histograms[model]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            **self.stats,
+            "inflight": len(self._inflight),
+            "latency_by_model": {
+                model: histogram.snapshot() for model, histogram in self._histograms.items()
+            },
+        }
+
+
+# ========================================
+# 🌐 REGISTRE PARTAGÉ PAR ENDPOINT
+# ========================================
+
+_clients: Dict[str, LocalLLMClient] = {}
+
+
+def get_local_llm_client(endpoint: str = "http://localhost:11434", **kwargs) -> LocalLLMClient:
+    """Retourne le client partagé pour un endpoint (créé au premier appel)"""
+    key = endpoint.rstrip("/")
+    if key not in _clients:
+        _clients[key] = LocalLLMClient(key, **kwargs)
+    return _clients[key]
+
+
+def get_local_llm_metrics() -> Dict[str, Any]:
+    """Métriques de tous les clients partagés"""
+    return {endpoint: client.get_metrics() for endpoint, client in _clients.items()}
+
+
+async def close_local_llm_clients():
+    """Ferme tous les pools (à appeler au shutdown des APIs)"""
+    for client in _clients.values():
+        await client.aclose()
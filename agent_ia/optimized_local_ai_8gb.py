@@ -12,9 +12,10 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-import httpx
 import psutil
 
+from local_llm_client import get_local_llm_client
+
 # ========================================
 # 🎯 CONFIGURATION MODÈLES OPTIMISÉS 8GB
 # ========================================
@@ -78,6 +79,7 @@ class OptimizedLocalAIManager:
         self.current_mode: AgentMode = AgentMode.IDLE
         self.model_configs = OPTIMIZED_MODELS
         self.ollama_endpoint = "http://localhost:11434"
+        self.llm = get_local_llm_client(self.ollama_endpoint)
         self.memory_threshold_gb = 6.5  # Seuil critique RAM
         self.model_cache = {}
 
@@ -219,32 +221,23 @@ class OptimizedLocalAIManager:
             raise Exception("No model loaded")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ollama_endpoint}/api/generate",
-                    json={
-                        "model": self.current_model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": kwargs.get("temperature", 0.2),
-                            "top_p": kwargs.get("top_p", 0.9),
-                            "num_ctx": kwargs.get("context_length", 4096),
-                        },
-                    },
-                    timeout=kwargs.get("timeout", 60.0),
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "response": result["response"],
-                        "tokens_generated": result.get("eval_count", 0),
-                        "generation_time": result.get("total_duration", 0) / 1e9,
-                        "status": "success",
-                    }
-                else:
-                    raise Exception(f"HTTP {response.status_code}: {response.text}")
+            result = await self.llm.generate(
+                self.current_model,
+                prompt,
+                options={
+                    "temperature": kwargs.get("temperature", 0.2),
+                    "top_p": kwargs.get("top_p", 0.9),
+                    "num_ctx": kwargs.get("context_length", 4096),
+                },
+                timeout=kwargs.get("timeout", 60.0),
+                on_token=kwargs.get("on_token"),
+            )
+            return {
+                "response": result["response"],
+                "tokens_generated": result.get("eval_count", 0),
+                "generation_time": result.get("total_duration", 0) / 1e9,
+                "status": "success",
+            }
 
         except Exception as e:
             raise Exception(f"Model execution failed: {e}")
@@ -306,14 +299,8 @@ class OptimizedLocalAIManager:
         """Chargement modèle spécifique"""
         try:
             # Test simple pour charger le modèle en mémoire
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ollama_endpoint}/api/generate",
-                    json={"model": model_name, "prompt": "Test", "stream": False},
-                    timeout=30.0,
-                )
-
-                return response.status_code == 200
+            await self.llm.generate(model_name, "Test", timeout=30.0)
+            return True
 
         except Exception as e:
             print(f"❌ Failed to load {model_name}: {e}")
@@ -322,11 +309,8 @@ class OptimizedLocalAIManager:
     async def _check_ollama_running(self) -> bool:
         """Vérification Ollama actif"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.ollama_endpoint}/api/version", timeout=5.0
-                )
-                return response.status_code == 200
+            response = await self.llm.get("/api/version", timeout=5.0)
+            return response.status_code == 200
         except:
             return False
 
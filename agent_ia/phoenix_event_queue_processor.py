@@ -11,13 +11,15 @@ import os
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 from supabase import Client, create_client
 import structlog
 
+from event_dedup_index import EventDedupIndex
+
 # Configuration logging structuré
 structlog.configure(
     processors=[
@@ -61,6 +63,80 @@ class BatchProcessingStats:
     processing_time: float
     insights_generated: int
     duplicates_avoided: int
+    # Compteurs par étage du pipeline streaming
+    fetched: int = 0
+    pages_fetched: int = 0
+    fetch_time: float = 0.0
+    fetch_throughput: float = 0.0
+    process_throughput: float = 0.0
+    avg_event_latency: float = 0.0
+    concurrency_limit: int = 0
+    backlog_detected: bool = False
+
+class AIMDConcurrencyLimiter:
+    """
+    Limiteur de concurrence adaptatif AIMD (Additive Increase / Multiplicative Decrease)
+    
+    La limite croît d'environ +1 par "fenêtre" de succès rapides et est divisée
+    dès qu'un traitement échoue ou dépasse la latence cible.
+    """
+    
+    def __init__(self, initial_limit: int = 5, min_limit: int = 1, max_limit: int = 20,
+                 latency_target: float = 5.0, decrease_factor: float = 0.5):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        
+        self.successes = 0
+        self.errors = 0
+        self.decreases = 0
+        self.ewma_latency = 0.0
+    
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+    
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+    
+    async def acquire(self):
+        """Attend qu'un slot soit disponible sous la limite courante"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+    
+    async def release(self, latency: float, success: bool):
+        """Libère un slot et ajuste la limite selon la latence/erreur observée"""
+        async with self._condition:
+            self._in_flight -= 1
+            self.ewma_latency = latency if self.ewma_latency == 0.0 else 0.8 * self.ewma_latency + 0.2 * latency
+            
+            if not success:
+                self.errors += 1
+            
+            if not success or latency > self.latency_target:
+                self.decreases += 1
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+            else:
+                self.successes += 1
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            
+            self._condition.notify_all()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "successes": self.successes,
+            "errors": self.errors,
+            "decreases": self.decreases,
+            "ewma_latency": self.ewma_latency
+        }
 
 class PhoenixEventQueueProcessor:
     """
@@ -89,14 +165,29 @@ class PhoenixEventQueueProcessor:
         
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
         
-        # Cache des événements traités pour déduplication
-        self._processed_hashes: Set[str] = set()
-        self._processing_lock = asyncio.Lock()
-        
         # Configuration
         self.batch_size = int(os.getenv("EVENT_BATCH_SIZE", "50"))
         self.max_retries = int(os.getenv("EVENT_MAX_RETRIES", "3"))
         self.processing_timeout = int(os.getenv("EVENT_PROCESSING_TIMEOUT", "30"))
+        self.dedup_sync_page_size = int(os.getenv("EVENT_DEDUP_SYNC_PAGE_SIZE", "1000"))
+        self.queue_size = int(os.getenv("EVENT_QUEUE_SIZE", str(self.batch_size * 2)))
+        self.cycle_max_events = int(os.getenv("EVENT_CYCLE_MAX_EVENTS", str(self.batch_size * 10)))
+        self.min_cycle_interval = float(os.getenv("EVENT_MIN_CYCLE_INTERVAL", "1.0"))
+        
+        # Concurrence adaptative (AIMD) sur la latence et le taux d'erreur
+        self._limiter = AIMDConcurrencyLimiter(
+            initial_limit=int(os.getenv("EVENT_INITIAL_CONCURRENCY", "5")),
+            min_limit=int(os.getenv("EVENT_MIN_CONCURRENCY", "1")),
+            max_limit=int(os.getenv("EVENT_MAX_CONCURRENCY", "20")),
+            latency_target=float(os.getenv("EVENT_LATENCY_TARGET", "5.0"))
+        )
+        
+        # Index persistant des événements traités pour déduplication
+        self._dedup_index = EventDedupIndex(
+            db_path=os.getenv("EVENT_DEDUP_DB_PATH", "./phoenix_event_dedup.db"),
+            retention_days=int(os.getenv("EVENT_DEDUP_RETENTION_DAYS", "7"))
+        )
+        self._processing_lock = asyncio.Lock()
         
         logger.info("✅ PhoenixEventQueueProcessor initialisé", 
                    batch_size=self.batch_size, 
@@ -128,35 +219,71 @@ class PhoenixEventQueueProcessor:
         signature_str = f"{signature_data['stream_id']}:{signature_data['event_type']}:{signature_data['timestamp']}:{signature_data['app_source']}:{signature_data['payload_hash']}"
         return hashlib.sha256(signature_str.encode()).hexdigest()
     
-    async def _load_processed_hashes(self):
-        """Charge les hashes des événements déjà traités"""
+    async def _sync_processed_hashes(self):
+        """Synchronise l'index avec les événements traités depuis le dernier watermark"""
         try:
-            # Récupérer les événements traités des 7 derniers jours pour éviter retraitement
-            cutoff_date = datetime.now() - timedelta(days=7)
+            self._dedup_index.expire()
             
-            response = self.supabase.table('phoenix_events')\
-                .select('event_id, stream_id, event_type, timestamp, app_source, payload')\
-                .not_.is_('ai_processed_at', 'null')\
-                .gte('timestamp', cutoff_date.isoformat())\
-                .execute()
-            
-            # Générer hashes pour tous les événements traités
-            for event in response.data:
-                event_hash = self._generate_event_hash(event)
-                self._processed_hashes.add(event_hash)
+            # Premier démarrage: rattrapage borné à la fenêtre de rétention
+            watermark = self._dedup_index.watermark or (
+                (datetime.now() - timedelta(days=self._dedup_index.retention_days)).isoformat(),
+                None
+            )
+            synced = 0
+            
+            while True:
+                # Pagination keyset (ai_processed_at, event_id): les lignes partageant
+                # le même ai_processed_at en limite de page ne sont pas sautées
+                processed_at, event_id = watermark
+                query = self.supabase.table('phoenix_events')\
+                    .select('event_id, stream_id, event_type, timestamp, app_source, payload, ai_processed_at')
+                
+                if event_id is None:
+                    query = query.gte('ai_processed_at', processed_at)
+                else:
+                    query = query.or_(
+                        f"ai_processed_at.gt.{processed_at},"
+                        f"and(ai_processed_at.eq.{processed_at},event_id.gt.{event_id})"
+                    )
+                
+                response = query\
+                    .order('ai_processed_at', desc=False)\
+                    .order('event_id', desc=False)\
+                    .limit(self.dedup_sync_page_size)\
+                    .execute()
+                
+                rows = response.data
+                if not rows:
+                    break
+                
+                self._dedup_index.add_many(self._generate_event_hash(event) for event in rows)
+                watermark = (rows[-1]['ai_processed_at'], rows[-1]['event_id'])
+                self._dedup_index.watermark = watermark
+                synced += len(rows)
+                
+                if len(rows) < self.dedup_sync_page_size:
+                    break
             
-            logger.info(f"📚 Chargé {len(self._processed_hashes)} hashes d'événements traités")
+            self._dedup_index.stats.synced_rows += synced
+            logger.info(f"📚 Synchronisé {synced} hashes d'événements traités",
+                       watermark=watermark[0])
             
         except Exception as e:
-            logger.error(f"❌ Erreur chargement hashes: {e}")
-            # Continue sans cache - mode dégradé
+            logger.error(f"❌ Erreur synchronisation hashes: {e}")
+            # Continue avec l'index local - mode dégradé
+    
+    def get_dedup_stats(self) -> Dict[str, Any]:
+        """Métriques de l'index de déduplication (hits, faux positifs Bloom, expirations)"""
+        return self._dedup_index.get_stats()
     
-    async def get_unprocessed_events(self, limit: int = None) -> List[Dict[str, Any]]:
+    async def get_unprocessed_events(self, limit: int = None,
+                                     after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
         """
         Récupère les événements non traités par IA de manière sûre
         
         Args:
             limit: Nombre max d'événements (batch_size par défaut)
+            after: Curseur keyset (timestamp, event_id) du dernier événement déjà lu
             
         Returns:
             List[Dict]: Événements à traiter
@@ -165,12 +292,22 @@ class PhoenixEventQueueProcessor:
             limit = self.batch_size
         
         try:
-            # Requête optimisée avec index
-            response = self.supabase.table('phoenix_events')\
+            # Requête optimisée avec index - pagination keyset (timestamp, event_id)
+            query = self.supabase.table('phoenix_events')\
                 .select('*')\
                 .is_('ai_processed_at', 'null')\
                 .is_('ai_processing_error', 'null')\
+                .is_('ai_processing_started_at', 'null')  # Verrouillés par une autre instance
+            
+            if after is not None:
+                cursor_ts, cursor_id = after
+                query = query.or_(
+                    f"timestamp.gt.{cursor_ts},and(timestamp.eq.{cursor_ts},event_id.gt.{cursor_id})"
+                )
+            
+            response = query\
                 .order('timestamp', desc=False)\
+                .order('event_id', desc=False)\
                 .limit(limit)\
                 .execute()
             
@@ -346,8 +483,10 @@ class PhoenixEventQueueProcessor:
         try:
             # 1. Vérification déduplication
             event_hash = self._generate_event_hash(event)
-            if event_hash in self._processed_hashes:
+            if self._dedup_index.contains(event_hash):
                 logger.warning(f"🔄 Événement {event_id} déjà traité (hash: {event_hash[:8]})")
+                # Marquer le doublon pour qu'il ne soit plus relu à chaque cycle
+                await self._mark_event_processing(event_id, ProcessingStatus.SKIPPED)
                 return EventProcessingResult(
                     event_id=event_id,
                     status=ProcessingStatus.SKIPPED,
@@ -389,7 +528,7 @@ class PhoenixEventQueueProcessor:
                 .execute()
             
             # 5. Mise à jour cache déduplication
-            self._processed_hashes.add(event_hash)
+            self._dedup_index.add(event_hash)
             
             # 6. Marquer comme complété
             await self._mark_event_processing(event_id, ProcessingStatus.COMPLETED)
@@ -426,6 +565,114 @@ class PhoenixEventQueueProcessor:
                 error_message=str(e)
             )
     
+    async def _worker(self, queue: asyncio.Queue, results: List[EventProcessingResult]):
+        """Consomme la file de travail sous contrôle du limiteur adaptatif"""
+        while True:
+            event = await queue.get()
+            try:
+                if event is None:
+                    return
+                
+                await self._limiter.acquire()
+                start = time.time()
+                result = None
+                try:
+                    result = await self.process_event(event)
+                except Exception as e:
+                    result = EventProcessingResult(
+                        event_id=event.get("event_id"),
+                        status=ProcessingStatus.FAILED,
+                        processing_time=time.time() - start,
+                        error_message=str(e)
+                    )
+                finally:
+                    await self._limiter.release(
+                        time.time() - start,
+                        success=result is not None and result.status != ProcessingStatus.FAILED
+                    )
+                results.append(result)
+            finally:
+                queue.task_done()
+    
+    async def _fetch_into_queue(self, queue: asyncio.Queue, stats: BatchProcessingStats, max_events: int):
+        """Producteur: pagine les événements non traités vers la file bornée"""
+        cursor = None
+        
+        while stats.fetched < max_events:
+            remaining = max_events - stats.fetched
+            limit = min(self.batch_size, remaining)
+            # Dernière page du cycle: une ligne de plus indique s'il reste du travail
+            probe = 1 if limit == remaining else 0
+            
+            fetch_start = time.time()
+            events = await self.get_unprocessed_events(limit=limit + probe, after=cursor)
+            stats.fetch_time += time.time() - fetch_start
+            stats.pages_fetched += 1
+            
+            if len(events) > limit:
+                # Ligne sonde: non traitée, elle sera relue au cycle suivant
+                stats.backlog_detected = True
+                events = events[:limit]
+            
+            for event in events:
+                await queue.put(event)  # Backpressure si les workers saturent
+            stats.fetched += len(events)
+            
+            if len(events) < limit:
+                return
+            cursor = (events[-1]["timestamp"], events[-1]["event_id"])
+    
+    async def _run_pipeline(self, producer, stats: BatchProcessingStats) -> BatchProcessingStats:
+        """Exécute producteur + N workers et agrège les statistiques"""
+        start_time = time.time()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        results: List[EventProcessingResult] = []
+        
+        workers = [
+            asyncio.create_task(self._worker(queue, results))
+            for _ in range(self._limiter.max_limit)
+        ]
+        
+        try:
+            await producer(queue)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        # Analyse des résultats
+        processing_time = time.time() - start_time
+        stats.total_events = len(results)
+        stats.processed = sum(1 for r in results if r.status == ProcessingStatus.COMPLETED)
+        stats.skipped = sum(1 for r in results if r.status == ProcessingStatus.SKIPPED)
+        stats.failed = sum(1 for r in results if r.status == ProcessingStatus.FAILED)
+        stats.insights_generated = sum(1 for r in results if r.ai_insights is not None)
+        stats.duplicates_avoided = sum(1 for r in results if "Duplicate" in (r.error_message or ""))
+        stats.processing_time = processing_time
+        
+        latencies = [r.processing_time for r in results if r.processing_time is not None]
+        stats.avg_event_latency = sum(latencies) / len(latencies) if latencies else 0.0
+        stats.fetch_throughput = stats.fetched / stats.fetch_time if stats.fetch_time > 0 else 0.0
+        stats.process_throughput = stats.total_events / processing_time if processing_time > 0 else 0.0
+        stats.concurrency_limit = self._limiter.limit
+        
+        logger.info(f"📊 Batch traité en {processing_time:.2f}s", 
+                   processed=stats.processed, 
+                   skipped=stats.skipped, 
+                   failed=stats.failed,
+                   insights=stats.insights_generated,
+                   concurrency=stats.concurrency_limit,
+                   throughput=f"{stats.process_throughput:.1f}/s")
+        
+        return stats
+    
+    @staticmethod
+    def _empty_stats() -> BatchProcessingStats:
+        return BatchProcessingStats(
+            total_events=0, processed=0, skipped=0, failed=0,
+            processing_time=0.0, insights_generated=0, duplicates_avoided=0
+        )
+    
     async def process_batch(self, events: List[Dict[str, Any]]) -> BatchProcessingStats:
         """
         Traite un batch d'événements de manière optimale
@@ -436,49 +683,40 @@ class PhoenixEventQueueProcessor:
         Returns:
             BatchProcessingStats: Statistiques complètes
         """
-        start_time = time.time()
-        
         logger.info(f"🚀 Démarrage traitement batch de {len(events)} événements")
         
-        # Traitement concurrent avec limite
-        semaphore = asyncio.Semaphore(5)  # Max 5 événements simultanés
+        stats = self._empty_stats()
+        stats.fetched = len(events)
         
-        async def process_with_semaphore(event):
-            async with semaphore:
-                return await self.process_event(event)
+        async def producer(queue: asyncio.Queue):
+            for event in events:
+                await queue.put(event)
         
-        # Exécution parallèle contrôlée
-        results = await asyncio.gather(
-            *[process_with_semaphore(event) for event in events],
-            return_exceptions=True
-        )
-        
-        # Analyse des résultats
-        processed = sum(1 for r in results if isinstance(r, EventProcessingResult) and r.status == ProcessingStatus.COMPLETED)
-        skipped = sum(1 for r in results if isinstance(r, EventProcessingResult) and r.status == ProcessingStatus.SKIPPED)
-        failed = sum(1 for r in results if isinstance(r, EventProcessingResult) and r.status == ProcessingStatus.FAILED)
-        insights_generated = sum(1 for r in results if isinstance(r, EventProcessingResult) and r.ai_insights is not None)
-        duplicates_avoided = sum(1 for r in results if isinstance(r, EventProcessingResult) and "Duplicate" in (r.error_message or ""))
+        return await self._run_pipeline(producer, stats)
+    
+    async def process_stream(self, max_events: int = None) -> BatchProcessingStats:
+        """
+        Traite la queue en streaming: pagination keyset → file bornée → workers
         
-        processing_time = time.time() - start_time
+        Args:
+            max_events: Plafond d'événements pour ce cycle (cycle_max_events par défaut)
+            
+        Returns:
+            BatchProcessingStats: Statistiques complètes avec compteurs par étage
+        """
+        if max_events is None:
+            max_events = self.cycle_max_events
         
-        stats = BatchProcessingStats(
-            total_events=len(events),
-            processed=processed,
-            skipped=skipped,
-            failed=failed,
-            processing_time=processing_time,
-            insights_generated=insights_generated,
-            duplicates_avoided=duplicates_avoided
-        )
+        stats = self._empty_stats()
         
-        logger.info(f"📊 Batch traité en {processing_time:.2f}s", 
-                   processed=processed, 
-                   skipped=skipped, 
-                   failed=failed,
-                   insights=insights_generated)
+        async def producer(queue: asyncio.Queue):
+            await self._fetch_into_queue(queue, stats, max_events)
         
-        return stats
+        return await self._run_pipeline(producer, stats)
+    
+    def get_concurrency_stats(self) -> Dict[str, Any]:
+        """Etat du limiteur adaptatif (limite courante, latence EWMA, erreurs)"""
+        return self._limiter.get_stats()
     
     async def run_processing_cycle(self) -> BatchProcessingStats:
         """
@@ -488,21 +726,14 @@ class PhoenixEventQueueProcessor:
             BatchProcessingStats: Résultats du cycle
         """
         async with self._processing_lock:
-            # 1. Charger cache déduplication
-            await self._load_processed_hashes()
+            # 1. Synchroniser l'index de déduplication (delta depuis le watermark)
+            await self._sync_processed_hashes()
             
-            # 2. Récupérer événements non traités
-            events = await self.get_unprocessed_events()
+            # 2. Récupérer et traiter les événements en streaming
+            stats = await self.process_stream()
             
-            if not events:
+            if stats.fetched == 0:
                 logger.info("✨ Aucun événement à traiter - queue vide")
-                return BatchProcessingStats(
-                    total_events=0, processed=0, skipped=0, failed=0,
-                    processing_time=0.0, insights_generated=0, duplicates_avoided=0
-                )
-            
-            # 3. Traiter le batch
-            stats = await self.process_batch(events)
             
             return stats
     
@@ -522,6 +753,14 @@ class PhoenixEventQueueProcessor:
                 if stats.total_events > 0:
                     logger.info(f"📈 Cycle terminé: {stats.processed} traités, {stats.failed} échecs")
                 
+                if stats.backlog_detected:
+                    # Backlog: enchaîner les cycles sans attendre l'intervalle complet,
+                    # avec une pause plancher pour ne pas marteler Supabase
+                    logger.info("⏩ Backlog détecté - cycle suivant anticipé",
+                               pause=self.min_cycle_interval)
+                    await asyncio.sleep(min(self.min_cycle_interval, interval))
+                    continue
+                
                 await asyncio.sleep(interval)
                 
             except KeyboardInterrupt:
@@ -12,6 +12,7 @@ import structlog
 import uvicorn
 from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from local_llm_client import close_local_llm_clients
 from pydantic import BaseModel
 from security_guardian_agent import PhoenixSecurityInterface
 
@@ -130,6 +131,8 @@ async def shutdown_event():
     """Nettoyage au shutdown"""
     logger.info("🔄 Shutting down Phoenix Security Guardian API...")
 
+    await close_local_llm_clients()
+
 
 # ========================================
 # 🛡️ ENDPOINTS SÉCURITÉ
@@ -8,13 +8,24 @@ import asyncio
 import hashlib
 import json
 import logging
+import os
 import re
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-import httpx
+from local_llm_client import LocalLLMError, get_local_llm_client
+
+try:
+    from phoenix_scan import PatternScanner, ScanHit, literal_rules, regex_rules
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../packages"))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_scan import PatternScanner, ScanHit, literal_rules, regex_rules
 
 # Configuration logging
 logging.basicConfig(
@@ -78,6 +89,109 @@ class SecurityReport:
     risk_score: float
 
 
+# ========================================
+# 🔎 PATTERNS SÉCURITÉ (compilés une fois)
+# ========================================
+
+# Patterns menaces
+THREAT_PATTERNS = {
+    "prompt_injection": [
+        "ignore previous instructions",
+        "system prompt",
+        "act as",
+        "pretend to be",
+        "jailbreak",
+        "override",
+        "forget everything",
+        "new instructions",
+    ],
+    "data_exfiltration": [
+        "export data",
+        "download database",
+        "show all users",
+        "admin password",
+        "secret key",
+        "api key",
+    ],
+    "malicious_code": [
+        "eval(",
+        "exec(",
+        "import os",
+        "subprocess",
+        "__import__",
+        "open(",
+        "file(",
+    ],
+    "social_engineering": [
+        "urgent",
+        "immediate action",
+        "suspend account",
+        "verify identity",
+        "click here now",
+    ],
+}
+
+# Patterns données personnelles (regex)
+PII_PATTERNS = {
+    "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
+    "phone_fr": r"\b(?:0[1-9]|[+]33[1-9])(?:[0-9]{8}|[0-9]{9})\b",
+    "carte_bancaire": r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13})\b",
+    "secu_sociale": r"\b[12][0-9]{2}(0[1-9]|1[0-2])[0-9]{8}\b",
+    "iban": r"\b[A-Z]{2}[0-9]{2}[A-Z0-9]{4}[0-9]{7}([A-Z0-9]?){0,16}\b",
+    "adresse_ip": r"\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b",
+}
+
+# Mots-clés RGPD sensibles
+RGPD_KEYWORDS = {
+    "donnees_sensibles": [
+        "origine raciale",
+        "ethnique",
+        "opinions politiques",
+        "convictions religieuses",
+        "philosophiques",
+        "appartenance syndicale",
+        "données génétiques",
+        "biométriques",
+        "santé",
+        "vie sexuelle",
+        "orientation sexuelle",
+        "casier judiciaire",
+        "infractions",
+    ],
+    "donnees_medicales": [
+        "maladie",
+        "handicap",
+        "pathologie",
+        "traitement médical",
+        "hospitalisation",
+        "médecin",
+        "diagnostic",
+        "allergie",
+    ],
+    "donnees_financieres": [
+        "salaire",
+        "revenus",
+        "dettes",
+        "crédit",
+        "patrimoine",
+        "situation financière",
+        "impôts",
+        "déclaration",
+    ],
+}
+
+PII_CATEGORY_PREFIX = "pii:"
+RGPD_CATEGORY_PREFIX = "rgpd:"
+
+# Un seul scan couvre menaces, PII et mots-clés RGPD
+_SCANNER = PatternScanner(
+    literal_rules(THREAT_PATTERNS, re.IGNORECASE)
+    + regex_rules({PII_CATEGORY_PREFIX + pii_type: [pattern] for pii_type, pattern in PII_PATTERNS.items()})
+    + literal_rules({RGPD_CATEGORY_PREFIX + category: keywords for category, keywords in RGPD_KEYWORDS.items()}, re.IGNORECASE)
+)
+_RULE_ORDER = {rule: index for index, rule in enumerate(_SCANNER.rules)}
+
+
 # ========================================
 # 🛡️ SECURITY GUARDIAN AGENT PRINCIPAL
 # ========================================
@@ -94,11 +208,13 @@ class SecurityGuardianAgent:
         self.endpoint = ollama_endpoint
         self.model = "phi3.5:3.8b"
         self.is_model_loaded = False
+        self.llm = get_local_llm_client(ollama_endpoint)
 
         # Base de connaissances sécurité
-        self.threat_patterns = self._init_threat_patterns()
-        self.pii_patterns = self._init_pii_patterns()
-        self.rgpd_keywords = self._init_rgpd_keywords()
+        self.threat_patterns = THREAT_PATTERNS
+        self.pii_patterns = PII_PATTERNS
+        self.rgpd_keywords = RGPD_KEYWORDS
+        self._last_scan: Optional[tuple] = None
 
         # Statistiques
         self.stats = {
@@ -110,95 +226,11 @@ class SecurityGuardianAgent:
 
         logger.info("🛡️ Security Guardian Agent initialized")
 
-    def _init_threat_patterns(self) -> Dict[str, List[str]]:
-        """Initialisation patterns menaces"""
-        return {
-            "prompt_injection": [
-                "ignore previous instructions",
-                "system prompt",
-                "act as",
-                "pretend to be",
-                "jailbreak",
-                "override",
-                "forget everything",
-                "new instructions",
-            ],
-            "data_exfiltration": [
-                "export data",
-                "download database",
-                "show all users",
-                "admin password",
-                "secret key",
-                "api key",
-            ],
-            "malicious_code": [
-                "eval(",
-                "exec(",
-                "import os",
-                "subprocess",
-                "__import__",
-                "open(",
-                "file(",
-            ],
-            "social_engineering": [
-                "urgent",
-                "immediate action",
-                "suspend account",
-                "verify identity",
-                "click here now",
-            ],
-        }
-
-    def _init_pii_patterns(self) -> Dict[str, str]:
-        """Patterns données personnelles (regex)"""
-        return {
-            "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
-            "phone_fr": r"\b(?:0[1-9]|[+]33[1-9])(?:[0-9]{8}|[0-9]{9})\b",
-            "carte_bancaire": r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13})\b",
-            "secu_sociale": r"\b[12][0-9]{2}(0[1-9]|1[0-2])[0-9]{8}\b",
-            "iban": r"\b[A-Z]{2}[0-9]{2}[A-Z0-9]{4}[0-9]{7}([A-Z0-9]?){0,16}\b",
-            "adresse_ip": r"\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b",
-        }
-
-    def _init_rgpd_keywords(self) -> Dict[str, List[str]]:
-        """Mots-clés RGPD sensibles"""
-        return {
-            "donnees_sensibles": [
-                "origine raciale",
-                "ethnique",
-                "opinions politiques",
-                "convictions religieuses",
-                "philosophiques",
-                "appartenance syndicale",
-                "données génétiques",
-                "biométriques",
-                "santé",
-                "vie sexuelle",
-                "orientation sexuelle",
-                "casier judiciaire",
-                "infractions",
-            ],
-            "donnees_medicales": [
-                "maladie",
-                "handicap",
-                "pathologie",
-                "traitement médical",
-                "hospitalisation",
-                "médecin",
-                "diagnostic",
-                "allergie",
-            ],
-            "donnees_financieres": [
-                "salaire",
-                "revenus",
-                "dettes",
-                "crédit",
-                "patrimoine",
-                "situation financière",
-                "impôts",
-                "déclaration",
-            ],
-        }
+    def _scan(self, content: str) -> List[ScanHit]:
+        """Scan unique du contenu (réutilisé par les détections d'une même analyse)"""
+        if self._last_scan is None or self._last_scan[0] is not content:
+            self._last_scan = (content, _SCANNER.scan(content))
+        return self._last_scan[1]
 
     async def start_agent(self) -> bool:
         """
@@ -273,54 +305,56 @@ class SecurityGuardianAgent:
     async def _detect_threats_patterns(self, content: str) -> List[SecurityThreat]:
         """Détection menaces via patterns"""
         threats = []
-        content_lower = content.lower()
-
-        for threat_type, patterns in self.threat_patterns.items():
-            for pattern in patterns:
-                if pattern in content_lower:
-                    threat = SecurityThreat(
-                        threat_type=threat_type,
-                        confidence=0.8,
-                        description=f"Pattern détecté: {pattern}",
-                        risk_level=(
-                            ThreatLevel.HIGH
-                            if threat_type == "prompt_injection"
-                            else ThreatLevel.MEDIUM
-                        ),
-                        mitigation=f"Bloquer ou sanitiser le contenu contenant '{pattern}'",
-                    )
-                    threats.append(threat)
+        found = {hit.rule for hit in self._scan(content) if hit.category in THREAT_PATTERNS}
+
+        for rule in sorted(found, key=_RULE_ORDER.__getitem__):
+            threat_type, pattern = rule.category, rule.pattern
+            threat = SecurityThreat(
+                threat_type=threat_type,
+                confidence=0.8,
+                description=f"Pattern détecté: {pattern}",
+                risk_level=(
+                    ThreatLevel.HIGH
+                    if threat_type == "prompt_injection"
+                    else ThreatLevel.MEDIUM
+                ),
+                mitigation=f"Bloquer ou sanitiser le contenu contenant '{pattern}'",
+            )
+            threats.append(threat)
 
         return threats
 
     async def _detect_pii(self, content: str) -> List[PIIDetection]:
         """Détection données personnelles"""
         pii_list = []
+        pii_hits = sorted(
+            (hit for hit in self._scan(content) if hit.category.startswith(PII_CATEGORY_PREFIX)),
+            key=lambda hit: (_RULE_ORDER[hit.rule], hit.start),
+        )
 
-        for pii_type, pattern in self.pii_patterns.items():
-            matches = re.findall(pattern, content)
-
-            for match in matches:
-                # Masquage valeur
-                if pii_type == "email":
-                    masked = match[:3] + "***@***.***"
-                elif pii_type in ["phone_fr", "carte_bancaire", "secu_sociale"]:
-                    masked = match[:4] + "*" * (len(match) - 4)
-                else:
-                    masked = match[:4] + "*" * max(0, len(match) - 4)
-
-                pii = PIIDetection(
-                    pii_type=pii_type,
-                    value_masked=masked,
-                    risk_level=(
-                        ThreatLevel.HIGH
-                        if pii_type in ["carte_bancaire", "secu_sociale"]
-                        else ThreatLevel.MEDIUM
-                    ),
-                    location=f"Position approximative: {content.find(match)}",
-                    anonymization_required=True,
-                )
-                pii_list.append(pii)
+        for hit in pii_hits:
+            pii_type, match = hit.category[len(PII_CATEGORY_PREFIX):], hit.text
+
+            # Masquage valeur
+            if pii_type == "email":
+                masked = match[:3] + "***@***.***"
+            elif pii_type in ["phone_fr", "carte_bancaire", "secu_sociale"]:
+                masked = match[:4] + "*" * (len(match) - 4)
+            else:
+                masked = match[:4] + "*" * max(0, len(match) - 4)
+
+            pii = PIIDetection(
+                pii_type=pii_type,
+                value_masked=masked,
+                risk_level=(
+                    ThreatLevel.HIGH
+                    if pii_type in ["carte_bancaire", "secu_sociale"]
+                    else ThreatLevel.MEDIUM
+                ),
+                location=f"Position: {hit.start}",
+                anonymization_required=True,
+            )
+            pii_list.append(pii)
 
         return pii_list
 
@@ -479,24 +513,22 @@ class SecurityGuardianAgent:
     async def _check_ollama_available(self) -> bool:
         """Vérification disponibilité Ollama"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.endpoint}/api/version", timeout=5.0)
-                return response.status_code == 200
+            response = await self.llm.get("/api/version", timeout=5.0)
+            return response.status_code == 200
         except:
             return False
 
     async def _check_model_available(self) -> bool:
         """Vérification modèle disponible"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.endpoint}/api/tags", timeout=10.0)
+            response = await self.llm.get("/api/tags", timeout=10.0)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    models = [model["name"] for model in data.get("models", [])]
-                    return self.model in models
+            if response.status_code == 200:
+                data = response.json()
+                models = [model["name"] for model in data.get("models", [])]
+                return self.model in models
 
-                return False
+            return False
         except:
             return False
 
@@ -539,28 +571,20 @@ class SecurityGuardianAgent:
         """Requête vers modèle IA"""
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.endpoint}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": temperature,
-                            "top_p": 0.9,
-                            "num_ctx": 4096,
-                        },
-                    },
-                    timeout=timeout,
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"❌ Model query failed: HTTP {response.status_code}")
-                    return None
+            return await self.llm.generate(
+                self.model,
+                prompt,
+                options={
+                    "temperature": temperature,
+                    "top_p": 0.9,
+                    "num_ctx": 4096,
+                },
+                timeout=timeout,
+            )
 
+        except LocalLLMError as e:
+            logger.error(f"❌ Model query failed: HTTP {e.status_code}")
+            return None
         except Exception as e:
             logger.error(f"❌ Model query error: {e}")
             return None
@@ -573,12 +597,9 @@ class SecurityGuardianAgent:
         """Analyse RGPD fallback"""
 
         # Détection basique données sensibles
-        sensitive_detected = []
-        content_lower = content.lower()
-
-        for category, keywords in self.rgpd_keywords.items():
-            if any(keyword in content_lower for keyword in keywords):
-                sensitive_detected.append(category)
+        found = {hit.category[len(RGPD_CATEGORY_PREFIX):] for hit in self._scan(content)
+                 if hit.category.startswith(RGPD_CATEGORY_PREFIX)}
+        sensitive_detected = [category for category in self.rgpd_keywords if category in found]
 
         return {
             "compliance_status": (
@@ -657,15 +678,11 @@ class SecurityGuardianAgent:
 
     async def quick_threat_check(self, content: str) -> bool:
         """Vérification rapide menaces (sans IA)"""
-        content_lower = content.lower()
-
         # Check patterns critiques
-        for threat_type, patterns in self.threat_patterns.items():
-            if threat_type == "prompt_injection":
-                for pattern in patterns:
-                    if pattern in content_lower:
-                        logger.warning(f"🚨 Quick threat detected: {pattern}")
-                        return True
+        found = _SCANNER.matched_rules(content, ["prompt_injection"])
+        if found:
+            logger.warning(f"🚨 Quick threat detected: {found[0].pattern}")
+            return True
 
         return False
 
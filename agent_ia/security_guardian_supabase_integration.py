@@ -9,6 +9,8 @@ import hashlib
 import json
 import logging
 import os
+import re
+import sys
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -26,8 +28,62 @@ from .security_guardian_agent import (
     SecurityThreat,
 )
 
+try:
+    from phoenix_scan import PatternScanner, regex_rules
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../packages"))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_scan import PatternScanner, regex_rules
+
 logger = logging.getLogger(__name__)
 
+# ========================================
+# 🔎 PATTERNS SÉCURITÉ (compilés une fois)
+# ========================================
+
+# Patterns menaces (insensibles à la casse)
+THREAT_PATTERNS = {
+    "prompt_injection": [
+        r"ignore\s+previous\s+instructions",
+        r"you\s+are\s+now\s+a\s+different",
+        r"forget\s+your\s+role",
+        r"act\s+as\s+if\s+you\s+are",
+    ],
+    "data_extraction": [
+        r"show\s+me\s+all\s+data",
+        r"export\s+user\s+information",
+        r"list\s+all\s+users",
+        r"database\s+contents",
+    ],
+    "malicious_content": [
+        r"<script\s*>",
+        r"javascript:",
+        r"vbscript:",
+        r"onload\s*=",
+    ]
+}
+
+# Patterns PII et masque d'anonymisation associé
+PII_PATTERNS = {
+    "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    "phone": r'\b(?:\+33|0)[1-9](?:[0-9]{8})\b',
+    "ssn": r'\b[1-2][0-9]{2}[0-1][0-9][0-9]{2}[0-9]{3}[0-9]{2}\b'
+}
+PII_MASKS = {
+    "email": '[EMAIL_MASQUÉ]',
+    "phone": '[TÉLÉPHONE_MASQUÉ]',
+    "ssn": '[N°SÉCU_MASQUÉ]',
+}
+PII_CATEGORIES = ["pii_" + pii_type for pii_type in PII_PATTERNS]
+
+# Catégories PII nommées comme les threat_type publiés ("pii_email"...)
+_SCANNER = PatternScanner(
+    regex_rules(THREAT_PATTERNS, re.IGNORECASE)
+    + regex_rules({"pii_" + pii_type: [pattern] for pii_type, pattern in PII_PATTERNS.items()})
+)
+
 # ========================================
 # 🛡️ STRUCTURES EVENT-SOURCING SÉCURITÉ
 # ========================================
@@ -97,26 +153,7 @@ class SecurityGuardianSupabasePublisher:
         self.security_agent = SecurityGuardianAgent()
         
         # Configuration patterns menaces
-        self.threat_patterns = {
-            "prompt_injection": [
-                r"ignore\s+previous\s+instructions",
-                r"you\s+are\s+now\s+a\s+different",
-                r"forget\s+your\s+role",
-                r"act\s+as\s+if\s+you\s+are",
-            ],
-            "data_extraction": [
-                r"show\s+me\s+all\s+data",
-                r"export\s+user\s+information",
-                r"list\s+all\s+users",
-                r"database\s+contents",
-            ],
-            "malicious_content": [
-                r"<script\s*>",
-                r"javascript:",
-                r"vbscript:",
-                r"onload\s*=",
-            ]
-        }
+        self.threat_patterns = THREAT_PATTERNS
         
         logger.info("✅ SecurityGuardianSupabasePublisher initialisé")
 
@@ -177,31 +214,27 @@ class SecurityGuardianSupabasePublisher:
         compliance_status = ComplianceStatus.COMPLIANT
         recommendations = []
         
+        # Un seul scan pour menaces et PII
+        found = _SCANNER.matched_rules(content)
+        
         # 1. Détection patterns menaces
-        for threat_type, patterns in self.threat_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    threat = SecurityThreat(
-                        threat_type=threat_type,
-                        confidence=0.9,
-                        severity=ThreatLevel.HIGH,
-                        description=f"Pattern malveillant détecté: {pattern}"
-                    )
-                    detected_threats.append(threat)
-                    threat_level = ThreatLevel.HIGH
+        for rule in found:
+            if rule.category in THREAT_PATTERNS:
+                threat = SecurityThreat(
+                    threat_type=rule.category,
+                    confidence=0.9,
+                    severity=ThreatLevel.HIGH,
+                    description=f"Pattern malveillant détecté: {rule.pattern}"
+                )
+                detected_threats.append(threat)
+                threat_level = ThreatLevel.HIGH
         
         # 2. Détection PII (données personnelles)
-        pii_patterns = {
-            "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            "phone": r'\b(?:\+33|0)[1-9](?:[0-9]{8})\b',
-            "ssn": r'\b[1-2][0-9]{2}[0-1][0-9][0-9]{2}[0-9]{3}[0-9]{2}\b'
-        }
-        
-        for pii_type, pattern in pii_patterns.items():
-            matches = re.findall(pattern, content)
-            if matches:
+        for rule in found:
+            if rule.category in PII_CATEGORIES:
+                pii_type = rule.category[len("pii_"):]
                 threat = SecurityThreat(
-                    threat_type=f"pii_{pii_type}",
+                    threat_type=rule.category,
                     confidence=0.8,
                     severity=ThreatLevel.MEDIUM,
                     description=f"Données personnelles détectées: {pii_type}"
@@ -251,27 +284,11 @@ class SecurityGuardianSupabasePublisher:
         """
         Anonymise le contenu en masquant les PII
         """
-        anonymized = content
-        
-        # Masquer emails
-        anonymized = re.sub(
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            '[EMAIL_MASQUÉ]',
-            anonymized
-        )
-        
-        # Masquer téléphones
-        anonymized = re.sub(
-            r'\b(?:\+33|0)[1-9](?:[0-9]{8})\b',
-            '[TÉLÉPHONE_MASQUÉ]',
-            anonymized
-        )
-        
-        # Masquer numéros sécu
-        anonymized = re.sub(
-            r'\b[1-2][0-9]{2}[0-1][0-9][0-9]{2}[0-9]{3}[0-9]{2}\b',
-            '[N°SÉCU_MASQUÉ]',
-            anonymized
+        # Masquage emails, téléphones et numéros sécu, dans l'ordre de PII_PATTERNS
+        anonymized, _ = _SCANNER.sub(
+            content,
+            lambda hit: PII_MASKS[hit.category[len("pii_"):]],
+            PII_CATEGORIES,
         )
         
         return anonymized
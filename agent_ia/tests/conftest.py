@@ -0,0 +1,121 @@
+import os
+import re
+import sys
+
+# Les modules agent_ia s'importent à plat (cf. test_optimized_ai.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """Sous-ensemble du query builder PostgREST utilisé par agent_ia, sur une liste en mémoire"""
+
+    _KEYSET = re.compile(r"^(\w+)\.gt\.([^,]+),and\(\1\.eq\.\2,(\w+)\.gt\.([^)]+)\)$")
+
+    def __init__(self, table):
+        self._table = table
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._update = None
+
+    def select(self, *_args):
+        return self
+
+    def update(self, data):
+        self._update = data
+        return self
+
+    def _where(self, predicate):
+        self._filters.append(predicate)
+        return self
+
+    def eq(self, column, value):
+        return self._where(lambda row: row.get(column) == value)
+
+    def gt(self, column, value):
+        return self._where(lambda row: row.get(column) is not None and row[column] > value)
+
+    def gte(self, column, value):
+        return self._where(lambda row: row.get(column) is not None and row[column] >= value)
+
+    def is_(self, column, value):
+        assert value == 'null'
+        return self._where(lambda row: row.get(column) is None)
+
+    def or_(self, expression):
+        match = self._KEYSET.match(expression)
+        assert match, f"filtre or_ non supporté: {expression}"
+        first, first_value, second, second_value = match.groups()
+        return self._where(
+            lambda row: row.get(first) is not None and (
+                row[first] > first_value
+                or (row[first] == first_value and row[second] > second_value)
+            )
+        )
+
+    def order(self, column, desc=False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def execute(self):
+        self._table.queries.append(self)
+        rows = [row for row in self._table.rows if all(f(row) for f in self._filters)]
+        if self._update is not None:
+            for row in rows:
+                row.update(self._update)
+            return FakeResponse([dict(row) for row in rows])
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return FakeResponse([dict(row) for row in rows])
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def __getattr__(self, name):
+        return getattr(FakeQuery(self), name)
+
+
+class FakeSupabase:
+    def __init__(self, rows=None):
+        self.events = FakeTable(rows if rows is not None else [])
+
+    def table(self, name):
+        assert name == 'phoenix_events'
+        return self.events
+
+
+@pytest.fixture
+def fake_supabase():
+    return FakeSupabase()
+
+
+@pytest.fixture
+def make_processor(monkeypatch, tmp_path, fake_supabase):
+    """Construit un PhoenixEventQueueProcessor branché sur le faux Supabase"""
+    import phoenix_event_queue_processor as module
+
+    monkeypatch.setattr(module, "create_client", lambda url, key: fake_supabase)
+    monkeypatch.setenv("EVENT_DEDUP_DB_PATH", str(tmp_path / "dedup.db"))
+
+    def factory(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, str(value))
+        return module.PhoenixEventQueueProcessor("http://supabase.test", "service-key")
+
+    return factory
@@ -0,0 +1,87 @@
+"""
+🧪 Tests de l'index de déduplication persistant et de sa synchronisation keyset
+"""
+
+import asyncio
+
+from event_dedup_index import EventDedupIndex
+
+HOUR = EventDedupIndex.BUCKET_SECONDS
+DAY = HOUR * EventDedupIndex.GENERATION_BUCKETS
+
+
+class TestEventDedupIndex:
+
+    def test_add_and_contains_survive_restart(self, tmp_path):
+        index = EventDedupIndex(db_path=str(tmp_path / "dedup.db"))
+        index.add_many(["a", "b"])
+        assert index.contains("a")
+        assert not index.contains("z")
+        index.close()
+
+        reopened = EventDedupIndex(db_path=str(tmp_path / "dedup.db"))
+        assert reopened.contains("b")
+        assert reopened.get_stats()["entries"] == 2
+
+    def test_expired_generation_is_rotated_without_rescan(self, tmp_path, monkeypatch):
+        index = EventDedupIndex(db_path=str(tmp_path / "dedup.db"), retention_days=2)
+        start = 1_000 * DAY
+
+        monkeypatch.setattr("event_dedup_index.time.time", lambda: start)
+        index.add("old")
+        monkeypatch.setattr("event_dedup_index.time.time", lambda: start + DAY)
+        index.add("recent")
+        assert index.get_stats()["bloom_generations"] == 2
+
+        # Les filtres vivants ne doivent jamais être reconstruits par scan SQLite
+        monkeypatch.setattr(index, "_load_blooms", lambda: (_ for _ in ()).throw(AssertionError))
+        deleted = index.expire(now=start + 3 * DAY)
+
+        assert deleted == 1
+        assert index.get_stats()["bloom_generations"] == 1
+        assert not index.contains("old")
+        assert index.contains("recent")
+
+    def test_legacy_watermark_is_read_without_event_id(self, tmp_path):
+        index = EventDedupIndex(db_path=str(tmp_path / "dedup.db"))
+        with index._conn:
+            index._conn.execute(
+                "INSERT INTO dedup_meta (key, value) VALUES ('watermark', '2026-10-01T00:00:00')"
+            )
+        assert index.watermark == ("2026-10-01T00:00:00", None)
+
+        index.watermark = ("2026-10-02T00:00:00", "evt-9")
+        assert index.watermark == ("2026-10-02T00:00:00", "evt-9")
+
+
+class TestProcessedHashesSync:
+
+    def test_rows_sharing_timestamp_across_page_boundary_are_synced(
+        self, make_processor, fake_supabase
+    ):
+        processed_at = "2026-10-16T10:00:00"
+        fake_supabase.events.rows.extend(
+            {
+                "event_id": f"evt-{i:02d}",
+                "stream_id": "user-1",
+                "event_type": "letter.generated",
+                "timestamp": f"2026-10-16T09:{i:02d}:00",
+                "app_source": "letters",
+                "payload": {"n": i},
+                "ai_processed_at": processed_at if i < 5 else "2026-10-16T11:00:00",
+            }
+            for i in range(7)
+        )
+        processor = make_processor(EVENT_DEDUP_SYNC_PAGE_SIZE=3)
+        processor._dedup_index.watermark = ("2026-10-16T08:00:00", None)
+
+        asyncio.run(processor._sync_processed_hashes())
+
+        for row in fake_supabase.events.rows:
+            assert processor._dedup_index.contains(processor._generate_event_hash(row))
+        assert processor._dedup_index.watermark == ("2026-10-16T11:00:00", "evt-06")
+
+        # Un second passage ne rapatrie rien de plus
+        synced_before = processor._dedup_index.stats.synced_rows
+        asyncio.run(processor._sync_processed_hashes())
+        assert processor._dedup_index.stats.synced_rows == synced_before
@@ -0,0 +1,108 @@
+"""
+🧪 Tests du pipeline streaming de PhoenixEventQueueProcessor
+"""
+
+import asyncio
+
+import pytest
+
+from phoenix_event_queue_processor import ProcessingStatus
+
+
+def _event(i, **extra):
+    return {
+        "event_id": f"evt-{i:03d}",
+        "stream_id": "user-1",
+        "event_type": "letter.generated",
+        "timestamp": f"2026-10-16T09:00:{i:02d}",
+        "app_source": "letters",
+        "payload": {"n": i},
+        "ai_processed_at": None,
+        "ai_processing_error": None,
+        "ai_processing_started_at": None,
+        **extra,
+    }
+
+
+class TestProcessingCycle:
+
+    def test_stream_processes_all_pages(self, make_processor, fake_supabase):
+        fake_supabase.events.rows.extend(_event(i) for i in range(12))
+        processor = make_processor(EVENT_BATCH_SIZE=5)
+
+        stats = asyncio.run(processor.process_stream())
+
+        assert stats.fetched == 12
+        assert stats.processed == 12
+        assert stats.pages_fetched == 3
+        assert all(row["ai_processed_at"] for row in fake_supabase.events.rows)
+
+    def test_backlog_detected_only_when_rows_remain(self, make_processor, fake_supabase):
+        fake_supabase.events.rows.extend(_event(i) for i in range(10))
+        processor = make_processor(EVENT_BATCH_SIZE=5)
+
+        exact = asyncio.run(processor.process_stream(max_events=10))
+
+        assert exact.fetched == 10
+        assert not exact.backlog_detected
+
+        fake_supabase.events.rows.extend(_event(i) for i in range(10, 21))
+        capped = asyncio.run(processor.process_stream(max_events=10))
+
+        assert capped.fetched == 10
+        assert capped.backlog_detected
+        # La ligne sonde n'est pas consommée par le cycle plafonné
+        assert fake_supabase.events.rows[20]["ai_processed_at"] is None
+
+    def test_duplicate_is_marked_and_not_fetched_again(self, make_processor, fake_supabase):
+        original = _event(1)
+        duplicate = _event(1, event_id="evt-dup")
+        fake_supabase.events.rows.extend([original, duplicate])
+        processor = make_processor()
+        processor._dedup_index.add(processor._generate_event_hash(original))
+
+        first = asyncio.run(processor.process_stream())
+        second = asyncio.run(processor.process_stream())
+
+        assert first.duplicates_avoided == 2
+        assert duplicate["ai_processing_status"] == ProcessingStatus.SKIPPED.value
+        assert duplicate["ai_processed_at"] is not None
+        assert second.fetched == 0
+
+    def test_events_locked_by_another_instance_are_not_fetched(self, make_processor, fake_supabase):
+        fake_supabase.events.rows.extend([
+            _event(1, ai_processing_started_at="2026-10-16T09:30:00"),
+            _event(2),
+        ])
+        processor = make_processor()
+
+        stats = asyncio.run(processor.process_stream())
+
+        assert stats.fetched == 1
+        assert stats.skipped == 0
+
+
+class TestContinuousProcessing:
+
+    def test_backlog_keeps_a_minimum_pause(self, make_processor, monkeypatch):
+        processor = make_processor(EVENT_MIN_CYCLE_INTERVAL=0.5)
+        stats = processor._empty_stats()
+        stats.backlog_detected = True
+
+        async def cycle():
+            return stats
+
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            if len(sleeps) == 3:
+                raise asyncio.CancelledError
+
+        monkeypatch.setattr(processor, "run_processing_cycle", cycle)
+        monkeypatch.setattr("phoenix_event_queue_processor.asyncio.sleep", fake_sleep)
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(processor.start_continuous_processing(interval=60))
+
+        assert sleeps == [0.5, 0.5, 0.5]
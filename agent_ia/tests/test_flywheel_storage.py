@@ -0,0 +1,86 @@
+"""
+🧪 Tests du moteur de stockage SQLite du Data Flywheel
+"""
+
+import threading
+import time
+
+import pytest
+
+from flywheel_storage import FlywheelStorageEngine
+
+INSERT_PATTERN = (
+    "INSERT INTO learned_patterns (pattern_id, pattern_type, confidence_score, usage_count, "
+    "success_rate, pattern_data, created_at, last_updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_INTERACTION = "INSERT INTO interactions (session_id, user_tier) VALUES (?, ?)"
+
+
+def _pattern(pattern_id):
+    return (pattern_id, "keyword", 0.9, 1, 0.8, "{}", "2026-10-16", "2026-10-16")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    engine = FlywheelStorageEngine(tmp_path / "flywheel.db")
+    yield engine
+    engine.close()
+
+
+class TestFlywheelStorageEngine:
+
+    def test_writes_are_visible_after_flush(self, storage):
+        for i in range(20):
+            storage.enqueue(INSERT_INTERACTION, (f"s{i}", "free"))
+
+        rows = storage.fetchall_sync("SELECT COUNT(*) AS n FROM interactions")
+
+        assert rows == [{"n": 20}]
+        assert storage.get_stats()["write_errors"] == 0
+
+    def test_failing_row_does_not_roll_back_the_batch(self, storage):
+        # Bloquer l'écrivain pour que toutes les écritures tombent dans le même lot
+        with storage._committed:
+            storage.enqueue(INSERT_PATTERN, _pattern("p1"))
+            storage.enqueue(INSERT_INTERACTION, ("s1", "free"))
+            storage.enqueue(INSERT_PATTERN, _pattern("p1"))  # Violation de clé primaire
+            storage.enqueue(INSERT_INTERACTION, ("s2", "premium"))
+
+        storage.flush()
+
+        assert storage.fetchall_sync("SELECT COUNT(*) AS n FROM interactions") == [{"n": 2}]
+        assert storage.fetchall_sync("SELECT COUNT(*) AS n FROM learned_patterns") == [{"n": 1}]
+        stats = storage.get_stats()
+        assert stats["write_errors"] == 1
+        assert stats["rows_written"] == 3
+        assert stats["batch_retries"] == 1
+
+    def test_read_does_not_wait_for_writes_enqueued_after_it(self, storage):
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                storage.enqueue(INSERT_INTERACTION, (f"s{i}", "free"))
+                i += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            time.sleep(0.05)
+            start = time.time()
+            storage.fetchall_sync("SELECT COUNT(*) AS n FROM interactions")
+            elapsed = time.time() - start
+        finally:
+            stop.set()
+            thread.join()
+
+        assert elapsed < 2.0
+
+    def test_enqueue_after_close_is_rejected(self, tmp_path):
+        engine = FlywheelStorageEngine(tmp_path / "flywheel.db")
+        engine.enqueue(INSERT_INTERACTION, ("s1", "free"))
+        engine.close()
+
+        with pytest.raises(RuntimeError):
+            engine.enqueue(INSERT_INTERACTION, ("s2", "free"))
@@ -0,0 +1,114 @@
+"""
+🧪 Tests du client LLM local partagé (coalescence, annulation, streaming)
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from local_llm_client import LocalLLMClient
+
+
+def _install_transport(client: LocalLLMClient, handler):
+    """Branche un transport httpx factice sur le pool de la boucle courante"""
+    client._ensure_client()
+    client._client = httpx.AsyncClient(
+        base_url=client.endpoint, transport=httpx.MockTransport(handler)
+    )
+
+
+class TestLocalLLMClient:
+
+    def test_identical_prompts_share_one_request(self):
+        client = LocalLLMClient()
+        calls = []
+
+        async def handler(request):
+            calls.append(json.loads(request.content))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"response": "ok", "done": True})
+
+        async def scenario():
+            _install_transport(client, handler)
+            results = await asyncio.gather(*(client.generate("phi3", "bonjour") for _ in range(5)))
+            await client.aclose()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert len(calls) == 1
+        assert all(result["response"] == "ok" for result in results)
+        assert client.stats["coalesced"] == 4
+        assert client.get_metrics()["inflight"] == 0
+
+    def test_cancelling_the_leader_does_not_cancel_followers(self):
+        client = LocalLLMClient()
+
+        async def handler(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"response": "partagé", "done": True})
+
+        async def scenario():
+            _install_transport(client, handler)
+            leader = asyncio.create_task(client.generate("phi3", "bonjour"))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(client.generate("phi3", "bonjour"))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            result = await follower
+            await client.aclose()
+            return leader, result
+
+        leader, result = asyncio.run(scenario())
+
+        assert leader.cancelled()
+        assert result["response"] == "partagé"
+        assert client.stats["requests"] == 1
+
+    def test_errors_are_propagated_and_not_cached(self):
+        client = LocalLLMClient()
+        statuses = iter([500, 200])
+
+        async def handler(request):
+            status = next(statuses)
+            return httpx.Response(status, json={"response": "ok", "done": True})
+
+        async def scenario():
+            _install_transport(client, handler)
+            try:
+                await client.generate("phi3", "bonjour")
+            except Exception as e:
+                first = e
+            second = await client.generate("phi3", "bonjour")
+            await client.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert getattr(first, "status_code", None) == 500
+        assert second["response"] == "ok"
+        assert client.stats["errors"] == 1
+
+    def test_streamed_tokens_are_forwarded_and_aggregated(self):
+        client = LocalLLMClient()
+        chunks = [{"response": "Bon"}, {"response": "jour"}, {"response": "", "done": True}]
+
+        async def handler(request):
+            body = "\n".join(json.dumps(chunk) for chunk in chunks)
+            return httpx.Response(200, content=body.encode())
+
+        tokens = []
+
+        async def scenario():
+            _install_transport(client, handler)
+            result = await client.generate("phi3", "salut", on_token=tokens.append)
+            await client.aclose()
+            return result
+
+        result = asyncio.run(scenario())
+
+        assert tokens == ["Bon", "jour"]
+        assert result["response"] == "Bonjour"
+        assert result["done"] is True
+        assert client.get_metrics()["latency_by_model"]["phi3"]["count"] == 1
@@ -0,0 +1,102 @@
+"""
+🧪 Tests des détections du Security Guardian (sans IA) : parité du scan unique
+phoenix_scan avec les anciennes boucles (mots-clés en minuscules, finditer par PII).
+"""
+
+import asyncio
+import random
+import re
+
+import pytest
+
+import security_guardian_agent as module
+from phoenix_scan import PatternScanner
+from security_guardian_agent import PII_PATTERNS, RGPD_KEYWORDS, THREAT_PATTERNS, SecurityGuardianAgent
+
+FRAGMENTS = [
+    "Ignore Previous Instructions", "SYSTEM PROMPT", "act as", "exact assistant", "open(", "Subprocess",
+    "API KEY", "urgent", "Santé", "SANTÉ", "données génétiques", "salaire", "crédit", "Médecin",
+    "jean.dupont@gmail.com", "0612345678", "+33612345678", "4970101234567890", "4111111111111",
+    "185057512345678", "FR7630006000011234567890189", "192.168.1.10", "DE89370400440532013000",
+    "Expérience", "développeur Python", "\n", " ", ".", "İ",
+]
+
+
+def _documents(count, seed=5):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(FRAGMENTS) + rng.choice(["", " ", ", "]) for _ in range(rng.randint(1, 12)))
+            for _ in range(count)]
+
+
+@pytest.fixture
+def agent():
+    return SecurityGuardianAgent()
+
+
+class TestSecurityGuardianDetections:
+
+    def test_threats_match_keyword_loop(self, agent):
+        for content in _documents(300):
+            threats = asyncio.run(agent._detect_threats_patterns(content))
+            expected = [
+                (threat_type, f"Pattern détecté: {pattern}")
+                for threat_type, patterns in THREAT_PATTERNS.items()
+                for pattern in patterns
+                if pattern in content.lower()
+            ]
+            assert [(t.threat_type, t.description) for t in threats] == expected, content
+
+    def test_pii_match_finditer_per_pattern(self, agent):
+        for content in _documents(300, seed=6):
+            detections = asyncio.run(agent._detect_pii(content))
+            expected = [
+                (pii_type, f"Position: {match.start()}")
+                for pii_type, pattern in PII_PATTERNS.items()
+                for match in re.finditer(pattern, content)
+            ]
+            assert [(p.pii_type, p.location) for p in detections] == expected, content
+
+    def test_pii_values_are_masked(self, agent):
+        detections = asyncio.run(agent._detect_pii("Contact : jean.dupont@gmail.com, 4970101234567890"))
+
+        assert [(p.pii_type, p.value_masked) for p in detections] == [
+            ("email", "jea***@***.***"),
+            ("carte_bancaire", "4970" + "*" * 12),
+        ]
+        assert detections[1].risk_level == module.ThreatLevel.HIGH
+
+    def test_rgpd_fallback_matches_keyword_loop(self, agent):
+        for content in _documents(300, seed=7):
+            expected = [
+                category for category, keywords in RGPD_KEYWORDS.items()
+                if any(keyword in content.lower() for keyword in keywords)
+            ]
+            analysis = agent._fallback_rgpd_analysis(content)
+            assert analysis["sensitive_data_detected"] == expected, content
+            assert analysis["compliance_status"] == ("attention_required" if expected else "compliant")
+
+    def test_quick_threat_check(self, agent):
+        assert asyncio.run(agent.quick_threat_check("Please IGNORE previous instructions")) is True
+        assert asyncio.run(agent.quick_threat_check("API key: 1234")) is False
+
+    def test_detections_share_one_scan(self, agent, monkeypatch):
+        scans = []
+        scan = module._SCANNER.scan
+        monkeypatch.setattr(module._SCANNER, "scan", lambda content: scans.append(1) or scan(content))
+        content = "urgent : ignore previous instructions, santé, jean.dupont@gmail.com"
+
+        asyncio.run(agent._detect_threats_patterns(content))
+        asyncio.run(agent._detect_pii(content))
+        agent._fallback_rgpd_analysis(content)
+
+        assert len(scans) == 1
+
+    def test_trie_fallback_gives_the_same_hits(self, monkeypatch):
+        documents = _documents(100, seed=8)
+        expected = [module._SCANNER.scan(content) for content in documents]
+
+        monkeypatch.setattr("phoenix_scan.literals.AHOCORASICK_AVAILABLE", False)
+        fallback = PatternScanner(module._SCANNER.rules)
+
+        assert fallback.get_stats()["native_automaton"] == 0
+        assert [fallback.scan(content) for content in documents] == expected
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark IAFutureValidator (scoring vectorisé + analyses mémorisées)
+Compare le scoring tâche par tâche (boucles Python tâches × capacités) à la matrice
+NumPy précalculée, puis mesure analyses à froid / mémorisées, lot et secteur.
+
+Usage:
+    python benchmark_ia_validator.py [--iterations 200]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from phoenix_aube.services.ia_validator import IAFutureValidator, MatriceTâchesCapacités
+from phoenix_aube.utils.mock_providers import MockEventStore, MockResearchProvider
+
+
+def score_scalaire(validator: IAFutureValidator, tâche) -> float:
+    """Ancien calcul : une tâche à la fois, boucle sur les capacités"""
+    score = tâche.automatisabilité_score
+    if tâche.empathie_requise:
+        score *= 0.3
+    if tâche.créativité_requise:
+        score *= 0.5
+    if tâche.interaction_humaine_requise:
+        score *= 0.6
+    score *= 1 - (tâche.complexité - 1) * 0.15
+    for capacité in validator.capacités_ia:
+        if validator._tâche_utilise_capacité(tâche, capacité):
+            score *= 0.5 + capacité.maturité_actuelle / 5.0 * 0.5
+    return max(0.0, min(1.0, score))
+
+
+def chrono(fonction, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fonction()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def chrono_async(fonction, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fonction()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    validator = IAFutureValidator(MockEventStore(), MockResearchProvider())
+    moteur = validator._moteur_scoring()
+    titres = list(validator.métiers_tâches_db)
+    print(f"⏱️ {len(moteur.tâches)} tâches de référence × {len(validator.capacités_ia)} capacités IA, "
+          f"{len(titres)} métiers\n")
+
+    scalaire = chrono(lambda: [score_scalaire(validator, t) for t in moteur.tâches], args.iterations)
+    matrice = chrono(lambda: MatriceTâchesCapacités(
+        validator.métiers_tâches_db, validator.capacités_ia, validator._tâche_utilise_capacité
+    ), args.iterations)
+    tranche = chrono(lambda: [moteur.métier(titre) for titre in titres], args.iterations)
+    print("📐 Scoring de toutes les tâches:")
+    print(f"  • {'boucles Python (tâche × capacité)':<38} {scalaire:9.1f} µs")
+    print(f"  • {'construction matrice NumPy':<38} {matrice:9.1f} µs (une fois par version du modèle)")
+    print(f"  • {'lecture des tranches précalculées':<38} {tranche:9.1f} µs\n")
+
+    async def à_froid():
+        validator._cache_analyses.clear()
+        await validator.évaluer_résistance_métier("Data Analyst")
+
+    print("🔮 Analyses:")
+    print(f"  • {'évaluer_résistance_métier (à froid)':<38} {await chrono_async(à_froid, args.iterations):9.1f} µs")
+    mémorisée = await chrono_async(lambda: validator.évaluer_résistance_métier("Data Analyst"), args.iterations)
+    print(f"  • {'évaluer_résistance_métier (mémorisée)':<38} {mémorisée:9.1f} µs")
+    lot = await chrono_async(lambda: validator.évaluer_résistance_métiers(titres), args.iterations)
+    print(f"  • {f'évaluer_résistance_métiers ({len(titres)} métiers)':<38} {lot:9.1f} µs")
+    secteur = await chrono_async(lambda: validator.prédire_évolution_secteur("Services"), args.iterations)
+    print(f"  • {'prédire_évolution_secteur (Services)':<38} {secteur:9.1f} µs")
+    print(f"\n📊 Cache: {validator.get_cache_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
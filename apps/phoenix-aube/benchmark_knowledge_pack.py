@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark knowledge pack Phoenix Aube (lookups métiers/compétences hors ligne)
+Construit l'artefact SQLite dans un dossier temporaire puis mesure la latence
+in-process des lookups utilisés par les providers et IAFutureValidator.
+
+Usage:
+    python benchmark_knowledge_pack.py [--iterations 2000] [--esco-dir ~/esco_v1.2_fr]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from phoenix_aube.knowledge import KnowledgePack, build_knowledge_pack
+
+LOOKUPS = {
+    "search exact ('Data Analyst')": lambda pack: pack.search_occupations("Data Analyst"),
+    "search préfixe ('infirm')": lambda pack: pack.search_occupations("infirm"),
+    "search faute de frappe ('devloppeur')": lambda pack: pack.search_occupations("devloppeur"),
+    "resolve (mis en cache)": lambda pack: pack.resolve("devloppeur"),
+    "get_skills": lambda pack: pack.get_skills("Data Analyst"),
+    "get_tasks": lambda pack: pack.get_tasks("Coach"),
+    "get_related_occupations (depth=2)": lambda pack: pack.get_related_occupations("Data Analyst", depth=2),
+    "get_occupations_by_secteur": lambda pack: pack.get_occupations_by_secteur("Tech/IT"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--esco-dir", help="Export CSV ESCO à inclure dans l'artefact")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "knowledge_pack.db")
+        start = time.perf_counter()
+        stats = build_knowledge_pack(output_path=path, esco_dir=args.esco_dir)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"📦 Build : {stats['occupations']} métiers, {stats['compétences']} compétences, "
+              f"{os.path.getsize(path) / 1024:.0f} Ko en {build_ms:.0f} ms\n")
+
+        pack = KnowledgePack(path)
+        print(f"⏱️ Lookups ({args.iterations} itérations):")
+        for name, lookup in LOOKUPS.items():
+            lookup(pack)
+            durations = []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                lookup(pack)
+                durations.append((time.perf_counter() - start) * 1e6)
+            durations.sort()
+            p99 = durations[int(len(durations) * 0.99) - 1]
+            print(f"  • {name:<38} p50 {statistics.median(durations):7.1f} µs   p99 {p99:7.1f} µs")
+        pack.close()
+
+
+if __name__ == "__main__":
+    main()
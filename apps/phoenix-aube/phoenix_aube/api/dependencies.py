@@ -5,9 +5,11 @@ Dépendances FastAPI pour injection et sécurité
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+import asyncio
 import logging
 
 from ..services.ia_validator import IAFutureValidator
+from ..services.data_providers import DataAggregationService
 from ..utils.mock_providers import MockEventStore, MockResearchProvider
 
 logger = logging.getLogger(__name__)
@@ -15,6 +17,8 @@ security = HTTPBearer()
 
 # Global instances (à améliorer avec DI container)
 _ia_validator_instance = None
+_data_service_instance: Optional[DataAggregationService] = None
+_data_service_lock = asyncio.Lock()
 
 def get_ia_validator() -> IAFutureValidator:
     """
@@ -31,6 +35,29 @@ def get_ia_validator() -> IAFutureValidator:
     
     return _ia_validator_instance
 
+async def get_data_service() -> DataAggregationService:
+    """
+    Dependency injection pour DataAggregationService (une instance par application:
+    sessions HTTP, jeton OAuth et cache partagés entre requêtes)
+    """
+    global _data_service_instance
+
+    if _data_service_instance is None:
+        async with _data_service_lock:
+            if _data_service_instance is None:
+                _data_service_instance = await DataAggregationService().__aenter__()
+                logger.info("DataAggregationService instance créée")
+
+    return _data_service_instance
+
+async def close_data_service() -> None:
+    """Ferme les sessions HTTP de l'agrégateur (arrêt de l'application)"""
+    global _data_service_instance
+
+    if _data_service_instance is not None:
+        await _data_service_instance.__aexit__(None, None, None)
+        _data_service_instance = None
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
@@ -16,10 +16,10 @@ from ..core.models import AnalyseRésilienceIA, ParcoursExploration
 from ..core import TransparencyEngine, PhoenixAubeEventStore, PhoenixAubeOrchestrator
 from ..services.ia_validator import IAFutureValidator
 from .schemas import (
-    JobResilienceRequest, AnxietyScoreRequest, 
+    JobResilienceRequest, JobResilienceBatchRequest, AnxietyScoreRequest, 
     ExplorationStartRequest, CareerRecommendationResponse
 )
-from .dependencies import get_ia_validator, get_current_user
+from .dependencies import get_ia_validator, get_current_user, get_data_service, close_data_service
 from ..services.data_providers import DataAggregationService
 
 # Configuration logging
@@ -43,12 +43,16 @@ async def lifespan(app: FastAPI):
     research_provider = MockResearchProvider()
     ia_validator = IAFutureValidator(event_store, research_provider)
     
+    # Agrégateur de données partagé (sessions poolées, OAuth et cache réutilisés)
+    await get_data_service()
+    
     logger.info("✅ Phoenix Aube API - Ready to serve!")
     
     yield
     
     # Shutdown
     logger.info("🔮 Phoenix Aube API - Shutting down...")
+    await close_data_service()
 
 # Application FastAPI
 app = FastAPI(
@@ -164,27 +168,62 @@ async def analyze_job_resilience(
             detail=f"Analyse failed: {str(e)}"
         )
 
+@app.post("/api/v1/analyze/job-resilience/batch", response_model=List[AnalyseRésilienceIA])
+async def analyze_job_resilience_batch(
+    request: JobResilienceBatchRequest,
+    background_tasks: BackgroundTasks,
+    validator: IAFutureValidator = Depends(get_ia_validator)
+) -> List[AnalyseRésilienceIA]:
+    """
+    🔮 Analyse de résistance IA de plusieurs métiers en une requête
+    """
+    try:
+        logger.info(f"Analyse IA demandée pour {len(request.job_titles)} métiers")
+        
+        analyses = await validator.évaluer_résistance_métiers(request.job_titles)
+        
+        for analysis in analyses:
+            background_tasks.add_task(
+                track_analysis_request,
+                analysis.métier_titre,
+                analysis.score_résistance_ia,
+                request.user_context
+            )
+        
+        return analyses
+        
+    except Exception as e:
+        logger.error(f"Erreur analyse IA par lot: {str(e)}")
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Batch analysis failed: {str(e)}"
+        )
+
 # =============================================
 # ENDPOINTS DATA PROVIDERS/AGGREGATION
 # =============================================
 
 @app.get("/api/v1/data/enriched-job/{job_title}")
-async def get_enriched_job(job_title: str) -> Dict[str, Any]:
+async def get_enriched_job(
+    job_title: str,
+    svc: DataAggregationService = Depends(get_data_service)
+) -> Dict[str, Any]:
     """Données métier enrichies (France Travail, ESCO, Research)."""
     try:
-        async with DataAggregationService() as svc:
-            return await svc.get_enriched_job_data(job_title)
+        return await svc.get_enriched_job_data(job_title)
     except Exception as e:
         logger.error("Erreur enriched-job")
         raise HTTPException(status_code=500, detail="Enriched job retrieval failed")
 
 
 @app.get("/api/v1/data/market-analysis/{sector}")
-async def get_market_analysis(sector: str) -> Dict[str, Any]:
+async def get_market_analysis(
+    sector: str,
+    svc: DataAggregationService = Depends(get_data_service)
+) -> Dict[str, Any]:
     """Analyse secteur (métiers, tendances compétences, études IA, opportunités)."""
     try:
-        async with DataAggregationService() as svc:
-            return await svc.get_comprehensive_market_analysis(sector)
+        return await svc.get_comprehensive_market_analysis(sector)
     except Exception as e:
         logger.error("Erreur market-analysis")
         raise HTTPException(status_code=500, detail="Market analysis failed")
@@ -367,7 +406,8 @@ async def health_check() -> Dict[str, str]:
 
 @app.get("/api/v1/metrics")
 async def get_metrics(
-    admin_user = Depends(get_current_user)
+    admin_user = Depends(get_current_user),
+    data_service: DataAggregationService = Depends(get_data_service)
 ) -> Dict[str, Any]:
     """📊 Métriques business Phoenix Aube"""
     try:
@@ -380,7 +420,9 @@ async def get_metrics(
             "average_satisfaction": 4.3,
             "top_analyzed_jobs": [
                 "Data Scientist", "Coach", "Chef de Projet", "Designer UX"
-            ]
+            ],
+            "data_cache": data_service.get_cache_stats(),
+            "resilience_cache": get_ia_validator().get_cache_stats()
         }
         
         return metrics
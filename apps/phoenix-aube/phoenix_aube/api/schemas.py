@@ -20,6 +20,15 @@ class JobResilienceRequest(BaseModel):
         True, description="Inclure explications détaillées"
     )
 
+class JobResilienceBatchRequest(BaseModel):
+    """Requête d'analyse de résistance IA de plusieurs métiers"""
+    job_titles: List[str] = Field(
+        ..., min_length=1, max_length=100, description="Titres des métiers à analyser"
+    )
+    user_context: Optional[Dict[str, Any]] = Field(
+        None, description="Contexte utilisateur pour personnalisation"
+    )
+
 class AnxietyScoreRequest(BaseModel):
     """Requête de calcul du score d'anxiété IA"""
     current_job: str = Field(..., description="Métier actuel de l'utilisateur")
@@ -0,0 +1,8 @@
+"""
+Knowledge pack Phoenix Aube - référentiel métiers/compétences hors ligne
+"""
+
+from .build import build_knowledge_pack
+from .pack import KnowledgePack, get_knowledge_pack
+
+__all__ = ["KnowledgePack", "build_knowledge_pack", "get_knowledge_pack"]
@@ -0,0 +1,253 @@
+"""
+Phoenix Aube - Construction du knowledge pack métiers/compétences
+Compile le référentiel (JSON condensé ROME/ESCO, export CSV ESCO optionnel)
+en une base SQLite compacte indexée FTS5, interrogeable hors ligne.
+
+Usage:
+    python -m phoenix_aube.knowledge.build
+    python -m phoenix_aube.knowledge.build --esco-dir ~/esco_v1.2_fr --output /data/knowledge_pack.db
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .text import normaliser
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_SOURCE = os.path.join(DATA_DIR, "occupations.json")
+DEFAULT_PACK_PATH = os.path.join(DATA_DIR, "knowledge_pack.db")
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE occupations (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE,
+    code_rome TEXT,
+    isco TEXT,
+    titre TEXT NOT NULL,
+    description TEXT,
+    secteur TEXT,
+    source TEXT
+);
+CREATE INDEX occupations_secteur ON occupations (secteur);
+CREATE INDEX occupations_isco ON occupations (isco);
+CREATE VIRTUAL TABLE occupation_labels USING fts5(
+    libellé, occupation_id UNINDEXED, préféré UNINDEXED,
+    tokenize = "unicode61 remove_diacritics 2", prefix = '2 3'
+);
+CREATE VIRTUAL TABLE occupation_trigrams USING fts5(
+    libellé, occupation_id UNINDEXED, tokenize = "trigram"
+);
+CREATE TABLE skills (id INTEGER PRIMARY KEY, nom TEXT NOT NULL UNIQUE, uri TEXT, type TEXT);
+CREATE TABLE occupation_skills (
+    occupation_id INTEGER NOT NULL,
+    skill_id INTEGER NOT NULL,
+    relation TEXT NOT NULL,
+    PRIMARY KEY (occupation_id, skill_id)
+) WITHOUT ROWID;
+CREATE INDEX skill_occupations ON occupation_skills (skill_id, occupation_id);
+CREATE TABLE tasks (
+    occupation_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    titre TEXT NOT NULL,
+    description TEXT,
+    fréquence TEXT,
+    complexité INTEGER,
+    interaction_humaine_requise INTEGER,
+    créativité_requise INTEGER,
+    empathie_requise INTEGER,
+    automatisabilité_score REAL,
+    PRIMARY KEY (occupation_id, position)
+) WITHOUT ROWID;
+CREATE TABLE related (
+    occupation_id INTEGER NOT NULL,
+    related_id INTEGER NOT NULL,
+    PRIMARY KEY (occupation_id, related_id)
+) WITHOUT ROWID;
+"""
+
+TASK_FIELDS = (
+    "titre", "description", "fréquence", "complexité", "interaction_humaine_requise",
+    "créativité_requise", "empathie_requise", "automatisabilité_score",
+)
+
+
+class _PackWriter:
+    """Insertion des occupations, libellés, compétences et tâches"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.skill_ids: Dict[str, int] = {}
+        self.occupation_ids: Dict[str, int] = {}
+
+    def add_occupation(self, code: str, titre: str, libellés: Iterable[str], **champs: Any) -> int:
+        cursor = self.conn.execute(
+            "INSERT INTO occupations (code, code_rome, isco, titre, description, secteur, source)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (code, champs.get("code_rome"), champs.get("isco"), titre, champs.get("description"),
+             champs.get("secteur"), champs.get("source")),
+        )
+        occupation_id = cursor.lastrowid
+        self.occupation_ids[code] = occupation_id
+
+        vus = set()
+        for position, libellé in enumerate([titre, *libellés]):
+            clé = normaliser(libellé)
+            if not clé or clé in vus:
+                continue
+            vus.add(clé)
+            self.conn.execute(
+                "INSERT INTO occupation_labels (libellé, occupation_id, préféré) VALUES (?, ?, ?)",
+                (libellé, occupation_id, int(position == 0)),
+            )
+            # Trigrammes sur la forme normalisée (sans accents) pour la recherche approchée
+            self.conn.execute(
+                "INSERT INTO occupation_trigrams (libellé, occupation_id) VALUES (?, ?)", (clé, occupation_id)
+            )
+        return occupation_id
+
+    def add_skill(self, occupation_id: int, nom: str, relation: str,
+                  uri: Optional[str] = None, type_: Optional[str] = None) -> None:
+        skill_id = self.skill_ids.get(nom)
+        if skill_id is None:
+            skill_id = self.conn.execute(
+                "INSERT INTO skills (nom, uri, type) VALUES (?, ?, ?)", (nom, uri, type_)
+            ).lastrowid
+            self.skill_ids[nom] = skill_id
+        self.conn.execute(
+            "INSERT OR IGNORE INTO occupation_skills (occupation_id, skill_id, relation) VALUES (?, ?, ?)",
+            (occupation_id, skill_id, relation),
+        )
+
+    def add_task(self, occupation_id: int, position: int, tâche: List[Any]) -> None:
+        self.conn.execute(
+            f"INSERT INTO tasks (occupation_id, position, {', '.join(TASK_FIELDS)})"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (occupation_id, position, *tâche),
+        )
+
+    def add_related(self, code: str, proches: Iterable[str]) -> None:
+        occupation_id = self.occupation_ids[code]
+        for proche in proches:
+            related_id = self.occupation_ids.get(proche)
+            if related_id is not None and related_id != occupation_id:
+                # Relation symétrique
+                self.conn.execute("INSERT OR IGNORE INTO related VALUES (?, ?)", (occupation_id, related_id))
+                self.conn.execute("INSERT OR IGNORE INTO related VALUES (?, ?)", (related_id, occupation_id))
+
+
+def _load_json_source(writer: _PackWriter, source_path: str) -> Dict[str, Any]:
+    with open(source_path, encoding="utf-8") as handle:
+        source = json.load(handle)
+
+    for occupation in source["occupations"]:
+        occupation_id = writer.add_occupation(
+            occupation["code_rome"], occupation["titre"], occupation.get("libellés", []),
+            code_rome=occupation["code_rome"], isco=occupation.get("isco"), secteur=occupation.get("secteur"),
+            description=occupation.get("description"), source="phoenix_aube",
+        )
+        compétences = occupation.get("compétences", {})
+        for nom in compétences.get("essentielles", []):
+            writer.add_skill(occupation_id, nom, "essential")
+        for nom in compétences.get("optionnelles", []):
+            writer.add_skill(occupation_id, nom, "optional")
+        for position, tâche in enumerate(occupation.get("tâches", [])):
+            writer.add_task(occupation_id, position, tâche)
+
+    for occupation in source["occupations"]:
+        writer.add_related(occupation["code_rome"], occupation.get("proches", []))
+    return source
+
+
+def _load_esco_csv(writer: _PackWriter, esco_dir: str, language: str = "fr") -> int:
+    """Import de l'export CSV officiel ESCO (occupations, skills, occupationSkillRelations)"""
+
+    def rows(name: str):
+        with open(os.path.join(esco_dir, f"{name}_{language}.csv"), encoding="utf-8", newline="") as handle:
+            yield from csv.DictReader(handle)
+
+    skills = {row["conceptUri"]: row for row in rows("skills")}
+    occupation_ids: Dict[str, int] = {}
+    for row in rows("occupations"):
+        code = row["conceptUri"].rsplit("/", 1)[-1]
+        if code in writer.occupation_ids:
+            continue
+        occupation_ids[row["conceptUri"]] = writer.add_occupation(
+            code, row["preferredLabel"], (row.get("altLabels") or "").split("\n"),
+            isco=row.get("iscoGroup"), description=row.get("description") or row.get("definition"),
+            source="esco",
+        )
+
+    for row in rows("occupationSkillRelations"):
+        occupation_id = occupation_ids.get(row["occupationUri"])
+        skill = skills.get(row["skillUri"])
+        if occupation_id is None or skill is None:
+            continue
+        writer.add_skill(occupation_id, skill["preferredLabel"], row.get("relationType") or "essential",
+                         uri=row["skillUri"], type_=skill.get("skillType"))
+    return len(occupation_ids)
+
+
+def build_knowledge_pack(
+    source_path: str = DEFAULT_SOURCE,
+    output_path: str = DEFAULT_PACK_PATH,
+    esco_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Compile le référentiel dans output_path (écriture atomique) et retourne ses statistiques"""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        writer = _PackWriter(conn)
+        with conn:
+            source = _load_json_source(writer, source_path)
+            esco_count = _load_esco_csv(writer, esco_dir) if esco_dir else 0
+            for table in ("occupation_labels", "occupation_trigrams"):
+                conn.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+            stats = {
+                "version": source.get("version", ""),
+                "construit_le": datetime.now().isoformat(timespec="seconds"),
+                "occupations": conn.execute("SELECT COUNT(*) FROM occupations").fetchone()[0],
+                "occupations_esco": esco_count,
+                "compétences": conn.execute("SELECT COUNT(*) FROM skills").fetchone()[0],
+                "tâches": conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0],
+            }
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in stats.items()])
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, output_path)
+    logger.info(f"📦 Knowledge pack construit: {output_path} ({stats['occupations']} métiers)")
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Construit le knowledge pack métiers/compétences")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Référentiel JSON condensé")
+    parser.add_argument("--esco-dir", help="Dossier de l'export CSV ESCO (occupations_fr.csv, ...)")
+    parser.add_argument("--output", default=os.getenv("AUBE_KNOWLEDGE_PACK", DEFAULT_PACK_PATH))
+    args = parser.parse_args()
+
+    stats = build_knowledge_pack(args.source, args.output, args.esco_dir)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"📦 {args.output} ({size_kb:.0f} Ko)")
+    for key, value in stats.items():
+        print(f"  • {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
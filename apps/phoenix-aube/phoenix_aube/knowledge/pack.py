@@ -0,0 +1,265 @@
+"""
+Phoenix Aube - Knowledge pack métiers/compétences (lecture hors ligne)
+Recherche approchée de métiers, compétences par métier, tâches et métiers proches
+sur l'artefact SQLite construit par phoenix_aube.knowledge.build.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from .build import DEFAULT_PACK_PATH, DEFAULT_SOURCE, TASK_FIELDS, build_knowledge_pack
+from .text import normaliser
+
+logger = logging.getLogger(__name__)
+
+MIN_FUZZY_SCORE = 0.5
+
+# Libellés du référentiel : normalisés une fois pour toutes
+_normaliser_libellé = lru_cache(maxsize=16384)(normaliser)
+
+
+@lru_cache(maxsize=16384)
+def _trigrammes(texte: str) -> FrozenSet[str]:
+    """Trigrammes des mots (bordés d'espaces, comme pg_trgm)"""
+    return frozenset(
+        bordé[i:i + 3] for mot in texte.split() for bordé in (f"  {mot} ",) for i in range(len(bordé) - 2)
+    )
+
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+def _similarité(requête: str, libellé: str) -> float:
+    """Similarité trigrammes entre requête et libellé normalisés (libellé entier ou fenêtre de mots)"""
+    trigrammes_requête = _trigrammes(requête)
+    score = _dice(trigrammes_requête, _trigrammes(libellé))
+    taille, mots_libellé = len(requête.split()), libellé.split()
+    for début in range(len(mots_libellé) - taille + 1 if taille < len(mots_libellé) else 0):
+        fenêtre = " ".join(mots_libellé[début:début + taille])
+        # Légère pénalité : correspondance partielle du libellé
+        score = max(score, 0.9 * _dice(trigrammes_requête, _trigrammes(fenêtre)))
+    return score
+
+
+class KnowledgePack:
+    """
+    Accès en lecture seule au knowledge pack (aucun appel réseau).
+
+    Les métiers sont désignés par code (ROME ou ESCO) ou par libellé libre,
+    résolu par recherche plein texte puis, à défaut, par trigrammes (fautes de frappe).
+    """
+
+    def __init__(self, path: str = DEFAULT_PACK_PATH):
+        self.path = path
+        # immutable : aucun verrou de fichier, l'artefact est remplacé atomiquement au rebuild
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.meta = dict(self._query("SELECT key, value FROM meta"))
+
+        self._occupations: Dict[int, Dict[str, Any]] = {}
+        self._ids_par_code: Dict[str, int] = {}
+        for row in self._query("SELECT id, code, code_rome, isco, titre, description, secteur FROM occupations"):
+            occupation_id, code, code_rome, isco, titre, description, secteur = row
+            self._occupations[occupation_id] = {
+                "code": code, "code_rome": code_rome, "isco": isco, "titre": titre,
+                "description": description or "", "secteur": secteur,
+            }
+            self._ids_par_code[code] = occupation_id
+        self._résoudre = lru_cache(maxsize=4096)(self._résoudre_id)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # === RECHERCHE DE MÉTIERS ===
+
+    def search_occupations(self, requête: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Métiers les plus proches d'un libellé libre (accents, pluriels, fautes de frappe tolérés)"""
+        if requête in self._ids_par_code:
+            occupation = self._occupations[self._ids_par_code[requête]]
+            return [{**occupation, "libellé_trouvé": occupation["titre"], "score": 1.0}]
+        clé = normaliser(requête)
+        if not clé:
+            return []
+        # Mots du libellé trouvés (en préfixe) : candidats retenus, seulement classés
+        candidats = self._candidats_plein_texte(clé, limit * 5)
+        seuil = 0.0
+        if not candidats:
+            candidats = self._candidats_trigrammes(clé, 30)
+            seuil = MIN_FUZZY_SCORE
+
+        meilleurs: Dict[int, tuple] = {}
+        for occupation_id, libellé in candidats:
+            score = _similarité(clé, _normaliser_libellé(libellé))
+            if score > meilleurs.get(occupation_id, (-1.0, ""))[0]:
+                meilleurs[occupation_id] = (score, libellé)
+
+        résultats = [
+            {**self._occupations[occupation_id], "libellé_trouvé": libellé, "score": round(score, 3)}
+            for occupation_id, (score, libellé) in meilleurs.items()
+            if score >= seuil
+        ]
+        résultats.sort(key=lambda r: r["score"], reverse=True)
+        return résultats[:limit]
+
+    def _candidats_plein_texte(self, clé: str, limit: int) -> List[tuple]:
+        # Chaque mot en préfixe : "develop" trouve "Développeur", "infirmiere" trouve "Infirmière"
+        expression = " AND ".join(f'"{mot}"*' for mot in clé.split())
+        return self._query(
+            "SELECT occupation_id, libellé FROM occupation_labels WHERE occupation_labels MATCH ?"
+            " ORDER BY bm25(occupation_labels) LIMIT ?",
+            (expression, limit),
+        )
+
+    def _candidats_trigrammes(self, clé: str, limit: int) -> List[tuple]:
+        trigrammes = {mot[i:i + 3] for mot in clé.split() for i in range(len(mot) - 2)}
+        if not trigrammes:
+            return []
+        expression = " OR ".join(f'"{trigramme}"' for trigramme in sorted(trigrammes))
+        return self._query(
+            "SELECT occupation_id, libellé FROM occupation_trigrams WHERE occupation_trigrams MATCH ?"
+            " ORDER BY bm25(occupation_trigrams) LIMIT ?",
+            (expression, limit),
+        )
+
+    def _résoudre_id(self, occupation: str) -> Optional[int]:
+        if occupation in self._ids_par_code:
+            return self._ids_par_code[occupation]
+        résultats = self.search_occupations(occupation, limit=1)
+        return self._ids_par_code[résultats[0]["code"]] if résultats else None
+
+    def resolve(self, occupation: str) -> Optional[Dict[str, Any]]:
+        """Métier correspondant à un code ou au meilleur libellé, None si inconnu"""
+        occupation_id = self._résoudre(occupation)
+        return dict(self._occupations[occupation_id]) if occupation_id is not None else None
+
+    # === COMPÉTENCES, TÂCHES, MÉTIERS PROCHES ===
+
+    def get_skills(self, occupation: str, relation: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Compétences du métier (essentielles d'abord) ; relation: "essential" ou "optional" """
+        occupation_id = self._résoudre(occupation)
+        if occupation_id is None:
+            return []
+        rows = self._query(
+            "SELECT s.nom, os.relation, s.uri FROM occupation_skills os JOIN skills s ON s.id = os.skill_id"
+            " WHERE os.occupation_id = ? ORDER BY os.relation != 'essential', os.skill_id",
+            (occupation_id,),
+        )
+        return [
+            {"nom": nom, "type": type_, "uri": uri or ""}
+            for nom, type_, uri in rows
+            if relation is None or type_ == relation
+        ]
+
+    def get_tasks(self, occupation: str) -> List[Dict[str, Any]]:
+        """Tâches du métier (champs de TâcheMétier)"""
+        occupation_id = self._résoudre(occupation)
+        if occupation_id is None:
+            return []
+        rows = self._query(
+            f"SELECT {', '.join(TASK_FIELDS)} FROM tasks WHERE occupation_id = ? ORDER BY position",
+            (occupation_id,),
+        )
+        tâches = []
+        for row in rows:
+            tâche = dict(zip(TASK_FIELDS, row))
+            for champ in ("interaction_humaine_requise", "créativité_requise", "empathie_requise"):
+                tâche[champ] = bool(tâche[champ])
+            tâches.append(tâche)
+        return tâches
+
+    def get_related_occupations(self, occupation: str, depth: int = 1, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Métiers proches : parcours en largeur des passerelles du référentiel (jusqu'à depth),
+        complété par les métiers partageant le plus de compétences.
+        """
+        origine = self._résoudre(occupation)
+        if origine is None:
+            return []
+
+        distances = {origine: 0}
+        frontière = [origine]
+        for distance in range(1, depth + 1):
+            suivants = []
+            for occupation_id in frontière:
+                for (related_id,) in self._query("SELECT related_id FROM related WHERE occupation_id = ?",
+                                                 (occupation_id,)):
+                    if related_id not in distances:
+                        distances[related_id] = distance
+                        suivants.append(related_id)
+            frontière = suivants
+
+        communes = dict(self._query(
+            "SELECT b.occupation_id, COUNT(*) FROM occupation_skills a"
+            " JOIN occupation_skills b ON b.skill_id = a.skill_id AND b.occupation_id != a.occupation_id"
+            " WHERE a.occupation_id = ? GROUP BY b.occupation_id ORDER BY COUNT(*) DESC LIMIT ?",
+            (origine, limit),
+        ))
+        proches = [occupation_id for occupation_id in distances if occupation_id != origine]
+        proches += [occupation_id for occupation_id in communes if occupation_id not in distances]
+
+        return [
+            {
+                **self._occupations[occupation_id],
+                "distance": distances.get(occupation_id),
+                "compétences_communes": communes.get(occupation_id, 0),
+            }
+            for occupation_id in proches[:limit]
+        ]
+
+    def get_occupations(self) -> List[Dict[str, Any]]:
+        return [dict(occupation) for occupation in self._occupations.values()]
+
+    def get_occupations_by_secteur(self, secteur: str, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self._query("SELECT id FROM occupations WHERE secteur = ? ORDER BY id LIMIT ?", (secteur, limit))
+        return [dict(self._occupations[occupation_id]) for (occupation_id,) in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.meta, "chemin": self.path, "résolutions_en_cache": self._résoudre.cache_info().currsize}
+
+
+# =============================================
+# INSTANCE PARTAGÉE
+# =============================================
+
+_pack: Optional[KnowledgePack] = None
+_pack_lock = threading.Lock()
+
+
+def _chemin_pack() -> str:
+    """Artefact à utiliser, (re)construit depuis le référentiel embarqué s'il manque ou est périmé"""
+    path = os.getenv("AUBE_KNOWLEDGE_PACK", DEFAULT_PACK_PATH)
+    if os.path.exists(path) and (path != DEFAULT_PACK_PATH
+                                 or os.path.getmtime(path) >= os.path.getmtime(DEFAULT_SOURCE)):
+        return path
+    try:
+        build_knowledge_pack(DEFAULT_SOURCE, path)
+    except OSError:
+        # Dossier en lecture seule (image Docker) : artefact dans le répertoire temporaire
+        path = os.path.join(tempfile.gettempdir(), "phoenix_aube_knowledge_pack.db")
+        build_knowledge_pack(DEFAULT_SOURCE, path)
+    return path
+
+
+def get_knowledge_pack() -> Optional[KnowledgePack]:
+    """Knowledge pack partagé du processus (None si SQLite/FTS5 indisponible)"""
+    global _pack
+    if _pack is None:
+        with _pack_lock:
+            if _pack is None:
+                try:
+                    _pack = KnowledgePack(_chemin_pack())
+                    logger.info(f"📦 Knowledge pack chargé ({_pack.meta.get('occupations')} métiers)")
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning(f"⚠️ Knowledge pack indisponible: {e}")
+                    return None
+    return _pack
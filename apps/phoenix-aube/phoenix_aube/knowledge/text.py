@@ -0,0 +1,15 @@
+"""
+Phoenix Aube - Normalisation des libellés (minuscules, sans accents ni ponctuation)
+"""
+
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normaliser(texte: str) -> str:
+    """'Développeur Full-Stack' -> 'developpeur full stack'"""
+    décomposé = unicodedata.normalize("NFKD", texte.lower())
+    sans_accents = "".join(c for c in décomposé if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", sans_accents).strip()
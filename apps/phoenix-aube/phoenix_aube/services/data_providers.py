@@ -5,13 +5,18 @@ Intégrations avec sources externes de données (France Travail, ESCO, Recherche
 
 import asyncio
 import aiohttp
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
 import logging
 from dataclasses import dataclass
 import os
 
+from ..knowledge import get_knowledge_pack
+from .ttl_cache import AsyncTTLCache
+
+PROVIDER_CACHE_SIZE = int(os.getenv("AUBE_PROVIDER_CACHE_SIZE", "500"))
+
 
 # =============================================
 # INTERFACES DATA PROVIDERS
@@ -70,29 +75,36 @@ class FranceTravailConfig:
 class FranceTravailProvider(IJobDataProvider):
     """Provider pour API France Travail (Offres d'emploi/ROME)"""
 
-    def __init__(self, config: FranceTravailConfig):
+    def __init__(self, config: FranceTravailConfig, session: Optional[aiohttp.ClientSession] = None):
         self.config = config
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Session partagée (pool de connexions de l'agrégateur) ou créée à l'entrée du contexte
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.access_token: Optional[str] = None
         self.token_expires_at: Optional[datetime] = None
+        self._auth_lock = asyncio.Lock()
         self.logger = logging.getLogger(__name__)
-        self._cache: Dict[str, Any] = {}
-        self._cache_ttl = timedelta(hours=6)
+        self._cache = AsyncTTLCache(max_entries=PROVIDER_CACHE_SIZE, ttl=6 * 3600, stale_ttl=6 * 3600)
         # Mode dégradé si identifiants manquants: pas d'appels réseau, on sert les fallbacks
         self.disabled: bool = False
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.timeout))
+        if self._owns_session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.timeout))
         # Si les identifiants FT sont absents, activer le mode fallback (aucun appel réseau)
         if not self.config.client_id or not self.config.client_secret:
             self.disabled = True
             self.logger.warning("FranceTravail credentials missing; using fallback data only (no network calls)")
             return self
-        await self._authenticate()
+        try:
+            await self._authenticate()
+        except Exception:
+            # Nouvelle tentative au premier appel (_get_headers)
+            self.logger.warning("⚠️ Authentification France Travail différée")
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
 
     async def _authenticate(self):
@@ -117,20 +129,36 @@ class FranceTravailProvider(IJobDataProvider):
     async def _get_headers(self) -> Dict[str, str]:
         if self.disabled:
             return {}
-        if not self.access_token or (self.token_expires_at and datetime.now() >= self.token_expires_at):
-            await self._authenticate()
+        if not self._token_valid():
+            # Un seul renouvellement OAuth pour toutes les requêtes concurrentes
+            async with self._auth_lock:
+                if not self._token_valid():
+                    await self._authenticate()
         return {"Authorization": f"Bearer {self.access_token}", "Content-Type": "application/json"}
 
+    def _token_valid(self) -> bool:
+        return bool(self.access_token) and not (self.token_expires_at and datetime.now() >= self.token_expires_at)
+
     async def _get_cached_or_fetch(self, cache_key: str, fetch_func):
-        if cache_key in self._cache:
-            cached_data, cached_time = self._cache[cache_key]
-            if datetime.now() - cached_time < self._cache_ttl:
-                return cached_data
-        data = await fetch_func()
-        self._cache[cache_key] = (data, datetime.now())
-        return data
+        return await self._cache.get_or_fetch(cache_key, fetch_func)
 
     async def get_métiers_by_secteur(self, secteur: str) -> List[Dict[str, Any]]:
+        # Knowledge pack local d'abord (hors ligne, < 1 ms), API France Travail sinon
+        pack = get_knowledge_pack()
+        if pack is not None:
+            métiers = pack.get_occupations_by_secteur(secteur)
+            if métiers:
+                return [
+                    {
+                        "titre": m["titre"],
+                        "code_rome": m["code_rome"],
+                        "description": m["description"],
+                        "secteur": secteur,
+                        "compétences": [c["nom"] for c in pack.get_skills(m["code"])],
+                    }
+                    for m in métiers
+                ]
+
         cache_key = f"métiers_secteur_{secteur}"
 
         async def fetch_métiers():
@@ -147,24 +175,28 @@ class FranceTravailProvider(IJobDataProvider):
                     "Industrie": ["H25", "H26", "H27"],
                 }
                 codes_rome = secteur_mapping.get(secteur, ["M18"])
-                métiers: List[Dict[str, Any]] = []
                 assert self.session is not None
-                for code in codes_rome:
+
+                async def fetch_code(code: str) -> List[Dict[str, Any]]:
                     url = f"{self.config.base_url}/partenaire/rome/v1/metier/{code}"
                     async with self.session.get(url, headers=headers) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            for m in data.get("metiers", []):
-                                métiers.append(
-                                    {
-                                        "titre": m.get("libelle", ""),
-                                        "code_rome": m.get("code", ""),
-                                        "description": m.get("definition", ""),
-                                        "secteur": secteur,
-                                        "compétences": [c.get("libelle", "") for c in m.get("competences", [])],
-                                    }
-                                )
-                return métiers
+                        if response.status != 200:
+                            return []
+                        data = await response.json()
+                        return [
+                            {
+                                "titre": m.get("libelle", ""),
+                                "code_rome": m.get("code", ""),
+                                "description": m.get("definition", ""),
+                                "secteur": secteur,
+                                "compétences": [c.get("libelle", "") for c in m.get("competences", [])],
+                            }
+                            for m in data.get("metiers", [])
+                        ]
+
+                # Codes ROME interrogés en parallèle (ordre conservé)
+                par_code = await asyncio.gather(*(fetch_code(code) for code in codes_rome))
+                return [m for métiers_code in par_code for m in métiers_code]
             except Exception as e:
                 self.logger.error(f"Erreur récupération métiers secteur {secteur}: {e}")
                 return self._get_fallback_métiers(secteur)
@@ -172,6 +204,12 @@ class FranceTravailProvider(IJobDataProvider):
         return await self._get_cached_or_fetch(cache_key, fetch_métiers)
 
     async def get_compétences_métier(self, métier: str) -> List[str]:
+        pack = get_knowledge_pack()
+        if pack is not None:
+            compétences = [c["nom"] for c in pack.get_skills(métier)]
+            if compétences:
+                return compétences
+
         cache_key = f"compétences_{métier}"
 
         async def fetch_compétences():
@@ -196,8 +234,9 @@ class FranceTravailProvider(IJobDataProvider):
         return await self._get_cached_or_fetch(cache_key, fetch_compétences)
 
     async def get_formations_transitions(self, métier_source: str, métier_cible: str) -> List[str]:
-        comp_src = await self.get_compétences_métier(métier_source)
-        comp_dst = await self.get_compétences_métier(métier_cible)
+        comp_src, comp_dst = await asyncio.gather(
+            self.get_compétences_métier(métier_source), self.get_compétences_métier(métier_cible)
+        )
         manquantes = set(comp_dst) - set(comp_src)
         return [f"Formation {c}" for c in list(manquantes)[:5]]
 
@@ -250,23 +289,24 @@ class FranceTravailProvider(IJobDataProvider):
 
 
 class ResearchDataProvider(IResearchDataProvider):
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.logger = logging.getLogger(__name__)
         self.sources = {
             "arxiv_api": "http://export.arxiv.org/api/query",
             "ocde_api": "https://stats.oecd.org/restsdmx/sdmx.ashx/GetData",
             "stanford_ai_index": "https://aiindex.stanford.edu/wp-content/uploads/2024/04/HAI_AI-Index-Report_2024.pdf",
         }
-        self._cache: Dict[str, Any] = {}
-        self._ttl = timedelta(days=7)
+        self._cache = AsyncTTLCache(max_entries=PROVIDER_CACHE_SIZE, ttl=7 * 86400, stale_ttl=7 * 86400)
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        if self._owns_session:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
 
     async def get_ai_impact_studies(self, secteur: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -393,13 +433,7 @@ class ResearchDataProvider(IResearchDataProvider):
         ]
 
     async def _get_cached_or_fetch(self, key: str, fetch_func):
-        if key in self._cache:
-            data, t = self._cache[key]
-            if datetime.now() - t < self._ttl:
-                return data
-        data = await fetch_func()
-        self._cache[key] = (data, datetime.now())
-        return data
+        return await self._cache.get_or_fetch(key, fetch_func)
 
 
 # =============================================
@@ -408,20 +442,28 @@ class ResearchDataProvider(IResearchDataProvider):
 
 
 class ESCOProvider:
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
         self.base_url = "https://ec.europa.eu/esco/api"
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.logger = logging.getLogger(__name__)
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        if self._owns_session:
+            self.session = aiohttp.ClientSession()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
 
     async def get_skills_by_occupation(self, occupation: str) -> List[Dict[str, Any]]:
+        # Knowledge pack local d'abord : évite les deux allers-retours search + resource
+        pack = get_knowledge_pack()
+        if pack is not None:
+            skills = pack.get_skills(occupation, relation="essential")
+            if skills:
+                return skills
         try:
             assert self.session is not None
             search_url = f"{self.base_url}/search"
@@ -448,6 +490,11 @@ class ESCOProvider:
 
     async def get_related_occupations(self, occupation: str) -> List[str]:
         try:
+            pack = get_knowledge_pack()
+            if pack is not None:
+                proches = [m["titre"] for m in pack.get_related_occupations(occupation, depth=2)]
+                if proches:
+                    return proches
             return [f"{occupation} - Senior Level", f"{occupation} - Specialist", f"Related to {occupation}"]
         except Exception as e:
             self.logger.error(f"Erreur métiers similaires ESCO: {e}")
@@ -461,38 +508,68 @@ class ESCOProvider:
 
 class DataProviderFactory:
     @staticmethod
-    def create_job_provider(provider_type: str = "france_travail") -> IJobDataProvider:
+    def create_job_provider(
+        provider_type: str = "france_travail", session: Optional[aiohttp.ClientSession] = None
+    ) -> IJobDataProvider:
         if provider_type == "france_travail":
             cfg = FranceTravailConfig(
                 client_id=os.getenv("FRANCE_TRAVAIL_CLIENT_ID", ""),
                 client_secret=os.getenv("FRANCE_TRAVAIL_CLIENT_SECRET", ""),
             )
-            return FranceTravailProvider(cfg)
+            return FranceTravailProvider(cfg, session)
         raise ValueError(f"Provider type {provider_type} non supporté")
 
     @staticmethod
-    def create_research_provider() -> IResearchDataProvider:
-        return ResearchDataProvider()
+    def create_research_provider(session: Optional[aiohttp.ClientSession] = None) -> IResearchDataProvider:
+        return ResearchDataProvider(session)
 
     @staticmethod
-    def create_esco_provider():
-        return ESCOProvider()
+    def create_esco_provider(session: Optional[aiohttp.ClientSession] = None):
+        return ESCOProvider(session)
 
 
 class DataAggregationService:
-    def __init__(self):
+    """
+    Agrégateur France Travail / ESCO / Recherche, prévu pour vivre toute la durée de l'application:
+    - une session aiohttp partagée (pool de connexions, cache DNS) et une seule authentification OAuth
+    - appels amont lancés en parallèle, chacun borné par son propre timeout (source dégradée sinon)
+    - résultats agrégés dans un cache TTL borné, stale-while-revalidate, requêtes concurrentes coalescées
+    """
+
+    def __init__(self, cache: Optional[AsyncTTLCache] = None):
         self.job_provider: Optional[IJobDataProvider] = None
         self.research_provider: Optional[IResearchDataProvider] = None
         self.esco_provider: Optional[ESCOProvider] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.cache = cache or AsyncTTLCache(
+            max_entries=int(os.getenv("AUBE_CACHE_MAX_ENTRIES", "1000")),
+            ttl=float(os.getenv("AUBE_CACHE_TTL", "900")),
+            stale_ttl=float(os.getenv("AUBE_CACHE_STALE_TTL", "3600")),
+        )
+        self.timeouts = {
+            "france_travail": float(os.getenv("AUBE_TIMEOUT_FRANCE_TRAVAIL", "8")),
+            "esco": float(os.getenv("AUBE_TIMEOUT_ESCO", "5")),
+            "research": float(os.getenv("AUBE_TIMEOUT_RESEARCH", "5")),
+        }
         self.logger = logging.getLogger(__name__)
 
     async def __aenter__(self):
-        self.job_provider = DataProviderFactory.create_job_provider()
-        self.research_provider = DataProviderFactory.create_research_provider()
-        self.esco_provider = DataProviderFactory.create_esco_provider()
-        await self.job_provider.__aenter__()
-        await self.research_provider.__aenter__()
-        await self.esco_provider.__aenter__()
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=int(os.getenv("AUBE_HTTP_POOL_SIZE", "100")),
+                limit_per_host=int(os.getenv("AUBE_HTTP_POOL_PER_HOST", "20")),
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=60),
+        )
+        self.job_provider = DataProviderFactory.create_job_provider(session=self.session)
+        self.research_provider = DataProviderFactory.create_research_provider(self.session)
+        self.esco_provider = DataProviderFactory.create_esco_provider(self.session)
+        await asyncio.gather(
+            self.job_provider.__aenter__(),
+            self.research_provider.__aenter__(),
+            self.esco_provider.__aenter__(),
+        )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -502,48 +579,97 @@ class DataAggregationService:
             await self.research_provider.__aexit__(exc_type, exc_val, exc_tb)
         if self.esco_provider:
             await self.esco_provider.__aexit__(exc_type, exc_val, exc_tb)
+        if self.session:
+            await self.session.close()
+
+    async def _fan_out(self, calls: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Exécute les appels amont en parallèle.
+        calls: {nom: (source, coroutine, valeur_par_défaut)} ; une source en échec ou hors délai
+        renvoie sa valeur par défaut et est listée dans les sources indisponibles.
+        """
+
+        async def call(source: str, coro, default):
+            try:
+                return await asyncio.wait_for(coro, timeout=self.timeouts[source]), None
+            except asyncio.TimeoutError:
+                self.logger.warning(f"⏱️ Source {source} hors délai ({self.timeouts[source]}s)")
+            except Exception as e:
+                self.logger.error(f"Erreur source {source}: {e}")
+            return default, source
+
+        names = list(calls)
+        outcomes = await asyncio.gather(*(call(*calls[name]) for name in names))
+        results = {name: value for name, (value, _) in zip(names, outcomes)}
+        unavailable = sorted({source for _, source in outcomes if source})
+        return results, unavailable
+
+    @staticmethod
+    def _complete(result: Dict[str, Any]) -> bool:
+        """Seuls les résultats sans erreur ni source dégradée sont mis en cache"""
+        return "error" not in result and not result.get("sources_indisponibles")
 
     async def get_enriched_job_data(self, métier: str) -> Dict[str, Any]:
+        return await self.cache.get_or_fetch(
+            f"job:{métier}", lambda: self._build_enriched_job_data(métier), cacheable=self._complete
+        )
+
+    async def _build_enriched_job_data(self, métier: str) -> Dict[str, Any]:
         try:
-            comp_ft = await self.job_provider.get_compétences_métier(métier)  # type: ignore
-            comp_esco = await self.esco_provider.get_skills_by_occupation(métier)  # type: ignore
-            studies = await self.research_provider.get_ai_impact_studies()  # type: ignore
+            data, unavailable = await self._fan_out({
+                "comp_ft": ("france_travail", self.job_provider.get_compétences_métier(métier), []),  # type: ignore
+                "comp_esco": ("esco", self.esco_provider.get_skills_by_occupation(métier), []),  # type: ignore
+                "studies": ("research", self.research_provider.get_ai_impact_studies(), []),  # type: ignore
+            })
             return {
                 "métier": métier,
-                "compétences_france_travail": comp_ft,
-                "compétences_esco": [c["nom"] for c in comp_esco],
-                "études_ia_pertinentes": [s for s in studies if métier.lower() in s.get("titre", "").lower()],
+                "compétences_france_travail": data["comp_ft"],
+                "compétences_esco": [c["nom"] for c in data["comp_esco"]],
+                "études_ia_pertinentes": [s for s in data["studies"] if métier.lower() in s.get("titre", "").lower()],
                 "dernière_mise_à_jour": datetime.now().isoformat(),
                 "sources_utilisées": ["France Travail", "ESCO", "Research Papers"],
+                "sources_indisponibles": unavailable,
             }
         except Exception as e:
             self.logger.error(f"Erreur agrégation données {métier}: {e}")
             return {"métier": métier, "error": str(e)}
 
     async def get_comprehensive_market_analysis(self, secteur: str) -> Dict[str, Any]:
+        return await self.cache.get_or_fetch(
+            f"market:{secteur}", lambda: self._build_market_analysis(secteur), cacheable=self._complete
+        )
+
+    async def _build_market_analysis(self, secteur: str) -> Dict[str, Any]:
         try:
-            métiers = await self.job_provider.get_métiers_by_secteur(secteur)  # type: ignore
-            trends = await self.research_provider.get_future_skills_trends()  # type: ignore
-            studies = await self.research_provider.get_ai_impact_studies(secteur)  # type: ignore
-            preds = await self.research_provider.get_expert_predictions(secteur)  # type: ignore
+            data, unavailable = await self._fan_out({
+                "métiers": ("france_travail", self.job_provider.get_métiers_by_secteur(secteur), []),  # type: ignore
+                "trends": ("research", self.research_provider.get_future_skills_trends(), {}),  # type: ignore
+                "studies": ("research", self.research_provider.get_ai_impact_studies(secteur), []),  # type: ignore
+                "preds": ("research", self.research_provider.get_expert_predictions(secteur), []),  # type: ignore
+            })
+            métiers, trends, studies = data["métiers"], data["trends"], data["studies"]
             return {
                 "secteur": secteur,
                 "métiers_disponibles": len(métiers),
                 "métiers_détail": métiers[:10],
                 "tendances_compétences": trends,
                 "études_ia": studies,
-                "prédictions_experts": preds,
+                "prédictions_experts": data["preds"],
                 "synthèse_marché": {
                     "attractivité": self._calculer_attractivité_secteur(métiers, studies),
                     "résistance_ia": self._calculer_résistance_secteur(studies),
                     "opportunités_émergentes": self._identifier_opportunités(trends),
                 },
                 "génération_rapport": datetime.now().isoformat(),
+                "sources_indisponibles": unavailable,
             }
         except Exception as e:
             self.logger.error(f"Erreur analyse marché {secteur}: {e}")
             return {"secteur": secteur, "error": str(e)}
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats()
+
     def _calculer_attractivité_secteur(self, métiers: List[Dict], études_ia: List[Dict]) -> float:
         base = min(1.0, len(métiers) / 20)
         if études_ia:
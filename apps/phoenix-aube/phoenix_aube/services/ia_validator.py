@@ -6,17 +6,25 @@ Prédiction impact IA sur métiers avec transparence scientifique
 """
 
 import asyncio
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Callable
 from datetime import datetime, timedelta
 import json
 import logging
+import os
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 from ..core.models import (
     AnalyseRésilienceIA, TypeEvolutionIA, NiveauConfiance,
     RecommandationCarrière
 )
+from ..knowledge import get_knowledge_pack
+from .ttl_cache import AsyncTTLCache
+
+RESILIENCE_CACHE_SIZE = int(os.getenv("AUBE_RESILIENCE_CACHE_SIZE", "2000"))
+RESILIENCE_CACHE_TTL = float(os.getenv("AUBE_RESILIENCE_CACHE_TTL", "3600"))
 
 # =============================================
 # TYPES & CONFIGURATIONS
@@ -53,6 +61,75 @@ class SourceDonnées(str, Enum):
     INTERNAL_RESEARCH = "internal_research"
     EXPERT_CONSENSUS = "expert_consensus"
 
+# =============================================
+# MOTEUR DE SCORING VECTORISÉ
+# =============================================
+
+class MatriceTâchesCapacités:
+    """
+    Tâches de référence × capacités IA, précalculées en tableaux NumPy.
+    Les scores d'automatisabilité de toutes les tâches sont calculés en une opération
+    par version du modèle ; un métier correspond ensuite à une tranche des tableaux.
+    """
+    
+    def __init__(
+        self,
+        métiers_tâches: Dict[str, List[TâcheMétier]],
+        capacités: List[CapacitéIA],
+        utilise_capacité: Callable[[TâcheMétier, CapacitéIA], bool],
+    ):
+        self.capacités = capacités
+        self.utilise_capacité = utilise_capacité
+        self.index = {titre: i for i, titre in enumerate(métiers_tâches)}
+        self.tâches = [tâche for tâches in métiers_tâches.values() for tâche in tâches]
+        self.bornes = np.cumsum([0] + [len(tâches) for tâches in métiers_tâches.values()])
+        # Impact de chaque capacité selon sa maturité (appliqué si la tâche l'utilise)
+        self.facteurs_maturité = 0.5 + np.array([c.maturité_actuelle for c in capacités], dtype=float) / 5.0 * 0.5
+        self.utilisation = self._utilisation(self.tâches)
+        self.scores = self._scorer(self.tâches, self.utilisation)
+    
+    def _utilisation(self, tâches: List[TâcheMétier]) -> np.ndarray:
+        """Matrice booléenne (tâches × capacités)"""
+        return np.array(
+            [[self.utilise_capacité(tâche, capacité) for capacité in self.capacités] for tâche in tâches],
+            dtype=bool,
+        ).reshape(len(tâches), len(self.capacités))
+    
+    def _scorer(self, tâches: List[TâcheMétier], utilisation: np.ndarray) -> np.ndarray:
+        """
+        Probabilité d'automatisation de chaque tâche
+        Basé sur recherche académique (Frey & Osborne amélioré)
+        """
+        if not tâches:
+            return np.zeros(0)
+        base, empathie, créativité, interaction, complexité = np.array([
+            (t.automatisabilité_score, t.empathie_requise, t.créativité_requise,
+             t.interaction_humaine_requise, t.complexité)
+            for t in tâches
+        ], dtype=float).T
+        
+        score = (
+            base
+            * np.where(empathie, 0.3, 1.0)  # Empathie très difficile à automatiser
+            * np.where(créativité, 0.5, 1.0)  # Créativité partiellement automatisable
+            * np.where(interaction, 0.6, 1.0)  # Interaction humaine complexe
+            * (1 - (complexité - 1) * 0.15)  # Plus c'est complexe, moins automatisable
+            * np.where(utilisation, self.facteurs_maturité, 1.0).prod(axis=1)
+        )
+        return np.clip(score, 0.0, 1.0)
+    
+    def scorer(self, tâches: List[TâcheMétier]) -> np.ndarray:
+        """Scores de tâches hors référentiel (enrichissement externe)"""
+        return self._scorer(tâches, self._utilisation(tâches))
+    
+    def métier(self, titre: str) -> Tuple[List[TâcheMétier], np.ndarray]:
+        """Tâches de référence du métier et leurs scores précalculés (vides si inconnu)"""
+        i = self.index.get(titre)
+        if i is None:
+            return [], np.zeros(0)
+        début, fin = self.bornes[i], self.bornes[i + 1]
+        return self.tâches[début:fin], self.scores[début:fin]
+
 # =============================================
 # SERVICE VALIDATION IA PRINCIPAL
 # =============================================
@@ -68,7 +145,8 @@ class IAFutureValidator:
         self.research_provider = research_data_provider
         self.logger = logging.getLogger(__name__)
         
-        # Base de données métiers → tâches (à enrichir)
+        # Base de données métiers → tâches (knowledge pack local)
+        self.knowledge_pack = get_knowledge_pack()
         self.métiers_tâches_db = self._init_métiers_tâches_database()
         
         # Capacités IA actuelles et évolution
@@ -76,6 +154,13 @@ class IAFutureValidator:
         
         # Modèles prédictifs (coefficients à calibrer avec 3IA)
         self.modèle_coefficients = self._init_modèle_prédictif()
+        
+        # Matrice tâches × capacités et analyses mémorisées, recalculées si le modèle change
+        self._moteur: Optional[MatriceTâchesCapacités] = None
+        self._version_moteur: Optional[int] = None
+        self._cache_analyses = AsyncTTLCache(
+            max_entries=RESILIENCE_CACHE_SIZE, ttl=RESILIENCE_CACHE_TTL, stale_ttl=RESILIENCE_CACHE_TTL
+        )
     
     async def évaluer_résistance_métier(self, métier_titre: str) -> AnalyseRésilienceIA:
         """
@@ -85,83 +170,53 @@ class IAFutureValidator:
         self.logger.info(f"Début analyse résistance IA pour: {métier_titre}")
         
         try:
-            # 1. Décomposer le métier en tâches
-            tâches_métier = await self._décomposer_métier_en_tâches(métier_titre)
-            
-            # 2. Analyser chaque tâche vs capacités IA
-            analyse_tâches = await self._analyser_tâches_vs_ia(tâches_métier)
-            
-            # 3. Calculer score de résistance global
-            score_résistance = self._calculer_score_résistance(analyse_tâches)
-            
-            # 4. Prédire évolution temporelle
-            évolution_timeline = await self._prédire_évolution_temporelle(métier_titre, analyse_tâches)
-            
-            # 5. Identifier opportunités collaboration IA
-            opportunités_collaboration = await self._identifier_opportunités_ia(métier_titre, tâches_métier)
-            
-            # 6. Générer recommandations compétences IA
-            compétences_ia_recommandées = await self._recommander_compétences_ia(métier_titre)
-            
-            # 7. Créer message rassurant
-            message_positif = self._générer_message_futur_positif(métier_titre, score_résistance, évolution_timeline)
-            
-            # 8. Évaluer niveau de confiance
-            niveau_confiance = self._évaluer_confiance_prédiction(métier_titre, analyse_tâches)
-            
-            # 9. Créer analyse complète
-            analyse = AnalyseRésilienceIA(
-                métier_titre=métier_titre,
-                score_résistance_ia=score_résistance,
-                niveau_menace=self._convertir_score_en_niveau(score_résistance),
-                type_évolution=évolution_timeline["type"],
-                timeline_impact=évolution_timeline["timeline"],
-                tâches_automatisables=analyse_tâches["automatisables"],
-                tâches_humaines_critiques=analyse_tâches["humaines_critiques"],
-                opportunités_ia_collaboration=opportunités_collaboration,
-                compétences_ia_à_développer=compétences_ia_recommandées,
-                message_futur_positif=message_positif,
-                avantages_évolution=évolution_timeline["avantages"],
-                niveau_confiance=niveau_confiance,
-                sources_analyse=self._get_sources_utilisées(métier_titre)
-            )
-            
-            # 10. Publier événement
-            await self.event_store.publish_event({
-                "event_type": "validation_ia_effectuée",
-                "user_id": "system",  # À adapter selon le contexte
-                "data": {
-                    "métier": métier_titre,
-                    "score_résistance": score_résistance,
-                    "niveau_confiance": niveau_confiance.value,
-                    "sources_utilisées": analyse.sources_analyse
-                }
-            })
-            
-            self.logger.info(f"Analyse terminée - Score: {score_résistance:.2f}, Confiance: {niveau_confiance}")
-            return analyse
-            
+            analyse = await self._analyse_mémorisée(métier_titre)
         except Exception as e:
             self.logger.error(f"Erreur analyse IA pour {métier_titre}: {str(e)}")
             # Retourner analyse par défaut plutôt que de fail
             return self._créer_analyse_par_défaut(métier_titre)
+        
+        await self._publier_validations([analyse])
+        self.logger.info(
+            f"Analyse terminée - Score: {analyse.score_résistance_ia:.2f}, Confiance: {analyse.niveau_confiance}"
+        )
+        return analyse
+    
+    async def évaluer_résistance_métiers(self, métiers_titres: List[str]) -> List[AnalyseRésilienceIA]:
+        """
+        Évalue plusieurs métiers en une fois (ordre conservé, doublons analysés une seule fois)
+        """
+        uniques = list(dict.fromkeys(métiers_titres))
+        résultats = await asyncio.gather(
+            *(self._analyse_mémorisée(métier) for métier in uniques), return_exceptions=True
+        )
+        
+        analyses: Dict[str, AnalyseRésilienceIA] = {}
+        réussies = []
+        for métier, résultat in zip(uniques, résultats):
+            if isinstance(résultat, Exception):
+                self.logger.error(f"Erreur analyse IA pour {métier}: {str(résultat)}")
+                analyses[métier] = self._créer_analyse_par_défaut(métier)
+            else:
+                analyses[métier] = résultat
+                réussies.append(résultat)
+        
+        await self._publier_validations(réussies)
+        return [analyses[métier] for métier in métiers_titres]
     
     async def prédire_évolution_secteur(self, secteur: str, horizon_années: int = 10) -> Dict[str, Any]:
         """
         Prédit l'évolution d'un secteur entier face à l'IA
         """
-        métiers_secteur = await self.research_provider.get_métiers_by_secteur(secteur)
-        
-        analyses_métiers = []
-        for métier in métiers_secteur:
-            analyse = await self.évaluer_résistance_métier(métier["titre"])
-            analyses_métiers.append(analyse)
+        métiers_secteur = await self._métiers_secteur(secteur)
+        analyses_métiers = await self.évaluer_résistance_métiers([métier["titre"] for métier in métiers_secteur])
+        scores = np.array([a.score_résistance_ia for a in analyses_métiers])
         
         # Synthèse sectorielle
         évolution_secteur = {
             "secteur": secteur,
             "métiers_analysés": len(analyses_métiers),
-            "score_résistance_moyen": sum(a.score_résistance_ia for a in analyses_métiers) / len(analyses_métiers),
+            "score_résistance_moyen": float(scores.mean()) if scores.size else 0.5,
             "métiers_stables": [a.métier_titre for a in analyses_métiers if a.score_résistance_ia > 0.7],
             "métiers_menacés": [a.métier_titre for a in analyses_métiers if a.score_résistance_ia < 0.4],
             "nouvelles_opportunités": await self._identifier_nouveaux_métiers_ia(secteur),
@@ -186,77 +241,159 @@ class IAFutureValidator:
             "recommandation_action": self._recommander_action_anxiété(score_anxiété)
         }
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache d'analyses mémorisées"""
+        return {**self._cache_analyses.get_stats(), "version_modèle": self._version_moteur}
+    
     # =============================================
     # MÉTHODES PRIVÉES - ALGORITHMES CORE
     # =============================================
     
-    async def _décomposer_métier_en_tâches(self, métier: str) -> List[TâcheMétier]:
+    def _moteur_scoring(self) -> MatriceTâchesCapacités:
+        """Matrice tâches × capacités à jour (recalculée et cache invalidé si capacités/coefficients changent)"""
+        version = hash((
+            tuple(tuple(vars(capacité).values()) for capacité in self.capacités_ia),
+            tuple(self.modèle_coefficients.items()),
+        ))
+        if version != self._version_moteur:
+            if self._moteur is not None:
+                self.logger.info("🔄 Modèle IA modifié: matrice recalculée, analyses mémorisées invalidées")
+            self._moteur = MatriceTâchesCapacités(
+                self.métiers_tâches_db, self.capacités_ia, self._tâche_utilise_capacité
+            )
+            self._version_moteur = version
+            self._cache_analyses.clear()
+        return self._moteur
+    
+    async def _analyse_mémorisée(self, métier_titre: str) -> AnalyseRésilienceIA:
+        """Analyse mémorisée par (métier, version du modèle) ; listes copiées pour protéger le cache"""
+        moteur = self._moteur_scoring()
+        analyse = await self._cache_analyses.get_or_fetch(
+            f"{self._version_moteur}:{métier_titre}", lambda: self._analyser_métier(métier_titre, moteur)
+        )
+        return analyse.model_copy(
+            update={champ: list(valeur) for champ, valeur in analyse if isinstance(valeur, list)}
+        )
+    
+    async def _analyser_métier(self, métier_titre: str, moteur: MatriceTâchesCapacités) -> AnalyseRésilienceIA:
+        """Pipeline complet d'analyse d'un métier"""
+        # 1. Décomposer le métier en tâches (scores de référence précalculés)
+        tâches_métier, scores_tâches = await self._décomposer_métier_en_tâches(métier_titre, moteur)
+        
+        # 2. Analyser chaque tâche vs capacités IA
+        analyse_tâches = self._analyser_tâches_vs_ia(tâches_métier, scores_tâches)
+        
+        # 3. Calculer score de résistance global
+        score_résistance = self._calculer_score_résistance(analyse_tâches)
+        
+        # 4. Prédire évolution temporelle
+        évolution_timeline = await self._prédire_évolution_temporelle(métier_titre, analyse_tâches)
+        
+        # 5. Identifier opportunités collaboration IA
+        opportunités_collaboration = await self._identifier_opportunités_ia(métier_titre, tâches_métier)
+        
+        # 6. Générer recommandations compétences IA
+        compétences_ia_recommandées = await self._recommander_compétences_ia(métier_titre)
+        
+        # 7. Créer message rassurant
+        message_positif = self._générer_message_futur_positif(métier_titre, score_résistance, évolution_timeline)
+        
+        # 8. Évaluer niveau de confiance
+        niveau_confiance = self._évaluer_confiance_prédiction(métier_titre, analyse_tâches)
+        
+        # 9. Créer analyse complète
+        analyse = AnalyseRésilienceIA(
+            métier_titre=métier_titre,
+            score_résistance_ia=score_résistance,
+            niveau_menace=self._convertir_score_en_niveau(score_résistance),
+            type_évolution=évolution_timeline["type"],
+            timeline_impact=évolution_timeline["timeline"],
+            tâches_automatisables=analyse_tâches["automatisables"],
+            tâches_humaines_critiques=analyse_tâches["humaines_critiques"],
+            opportunités_ia_collaboration=opportunités_collaboration,
+            compétences_ia_à_développer=compétences_ia_recommandées,
+            message_futur_positif=message_positif,
+            avantages_évolution=évolution_timeline["avantages"],
+            niveau_confiance=niveau_confiance,
+            sources_analyse=self._get_sources_utilisées(métier_titre)
+        )
+        return analyse
+    
+    async def _décomposer_métier_en_tâches(
+        self, métier: str, moteur: MatriceTâchesCapacités
+    ) -> Tuple[List[TâcheMétier], np.ndarray]:
+        """Tâches du référentiel (libellé résolu) enrichies des tâches externes, avec leurs scores"""
+        tâches, scores = moteur.métier(self._titre_référentiel(métier))
+        tâches_externes = await self._tâches_externes(métier)
+        if tâches_externes:
+            # Nouvelles listes : le référentiel et la matrice ne sont jamais modifiés
+            tâches = tâches + tâches_externes
+            scores = np.concatenate((scores, moteur.scorer(tâches_externes)))
+        return tâches, scores
+    
+    async def _publier_validations(self, analyses: List[AnalyseRésilienceIA]) -> None:
+        """Publie un événement par analyse (l'échec de publication n'invalide pas l'analyse)"""
+        try:
+            await asyncio.gather(*(
+                self.event_store.publish_event({
+                    "event_type": "validation_ia_effectuée",
+                    "user_id": "system",  # À adapter selon le contexte
+                    "data": {
+                        "métier": analyse.métier_titre,
+                        "score_résistance": analyse.score_résistance_ia,
+                        "niveau_confiance": analyse.niveau_confiance.value,
+                        "sources_utilisées": analyse.sources_analyse
+                    }
+                })
+                for analyse in analyses
+            ))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Publication événement validation IA échouée: {e}")
+    
+    async def _métiers_secteur(self, secteur: str) -> List[Dict[str, Any]]:
+        """Métiers du secteur : knowledge pack local, sinon provider de recherche"""
+        if self.knowledge_pack is not None:
+            métiers = self.knowledge_pack.get_occupations_by_secteur(secteur)
+            if métiers:
+                return métiers
+        return await self.research_provider.get_métiers_by_secteur(secteur)
+    
+    async def _tâches_externes(self, métier: str) -> List[TâcheMétier]:
         """
-        Décompose un métier en tâches analysables
+        Enrichissement via API externe si disponible
         """
-        # Base de données métier → tâches (à enrichir avec données réelles)
-        tâches_base = self.métiers_tâches_db.get(métier, [])
-        
-        # Enrichissement via API externe si disponible
         try:
-            tâches_externes = await self.research_provider.get_tâches_détaillées(métier)
-            tâches_base.extend(tâches_externes)
-        except:
-            pass  # Fallback sur base locale
-        
-        return tâches_base
+            tâches = await self.research_provider.get_tâches_détaillées(métier)
+        except Exception:
+            return []  # Fallback sur base locale
+        return [tâche for tâche in tâches if isinstance(tâche, TâcheMétier)]
+    
+    def _titre_référentiel(self, métier: str) -> str:
+        """Titre du référentiel correspondant au libellé saisi (accents, synonymes, fautes de frappe)"""
+        if métier in self.métiers_tâches_db or self.knowledge_pack is None:
+            return métier
+        occupation = self.knowledge_pack.resolve(métier)
+        return occupation["titre"] if occupation else métier
     
-    async def _analyser_tâches_vs_ia(self, tâches: List[TâcheMétier]) -> Dict[str, List[str]]:
+    def _analyser_tâches_vs_ia(self, tâches: List[TâcheMétier], scores: np.ndarray) -> Dict[str, Any]:
         """
         Analyse chaque tâche face aux capacités IA actuelles et futures
         """
-        automatisables = []
-        humaines_critiques = []
-        
-        for tâche in tâches:
-            # Évaluer automatisabilité basée sur plusieurs critères
-            score_auto = self._calculer_automatisabilité_tâche(tâche)
-            
-            if score_auto > 0.7:
-                automatisables.append(f"{tâche.titre} (probabilité: {score_auto:.0%})")
-            elif score_auto < 0.3:
-                humaines_critiques.append(f"{tâche.titre} (valeur humaine: {1-score_auto:.0%})")
+        automatisables = [
+            f"{tâches[i].titre} (probabilité: {scores[i]:.0%})" for i in np.flatnonzero(scores > 0.7)
+        ]
+        humaines_critiques = [
+            f"{tâches[i].titre} (valeur humaine: {1 - scores[i]:.0%})" for i in np.flatnonzero(scores < 0.3)
+        ]
         
         return {
             "automatisables": automatisables,
             "humaines_critiques": humaines_critiques,
-            "score_moyen_automatisation": sum(t.automatisabilité_score for t in tâches) / len(tâches) if tâches else 0
+            "score_moyen_automatisation": (
+                float(np.mean([t.automatisabilité_score for t in tâches])) if tâches else 0
+            )
         }
     
-    def _calculer_automatisabilité_tâche(self, tâche: TâcheMétier) -> float:
-        """
-        Calcule la probabilité d'automatisation d'une tâche
-        Basé sur recherche académique (Frey & Osborne amélioré)
-        """
-        score = tâche.automatisabilité_score  # Score de base
-        
-        # Ajustements basés sur caractéristiques humaines
-        if tâche.empathie_requise:
-            score *= 0.3  # Empathie très difficile à automatiser
-        
-        if tâche.créativité_requise:
-            score *= 0.5  # Créativité partiellement automatisable
-        
-        if tâche.interaction_humaine_requise:
-            score *= 0.6  # Interaction humaine complexe
-        
-        # Ajustement par complexité
-        facteur_complexité = 1 - (tâche.complexité - 1) * 0.15  # Plus c'est complexe, moins automatisable
-        score *= facteur_complexité
-        
-        # Ajustement par capacités IA actuelles
-        for capacité in self.capacités_ia:
-            if self._tâche_utilise_capacité(tâche, capacité):
-                facteur_maturité = capacité.maturité_actuelle / 5.0
-                score *= (0.5 + facteur_maturité * 0.5)  # Impact basé sur maturité
-        
-        return max(0.0, min(1.0, score))
-    
     def _calculer_score_résistance(self, analyse_tâches: Dict[str, Any]) -> float:
         """
         Calcule le score global de résistance du métier
@@ -375,7 +512,7 @@ class IAFutureValidator:
         facteurs_confiance = []
         
         # Qualité des données
-        if métier in self.métiers_tâches_db:
+        if self._titre_référentiel(métier) in self.métiers_tâches_db:
             facteurs_confiance.append(0.3)  # Données détaillées disponibles
         
         # Consensus recherche
@@ -444,57 +581,20 @@ class IAFutureValidator:
         )
     
     # =============================================
-    # BASES DE DONNÉES MOCK (À ENRICHIR)
+    # BASES DE DONNÉES
     # =============================================
     
     def _init_métiers_tâches_database(self) -> Dict[str, List[TâcheMétier]]:
-        """Initialise base métiers → tâches (mock à enrichir)"""
-        return {
-            "Data Analyst": [
-                TâcheMétier(
-                    titre="Extraction de données",
-                    description="Extraire données depuis bases",
-                    fréquence="quotidienne",
-                    complexité=2,
-                    interaction_humaine_requise=False,
-                    créativité_requise=False,
-                    empathie_requise=False,
-                    automatisabilité_score=0.8
-                ),
-                TâcheMétier(
-                    titre="Interprétation business des analyses",
-                    description="Traduire insights pour business",
-                    fréquence="hebdomadaire",
-                    complexité=4,
-                    interaction_humaine_requise=True,
-                    créativité_requise=True,
-                    empathie_requise=False,
-                    automatisabilité_score=0.3
-                )
-            ],
-            "Coach": [
-                TâcheMétier(
-                    titre="Écoute active et empathie",
-                    description="Comprendre besoins client",
-                    fréquence="quotidienne",
-                    complexité=4,
-                    interaction_humaine_requise=True,
-                    créativité_requise=True,
-                    empathie_requise=True,
-                    automatisabilité_score=0.1
-                ),
-                TâcheMétier(
-                    titre="Suivi administratif",
-                    description="Gestion planning et facturation",
-                    fréquence="hebdomadaire",
-                    complexité=2,
-                    interaction_humaine_requise=False,
-                    créativité_requise=False,
-                    empathie_requise=False,
-                    automatisabilité_score=0.9
-                )
-            ]
-        }
+        """Initialise base métiers → tâches depuis le knowledge pack (vide si indisponible)"""
+        if self.knowledge_pack is None:
+            self.logger.warning("⚠️ Knowledge pack indisponible, aucune tâche métier de référence")
+            return {}
+        base = {}
+        for occupation in self.knowledge_pack.get_occupations():
+            tâches = self.knowledge_pack.get_tasks(occupation["code"])
+            if tâches:
+                base[occupation["titre"]] = [TâcheMétier(**tâche) for tâche in tâches]
+        return base
     
     def _init_capacités_ia_tracker(self) -> List[CapacitéIA]:
         """Initialise tracker capacités IA"""
@@ -0,0 +1,122 @@
+"""
+Phoenix Aube - Cache TTL asynchrone borné
+LRU à durée de vie, stale-while-revalidate et coalescence des requêtes concurrentes
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class AsyncTTLCache:
+    """
+    Cache partagé entre requêtes:
+    - entrée fraîche (< ttl) : servie directement
+    - entrée périmée (< ttl + stale_ttl) : servie immédiatement, rafraîchie en arrière-plan
+    - absente/expirée : un seul fetch par clé, les appels concurrents attendent le même résultat
+    - au-delà de max_entries : éviction LRU
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 900.0,
+        stale_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats: Counter = Counter()
+        self.logger = logging.getLogger(__name__)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Valeur en cache, sinon résultat de fetch() (non mis en cache si cacheable(valeur) est faux)"""
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                if now < entry.fresh_until:
+                    self.stats["hits"] += 1
+                else:
+                    self.stats["stale_hits"] += 1
+                    if key not in self._inflight:
+                        self.stats["refreshes"] += 1
+                        self._start(key, fetch, ttl, cacheable)
+                return entry.value
+            del self._entries[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        self.stats["misses"] += 1
+        # shield : l'annulation d'un appelant n'interrompt pas le fetch partagé
+        return await asyncio.shield(self._start(key, fetch, ttl, cacheable))
+
+    def _start(self, key, fetch, ttl, cacheable) -> asyncio.Future:
+        task = asyncio.ensure_future(self._load(key, fetch, ttl, cacheable))
+        task.add_done_callback(self._on_done)
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key, fetch, ttl, cacheable) -> Any:
+        try:
+            value = await fetch()
+            if cacheable is None or cacheable(value):
+                self.set(key, value, ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _on_done(self, task: asyncio.Future) -> None:
+        # Récupère l'exception (rafraîchissement sans appelant) pour éviter les warnings asyncio
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+            self.logger.warning(f"⚠️ Chargement cache échoué: {task.exception()}")
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        fresh_until = self._clock() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = _Entry(value, fresh_until, fresh_until + self.stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+        }
@@ -21,3 +21,45 @@ async def test_market_analysis_smoke():
         assert res["secteur"] == "Tech/IT"
         assert "tendances_compétences" in res
 
+
+
+@pytest.mark.asyncio
+async def test_enriched_job_data_fan_out_and_coalescing():
+    async with DataAggregationService() as svc:
+        calls = []
+
+        async def upstream(value, delay=0.1):
+            calls.append(value)
+            await asyncio.sleep(delay)
+            return value
+
+        svc.job_provider.get_compétences_métier = lambda m: upstream(["Python"])
+        svc.esco_provider.get_skills_by_occupation = lambda m: upstream([{"nom": "SQL"}])
+        svc.research_provider.get_ai_impact_studies = lambda s=None: upstream([])
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(*(svc.get_enriched_job_data("Data Analyst") for _ in range(20)))
+        elapsed = loop.time() - start
+
+        # 3 sources interrogées une seule fois, en parallèle
+        assert len(calls) == 3
+        assert elapsed < 0.25
+        assert all(r["compétences_esco"] == ["SQL"] for r in results)
+        assert svc.get_cache_stats()["coalesced"] == 19
+
+
+@pytest.mark.asyncio
+async def test_slow_source_degrades_without_caching():
+    async with DataAggregationService() as svc:
+        async def slow_esco(métier):
+            await asyncio.sleep(1)
+            return [{"nom": "SQL"}]
+
+        svc.esco_provider.get_skills_by_occupation = slow_esco
+        svc.timeouts["esco"] = 0.05
+
+        res = await svc.get_enriched_job_data("Coach")
+        assert res["sources_indisponibles"] == ["esco"]
+        assert res["compétences_esco"] == []
+        assert len(svc.cache) == 0
@@ -0,0 +1,77 @@
+import pytest
+
+from phoenix_aube.services.ia_validator import IAFutureValidator, TâcheMétier
+from phoenix_aube.utils.mock_providers import MockEventStore
+
+
+class Research:
+    def __init__(self):
+        self.appels = 0
+
+    async def get_tâches_détaillées(self, métier):
+        self.appels += 1
+        return [
+            TâcheMétier("Reporting NLP", "Synthèse nlp des retours", "quotidienne", 1, False, False, False, 0.9),
+            "tâche mal formée",
+        ]
+
+
+def score_scalaire(validator, tâche):
+    # Formule historique, tâche par tâche
+    score = tâche.automatisabilité_score
+    if tâche.empathie_requise:
+        score *= 0.3
+    if tâche.créativité_requise:
+        score *= 0.5
+    if tâche.interaction_humaine_requise:
+        score *= 0.6
+    score *= 1 - (tâche.complexité - 1) * 0.15
+    for capacité in validator.capacités_ia:
+        if validator._tâche_utilise_capacité(tâche, capacité):
+            score *= 0.5 + capacité.maturité_actuelle / 5.0 * 0.5
+    return max(0.0, min(1.0, score))
+
+
+@pytest.fixture
+def validator():
+    return IAFutureValidator(MockEventStore(), Research())
+
+
+def test_vectorized_scores_match_scalar_formula(validator):
+    moteur = validator._moteur_scoring()
+    attendus = [score_scalaire(validator, tâche) for tâche in moteur.tâches]
+    assert moteur.scores.tolist() == pytest.approx(attendus)
+
+    externe = TâcheMétier("Rédaction NLP", "Génération nlp", "quotidienne", 3, True, False, False, 0.8)
+    assert moteur.scorer([externe]).tolist() == pytest.approx([score_scalaire(validator, externe)])
+    assert moteur.scorer([]).size == 0
+
+
+@pytest.mark.asyncio
+async def test_analysis_memoized_and_invalidated_on_model_change(validator):
+    première = await validator.évaluer_résistance_métier("Data Analyst")
+    seconde = await validator.évaluer_résistance_métier("Data Analyst")
+    assert validator.research_provider.appels == 1
+    assert seconde == première and seconde is not première
+    assert any("Reporting NLP" in t for t in première.tâches_automatisables)
+    assert len(validator.event_store.published_events) == 2
+
+    # Les copies renvoyées ne modifient pas le cache
+    seconde.tâches_automatisables.clear()
+    assert (await validator.évaluer_résistance_métier("Data Analyst")) == première
+
+    validator.capacités_ia[0].maturité_actuelle = 1
+    après = await validator.évaluer_résistance_métier("Data Analyst")
+    assert validator.research_provider.appels == 2
+    assert après.tâches_automatisables != première.tâches_automatisables
+
+
+@pytest.mark.asyncio
+async def test_batch_and_sector_scoring(validator):
+    analyses = await validator.évaluer_résistance_métiers(["Coach", "Data Analyst", "coach"])
+    assert [a.métier_titre for a in analyses] == ["Coach", "Data Analyst", "coach"]
+    assert analyses[0].score_résistance_ia == analyses[2].score_résistance_ia
+
+    secteur = await validator.prédire_évolution_secteur("Tech/IT")
+    assert secteur["métiers_analysés"] == len(validator.knowledge_pack.get_occupations_by_secteur("Tech/IT"))
+    assert 0 <= secteur["score_résistance_moyen"] <= 1
@@ -0,0 +1,67 @@
+import pytest
+
+from phoenix_aube.knowledge import KnowledgePack, build_knowledge_pack
+from phoenix_aube.services.data_providers import ESCOProvider
+from phoenix_aube.services.ia_validator import IAFutureValidator, TâcheMétier
+
+
+@pytest.fixture(scope="module")
+def pack(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("knowledge") / "pack.db")
+    stats = build_knowledge_pack(output_path=path)
+    assert stats["occupations"] > 0
+    knowledge_pack = KnowledgePack(path)
+    yield knowledge_pack
+    knowledge_pack.close()
+
+
+def test_search_tolerates_accents_synonyms_and_typos(pack):
+    assert pack.search_occupations("infirmiere")[0]["titre"] == "Infirmier"
+    assert pack.search_occupations("developpeur web")[0]["titre"] == "Développeur"
+    assert pack.search_occupations("devloppeur")[0]["titre"] == "Développeur"
+    assert pack.search_occupations("aide soigant")[0]["titre"] == "Aide-Soignant"
+    assert pack.search_occupations("M1805")[0]["titre"] == "Développeur"
+    assert pack.search_occupations("xyz") == []
+
+
+def test_skills_tasks_and_related(pack):
+    skills = pack.get_skills("Data Analyst")
+    assert {"nom": "SQL", "type": "essential", "uri": ""} in skills
+    assert all(s["type"] == "essential" for s in pack.get_skills("Data Analyst", relation="essential"))
+
+    tâches = pack.get_tasks("Coach")
+    assert tâches[0]["titre"] == "Écoute active et empathie"
+    assert tâches[0]["empathie_requise"] is True
+
+    proches = pack.get_related_occupations("Data Analyst", depth=2)
+    assert "Data Scientist" in [m["titre"] for m in proches]
+    assert pack.get_related_occupations("xyz") == []
+
+
+@pytest.mark.asyncio
+async def test_esco_provider_answers_from_pack_without_network():
+    # Aucune session HTTP : la réponse vient du knowledge pack
+    provider = ESCOProvider()
+    skills = await provider.get_skills_by_occupation("Data Analyst")
+    assert "SQL" in [s["nom"] for s in skills]
+    assert "Data Scientist" in await provider.get_related_occupations("Data Analyst")
+
+
+@pytest.mark.asyncio
+async def test_validator_tasks_resolved_and_not_mutated():
+    class Research:
+        async def get_tâches_détaillées(self, métier):
+            return [TâcheMétier("Tâche externe", "Enrichissement", "hebdomadaire", 2, False, False, False, 0.5)]
+
+    validator = IAFutureValidator(None, Research())
+    moteur = validator._moteur_scoring()
+    référence = len(validator.métiers_tâches_db["Data Analyst"])
+    total = len(moteur.tâches)
+
+    for _ in range(3):
+        # "data analyste" est résolu vers "Data Analyst" par le knowledge pack
+        tâches, scores = await validator._décomposer_métier_en_tâches("data analyste", moteur)
+        assert len(tâches) == len(scores) == référence + 1
+        assert tâches[-1].titre == "Tâche externe"
+    assert len(validator.métiers_tâches_db["Data Analyst"]) == référence
+    assert len(moteur.tâches) == total == len(moteur.scores)
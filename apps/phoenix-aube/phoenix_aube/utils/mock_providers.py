@@ -25,6 +25,13 @@ class MockEventStore:
     def __init__(self):
         self.events: List[ÉvénementPhoenixAube] = []
         self.user_journeys: Dict[str, List[ÉvénementPhoenixAube]] = {}
+        self.published_events: List[Dict[str, Any]] = []
+    
+    async def publish_event(self, event_data: Dict[str, Any]) -> bool:
+        """Publie un événement de service (format dict, simulation)"""
+        self.published_events.append(event_data)
+        logger.info(f"Event published: {event_data.get('event_type')}")
+        return True
     
     async def store_event(self, event: ÉvénementPhoenixAube) -> bool:
         """Stocke un événement (simulation)"""
@@ -0,0 +1,343 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+from phoenix_cv.utils.secure_crypto import secure_crypto
+from phoenix_cv.utils.secure_logging import secure_logger
+
+
+def content_digest(data: bytes) -> str:
+    """Empreinte de contenu (clé de cache)."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def normalized_text_digest(text: str) -> str:
+    """Empreinte d'un texte normalisé (espaces et casse ignorés)."""
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    return content_digest(normalized.encode("utf-8"))
+
+
+class ContentAddressedCache:
+    """
+    🚀 Cache adressé par contenu à deux niveaux.
+    Mémoire : LRU bornée en octets. Disque : fichiers chiffrés (contenu de CV),
+    éviction des moins récemment utilisés au-delà de la taille maximale.
+
+    Le répertoire disque peut être partagé entre workers : les fichiers écrits
+    par un autre processus sont lus directement, et la taille maximale est
+    appliquée à l'occupation réelle du répertoire (rescan sous verrou fichier,
+    ordre LRU = mtime) dès que l'estimation locale la dépasse et au plus tard
+    toutes les `disk_sync_seconds`.
+    """
+
+    LOCK_FILE = ".lock"
+
+    def __init__(
+        self,
+        namespace: str,
+        directory: Optional[str] = None,
+        memory_max_bytes: int = 16 * 1024 * 1024,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: int = 7 * 24 * 3600,
+        disk_sync_seconds: float = 5.0,
+    ):
+        self.namespace = namespace
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_sync_seconds = disk_sync_seconds
+        self._last_disk_sync = 0.0
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "disk_errors": 0
+        }
+
+        self.directory = os.path.join(directory, namespace) if directory else None
+        if self.directory:
+            try:
+                os.makedirs(self.directory, mode=0o700, exist_ok=True)
+                self._sync_disk()
+            except OSError as e:
+                secure_logger.log_security_event(
+                    "CV_CACHE_DISK_UNAVAILABLE", {"namespace": namespace, "error": str(e)[:100]}, "WARNING"
+                )
+                self.directory = None
+
+    # ------------------------------------------------------------------
+    # Lecture / écriture
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        """Retourne la valeur en cache (mémoire puis disque), None sinon."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at, _ = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                self._drop_memory(key)
+
+        record = self._read_disk(key)
+        if record is not None:
+            if now - record["created_at"] <= self.ttl_seconds:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    self._put_memory(key, record["value"], record["created_at"])
+                return record["value"]
+            self._forget_disk(key)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """Met en cache une valeur dans les deux niveaux."""
+        created_at = time.time()
+        with self._lock:
+            self._put_memory(key, value, created_at)
+            self.stats["writes"] += 1
+        self._write_disk(key, value, created_at)
+
+    def clear(self) -> None:
+        """Vide la mémoire et tout le répertoire disque (y compris les entrées d'autres workers)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if not self.directory:
+            return
+        with self._directory_lock():
+            for name in self._scan_files():
+                self._unlink(name)
+            with self._lock:
+                self._disk.clear()
+                self._disk_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Niveau mémoire
+    # ------------------------------------------------------------------
+
+    def _put_memory(self, key: str, value: str, created_at: float) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._drop_memory(key)
+        self._memory[key] = (value, created_at, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes:
+            self._drop_memory(next(iter(self._memory)))
+
+    def _drop_memory(self, key: str) -> None:
+        _, _, size = self._memory.pop(key)
+        self._memory_bytes -= size
+
+    # ------------------------------------------------------------------
+    # Niveau disque
+    # ------------------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    @contextmanager
+    def _directory_lock(self):
+        """Verrou exclusif inter-processus sur le répertoire du namespace."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, self.LOCK_FILE), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _scan_files(self) -> "OrderedDict[str, int]":
+        """Fichiers du répertoire, du moins au plus récemment utilisé (mtime)."""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Évincé entre-temps par un autre worker
+                if entry.is_file():
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+        return OrderedDict((name, size) for _, name, size in sorted(files))
+
+    def _sync_disk(self) -> None:
+        """Applique la taille maximale à l'occupation réelle du répertoire partagé."""
+        with self._directory_lock():
+            files = self._scan_files()
+            total = sum(files.values())
+            evicted = []
+            while total > self.disk_max_bytes and files:
+                oldest, size = files.popitem(last=False)
+                total -= size
+                evicted.append(oldest)
+            for name in evicted:
+                self._unlink(name)
+        with self._lock:
+            self._disk = files
+            self._disk_bytes = total
+            self.stats["evictions"] += len(evicted)
+            self._last_disk_sync = time.monotonic()
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as handle:
+                payload = handle.read()
+        except FileNotFoundError:
+            # Jamais écrit, ou évincé par un autre worker
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+        except OSError:
+            return None
+        try:
+            record = json.loads(secure_crypto.decrypt_data(payload))
+            os.utime(self._path(key))
+        except Exception:
+            # Fichier corrompu ou clé de chiffrement changée
+            with self._lock:
+                self.stats["disk_errors"] += 1
+            self._forget_disk(key)
+            return None
+        with self._lock:
+            # Entrée éventuellement écrite par un autre worker : prise en compte dans l'index
+            if key not in self._disk:
+                self._disk[key] = len(payload)
+                self._disk_bytes += len(payload)
+            self._disk.move_to_end(key)
+        return record
+
+    def _write_disk(self, key: str, value: str, created_at: float) -> None:
+        if not self.directory:
+            return
+        try:
+            payload = secure_crypto.encrypt_data(json.dumps({"value": value, "created_at": created_at}))
+            if len(payload) > self.disk_max_bytes:
+                return
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            secure_logger.log_security_event(
+                "CV_CACHE_WRITE_ERROR", {"namespace": self.namespace, "error": str(e)[:100]}, "WARNING"
+            )
+            return
+
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(payload)
+            self._disk_bytes += len(payload)
+            # L'index local ignore les écritures des autres workers : resynchronisation
+            # dès qu'il dépasse la limite, et périodiquement sinon
+            needs_sync = (
+                self._disk_bytes > self.disk_max_bytes
+                or time.monotonic() - self._last_disk_sync >= self.disk_sync_seconds
+            )
+        if needs_sync:
+            try:
+                self._sync_disk()
+            except OSError as e:
+                secure_logger.log_security_event(
+                    "CV_CACHE_SYNC_ERROR", {"namespace": self.namespace, "error": str(e)[:100]}, "WARNING"
+                )
+
+    def _forget_disk(self, key: str) -> None:
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+        self._unlink(key)
+
+    def _unlink(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+class CVContentCache:
+    """Caches du pipeline CV : OCR par image, texte extrait par document, parsing IA par texte normalisé."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_max_bytes: int = 32 * 1024 * 1024,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: int = 7 * 24 * 3600,
+    ):
+        # Budget réparti : les textes extraits et l'OCR dominent le volume
+        shares = {"ocr": 0.4, "text": 0.4, "parse": 0.2}
+        self.ocr, self.text, self.parse = (
+            ContentAddressedCache(
+                namespace,
+                directory=directory,
+                memory_max_bytes=int(memory_max_bytes * share),
+                disk_max_bytes=int(disk_max_bytes * share),
+                ttl_seconds=ttl_seconds,
+            )
+            for namespace, share in shares.items()
+        )
+
+    def get_stats(self) -> Dict:
+        return {"ocr": self.ocr.get_stats(), "text": self.text.get_stats(), "parse": self.parse.get_stats()}
+
+
+_cv_content_cache: Optional[CVContentCache] = None
+_cv_content_cache_lock = threading.Lock()
+
+
+def get_cv_content_cache() -> CVContentCache:
+    """Instance partagée, configurée par variables d'environnement."""
+    global _cv_content_cache
+    with _cv_content_cache_lock:
+        if _cv_content_cache is None:
+            directory = os.getenv("PHOENIX_CV_CACHE_DIR", os.path.join(tempfile.gettempdir(), "phoenix_cv_cache"))
+            _cv_content_cache = CVContentCache(
+                directory=directory if directory.lower() != "none" else None,
+                memory_max_bytes=int(os.getenv("PHOENIX_CV_CACHE_MEMORY_MB", "32")) * 1024 * 1024,
+                disk_max_bytes=int(os.getenv("PHOENIX_CV_CACHE_DISK_MB", "256")) * 1024 * 1024,
+                ttl_seconds=int(os.getenv("PHOENIX_CV_CACHE_TTL_HOURS", "168")) * 3600,
+            )
+            secure_logger.log_security_event(
+                "CV_CONTENT_CACHE_INITIALIZED", {"disk_enabled": directory.lower() != "none"}
+            )
+        return _cv_content_cache
@@ -13,14 +13,13 @@ import time
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from datetime import datetime
 from typing import Any, Dict, List
-import asyncio
 import sys
 
 import google.generativeai as genai
 
 # Import Event Bridge pour data pipeline
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
-from phoenix_event_bridge import PhoenixEventBridge, PhoenixEventData, PhoenixEventType
+from phoenix_event_bridge import PhoenixEventData, PhoenixEventFactory, PhoenixEventType
 
 # Imports conditionnels pour éviter les erreurs de dépendances
 try:
@@ -75,8 +74,8 @@ class EnhancedGeminiClient:
         self._request_history = []
         self._lock = threading.Lock()
 
-        # Event Bridge pour data pipeline Phoenix
-        self.event_bridge = PhoenixEventBridge()
+        # Event Bridge pour data pipeline Phoenix (outbox partagée, non bloquante)
+        self.event_bridge = PhoenixEventFactory.create_bridge()
 
         # Compteurs Green AI
         self._green_metrics = {
@@ -156,7 +155,6 @@ class EnhancedGeminiClient:
 
             # 🔥 PUBLIER ÉVÉNEMENT CV_GENERATED DANS DATA PIPELINE
             try:
-                import asyncio
                 user_id = clean_data.get('user_id', f"anonymous_{hash(str(clean_data))}")
                 
                 event_data = PhoenixEventData(
@@ -180,9 +178,9 @@ class EnhancedGeminiClient:
                     }
                 )
                 
-                # Publication en mode non-bloquant
+                # Publication en mode non-bloquant (mise en file)
                 try:
-                    asyncio.run(self.event_bridge.publish_event(event_data))
+                    self.event_bridge.enqueue_event(event_data)
                 except Exception:
                     pass  # Mode dégradé silencieux
                     
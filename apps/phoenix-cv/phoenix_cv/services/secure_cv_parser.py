@@ -2,8 +2,13 @@ import io
 import os
 import re
 import json
+import time
 import asyncio
+import hashlib
 import concurrent.futures
+import multiprocessing
+import multiprocessing.pool
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
 import docx
@@ -12,6 +17,12 @@ import pytesseract
 from PIL import Image
 
 from phoenix_cv.models.cv_data import CVProfile, Education, Experience, PersonalInfo, Skill
+from phoenix_cv.services.cv_content_cache import (
+    CVContentCache,
+    content_digest,
+    get_cv_content_cache,
+    normalized_text_digest,
+)
 from phoenix_cv.services.secure_gemini_client import SecureGeminiClient
 from phoenix_cv.utils.exceptions import SecurityException, ValidationException
 from phoenix_cv.utils.rate_limiter import rate_limit
@@ -20,7 +31,7 @@ from phoenix_cv.utils.secure_validator import SecureValidator
 
 # Import de la protection pypdf DoS pour référence
 try:
-    from pdf_security_patch.pypdf_dos_mitigation import safe_extract_pdf_text
+    from pdf_security_patch.pypdf_dos_mitigation import check_pdf_bytes
     PYPDF_DOS_PROTECTION_ENABLED = True
     secure_logger.log_security_event(
         "PYPDF_DOS_PROTECTION_AVAILABLE",
@@ -35,6 +46,85 @@ except ImportError:
     )
     PYPDF_DOS_PROTECTION_ENABLED = False
 
+# Limites d'extraction PDF (appliquées pendant l'unique passe PyMuPDF)
+PDF_MAX_PAGES = 20
+PDF_MAX_TEXT_CHARS = 80000
+PDF_MAX_IMAGES_PER_PAGE = 5
+PDF_MAX_BYTES = 5 * 1024 * 1024
+PDF_PROCESSING_TIMEOUT = 10.0
+OCR_IMAGE_TIMEOUT = 30.0
+# En dessous de ce nombre de pages, le coût du pool de processus dépasse le gain
+PDF_PARALLEL_MIN_PAGES = 4
+
+
+@dataclass
+class PDFPageContent:
+    """Texte natif et images d'une page, produits par un worker d'extraction."""
+
+    page_num: int
+    text: str
+    images: List[Tuple[str, bytes]] = field(default_factory=list)
+    image_errors: int = 0
+
+
+class TextBuffer:
+    """Tampon de sortie à base de liste avec longueur courante (pas de concaténation quadratique)."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.length = 0
+        self._parts: List[str] = []
+
+    def append(self, chunk: str) -> bool:
+        """Ajoute un fragment s'il tient dans la limite, retourne False sinon."""
+        if self.length + len(chunk) > self.max_chars:
+            return False
+        self._parts.append(chunk)
+        self.length += len(chunk)
+        return True
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
+def _count_pdf_pages(file_content: bytes) -> int:
+    """Worker : nombre de pages (même l'ouverture du PDF se fait hors du processus principal)."""
+    with fitz.open(stream=file_content, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def _extract_pdf_page_range(
+    file_content: bytes, start: int, stop: int, max_images_per_page: int = PDF_MAX_IMAGES_PER_PAGE
+) -> List[PDFPageContent]:
+    """
+    Worker d'extraction (exécutable dans un processus) : texte natif et images
+    des pages [start, stop). Chaque image n'est extraite qu'une fois par worker.
+    """
+    doc = fitz.open(stream=file_content, filetype="pdf")
+    try:
+        pages: List[PDFPageContent] = []
+        seen_xrefs = set()
+        for page_num in range(start, min(stop, doc.page_count)):
+            page = doc.load_page(page_num)
+            content = PDFPageContent(page_num=page_num, text=page.get_text())
+
+            for img_index, img in enumerate(page.get_images(full=True)[:max_images_per_page]):
+                xref = img[0]
+                if xref in seen_xrefs:
+                    continue
+                seen_xrefs.add(xref)
+                try:
+                    content.images.append(
+                        (f"{page_num}_{img_index}", doc.extract_image(xref)["image"])
+                    )
+                except Exception:
+                    content.image_errors += 1
+
+            pages.append(content)
+        return pages
+    finally:
+        doc.close()
+
 
 class SecureCVParser:
     """
@@ -43,10 +133,24 @@ class SecureCVParser:
     Performance et précision maximales.
     """
 
-    def __init__(self, gemini_client: SecureGeminiClient, max_workers: int = 4):
+    def __init__(
+        self,
+        gemini_client: SecureGeminiClient,
+        max_workers: int = 4,
+        page_workers: Optional[int] = None,
+        content_cache: Optional[CVContentCache] = None,
+    ):
         self.gemini = gemini_client
         self.max_workers = max_workers
         
+        # ✅ Cache adressé par contenu (OCR, texte extrait, parsing IA)
+        self.content_cache = content_cache or get_cv_content_cache()
+        
+        # ✅ Pool de processus pour l'extraction page par page (créé à la demande,
+        # terminé si un PDF dépasse le délai : aucun worker ne reste bloqué)
+        self.page_workers = max(page_workers if page_workers is not None else min(max_workers, os.cpu_count() or 1), 1)
+        self._page_pool: Optional[multiprocessing.pool.Pool] = None
+        
         # ✅ Pool de threads pour OCR parallèle
         self.ocr_executor = concurrent.futures.ThreadPoolExecutor(
             max_workers=max_workers, 
@@ -66,7 +170,12 @@ class SecureCVParser:
         # pytesseract.pytesseract.tesseract_cmd = r'/usr/local/bin/tesseract'
 
     def _perform_ocr_on_image(self, image_bytes: bytes) -> str:
-        """Effectue l'OCR sur une image avec gestion des erreurs."""
+        """Effectue l'OCR sur une image avec gestion des erreurs (résultat mis en cache par empreinte)."""
+        cache_key = content_digest(image_bytes)
+        cached_text = self.content_cache.ocr.get(cache_key)
+        if cached_text is not None:
+            return cached_text
+        
         try:
             image = Image.open(io.BytesIO(image_bytes))
             # ✅ Prétraitement optimisé pour améliorer la qualité de l'OCR
@@ -75,17 +184,55 @@ class SecureCVParser:
             # ✅ Configuration OCR optimisée pour CV
             custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789àâäéèêëïîôöùûüÿçÀÂÄÉÈÊËÏÎÔÖÙÛÜŸÇ .,;:!?()[]{}"\'-+@#$%&*=/'
             
-            return pytesseract.image_to_string(
+            ocr_text = pytesseract.image_to_string(
                 image, 
                 lang='fra+eng',  # Multi-langue pour CV internationaux
                 config=custom_config
             )
+            self.content_cache.ocr.set(cache_key, ocr_text)
+            return ocr_text
         except Exception as e:
             secure_logger.log_security_event(
                 "OCR_PERFORMANCE_ERROR", {"error": str(e)[:100]}, "WARNING"
             )
             return ""
     
+    def _perform_ocr_batch(self, image_list: List[Tuple[str, bytes]], timeout: float = OCR_IMAGE_TIMEOUT) -> Dict[str, str]:
+        """
+        🚀 OCR de toutes les images du document en un seul lot.
+        Les images identiques (logo répété sur chaque page) ne sont traitées
+        qu'une fois et leur texte n'est retourné que pour la première occurrence.
+        """
+        if not image_list:
+            return {}
+        
+        futures_by_digest: Dict[bytes, concurrent.futures.Future] = {}
+        first_id_by_digest: Dict[bytes, str] = {}
+        for img_id, image_bytes in image_list:
+            digest = hashlib.blake2b(image_bytes, digest_size=16).digest()
+            if digest not in futures_by_digest:
+                first_id_by_digest[digest] = img_id
+                futures_by_digest[digest] = self.ocr_executor.submit(self._perform_ocr_on_image, image_bytes)
+        
+        done, not_done = concurrent.futures.wait(futures_by_digest.values(), timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            secure_logger.log_security_event(
+                "OCR_BATCH_TIMEOUT", {"processed": len(done), "total": len(futures_by_digest)}, "WARNING"
+            )
+        
+        results = {}
+        for digest, future in futures_by_digest.items():
+            if future in done and not future.exception():
+                results[first_id_by_digest[digest]] = future.result()
+        
+        secure_logger.log_security_event(
+            "OCR_BATCH_COMPLETED",
+            {"images_processed": len(results), "total_images": len(image_list), "unique_images": len(futures_by_digest)}
+        )
+        return results
+    
     async def _perform_ocr_batch_async(self, image_list: List[Tuple[int, bytes]]) -> List[Tuple[int, str]]:
         """🚀 Traitement OCR parallèle sur plusieurs images."""
         if not image_list:
@@ -120,116 +267,129 @@ class SecureCVParser:
         
         return results
 
+    def _check_pdf_limits(self, file_content: bytes) -> None:
+        """🛡️ Contrôles DoS sans parsing : taille et motifs dangereux (CVE-2023-36810)."""
+        try:
+            if PYPDF_DOS_PROTECTION_ENABLED:
+                check_pdf_bytes(file_content)
+            elif len(file_content) > PDF_MAX_BYTES:
+                raise ValueError(f"PDF trop volumineux: {len(file_content)} bytes")
+        except ValueError as e:
+            secure_logger.log_security_event(
+                "PDF_DOS_PROTECTION_BLOCKED_CV",
+                {"error": str(e)},
+                "CRITICAL"
+            )
+            raise SecurityException(f"PDF bloqué par protection DoS: {str(e)}")
+    
+    def _get_page_pool(self) -> multiprocessing.pool.Pool:
+        if self._page_pool is None:
+            self._page_pool = multiprocessing.Pool(processes=self.page_workers)
+        return self._page_pool
+    
+    def _terminate_page_pool(self) -> None:
+        """Tue les workers en cours : un PDF piégé ne continue pas à consommer du CPU."""
+        pool, self._page_pool = self._page_pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    
+    def _run_in_page_pool(self, tasks: List[Tuple], deadline: float) -> List:
+        """Exécute les tâches sur le pool de processus, toutes bornées par la même échéance."""
+        pending = [self._get_page_pool().apply_async(func, args) for func, *args in tasks]
+        try:
+            return [result.get(timeout=max(deadline - time.monotonic(), 0)) for result in pending]
+        except multiprocessing.TimeoutError:
+            self._terminate_page_pool()
+            secure_logger.log_security_event(
+                "PDF_DOS_PROTECTION_BLOCKED_CV",
+                {"error": "timeout", "tasks": len(tasks)},
+                "CRITICAL"
+            )
+            raise SecurityException("PDF bloqué par protection DoS: délai de traitement dépassé")
+    
+    def _extract_pdf_pages(self, file_content: bytes, deadline: float) -> List[PDFPageContent]:
+        """
+        Extraction des pages hors du processus principal, quelle que soit la taille du PDF.
+        Plages contiguës réparties sur les workers à partir de PDF_PARALLEL_MIN_PAGES pages.
+        """
+        (page_count,) = self._run_in_page_pool([(_count_pdf_pages, file_content)], deadline)
+        page_count = min(page_count, PDF_MAX_PAGES)
+        if page_count == 0:
+            return []
+        
+        workers = self.page_workers if page_count >= PDF_PARALLEL_MIN_PAGES else 1
+        chunk = -(-page_count // workers)
+        ranges = self._run_in_page_pool(
+            [
+                (_extract_pdf_page_range, file_content, start, min(start + chunk, page_count))
+                for start in range(0, page_count, chunk)
+            ],
+            deadline,
+        )
+        return [page for pages in ranges for page in pages]
+    
     @rate_limit(max_requests=5, window_seconds=300)
     def extract_text_from_pdf_secure(self, file_content: bytes) -> str:
         """
-        Extraction de texte PDF ultra-performante avec PyMuPDF et OCR Tesseract.
-        Combine le texte natif et le texte des images.
-        Protection intégrée contre CVE-2023-36810.
+        Extraction de texte PDF en une seule passe PyMuPDF, parallélisée par page.
+        Les limites DoS (taille, motifs CVE-2023-36810, pages, délai, volume de texte)
+        sont appliquées pendant cette passe, toujours exécutée dans le pool de processus
+        sous PDF_PROCESSING_TIMEOUT ; l'OCR de toutes les images est lancé en un lot.
         """
+        # ✅ CV déjà importé : seuls les documents ayant passé les contrôles sont en cache
+        document_key = content_digest(file_content)
+        cached_text = self.content_cache.text.get(document_key)
+        if cached_text is not None:
+            secure_logger.log_security_event(
+                "PDF_TEXT_CACHE_HIT", {"text_length": len(cached_text)}
+            )
+            return cached_text
         
-        # 🛡️ PROTECTION PYPDF DOS COMME PREMIÈRE LIGNE DE DÉFENSE
-        if PYPDF_DOS_PROTECTION_ENABLED:
-            try:
-                secure_logger.log_security_event(
-                    "PDF_DOS_PROTECTION_ACTIVE",
-                    {"file_size": len(file_content), "method": "cv_parser"},
-                    "INFO"
-                )
-                
-                # Test avec protection DoS avant traitement PyMuPDF
-                test_text = safe_extract_pdf_text(file_content, "cv_parsing.pdf")
-                
-                # Si le test passe, continuer avec PyMuPDF pour OCR avancé
-                secure_logger.log_security_event(
-                    "PDF_DOS_PROTECTION_PASSED_CV",
-                    {"extracted_preview": len(test_text)},
-                    "INFO"
-                )
-                
-            except (ValueError, TimeoutError) as e:
-                secure_logger.log_security_event(
-                    "PDF_DOS_PROTECTION_BLOCKED_CV",
-                    {"error": str(e)},
-                    "CRITICAL"
-                )
-                raise SecurityException(f"PDF bloqué par protection DoS: {str(e)}")
-            except Exception as e:
-                secure_logger.log_security_event(
-                    "PDF_DOS_PROTECTION_ERROR_CV",
-                    {"error": str(e)},
-                    "ERROR"
-                )
-                # Continue avec PyMuPDF mais avec vigilance accrue
+        self._check_pdf_limits(file_content)
         
-        # Traitement PyMuPDF avec OCR (après validation DoS)
         try:
-            doc = fitz.open(stream=file_content, filetype="pdf")
-            text = ""
-            page_count = 0
-            image_count = 0
-
-            for page_num, page in enumerate(doc):
-                if page_count >= 20:  # Limite de sécurité
-                    break
-
-                # 1. Extraction du texte natif (ultra-rapide)
-                page_text = page.get_text()
-                if len(text + page_text) > 80000: # Limite de taille augmentée
+            started = time.monotonic()
+            deadline = started + PDF_PROCESSING_TIMEOUT
+            pages = self._extract_pdf_pages(file_content, deadline)
+            
+            images = [image for page in pages for image in page.images]
+            remaining = max(deadline - time.monotonic(), 0) + OCR_IMAGE_TIMEOUT
+            ocr_results = self._perform_ocr_batch(images, timeout=remaining)
+            
+            # Assemblage dans l'ordre des pages : texte natif puis OCR de ses images
+            buffer = TextBuffer(PDF_MAX_TEXT_CHARS)
+            pages_kept = 0
+            for page in pages:
+                if not buffer.append(page.text + "\n"):
                     break
-                text += page_text + "\n"
-
-                # 2. ✅ Collecte des images pour traitement OCR parallèle
-                images = page.get_images(full=True)
-                page_images = []
-                
-                for img_index, img in enumerate(images[:5]):  # Max 5 images par page
-                    try:
-                        xref = img[0]
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        page_images.append((f"{page_num}_{img_index}", image_bytes))
-                        image_count += 1
-                    except Exception as e:
-                        secure_logger.log_security_event(
-                            "IMAGE_EXTRACTION_ERROR", {"page": page_num, "img": img_index, "error": str(e)[:100]}, "WARNING"
-                        )
-                
-                # ✅ Traitement OCR asynchrone de toutes les images de la page
-                if page_images:
-                    try:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        ocr_results = loop.run_until_complete(self._perform_ocr_batch_async(page_images))
-                        
-                        for img_id, ocr_text in ocr_results:
-                            if len(text + ocr_text) > 80000:
-                                break
-                            if ocr_text.strip():  # Ignorer OCR vides
-                                text += f"\n--- OCR IMAGE {img_id} ---\n" + ocr_text + "\n"
-                        
-                        loop.close()
-                    except Exception as e:
-                        secure_logger.log_security_event(
-                            "OCR_ASYNC_ERROR", {"page": page_num, "error": str(e)[:100]}, "WARNING"
-                        )
-
-                page_count += 1
-
-            doc.close()
-            clean_text = SecureValidator.validate_text_input(text, 80000, "contenu PDF")
+                pages_kept += 1
+                for img_id, _ in page.images:
+                    ocr_text = ocr_results.get(img_id, "")
+                    if ocr_text.strip() and not buffer.append(f"\n--- OCR IMAGE {img_id} ---\n{ocr_text}\n"):
+                        break
+                if page.image_errors:
+                    secure_logger.log_security_event(
+                        "IMAGE_EXTRACTION_ERROR", {"page": page.page_num, "errors": page.image_errors}, "WARNING"
+                    )
+            
+            clean_text = SecureValidator.validate_text_input(buffer.getvalue(), PDF_MAX_TEXT_CHARS, "contenu PDF")
+            self.content_cache.text.set(document_key, clean_text)
 
             secure_logger.log_security_event(
                 "PDF_TEXT_EXTRACTED_OPTIMIZED",
                 {
-                    "pages": page_count,
-                    "images_processed": image_count,
+                    "pages": pages_kept,
+                    "images_processed": len(images),
                     "text_length": len(clean_text),
-                    "dos_protection": PYPDF_DOS_PROTECTION_ENABLED
+                    "dos_protection": PYPDF_DOS_PROTECTION_ENABLED,
+                    "duration_ms": round((time.monotonic() - started) * 1000, 1)
                 },
             )
             return clean_text
 
+        except SecurityException:
+            raise
         except Exception as e:
             secure_logger.log_security_event(
                 "PDF_EXTRACTION_ERROR_OPTIMIZED", {"error": str(e)[:100]}, "CRITICAL"
@@ -256,6 +416,11 @@ class SecureCVParser:
 
     def extract_text_from_docx_secure(self, file_content: bytes) -> str:
         """Extraction sécurisée de texte DOCX (inchangée mais bénéficie du logging)"""
+        document_key = content_digest(file_content)
+        cached_text = self.content_cache.text.get(document_key)
+        if cached_text is not None:
+            return cached_text
+        
         try:
             doc = docx.Document(io.BytesIO(file_content))
             text = "\n".join([para.text for para in doc.paragraphs])
@@ -263,6 +428,7 @@ class SecureCVParser:
             clean_text = SecureValidator.validate_text_input(
                 text, 50000, "contenu DOCX"
             )
+            self.content_cache.text.set(document_key, clean_text)
 
             secure_logger.log_security_event(
                 "DOCX_TEXT_EXTRACTED", {"text_length": len(clean_text)}
@@ -300,13 +466,16 @@ class SecureCVParser:
                 cv_text, 80000, "texte CV" # Limite augmentée
             )
 
-            anonymized_text = self._anonymize_text_for_ai(clean_cv_text)
+            parsed_data = self._get_cached_parse(clean_cv_text)
+            if parsed_data is None:
+                anonymized_text = self._anonymize_text_for_ai(clean_cv_text)
 
-            prompt_data = {"cv_content": anonymized_text}
+                prompt_data = {"cv_content": anonymized_text}
 
-            response = self.gemini.generate_content_secure("cv_parsing", prompt_data)
+                response = self.gemini.generate_content_secure("cv_parsing", prompt_data)
 
-            parsed_data = self._parse_json_response_secure(response)
+                parsed_data = self._parse_json_response_secure(response)
+                self._set_cached_parse(clean_cv_text, parsed_data)
 
             profile = self._build_cv_profile_secure(parsed_data)
 
@@ -336,27 +505,31 @@ class SecureCVParser:
                 cv_text, 80000, "texte CV"
             )
             
-            # ✅ Anonymisation asynchrone
-            anonymized_text = await loop.run_in_executor(
-                None,  # Utiliser le pool par défaut
-                self._anonymize_text_for_ai,
-                clean_cv_text
-            )
-            
-            prompt_data = {"cv_content": anonymized_text}
-            
-            # ✅ Appel Gemini asynchrone (bénéficie du cache optimisé)
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.gemini.generate_content_secure("cv_parsing", prompt_data)
-            )
-            
-            # ✅ Parsing JSON asynchrone
-            parsed_data = await loop.run_in_executor(
-                None,
-                self._parse_json_response_secure,
-                response
-            )
+            # ✅ Texte déjà analysé : pas d'appel Gemini
+            parsed_data = self._get_cached_parse(clean_cv_text)
+            if parsed_data is None:
+                # ✅ Anonymisation asynchrone
+                anonymized_text = await loop.run_in_executor(
+                    None,  # Utiliser le pool par défaut
+                    self._anonymize_text_for_ai,
+                    clean_cv_text
+                )
+                
+                prompt_data = {"cv_content": anonymized_text}
+                
+                # ✅ Appel Gemini asynchrone (bénéficie du cache optimisé)
+                response = await loop.run_in_executor(
+                    None,
+                    lambda: self.gemini.generate_content_secure("cv_parsing", prompt_data)
+                )
+                
+                # ✅ Parsing JSON asynchrone
+                parsed_data = await loop.run_in_executor(
+                    None,
+                    self._parse_json_response_secure,
+                    response
+                )
+                self._set_cached_parse(clean_cv_text, parsed_data)
             
             # ✅ Construction profil asynchrone
             profile = await loop.run_in_executor(
@@ -450,9 +623,22 @@ class SecureCVParser:
                 self.ocr_executor.shutdown(wait=False)
             if hasattr(self, 'io_executor'):
                 self.io_executor.shutdown(wait=False)
+            if getattr(self, '_page_pool', None) is not None:
+                self._terminate_page_pool()
         except Exception:
             pass  # Ignorer erreurs de nettoyage
 
+    def _get_cached_parse(self, cv_text: str) -> Optional[Dict]:
+        """Résultat de parsing IA déjà obtenu pour ce texte normalisé."""
+        cached = self.content_cache.parse.get(normalized_text_digest(cv_text))
+        if cached is None:
+            return None
+        secure_logger.log_security_event("CV_PARSE_CACHE_HIT", {"text_length": len(cv_text)})
+        return json.loads(cached)
+
+    def _set_cached_parse(self, cv_text: str, parsed_data: Dict) -> None:
+        self.content_cache.parse.set(normalized_text_digest(cv_text), json.dumps(parsed_data))
+
     def _anonymize_text_for_ai(self, text: str) -> str:
         """Anonymisation avancée pour traitement IA"""
         anonymized = text
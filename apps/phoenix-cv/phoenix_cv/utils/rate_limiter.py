@@ -1,60 +1,47 @@
-import threading
-import time
-from functools import wraps
+import sys
+from functools import lru_cache, wraps
+from pathlib import Path
 
 import streamlit as st
 from phoenix_cv.utils.secure_logging import secure_logger
 
+try:
+    from phoenix_rate_limit import Quota, create_rate_limiter_from_env
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = Path(__file__).resolve().parent.parent.parent.parent.parent / "packages"
+    if str(PACKAGES_PATH) not in sys.path:
+        sys.path.insert(0, str(PACKAGES_PATH))
+    from phoenix_rate_limit import Quota, create_rate_limiter_from_env
+
+
+@lru_cache(maxsize=64)
+def _quota(max_requests: int, window_seconds: int) -> Quota:
+    return Quota(max_requests, window_seconds)
+
 
 class RateLimiter:
-    """Rate limiter thread-safe"""
+    """Rate limiter thread-safe (GCRA partagé : état O(1) par clé, clés expirées évincées)"""
 
     def __init__(self):
-        self._limits = {}
-        self._lock = threading.Lock()
+        self._limiter = create_rate_limiter_from_env("phoenix-cv")
 
     def is_allowed(self, key: str, max_requests: int, window_seconds: int) -> bool:
         """Vérifie si la requête est autorisée"""
-        now = time.time()
-
-        with self._lock:
-            if key not in self._limits:
-                self._limits[key] = []
-
-            self._limits[key] = [
-                timestamp
-                for timestamp in self._limits[key]
-                if now - timestamp < window_seconds
-            ]
-
-            if len(self._limits[key]) >= max_requests:
-                secure_logger.log_security_event(
-                    "RATE_LIMIT_EXCEEDED",
-                    {"key": key[:10], "requests": len(self._limits[key])},
-                    "WARNING",
-                )
-                return False
-
-            self._limits[key].append(now)
-            return True
+        result = self._limiter.hit(key, _quota(max_requests, window_seconds))
+        if not result.allowed:
+            secure_logger.log_security_event(
+                "RATE_LIMIT_EXCEEDED",
+                {"key": key[:10], "retry_after": round(result.retry_after, 1)},
+                "WARNING",
+            )
+        return result.allowed
 
     def get_remaining_requests(
         self, key: str, max_requests: int, window_seconds: int
     ) -> int:
         """Retourne le nombre de requêtes restantes"""
-        now = time.time()
-
-        with self._lock:
-            if key not in self._limits:
-                return max_requests
-
-            recent_requests = [
-                timestamp
-                for timestamp in self._limits[key]
-                if now - timestamp < window_seconds
-            ]
-
-            return max(0, max_requests - len(recent_requests))
+        return self._limiter.peek(key, _quota(max_requests, window_seconds)).remaining
 
 
 rate_limiter = RateLimiter()
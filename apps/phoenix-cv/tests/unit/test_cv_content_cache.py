@@ -0,0 +1,111 @@
+"""Tests du cache adressé par contenu de Phoenix CV (niveau disque chiffré)."""
+
+import os
+
+import pytest
+from cryptography.fernet import Fernet
+
+from phoenix_cv.services import cv_content_cache
+from phoenix_cv.services.cv_content_cache import ContentAddressedCache, content_digest
+
+VALUE = "Chef de projet logistique - pilotage budget, planification. " * 20
+
+
+def _disk_files(cache):
+    return [name for name in os.listdir(cache.directory) if not name.startswith(".")]
+
+
+def _disk_usage(cache):
+    return sum(os.path.getsize(os.path.join(cache.directory, name)) for name in _disk_files(cache))
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def factory(**kwargs):
+        kwargs.setdefault("memory_max_bytes", 0)  # Force la lecture depuis le disque
+        return ContentAddressedCache("text", directory=str(tmp_path), **kwargs)
+
+    return factory
+
+
+def test_disk_round_trip_is_encrypted(make_cache):
+    key = content_digest(b"cv.pdf")
+    make_cache().set(key, VALUE)
+
+    with open(os.path.join(make_cache().directory, key), encoding="utf-8") as handle:
+        assert "Chef de projet" not in handle.read()
+
+    cache = make_cache()
+    assert cache.get(key) == VALUE
+    assert cache.get_stats()["disk_hits"] == 1
+
+
+def test_entry_written_by_another_worker_is_read(make_cache):
+    reader = make_cache()
+    writer = make_cache()
+    writer.set("k1", VALUE)
+
+    assert reader.get("k1") == VALUE
+    assert reader.get_stats()["disk_entries"] == 1
+
+
+def test_key_mismatch_is_a_miss_and_drops_the_file(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.set("k1", VALUE)
+    monkeypatch.setattr(cv_content_cache.secure_crypto, "_fernet", Fernet(Fernet.generate_key()))
+
+    assert cache.get("k1") is None
+    stats = cache.get_stats()
+    assert stats["disk_errors"] == 1
+    assert stats["misses"] == 1
+    assert _disk_files(cache) == []
+
+
+def test_expired_entry_is_removed(make_cache, monkeypatch):
+    cache = make_cache(ttl_seconds=60)
+    cache.set("k1", VALUE)
+    later = cv_content_cache.time.time() + 61
+    monkeypatch.setattr(cv_content_cache.time, "time", lambda: later)
+
+    assert cache.get("k1") is None
+    assert _disk_files(cache) == []
+
+
+def test_least_recently_used_entries_are_evicted(make_cache):
+    probe = make_cache()
+    probe.set("probe", VALUE)
+    entry_size = _disk_usage(probe)
+    probe.clear()
+
+    cache = make_cache(disk_max_bytes=3 * entry_size)
+    for i in range(3):
+        cache.set(f"k{i}", VALUE)
+        os.utime(os.path.join(cache.directory, f"k{i}"), (i, i))
+    cache.get("k0")  # k0 redevient le plus récent
+    cache.set("k3", VALUE)
+
+    assert sorted(_disk_files(cache)) == ["k0", "k2", "k3"]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_size_cap_holds_across_workers_sharing_the_directory(make_cache):
+    probe = make_cache()
+    probe.set("probe", VALUE)
+    entry_size = _disk_usage(probe)
+    probe.clear()
+
+    workers = [make_cache(disk_max_bytes=4 * entry_size, disk_sync_seconds=3600) for _ in range(3)]
+    for i in range(12):
+        workers[i % 3].set(f"k{i}", VALUE)
+
+    # Chaque worker n'a écrit que 4 entrées : seul le rescan du répertoire détecte le dépassement
+    workers[0].set("k12", VALUE)
+    assert _disk_usage(workers[0]) <= 4 * entry_size
+
+
+def test_clear_removes_entries_of_other_workers(make_cache):
+    make_cache().set("k1", VALUE)
+    cache = make_cache()
+    cache.clear()
+
+    assert _disk_files(cache) == []
@@ -0,0 +1,84 @@
+"""Tests de l'extraction PDF de SecureCVParser : délai DoS sur tous les chemins."""
+
+import fitz  # PyMuPDF
+import pytest
+
+from phoenix_cv.services import secure_cv_parser
+from phoenix_cv.services.cv_content_cache import CVContentCache
+from phoenix_cv.services.secure_cv_parser import SecureCVParser
+from phoenix_cv.utils.exceptions import SecurityException
+
+# Appel direct sans le décorateur de rate limiting (lié à la session Streamlit)
+extract = SecureCVParser.extract_text_from_pdf_secure.__wrapped__
+
+
+def build_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for page_num in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {page_num} - Chef de projet logistique")
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+@pytest.fixture
+def make_parser(tmp_path):
+    parsers = []
+
+    def factory(page_workers=1):
+        parser = SecureCVParser(
+            gemini_client=None,
+            page_workers=page_workers,
+            content_cache=CVContentCache(directory=str(tmp_path / f"cache{len(parsers)}")),
+        )
+        parsers.append(parser)
+        return parser
+
+    yield factory
+    for parser in parsers:
+        parser._terminate_page_pool()
+
+
+def test_small_pdf_is_extracted_out_of_process(make_parser):
+    parser = make_parser(page_workers=1)
+
+    text = extract(parser, build_pdf(1))
+
+    assert "Page 0 - Chef de projet logistique" in text
+    assert parser._page_pool is not None
+
+
+def test_multi_page_pdf_keeps_page_order(make_parser):
+    parser = make_parser(page_workers=2)
+
+    text = extract(parser, build_pdf(6))
+
+    positions = [text.index(f"Page {i} -") for i in range(6)]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.parametrize("pages,page_workers", [(1, 1), (2, 4), (6, 2)])
+def test_timeout_applies_to_every_path_and_terminates_workers(make_parser, monkeypatch, pages, page_workers):
+    parser = make_parser(page_workers=page_workers)
+    parser._get_page_pool()
+    workers = list(parser._page_pool._pool)
+    monkeypatch.setattr(secure_cv_parser, "PDF_PROCESSING_TIMEOUT", 0.0)
+
+    with pytest.raises(SecurityException, match="délai"):
+        extract(parser, build_pdf(pages))
+
+    assert parser._page_pool is None
+    assert not any(worker.is_alive() for worker in workers)
+
+    # Le pool est recréé à l'appel suivant
+    monkeypatch.setattr(secure_cv_parser, "PDF_PROCESSING_TIMEOUT", 10.0)
+    assert "Page 0" in extract(parser, build_pdf(pages))
+
+
+def test_oversized_pdf_is_rejected_before_parsing(make_parser):
+    parser = make_parser()
+
+    with pytest.raises(SecurityException, match="volumineux"):
+        extract(parser, b"%PDF-1.4\n" + b"0" * (secure_cv_parser.PDF_MAX_BYTES + 1))
+
+    assert parser._page_pool is None
@@ -6,6 +6,7 @@ Author: Claude Phoenix DevSecOps Guardian
 Version: 2.0.0 - Production AI Engine
 """
 
+import asyncio
 import os
 import logging
 from typing import List, Dict, Any, Optional
@@ -16,8 +17,25 @@ import json
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
+# ✅ Cache Gemini partagé (L1 mémoire + L2 persistant opt-in) depuis packages partagés
+try:
+    from phoenix_shared_ai.services import get_cache_optimizer
+except ImportError:
+    # Sans le package partagé, chaque appel part vers Gemini
+    get_cache_optimizer = None
+
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "gemini-1.5-flash"
+
+# Configuration du modèle pour Alessio
+GENERATION_CONFIG = {
+    "temperature": 0.7,  # Équilibre créativité/cohérence
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 1000,  # Limité pour des réponses concises
+}
+
 @dataclass
 class AlessioResponse:
     """Réponse structurée d'Alessio"""
@@ -34,12 +52,16 @@ class GeminiAlessioEngine:
     Personnalité: Coach empathique spécialisé reconversion
     """
     
-    def __init__(self):
+    def __init__(self, cache_optimizer=None):
         self.api_key = self._get_api_key()
         self._configure_gemini()
         self.model = self._initialize_model()
         self.alessio_personality = self._load_alessio_personality()
         self.conversation_context = {}  # Cache des contextes par utilisateur
+        # Réponses partagées entre workers et redémarrages (premiers messages uniquement)
+        if cache_optimizer is None and get_cache_optimizer is not None:
+            cache_optimizer = get_cache_optimizer()
+        self._cache_optimizer = cache_optimizer
         
     def _get_api_key(self) -> str:
         """Récupère la clé API Gemini"""
@@ -60,25 +82,17 @@ class GeminiAlessioEngine:
         safety_settings = {
             HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
             HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_HIGH_ONLY,
+            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
             HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
         }
         
-        # Configuration du modèle pour Alessio
-        generation_config = {
-            "temperature": 0.7,  # Équilibre créativité/cohérence
-            "top_p": 0.95,
-            "top_k": 40,
-            "max_output_tokens": 1000,  # Limité pour des réponses concises
-        }
-        
         try:
             model = genai.GenerativeModel(
-                model_name="gemini-1.5-flash",  # Modèle rapide et efficace
-                generation_config=generation_config,
+                model_name=MODEL_NAME,  # Modèle rapide et efficace
+                generation_config=GENERATION_CONFIG,
                 safety_settings=safety_settings
             )
-            logger.info("Gemini model initialized for Alessio: gemini-1.5-flash")
+            logger.info(f"Gemini model initialized for Alessio: {MODEL_NAME}")
             return model
         except Exception as e:
             logger.error(f"Erreur initialisation modèle Gemini: {e}")
@@ -160,11 +174,20 @@ Alessio 🤝"
             # 1. Construire le prompt contextualisé
             full_prompt = await self._build_contextual_prompt(user_message, user_id, context)
             
-            # 2. Générer avec Gemini
-            response = await self.model.generate_content_async(full_prompt)
+            # 2. Générer avec Gemini (ou réponse déjà payée pour le même premier message)
+            cacheable = self._is_cacheable(user_id, context)
+            content = None
+            if cacheable:
+                content = await asyncio.to_thread(
+                    self._cache_optimizer.get, full_prompt, {}, self._model_config()
+                )
             
             # 3. Traiter la réponse
-            content = response.text.strip()
+            if content is None:
+                response = await self.model.generate_content_async(full_prompt)
+                content = response.text.strip()
+                if cacheable:
+                    self._cache_optimizer.set(full_prompt, {}, content, self._model_config())
             
             # 4. Extraire suggestions (si le modèle en génère)
             suggestions = self._extract_suggestions(content)
@@ -181,7 +204,7 @@ Alessio 🤝"
                 suggestions=suggestions,
                 context_used=context is not None,
                 processing_time_ms=int(processing_time),
-                model_used="gemini-1.5-flash"
+                model_used=MODEL_NAME
             )
             
             logger.info(f"Alessio response generated - User: {user_id}, Time: {processing_time:.0f}ms")
@@ -200,6 +223,21 @@ Alessio 🤝"
                 model_used="fallback"
             )
     
+    def _is_cacheable(self, user_id: str, context: Optional[Dict[str, Any]]) -> bool:
+        """
+        Seul un premier message sans profil utilisateur est mis en cache : le prompt ne
+        contient alors que la personnalité, le contexte d'app et la question, jamais
+        l'historique ou le profil d'un utilisateur.
+        """
+        return (
+            self._cache_optimizer is not None
+            and not self.conversation_context.get(user_id)
+            and not (context or {}).get('user_profile')
+        )
+    
+    def _model_config(self) -> Dict[str, Any]:
+        return {"model": MODEL_NAME, **GENERATION_CONFIG}
+    
     async def _build_contextual_prompt(
         self, 
         user_message: str, 
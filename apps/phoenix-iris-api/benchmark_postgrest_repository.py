@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark accès Supabase - Dojo API (lectures Kaizen concurrentes)
+Compare l'ancien schéma de dojo_api_optimized (client supabase-py synchrone dans un
+ThreadPoolExecutor de 5 threads) au PostgrestRepository asynchrone, contre le stub
+PostgREST local (latence simulée par requête, lancé dans un processus séparé).
+Sur une machine à un seul cœur, le CPU client + stub plafonne le débit aux faibles latences.
+
+Usage:
+    python benchmark_postgrest_repository.py [--requests 200] [--latency-ms 80]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from database import PostgrestRepository
+
+USERS = 50
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub(latency_ms: float):
+    """Lance le stub dans un processus séparé (comme un vrai PostgREST)"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "database.postgrest_stub", "--port", str(port), "--latency-ms", str(latency_ms)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{url}/rest/v1/kaizen", params={"limit": "1"})
+            break
+        except httpx.TransportError:
+            time.sleep(0.1)
+    # Quelques Kaizen par utilisateur
+    httpx.post(f"{url}/rest/v1/kaizen", headers={"Prefer": "return=minimal"}, json=[
+        {"user_id": f"user_{i % USERS}", "action": f"Action {i}",
+         "date": f"2026-10-{i % 28 + 1:02d}", "completed": i % 3 == 0}
+        for i in range(USERS * 20)
+    ])
+    return process, url
+
+
+def report(name: str, latencies, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  • {name:<34} {len(latencies) / elapsed:7.1f} req/s   "
+          f"p50 {statistics.median(latencies):7.1f} ms   p95 {p95:7.1f} ms")
+
+
+async def bench_executor(url: str, requests: int) -> None:
+    """Ancien chemin : supabase-py + run_in_executor (5 threads)"""
+    from supabase import create_client
+
+    client = create_client(url, "stub-key")
+    executor = ThreadPoolExecutor(max_workers=5)
+    loop = asyncio.get_running_loop()
+
+    def select(user_id: str):
+        return client.table("kaizen").select("*").eq("user_id", user_id) \
+            .order("date", desc=True).limit(50).execute().data
+
+    async def timed(user_id: str) -> float:
+        start = time.perf_counter()
+        await loop.run_in_executor(executor, select, user_id)
+        return (time.perf_counter() - start) * 1000
+
+    await timed("user_0")  # établit la connexion
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(f"user_{i % USERS}") for i in range(requests)))
+    report("supabase-py + executor (5 threads)", latencies, time.perf_counter() - start)
+    executor.shutdown()
+
+
+async def bench_repository(url: str, requests: int) -> PostgrestRepository:
+    """Nouveau chemin : PostgrestRepository (httpx.AsyncClient, pool keep-alive)"""
+    repo = PostgrestRepository(url, "stub-key")
+
+    async def timed(user_id: str) -> float:
+        start = time.perf_counter()
+        await repo.table("kaizen").select("*").eq("user_id", user_id).order("date desc").limit(50).execute()
+        return (time.perf_counter() - start) * 1000
+
+    await timed("user_0")
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(f"user_{i % USERS}") for i in range(requests)))
+    report("PostgrestRepository (asyncio)", latencies, time.perf_counter() - start)
+    return repo
+
+
+async def bench_bulk_insert(repo: PostgrestRepository, rows: int) -> None:
+    """Insertion d'événements analytics : une requête par ligne vs lot découpé"""
+    events = [{"event_type": "chat_request", "user_hash": f"h{i}", "metadata": "{}"} for i in range(rows)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(repo.table("iris_events").insert(event, returning="minimal").execute()
+                           for event in events))
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await repo.table("iris_events").insert(events, returning="minimal", chunk_size=100).execute()
+    bulk = time.perf_counter() - start
+    print(f"  • {rows} événements : {single * 1000:7.1f} ms unitaires, {bulk * 1000:7.1f} ms par lots de 100")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    stub, url = start_stub(args.latency_ms)
+    print(f"⏱️ {args.requests} lectures Kaizen concurrentes, stub PostgREST à {args.latency_ms:.0f} ms/requête\n")
+
+    await bench_executor(url, args.requests)
+    repo = await bench_repository(url, args.requests)
+    print()
+    await bench_bulk_insert(repo, 1000)
+
+    print("\n📊 Métriques du dépôt (table.opération):")
+    for key, metrics in repo.get_metrics().items():
+        print(f"  • {key:<20} {metrics['requests']:5d} requêtes   p95 {metrics['p95_ms']:7.1f} ms")
+    await repo.aclose()
+    stub.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,14 @@
+"""
+🗄️ DATABASE - Accès asynchrone à Supabase (PostgREST) pour Iris API
+"""
+
+from database.postgrest_repository import (
+    PostgrestError,
+    PostgrestRepository,
+    QueryBuilder,
+    create_postgrest_repository,
+    get_postgrest_repository,
+)
+
+__all__ = ["PostgrestError", "PostgrestRepository", "QueryBuilder",
+           "create_postgrest_repository", "get_postgrest_repository"]
@@ -0,0 +1,364 @@
+"""
+🗄️ POSTGREST REPOSITORY - Accès asynchrone aux tables Supabase
+Client PostgREST natif asyncio (httpx.AsyncClient, HTTP/2, pool keep-alive) :
+aucune requête ne passe par un pool de threads, la concurrence n'est bornée
+que par le pool de connexions.
+
+Usage:
+    repo = get_postgrest_repository()
+    rows = await repo.table("kaizen").select("*").eq("user_id", uid).order("date", desc=True).limit(50).execute()
+    await repo.table("iris_events").insert(events, returning="minimal").execute()
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+
+# Percentiles calculés sur les dernières requêtes de chaque (table, opération)
+LATENCY_WINDOW = 1024
+
+try:
+    import h2  # noqa: F401 - requis par httpx pour HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class PostgrestError(Exception):
+    """Erreur renvoyée par PostgREST (statut HTTP >= 400)"""
+
+    def __init__(self, table: str, status_code: int, message: str):
+        super().__init__(f"{table}: HTTP {status_code} - {message}")
+        self.table = table
+        self.status_code = status_code
+        self.message = message
+
+
+class TableMetrics:
+    """Compteurs et latences récentes pour une (table, opération)"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.latencies: deque = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float, rows: int, error: bool) -> None:
+        self.requests += 1
+        self.rows += rows
+        self.errors += int(error)
+        self.total_ms += elapsed_ms
+        self.latencies.append(elapsed_ms)
+
+    def percentile(self, q: float) -> float:
+        """Percentile (q entre 0 et 100) des dernières latences, par rang le plus proche"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rows": self.rows,
+            "avg_ms": round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+        }
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _json_default(value: Any) -> str:
+    """Sérialisation JSON des dates (modèles Pydantic dumpés en objets Python)"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class QueryBuilder:
+    """
+    Construction d'une requête PostgREST (même vocabulaire que supabase-py),
+    exécutée par `await builder.execute()`.
+    """
+
+    def __init__(self, repository: "PostgrestRepository", table: str):
+        self._repository = repository
+        self._table = table
+        self._method = "GET"
+        self._operation = "select"
+        self._params: List[Tuple[str, str]] = []
+        self._headers: Dict[str, str] = {}
+        self._payload: Union[Row, List[Row], None] = None
+        self._single = False
+        self._chunk_size: Optional[int] = None
+
+    # === OPÉRATIONS ===
+
+    def select(self, columns: str = "*") -> "QueryBuilder":
+        self._params.append(("select", columns))
+        return self
+
+    def insert(self, rows: Union[Row, List[Row]], returning: str = "representation",
+               chunk_size: Optional[int] = None) -> "QueryBuilder":
+        """Insertion (une ligne ou un lot, découpé en requêtes de chunk_size lignes)"""
+        self._method, self._operation = "POST", "insert"
+        self._payload = rows
+        self._chunk_size = chunk_size
+        self._headers["Prefer"] = f"return={returning}"
+        return self
+
+    def upsert(self, rows: Union[Row, List[Row]], on_conflict: Optional[str] = None,
+               returning: str = "representation", ignore_duplicates: bool = False,
+               chunk_size: Optional[int] = None) -> "QueryBuilder":
+        """Insertion ou mise à jour sur conflit (clé primaire ou on_conflict)"""
+        self.insert(rows, returning, chunk_size)
+        self._operation = "upsert"
+        resolution = "ignore-duplicates" if ignore_duplicates else "merge-duplicates"
+        self._headers["Prefer"] = f"return={returning},resolution={resolution}"
+        if on_conflict:
+            self._params.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, values: Row, returning: str = "representation") -> "QueryBuilder":
+        self._method, self._operation = "PATCH", "update"
+        self._payload = values
+        self._headers["Prefer"] = f"return={returning}"
+        return self
+
+    def delete(self, returning: str = "minimal") -> "QueryBuilder":
+        self._method, self._operation = "DELETE", "delete"
+        self._headers["Prefer"] = f"return={returning}"
+        return self
+
+    # === FILTRES ===
+
+    def _filter(self, column: str, operator: str, value: Any) -> "QueryBuilder":
+        self._params.append((column, f"{operator}.{_format_value(value)}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "lte", value)
+
+    def is_(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "is", value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "QueryBuilder":
+        quoted = ",".join(f'"{_format_value(value)}"' for value in values)
+        self._params.append((column, f"in.({quoted})"))
+        return self
+
+    # === MODIFICATEURS ===
+
+    def order(self, column: str, desc: bool = False) -> "QueryBuilder":
+        """Tri ; accepte aussi la forme "date desc" utilisée par dojo_api"""
+        if " " in column:
+            column, direction = column.split(None, 1)
+            desc = direction.strip().lower() == "desc"
+        self._params.append(("order", f"{column}.{'desc' if desc else 'asc'}"))
+        return self
+
+    def limit(self, count: int) -> "QueryBuilder":
+        self._params.append(("limit", str(count)))
+        return self
+
+    def range(self, start: int, end: int) -> "QueryBuilder":
+        """Lignes start à end incluses (comme supabase-py)"""
+        self._params.append(("offset", str(start)))
+        self._params.append(("limit", str(end - start + 1)))
+        return self
+
+    def single(self) -> "QueryBuilder":
+        """Une seule ligne attendue : execute() renvoie un dict, ou None si absente"""
+        self._single = True
+        self._headers["Accept"] = "application/vnd.pgrst.object+json"
+        return self
+
+    # === EXÉCUTION ===
+
+    async def execute(self) -> Union[List[Row], Row, None]:
+        if self._method == "POST" and isinstance(self._payload, list) and self._chunk_size:
+            chunks = [self._payload[i:i + self._chunk_size]
+                      for i in range(0, len(self._payload), self._chunk_size)]
+            results = await asyncio.gather(*(self._send(chunk) for chunk in chunks))
+            return [row for rows in results for row in (rows or [])]
+        return await self._send(self._payload)
+
+    async def _send(self, payload) -> Union[List[Row], Row, None]:
+        return await self._repository.request(
+            self._table, self._operation, self._method, self._params,
+            payload, self._headers, self._single,
+        )
+
+
+class PostgrestRepository:
+    """
+    ✅ Dépôt asynchrone partagé sur l'API PostgREST de Supabase.
+
+    - Un seul httpx.AsyncClient par processus : HTTP/2 (multiplexage) et keep-alive
+    - Builders de requêtes compatibles supabase-py (select/eq/order/limit/single...)
+    - Insert/upsert en lot, découpage optionnel en requêtes parallèles
+    - Métriques de latence par table et par opération
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 20,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        if not self.base_url.endswith("/rest/v1"):
+            self.base_url += "/rest/v1"
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("⚠️ Package h2 absent, PostgREST en HTTP/1.1 (keep-alive conservé)")
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "apikey": api_key,
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            http2=self.http2,
+            transport=transport,
+        )
+        self._metrics: Dict[str, TableMetrics] = {}
+
+    def table(self, name: str) -> QueryBuilder:
+        return QueryBuilder(self, name)
+
+    async def request(
+        self,
+        table: str,
+        operation: str,
+        method: str,
+        params: List[Tuple[str, str]],
+        payload: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        single: bool = False,
+    ) -> Union[List[Row], Row, None]:
+        """Exécute une requête PostgREST et enregistre sa latence"""
+        start = time.perf_counter()
+        error = True
+        rows = 0
+        try:
+            content = None if payload is None else json.dumps(payload, default=_json_default)
+            response = await self._client.request(
+                method, f"/{table}", params=params, content=content, headers=headers
+            )
+            if single and response.status_code == 406:
+                # PostgREST : 0 (ou plusieurs) lignes pour un objet unique
+                error = False
+                return None
+            if response.status_code >= 400:
+                raise PostgrestError(table, response.status_code, self._error_message(response))
+            error = False
+            if not response.content:
+                return None if single else []
+            data = response.json()
+            rows = 1 if isinstance(data, dict) else len(data)
+            return data
+        finally:
+            self._record(f"{table}.{operation}", (time.perf_counter() - start) * 1000, rows, error)
+
+    @staticmethod
+    def _error_message(response: httpx.Response) -> str:
+        try:
+            body = response.json()
+            return body.get("message") or str(body)
+        except ValueError:
+            return response.text[:200]
+
+    def _record(self, key: str, elapsed_ms: float, rows: int, error: bool) -> None:
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = TableMetrics()
+        metrics.record(elapsed_ms, rows, error)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Latence et volumes par "table.opération" """
+        return {key: metrics.to_dict() for key, metrics in sorted(self._metrics.items())}
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def create_postgrest_repository(url: str, key: str) -> PostgrestRepository:
+    """
+    Dépôt configuré par l'environnement : POSTGREST_TIMEOUT,
+    POSTGREST_MAX_CONNECTIONS, POSTGREST_MAX_KEEPALIVE, POSTGREST_HTTP2.
+    """
+    repository = PostgrestRepository(
+        url,
+        key,
+        timeout=float(os.getenv("POSTGREST_TIMEOUT", "10")),
+        max_connections=int(os.getenv("POSTGREST_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("POSTGREST_MAX_KEEPALIVE", "20")),
+        http2=os.getenv("POSTGREST_HTTP2", "true").lower() == "true",
+    )
+    logger.info(f"✅ PostgrestRepository initialisé (http2={repository.http2})")
+    return repository
+
+
+_repository: Optional[PostgrestRepository] = None
+
+
+def get_postgrest_repository() -> Optional[PostgrestRepository]:
+    """
+    Dépôt partagé du processus, avec la clé service (None si Supabase n'est pas configuré).
+    Configuration: SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY (ou SUPABASE_KEY).
+    """
+    global _repository
+    if _repository is None:
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+        if not url or not key:
+            return None
+        _repository = create_postgrest_repository(url, key)
+    return _repository
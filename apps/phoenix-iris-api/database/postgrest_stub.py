@@ -0,0 +1,174 @@
+"""
+🧪 POSTGREST STUB - Serveur PostgREST minimal en mémoire pour tests de charge
+Implémente le sous-ensemble utilisé par Iris (filtres eq/neq/gt/gte/lt/lte/is/in,
+select, order, limit/offset, objet unique, insert/upsert en lot, update, delete)
+avec une latence simulée par requête.
+
+Usage:
+    python -m database.postgrest_stub --port 54321 --latency-ms 20
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=stub uvicorn dojo_api_optimized:app
+"""
+
+import argparse
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    """Convertit une valeur de filtre selon le type de la colonne"""
+    if raw == "null":
+        return None
+    if isinstance(sample, bool):
+        return raw == "true"
+    if isinstance(sample, (int, float)):
+        try:
+            return type(sample)(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    operator, _, raw = expression.partition(".")
+    value = row.get(column)
+    if operator == "in":
+        options = [item.strip().strip('"') for item in raw.strip("()").split(",")]
+        return any(value == _coerce(option, value) for option in options)
+    if operator == "is":
+        return value is None if raw == "null" else value == (raw == "true")
+    expected = _coerce(raw, value)
+    if operator == "eq":
+        return value == expected
+    if operator == "neq":
+        return value != expected
+    if value is None or expected is None:
+        return False
+    return {
+        "gt": value > expected,
+        "gte": value >= expected,
+        "lt": value < expected,
+        "lte": value <= expected,
+    }.get(operator, False)
+
+
+class PostgrestStub:
+    """Tables en mémoire exposées sous /rest/v1/<table>"""
+
+    def __init__(self, latency_ms: float = 0.0, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.latency_ms = latency_ms
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list, tables or {})
+        self._next_id: Dict[str, int] = defaultdict(lambda: 1)
+        self.requests = 0
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/rest/v1/{table}", self.handle, methods=["GET", "POST", "PATCH", "DELETE"]),
+        ])
+
+    async def handle(self, request: Request) -> Response:
+        self.requests += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        table = self.tables[request.path_params["table"]]
+        params = request.query_params
+        prefer = request.headers.get("prefer", "")
+        single = "vnd.pgrst.object" in request.headers.get("accept", "")
+        filters = [(key, value) for key, value in params.multi_items() if key not in RESERVED_PARAMS]
+
+        if request.method == "POST":
+            payload = json.loads(await request.body() or b"[]")
+            rows = self._write(request.path_params["table"], table,
+                               payload if isinstance(payload, list) else [payload],
+                               "merge-duplicates" in prefer, "ignore-duplicates" in prefer,
+                               params.get("on_conflict", "id").split(","))
+            return self._respond(rows, prefer, single, status_code=201)
+
+        matched = [row for row in table if all(_matches(row, key, value) for key, value in filters)]
+
+        if request.method == "PATCH":
+            values = json.loads(await request.body() or b"{}")
+            for row in matched:
+                row.update(values)
+            return self._respond(matched, prefer, single)
+
+        if request.method == "DELETE":
+            removed = {id(row) for row in matched}
+            table[:] = [row for row in table if id(row) not in removed]
+            return self._respond(matched, prefer, single)
+
+        for clause in reversed(params.get("order", "").split(",") if params.get("order") else []):
+            column, _, direction = clause.partition(".")
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)),
+                         reverse=direction.startswith("desc"))
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        matched = matched[offset:offset + int(limit) if limit else None]
+
+        columns = params.get("select", "*")
+        if columns != "*":
+            names = [name.strip() for name in columns.split(",")]
+            matched = [{name: row.get(name) for name in names} for row in matched]
+        return self._respond(matched, "return=representation", single)
+
+    def _write(self, name: str, table: List[Dict[str, Any]], rows: List[Dict[str, Any]],
+               merge: bool, ignore: bool, conflict_columns: List[str]) -> List[Dict[str, Any]]:
+        written = []
+        for row in rows:
+            row = dict(row)
+            existing = None
+            if merge or ignore:
+                key = tuple(row.get(column) for column in conflict_columns)
+                existing = next((current for current in table
+                                 if tuple(current.get(column) for column in conflict_columns) == key), None)
+            if existing is not None:
+                if merge:
+                    existing.update(row)
+                written.append(existing)
+                continue
+            if "id" not in row:
+                row["id"] = self._next_id[name]
+                self._next_id[name] += 1
+            table.append(row)
+            written.append(row)
+        return written
+
+    @staticmethod
+    def _respond(rows: List[Dict[str, Any]], prefer: str, single: bool, status_code: int = 200) -> Response:
+        if "return=minimal" in prefer:
+            return Response(status_code=204 if status_code == 200 else status_code)
+        if single:
+            if len(rows) != 1:
+                return JSONResponse({"code": "PGRST116", "message": f"{len(rows)} lignes pour un objet unique"},
+                                    status_code=406)
+            return JSONResponse(rows[0], status_code=status_code)
+        return JSONResponse(rows, status_code=status_code)
+
+
+def create_stub_app(latency_ms: float = 0.0) -> Starlette:
+    return PostgrestStub(latency_ms).app()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serveur PostgREST en mémoire pour tests de charge")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(create_stub_app(args.latency_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
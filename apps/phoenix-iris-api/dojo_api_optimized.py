@@ -2,13 +2,13 @@
 Dojo API optimisée avec opérations non-bloquantes.
 
 Cette version améliore les performances en utilisant:
-- Opérations asynchrones wrappées avec ThreadPoolExecutor
+- Accès Supabase asynchrone natif (PostgREST, HTTP/2, pool keep-alive)
 - Background tasks pour le logging
 - Validation renforcée
 - Gestion d'erreurs améliorée
 
 Author: Claude Phoenix DevSecOps Guardian
-Version: 2.0.0 - Performance Optimized
+Version: 2.1.0 - Async PostgREST
 """
 
 from fastapi import FastAPI, HTTPException, Depends, status, BackgroundTasks
@@ -17,97 +17,77 @@ from datetime import date, datetime
 from typing import Optional, List
 import os
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from functools import wraps
 import logging
-from supabase import create_client, Client
+from database import PostgrestRepository, create_postgrest_repository
 # 🔒 CORRECTION CRITIQUE: Validation sécurisée des entrées
 from phoenix_security.services.input_validator import validate_kaizen_input, validate_zazen_duration, ValidationSeverity
 
-# Initialisation de Supabase
+# Initialisation de Supabase (dépôt PostgREST asynchrone partagé)
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+repository: PostgrestRepository = create_postgrest_repository(SUPABASE_URL, SUPABASE_KEY)
 
 # Configuration logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Thread pool pour opérations DB
-executor = ThreadPoolExecutor(max_workers=5)
-
 app = FastAPI(
     title="Dojo Mental API - Optimized",
     description="✅ API optimisée avec opérations non-bloquantes pour Kaizen et Zazen.",
-    version="2.0.0",
+    version="2.1.0",
 )
 
-# ✅ Fonctions helper asynchrones
-def run_in_executor(func):
-    """Décorateur pour exécuter une fonction synchrone de façon asynchrone."""
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(executor, lambda: func(*args, **kwargs))
-    return wrapper
-
-@run_in_executor
-def _sync_supabase_insert(table_name: str, data: dict):
-    """Insertion Supabase synchrone wrappée."""
+# ✅ Helpers d'accès aux données (natifs asyncio, sans pool de threads)
+async def _db_insert(table_name: str, data: dict):
+    """Insertion asynchrone, renvoie la ligne créée."""
     try:
-        response = supabase.table(table_name).insert(data).execute()
-        return response.data[0] if response.data else None
+        rows = await repository.table(table_name).insert(data).execute()
+        return rows[0] if rows else None
     except Exception as e:
         logger.error(f"❌ DB insert error on {table_name}: {e}")
         raise
 
-@run_in_executor
-def _sync_supabase_update(table_name: str, kaizen_id: int, data: dict):
-    """Update Supabase synchrone wrappée."""
+async def _db_update(table_name: str, kaizen_id: int, data: dict):
+    """Update asynchrone, renvoie la ligne modifiée."""
     try:
-        response = supabase.table(table_name).update(data).eq("id", kaizen_id).execute()
-        return response.data[0] if response.data else None
+        rows = await repository.table(table_name).update(data).eq("id", kaizen_id).execute()
+        return rows[0] if rows else None
     except Exception as e:
         logger.error(f"❌ DB update error on {table_name}: {e}")
         raise
 
-@run_in_executor  
-def _sync_supabase_select(table_name: str, filters: dict = None, order_by: str = None, limit: int = None):
-    """Select Supabase synchrone wrappée."""
+async def _db_select(table_name: str, filters: dict = None, order_by: str = None, limit: int = None):
+    """Select asynchrone."""
     try:
-        query = supabase.table(table_name).select("*")
-        
-        if filters:
-            for key, value in filters.items():
-                query = query.eq(key, value)
-        
+        query = repository.table(table_name).select("*")
+
+        for key, value in (filters or {}).items():
+            query = query.eq(key, value)
+
         if order_by:
             query = query.order(order_by)
-        
+
         if limit:
             query = query.limit(limit)
-        
-        response = query.execute()
-        return response.data
+
+        return await query.execute()
     except Exception as e:
         logger.error(f"❌ DB select error on {table_name}: {e}")
         raise
 
-@run_in_executor
-def _sync_supabase_select_single(table_name: str, filters: dict, columns: str = "*"):
-    """Select single Supabase synchrone wrappée."""
+async def _db_select_single(table_name: str, filters: dict, columns: str = "*"):
+    """Select d'une ligne unique (None si absente)."""
     try:
-        query = supabase.table(table_name).select(columns)
-        
+        query = repository.table(table_name).select(columns)
+
         for key, value in filters.items():
             query = query.eq(key, value)
-        
-        response = query.single().execute()
-        return response.data
+
+        return await query.single().execute()
     except Exception as e:
         logger.error(f"❌ DB select single error on {table_name}: {e}")
         raise
@@ -192,7 +172,7 @@ async def create_kaizen(
             "completed": kaizen.completed
         }
         
-        result = await _sync_supabase_insert("kaizen", kaizen_data)
+        result = await _db_insert("kaizen", kaizen_data)
         
         if not result:
             raise HTTPException(status_code=500, detail="Failed to create Kaizen")
@@ -221,7 +201,7 @@ async def update_kaizen(
     """✅ Mise à jour Kaizen avec vérifications asynchrones."""
     try:
         # ✅ Vérification d'autorisation asynchrone
-        existing_kaizen = await _sync_supabase_select_single(
+        existing_kaizen = await _db_select_single(
             "kaizen", 
             {"id": kaizen_id}, 
             "user_id"
@@ -234,7 +214,7 @@ async def update_kaizen(
             )
 
         # ✅ Update asynchrone
-        result = await _sync_supabase_update(
+        result = await _db_update(
             "kaizen", 
             kaizen_id, 
             kaizen_update.model_dump()
@@ -275,7 +255,7 @@ async def get_user_kaizens(
     
     try:
         # ✅ Récupération asynchrone avec limite
-        kaizens = await _sync_supabase_select(
+        kaizens = await _db_select(
             "kaizen",
             filters={"user_id": user_id},
             order_by="date desc",  # Plus récents en premier
@@ -318,7 +298,7 @@ async def create_zazen_session(
         session.duration = int(duration_validation.sanitized_value)
         
         # ✅ Insertion asynchrone
-        result = await _sync_supabase_insert(
+        result = await _db_insert(
             "zazen_sessions", 
             session.model_dump()
         )
@@ -357,7 +337,7 @@ async def get_user_zazen_sessions(
         )
     
     try:
-        sessions = await _sync_supabase_select(
+        sessions = await _db_select(
             "zazen_sessions",
             filters={"user_id": user_id},
             order_by="timestamp desc",
@@ -392,18 +372,17 @@ async def health_check():
     """Endpoint de santé avec métriques."""
     return {
         "status": "healthy",
-        "version": "2.0.0",
-        "features": ["async_operations", "background_tasks", "optimized_queries", "pagination"],
-        "executor_threads": executor._max_workers
+        "version": "2.1.0",
+        "features": ["async_operations", "background_tasks", "optimized_queries", "pagination", "http2_pool"],
+        "http2": repository.http2,
     }
 
 @app.get("/metrics")
 async def get_metrics():
-    """Métriques basiques de l'API."""
+    """Latence des requêtes PostgREST par table et opération."""
     return {
-        "executor_active_threads": executor._threads,
-        "max_workers": executor._max_workers,
-        "version": "2.0.0"
+        "database": repository.get_metrics(),
+        "version": "2.1.0"
     }
 
 # ✅ Nettoyage à l'arrêt
@@ -411,7 +390,7 @@ async def get_metrics():
 async def shutdown_event():
     """Nettoyage des ressources à l'arrêt."""
     logger.info("🔄 Shutting down Dojo API...")
-    executor.shutdown(wait=True)
+    await repository.aclose()
     logger.info("✅ Dojo API shutdown complete")
 
 if __name__ == "__main__":
@@ -11,9 +11,10 @@ import logging
 from datetime import datetime
 from typing import List, Optional
 import hashlib
+import hmac
 import time
 
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from pydantic import BaseModel, Field
@@ -30,6 +31,7 @@ from security.phoenix_auth_standalone import (
 )
 from ai.gemini_alessio_engine import alessio_engine, AlessioResponse
 from monitoring.iris_analytics import create_analytics, EventType
+from database import get_postgrest_repository
 
 # Configuration du logger production
 logging.basicConfig(
@@ -43,7 +45,8 @@ supabase = create_client(
     os.getenv("SUPABASE_URL"),
     os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
 )
-analytics = create_analytics(supabase)
+repository = get_postgrest_repository()
+analytics = create_analytics(supabase, repository)
 
 # Supprimé: Fonction déplacée dans iris_analytics.py
 
@@ -448,6 +451,45 @@ async def get_user_analytics(user: IrisUser = Depends(get_authenticated_user)):
         logger.error(f"Erreur analytics utilisateur: {e}")
         raise HTTPException(status_code=500, detail="Erreur récupération analytics")
 
+# --- HOOKS INTERNES ---
+
+class SubscriptionChangedEvent(BaseModel):
+    """Notification de changement d'abonnement (billing.subscription_*)"""
+    user_id: str = Field(..., min_length=1, max_length=128)
+    new_tier: Optional[str] = None
+
+@app.post("/internal/auth/subscription-changed")
+async def subscription_changed(
+    event: SubscriptionChangedEvent,
+    x_internal_token: Optional[str] = Header(None)
+):
+    """
+    Invalide le cache d'authentification d'un utilisateur après un changement d'abonnement
+    
+    Le worker qui reçoit l'appel diffuse l'invalidation aux autres via Redis
+    (IRIS_AUTH_REDIS_URL); sans Redis, les autres workers convergent sous IRIS_AUTH_CACHE_TTL.
+    """
+    expected_token = os.getenv("IRIS_INTERNAL_TOKEN")
+    if not expected_token or not x_internal_token or not hmac.compare_digest(x_internal_token, expected_token):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    
+    removed = auth_service.on_subscription_changed(event.user_id, event.new_tier)
+    return {"invalidated": removed}
+
+@app.on_event("startup")
+async def startup_event():
+    """Écoute les invalidations du cache auth diffusées par les autres workers"""
+    auth_service.start_invalidation_listener()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Vide le tampon analytics avant l'arrêt"""
+    auth_service.invalidation_bus.stop()
+    await analytics.close()
+    logger.info("✅ Analytics: tampon vidé à l'arrêt")
+    if repository is not None:
+        await repository.aclose()
+
 # --- LANCEMENT DE L'APPLICATION ---
 
 if __name__ == "__main__":
@@ -0,0 +1,332 @@
+"""
+📥 ANALYTICS SINK - Tampon borné et non bloquant pour les événements Iris
+File asyncio avec seuil de saturation et politique d'échantillonnage par type,
+écriture par lots (coroutine, ou thread dédié pour un writer synchrone) avec
+backoff exponentiel et débordement JSONL local (répertoire privé) pendant les
+pannes Supabase.
+
+L'échantillonnage ne concerne que les lignes insérées dans iris_events : les
+agrégats (rollups) doivent être alimentés avant offer(), pas via on_written.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import stat
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+EventRow = Dict[str, Any]
+BatchWriter = Callable[[List[EventRow]], Union[None, Awaitable[None]]]
+
+# Fraction conservée par type d'événement quand la file dépasse le seuil de saturation
+# (1.0 = toujours conservé, 0.0 = abandonné). Types absents : DEFAULT_OVERLOAD_RATE.
+DEFAULT_OVERLOAD_POLICY: Dict[str, float] = {
+    "error": 1.0,
+    "auth_failure": 1.0,
+    "user_upgrade": 1.0,
+    "rate_limit_hit": 0.5,
+    "chat_request": 0.1,
+    "chat_response": 0.1,
+    "auth_success": 0.0,
+}
+DEFAULT_OVERLOAD_RATE = 0.1
+
+
+class AnalyticsSink:
+    """
+    Tampon d'événements analytics.
+
+    - offer() : put_nowait, jamais d'I/O ni d'attente sur la boucle
+    - Au-delà de high_water : échantillonnage selon overload_policy
+    - File pleine (max_queue_size) : événements critiques débordés sur disque, autres abandonnés
+    - Tâche d'écriture dédiée : lots insérés par le writer (attendu directement s'il
+      est une coroutine, sinon exécuté dans un thread), retry avec backoff,
+      débordement JSONL après max_retries puis rejeu au retour de Supabase
+    - on_written(batch) : appelé après chaque lot inséré (ou rejoué) ; il ne voit
+      que les événements conservés, jamais ceux écartés par l'échantillonnage
+    """
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        on_written: Optional[Callable[[List[EventRow]], None]] = None,
+        batch_size: int = 50,
+        flush_interval: float = 5.0,
+        high_water: int = 1000,
+        max_queue_size: int = 5000,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 30.0,
+        spill_path: Optional[str] = None,
+        overload_policy: Optional[Dict[str, float]] = None,
+    ):
+        self.writer = writer
+        self._async_writer = asyncio.iscoroutinefunction(writer)
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.high_water = high_water
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.spill_path = spill_path
+        self.overload_policy = overload_policy if overload_policy is not None else DEFAULT_OVERLOAD_POLICY
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Un seul thread : les écritures (et les rollups) restent séquentielles
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="iris-analytics")
+        self._stats = Counter()
+        self._dropped_by_type: Counter = Counter()
+
+    # === ENTRÉE ===
+
+    def offer(self, row: EventRow) -> bool:
+        """Ajoute un événement sans jamais attendre. Retourne False s'il n'est pas mis en file."""
+        self._ensure_started()
+        event_type = row.get("event_type", "")
+        rate = self.overload_policy.get(event_type, DEFAULT_OVERLOAD_RATE)
+
+        if self._queue.qsize() >= self.high_water and random.random() >= rate:
+            self._stats["sampled_out"] += 1
+            self._dropped_by_type[event_type] += 1
+            return False
+
+        try:
+            self._queue.put_nowait(row)
+            self._stats["enqueued"] += 1
+            return True
+        except asyncio.QueueFull:
+            if rate >= 1.0 and self.spill_path:
+                # Événement critique : conservé sur disque (écriture hors boucle)
+                self._executor.submit(self._spill, [row])
+            else:
+                self._stats["dropped"] += 1
+                self._dropped_by_type[event_type] += 1
+            return False
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+                self._flush_requested = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            self._task = self._loop.create_task(self._writer_loop())
+
+    # === ÉCRITURE ===
+
+    async def _writer_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                if self.spill_path and os.path.exists(self.spill_path):
+                    await loop.run_in_executor(self._executor, self._replay_spill)
+                continue
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _next_batch(self) -> List[EventRow]:
+        """
+        Constitue un lot : jusqu'à batch_size événements ou flush_interval écoulé
+        depuis le premier (flush() écourte l'attente).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch: List[EventRow] = []
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or (batch and self._flush_requested.is_set()):
+                break
+            getter = asyncio.ensure_future(self._queue.get())
+            flush_waiter = asyncio.ensure_future(self._flush_requested.wait())
+            await asyncio.wait(
+                {getter, flush_waiter}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            flush_waiter.cancel()
+            if getter.done():
+                batch.append(getter.result())
+            else:
+                getter.cancel()
+                if self._flush_requested.is_set() and not batch:
+                    self._flush_requested.clear()
+                    return batch
+        if self._queue.empty():
+            self._flush_requested.clear()
+        return batch
+
+    async def _write(self, batch: List[EventRow]) -> None:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries):
+            try:
+                if self._async_writer:
+                    await self.writer(batch)
+                else:
+                    await loop.run_in_executor(self._executor, self.writer, batch)
+                self._stats["written"] += len(batch)
+                self._stats["batches"] += 1
+                if self.on_written:
+                    await loop.run_in_executor(self._executor, self._notify_written, batch)
+                if self.spill_path and os.path.exists(self.spill_path):
+                    await loop.run_in_executor(self._executor, self._replay_spill)
+                return
+            except Exception as e:
+                self._stats["retries"] += 1
+                logger.warning(
+                    f"⚠️ Erreur flush analytics (tentative {attempt + 1}/{self.max_retries}): {e}"
+                )
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(min(self.retry_base_delay * 2 ** attempt, self.retry_max_delay))
+        await loop.run_in_executor(self._executor, self._spill, batch)
+
+    def _write_from_thread(self, batch: List[EventRow]) -> None:
+        """Écriture depuis le thread d'écriture (writer coroutine renvoyé sur la boucle)"""
+        if self._async_writer:
+            asyncio.run_coroutine_threadsafe(self.writer(batch), self._loop).result()
+        else:
+            self.writer(batch)
+
+    def _notify_written(self, batch: List[EventRow]) -> None:
+        try:
+            self.on_written(batch)
+        except Exception as e:
+            logger.error(f"❌ Erreur post-traitement analytics: {e}")
+
+    # === DÉBORDEMENT DISQUE (thread d'écriture) ===
+
+    def _spill(self, rows: List[EventRow]) -> None:
+        if not self.spill_path:
+            self._stats["dropped"] += len(rows)
+            logger.error(f"❌ Analytics: {len(rows)} événements perdus (pas de fichier de débordement)")
+            return
+        try:
+            # Fichier lisible par le seul propriétaire : les lignes contiennent des hash d'utilisateurs
+            fd = os.open(self.spill_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "a", encoding="utf-8") as handle:
+                for row in rows:
+                    handle.write(json.dumps(row, default=str) + "\n")
+            self._stats["spilled"] += len(rows)
+            logger.warning(f"💾 Analytics: {len(rows)} événements sauvegardés dans {self.spill_path}")
+        except OSError as e:
+            self._stats["dropped"] += len(rows)
+            logger.error(f"❌ Analytics: débordement disque impossible ({e}), {len(rows)} événements perdus")
+
+    def _replay_spill(self) -> None:
+        replay_path = f"{self.spill_path}.{uuid.uuid4().hex[:8]}.replay"
+        try:
+            os.replace(self.spill_path, replay_path)
+            with open(replay_path, "r", encoding="utf-8") as handle:
+                rows = [json.loads(line) for line in handle if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Analytics: relecture du débordement impossible: {e}")
+            return
+
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self._write_from_thread(batch)
+            except Exception as e:
+                logger.warning(f"⚠️ Analytics: rejeu interrompu, Supabase indisponible: {e}")
+                self._spill(rows[start:])
+                break
+            self._stats["replayed"] += len(batch)
+            if self.on_written:
+                self._notify_written(batch)
+
+        try:
+            os.remove(replay_path)
+        except OSError:
+            pass
+
+    # === CYCLE DE VIE ===
+
+    async def flush(self) -> None:
+        """Attend que tous les événements en file aient été traités."""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            self._flush_requested.set()
+            await self._queue.join()
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Vide la file (dans la limite du délai) puis arrête la tâche d'écriture."""
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ Analytics: délai de flush dépassé à l'arrêt")
+        if self._task is not None:
+            self._task.cancel()
+        remaining = []
+        while self._queue is not None and not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining:
+            self._spill(remaining)
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "high_water": self.high_water,
+            "max_queue_size": self.max_queue_size,
+            "dropped_by_type": dict(self._dropped_by_type),
+        }
+
+
+def _ensure_private_dir(directory: str) -> None:
+    """Crée le répertoire en 0700 et refuse un répertoire d'un autre utilisateur."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Analytics spill directory not owned by current user: {directory}")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(directory, 0o700)
+
+
+def default_spill_dir() -> str:
+    """Répertoire d'état privé du débordement (jamais le /tmp partagé)."""
+    state_home = os.getenv("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(state_home, "phoenix", "iris_analytics")
+
+
+def create_sink_from_env(
+    writer: BatchWriter,
+    on_written: Optional[Callable[[List[EventRow]], None]] = None,
+) -> AnalyticsSink:
+    """
+    Sink configuré par variables d'environnement (ANALYTICS_*).
+
+    ANALYTICS_SPILL_DIR : répertoire privé (0700) du débordement disque,
+    "none" pour le désactiver ; défaut $XDG_STATE_HOME/phoenix/iris_analytics.
+    """
+    directory = os.getenv("ANALYTICS_SPILL_DIR", default_spill_dir())
+    spill_path = None
+    if directory.lower() != "none":
+        try:
+            _ensure_private_dir(directory)
+            spill_path = os.path.join(directory, "spill.jsonl")
+        except OSError as e:
+            logger.error(f"❌ Analytics: répertoire de débordement inutilisable, débordement désactivé: {e}")
+    return AnalyticsSink(
+        writer,
+        on_written=on_written,
+        batch_size=int(os.getenv("ANALYTICS_BATCH_SIZE", "50")),
+        flush_interval=float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "60")),
+        high_water=int(os.getenv("ANALYTICS_HIGH_WATER", "1000")),
+        max_queue_size=int(os.getenv("ANALYTICS_MAX_QUEUE", "5000")),
+        spill_path=spill_path,
+    )
@@ -6,10 +6,9 @@ Author: Claude Phoenix DevSecOps Guardian
 Version: 2.0.0 - Production Analytics
 """
 
-import os
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -17,6 +16,10 @@ import asyncio
 
 from supabase import Client
 
+from database import PostgrestRepository
+from monitoring.analytics_sink import create_sink_from_env
+from monitoring.iris_rollups import IrisRollupStore
+
 logger = logging.getLogger(__name__)
 
 class EventType(Enum):
@@ -44,17 +47,21 @@ class IrisAnalytics:
     """
     Service d'analytics pour Iris API
     Collecte métriques business et techniques pour optimisation
+
+    Le tracking se limite à la mise à jour des rollups en mémoire et à une mise
+    en file (AnalyticsSink) : les insertions Supabase et la persistance des
+    rollups sont faites par la tâche d'écriture, hors requête. Les rollups
+    voient tous les événements, y compris ceux que le tampon échantillonne.
     """
     
-    def __init__(self, supabase_client: Client):
+    def __init__(self, supabase_client: Client, repository: Optional[PostgrestRepository] = None):
         self.supabase = supabase_client
-        self.batch_events: List[IrisAnalyticsEvent] = []
-        self.batch_size = int(os.getenv("ANALYTICS_BATCH_SIZE", "50"))
-        self.flush_interval = int(os.getenv("ANALYTICS_FLUSH_INTERVAL", "60"))  # secondes
+        self.repository = repository
+        self.rollups = IrisRollupStore(supabase_client)
+        # Dépôt PostgREST disponible : insertion des lots sur la boucle, sans thread
+        writer = self._insert_events_async if repository is not None else self._insert_events
+        self.sink = create_sink_from_env(writer, self._persist_rollups)
         self._setup_analytics_tables()
-        
-        # Démarrer le flush périodique
-        asyncio.create_task(self._periodic_flush())
     
     def _setup_analytics_tables(self):
         """S'assure que les tables analytics existent"""
@@ -65,23 +72,22 @@ class IrisAnalytics:
             logger.warning("Table iris_events non trouvée, création recommendée")
             
         try:
-            # Table pour les métriques agrégées
-            self.supabase.table('iris_metrics_daily').select('id').limit(1).execute() 
+            # Tables des rollups agrégés
+            self.supabase.table('iris_rollups_daily').select('date').limit(1).execute()
+            self.supabase.table('iris_user_rollups_daily').select('date').limit(1).execute()
         except:
-            logger.warning("Table iris_metrics_daily non trouvée, création recommendée")
+            logger.warning("Tables iris_rollups_daily / iris_user_rollups_daily non trouvées, création recommendée")
     
     async def track_event(self, event: IrisAnalyticsEvent):
-        """Enregistre un événement analytics"""
+        """Enregistre un événement analytics (mise en file uniquement, aucune I/O)"""
         try:
             # Anonymisation des données sensibles
             anonymized_event = self._anonymize_event(event)
+            row = self._event_row(anonymized_event)
             
-            # Ajouter au batch
-            self.batch_events.append(anonymized_event)
-            
-            # Flush si batch plein
-            if len(self.batch_events) >= self.batch_size:
-                await self._flush_events()
+            # Rollups alimentés avant l'échantillonnage du tampon : compteurs exacts
+            self.rollups.record([row])
+            self.sink.offer(row)
                 
         except Exception as e:
             logger.error(f"Erreur tracking event: {e}")
@@ -120,48 +126,49 @@ class IrisAnalytics:
             user_agent_hash=event.user_agent_hash
         )
     
-    async def _flush_events(self):
-        """Envoie le batch d'événements à Supabase"""
-        if not self.batch_events:
-            return
-            
+    @staticmethod
+    def _event_row(event: IrisAnalyticsEvent) -> Dict[str, Any]:
+        """Convertit un événement anonymisé au format Supabase"""
+        return {
+            'event_type': event.event_type.value,
+            'user_hash': event.user_id,
+            'user_tier': event.user_tier,
+            'timestamp': event.timestamp.isoformat(),
+            'metadata': json.dumps(event.metadata),
+            'session_id': event.session_id,
+            'ip_hash': event.ip_hash,
+            'user_agent_hash': event.user_agent_hash
+        }
+    
+    def _insert_events(self, events_data: List[Dict[str, Any]]):
+        """Insère un lot d'événements (thread d'écriture du sink)"""
+        self.supabase.table('iris_events').insert(events_data).execute()
+        logger.info(f"Analytics: {len(events_data)} événements envoyés")
+    
+    async def _insert_events_async(self, events_data: List[Dict[str, Any]]):
+        """Insère un lot d'événements via le dépôt PostgREST asynchrone"""
+        await self.repository.table('iris_events').insert(events_data, returning="minimal").execute()
+        logger.info(f"Analytics: {len(events_data)} événements envoyés")
+    
+    def _persist_rollups(self, events_data: Optional[List[Dict[str, Any]]] = None):
+        """Persiste les rollups modifiés (déjà à jour : alimentés par track_event)"""
         try:
-            # Convertir en format Supabase
-            events_data = [
-                {
-                    'event_type': event.event_type.value,
-                    'user_hash': event.user_id,
-                    'user_tier': event.user_tier,
-                    'timestamp': event.timestamp.isoformat(),
-                    'metadata': json.dumps(event.metadata),
-                    'session_id': event.session_id,
-                    'ip_hash': event.ip_hash,
-                    'user_agent_hash': event.user_agent_hash
-                }
-                for event in self.batch_events
-            ]
-            
-            # Insérer en batch
-            result = self.supabase.table('iris_events').insert(events_data).execute()
-            
-            logger.info(f"Analytics: {len(self.batch_events)} événements envoyés")
-            self.batch_events.clear()
-            
+            self.rollups.persist()
         except Exception as e:
-            logger.error(f"Erreur flush analytics: {e}")
-            # Garder les événements pour retry
-            if len(self.batch_events) > self.batch_size * 2:
-                # Éviter l'accumulation excessive
-                self.batch_events = self.batch_events[-self.batch_size:]
+            logger.error(f"Erreur persistance rollups analytics: {e}")
+    
+    async def _flush_events(self):
+        """Attend l'écriture de tous les événements en file"""
+        await self.sink.flush()
+    
+    async def close(self):
+        """Vide la file d'événements à l'arrêt de l'API (reliquat sauvegardé sur disque)"""
+        await self.sink.close()
+        await asyncio.to_thread(self._persist_rollups)
     
-    async def _periodic_flush(self):
-        """Flush périodique des événements"""
-        while True:
-            try:
-                await asyncio.sleep(self.flush_interval)
-                await self._flush_events()
-            except Exception as e:
-                logger.error(f"Erreur flush périodique: {e}")
+    def get_sink_stats(self) -> Dict[str, Any]:
+        """Statistiques du tampon (file, échantillonnage, débordement)"""
+        return self.sink.get_stats()
     
     # === MÉTHODES DE TRACKING SPÉCIALISÉES ===
     
@@ -254,73 +261,15 @@ class IrisAnalytics:
     # === MÉTRIQUES BUSINESS ===
     
     async def get_daily_metrics(self, date: datetime) -> Dict[str, Any]:
-        """Récupère les métriques d'une journée"""
+        """Récupère les métriques d'une journée (fusion des rollups des instances)"""
         try:
-            date_str = date.strftime('%Y-%m-%d')
-            
-            result = self.supabase.table('iris_metrics_daily').select('*').eq('date', date_str).single().execute()
-            
-            if result.data:
-                return result.data
-            else:
-                # Calculer à la volée si pas en cache
-                return await self._calculate_daily_metrics(date)
+            rollup = await asyncio.to_thread(self.rollups.get_daily, date.date())
+            return rollup.to_metrics() if rollup else {}
                 
         except Exception as e:
             logger.error(f"Erreur récupération métriques: {e}")
             return {}
     
-    async def _calculate_daily_metrics(self, date: datetime) -> Dict[str, Any]:
-        """Calcule les métriques d'une journée à partir des événements"""
-        try:
-            date_start = date.strftime('%Y-%m-%d 00:00:00')
-            date_end = date.strftime('%Y-%m-%d 23:59:59')
-            
-            # Requête des événements de la journée
-            events = self.supabase.table('iris_events').select('*').gte('timestamp', date_start).lte('timestamp', date_end).execute()
-            
-            if not events.data:
-                return {}
-            
-            # Calculs
-            total_requests = len([e for e in events.data if e['event_type'] == 'chat_request'])
-            total_responses = len([e for e in events.data if e['event_type'] == 'chat_response'])
-            unique_users = len(set([e['user_hash'] for e in events.data if e['user_hash']]))
-            
-            # Répartition par tier
-            tier_breakdown = {}
-            for event in events.data:
-                if event['user_tier']:
-                    tier = event['user_tier']
-                    tier_breakdown[tier] = tier_breakdown.get(tier, 0) + 1
-            
-            # Temps de réponse moyen
-            response_times = [
-                json.loads(e['metadata']).get('processing_time_ms', 0)
-                for e in events.data
-                if e['event_type'] == 'chat_response' and e['metadata']
-            ]
-            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-            
-            metrics = {
-                'date': date.strftime('%Y-%m-%d'),
-                'total_requests': total_requests,
-                'total_responses': total_responses,
-                'unique_users': unique_users,
-                'avg_response_time_ms': round(avg_response_time, 2),
-                'tier_breakdown': tier_breakdown,
-                'calculated_at': datetime.now().isoformat()
-            }
-            
-            # Sauvegarder en cache
-            self.supabase.table('iris_metrics_daily').upsert(metrics, on_conflict='date').execute()
-            
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Erreur calcul métriques: {e}")
-            return {}
-    
     async def get_user_analytics(self, user_id: str, days: int = 7) -> Dict[str, Any]:
         """Récupère les analytics d'un utilisateur"""
         try:
@@ -328,35 +277,14 @@ class IrisAnalytics:
             import hashlib
             user_hash = hashlib.sha256(f"{user_id}_analytics".encode()).hexdigest()[:16]
             
-            # Récupérer les événements des derniers jours
-            since_date = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            events = self.supabase.table('iris_events').select('*').eq('user_hash', user_hash).gte('timestamp', since_date).execute()
-            
-            if not events.data:
-                return {'message_count': 0, 'days_active': 0}
-            
-            # Calculs
-            message_count = len([e for e in events.data if e['event_type'] == 'chat_request'])
-            
-            # Jours actifs
-            active_dates = set([
-                datetime.fromisoformat(e['timestamp']).strftime('%Y-%m-%d')
-                for e in events.data
-            ])
-            
-            return {
-                'message_count': message_count,
-                'days_active': len(active_dates),
-                'last_activity': max([e['timestamp'] for e in events.data]) if events.data else None,
-                'total_events': len(events.data)
-            }
+            return await asyncio.to_thread(self.rollups.get_user, user_hash, days)
             
         except Exception as e:
             logger.error(f"Erreur analytics utilisateur: {e}")
             return {'error': str(e)}
 
 # Fonction pour créer l'instance analytics
-def create_analytics(supabase_client: Client) -> IrisAnalytics:
+def create_analytics(supabase_client: Client,
+                     repository: Optional[PostgrestRepository] = None) -> IrisAnalytics:
     """Crée une instance d'analytics"""
-    return IrisAnalytics(supabase_client)
\ No newline at end of file
+    return IrisAnalytics(supabase_client, repository)
\ No newline at end of file
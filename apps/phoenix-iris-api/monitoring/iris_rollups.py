@@ -0,0 +1,386 @@
+"""
+📈 IRIS ROLLUPS - Agrégats incrémentaux des événements analytics
+Compteurs journaliers, histogramme des temps de réponse (p50/p95/p99) et
+sketch HyperLogLog des utilisateurs (partagé avec phoenix_event_bridge), mis à
+jour pour chaque événement suivi (avant tout échantillonnage du tampon) et
+persistés à chaque flush d'événements.
+
+Chaque processus de l'API écrit ses propres lignes (date, instance_id) : les
+lectures additionnent quelques lignes au lieu de rescanner iris_events.
+
+Reconstruction depuis les événements bruts:
+    python -m monitoring.iris_rollups backfill --start 2025-01-01 --end 2025-01-31
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from phoenix_event_bridge.event_rollups import HyperLogLog
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../packages'))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_event_bridge.event_rollups import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+DAILY_TABLE = "iris_rollups_daily"
+USER_DAILY_TABLE = "iris_user_rollups_daily"
+BACKFILL_INSTANCE = "backfill"
+# Sketch des utilisateurs : 2^11 registres (~2.3% d'erreur), format des lignes existantes
+USERS_HLL_PRECISION = 11
+
+# Bornes supérieures des classes de l'histogramme (ms) : progression géométrique
+# de raison 1.1 entre 10 ms et ~2 min (erreur relative des percentiles < 5%)
+RESPONSE_TIME_BOUNDS_MS = tuple(round(10 * 1.1 ** i, 1) for i in range(100))
+
+
+class ResponseTimeHistogram:
+    """Histogramme fusionnable des temps de réponse (percentiles par interpolation)."""
+
+    def __init__(self, counts: Optional[List[int]] = None, total_ms: float = 0.0):
+        self.counts = list(counts) if counts else [0] * (len(RESPONSE_TIME_BOUNDS_MS) + 1)
+        self.total_ms = total_ms
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def add(self, value_ms: float) -> None:
+        value_ms = max(float(value_ms), 0.0)
+        self.counts[bisect.bisect_left(RESPONSE_TIME_BOUNDS_MS, value_ms)] += 1
+        self.total_ms += value_ms
+
+    def merge(self, other: "ResponseTimeHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total_ms += other.total_ms
+
+    def percentile(self, q: float) -> float:
+        """Percentile approché (q entre 0 et 100)."""
+        total = self.count
+        if not total:
+            return 0.0
+        rank = q / 100 * total
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = RESPONSE_TIME_BOUNDS_MS[index - 1] if index else 0
+                upper = (RESPONSE_TIME_BOUNDS_MS[index] if index < len(RESPONSE_TIME_BOUNDS_MS)
+                         else RESPONSE_TIME_BOUNDS_MS[-1] * 2)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return float(RESPONSE_TIME_BOUNDS_MS[-1])
+
+
+def _parse_metadata(metadata: Any) -> Dict[str, Any]:
+    if isinstance(metadata, dict):
+        return metadata
+    if not metadata:
+        return {}
+    try:
+        return json.loads(metadata)
+    except (TypeError, ValueError):
+        return {}
+
+
+class DailyRollup:
+    """Agrégat d'une journée (pour une instance, ou fusion de toutes les instances)."""
+
+    def __init__(self, day: date):
+        self.day = day
+        self.event_counts: Counter = Counter()
+        self.tier_breakdown: Counter = Counter()
+        self.response_times = ResponseTimeHistogram()
+        self.users = HyperLogLog(USERS_HLL_PRECISION)
+
+    def add(self, event: Dict[str, Any]) -> None:
+        self.event_counts[event["event_type"]] += 1
+        if event.get("user_tier"):
+            self.tier_breakdown[event["user_tier"]] += 1
+        if event.get("user_hash"):
+            self.users.add(event["user_hash"])
+        if event["event_type"] == "chat_response":
+            processing_time = _parse_metadata(event.get("metadata")).get("processing_time_ms")
+            if processing_time is not None:
+                self.response_times.add(processing_time)
+
+    def merge(self, other: "DailyRollup") -> None:
+        self.event_counts.update(other.event_counts)
+        self.tier_breakdown.update(other.tier_breakdown)
+        self.response_times.merge(other.response_times)
+        self.users.merge(other.users)
+
+    def to_row(self, instance_id: str) -> Dict[str, Any]:
+        return {
+            "date": self.day.isoformat(),
+            "instance_id": instance_id,
+            "event_counts": dict(self.event_counts),
+            "tier_breakdown": dict(self.tier_breakdown),
+            "response_time_histogram": self.response_times.counts,
+            "response_time_total_ms": self.response_times.total_ms,
+            "users_hll": self.users.to_b64(),
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "DailyRollup":
+        rollup = cls(date.fromisoformat(row["date"][:10]))
+        rollup.event_counts.update(row.get("event_counts") or {})
+        rollup.tier_breakdown.update(row.get("tier_breakdown") or {})
+        rollup.response_times = ResponseTimeHistogram(
+            row.get("response_time_histogram"), row.get("response_time_total_ms") or 0.0
+        )
+        rollup.users = HyperLogLog.from_b64(row["users_hll"])
+        return rollup
+
+    def to_metrics(self) -> Dict[str, Any]:
+        """Format historique de get_daily_metrics, enrichi des percentiles."""
+        return {
+            "date": self.day.isoformat(),
+            "total_requests": self.event_counts.get("chat_request", 0),
+            "total_responses": self.event_counts.get("chat_response", 0),
+            "unique_users": self.users.count(),
+            "avg_response_time_ms": round(self.response_times.mean, 2),
+            "p50_response_time_ms": round(self.response_times.percentile(50), 2),
+            "p95_response_time_ms": round(self.response_times.percentile(95), 2),
+            "p99_response_time_ms": round(self.response_times.percentile(99), 2),
+            "tier_breakdown": dict(self.tier_breakdown),
+            "event_counts": dict(self.event_counts),
+            "calculated_at": datetime.now().isoformat(),
+        }
+
+
+class UserDailyRollup:
+    """Activité d'un utilisateur (hash anonymisé) sur une journée."""
+
+    def __init__(self, day: date, user_hash: str):
+        self.day = day
+        self.user_hash = user_hash
+        self.message_count = 0
+        self.total_events = 0
+        self.last_activity: Optional[str] = None
+
+    def add(self, event: Dict[str, Any]) -> None:
+        self.total_events += 1
+        if event["event_type"] == "chat_request":
+            self.message_count += 1
+        if self.last_activity is None or event["timestamp"] > self.last_activity:
+            self.last_activity = event["timestamp"]
+
+    def to_row(self, instance_id: str) -> Dict[str, Any]:
+        return {
+            "date": self.day.isoformat(),
+            "user_hash": self.user_hash,
+            "instance_id": instance_id,
+            "message_count": self.message_count,
+            "total_events": self.total_events,
+            "last_activity": self.last_activity,
+        }
+
+
+def build_rollups(events: Iterable[Dict[str, Any]]) -> Tuple[Dict[date, DailyRollup], Dict[Tuple[date, str], UserDailyRollup]]:
+    """Agrège des événements (format de la table iris_events) par jour et par utilisateur."""
+    daily: Dict[date, DailyRollup] = {}
+    users: Dict[Tuple[date, str], UserDailyRollup] = {}
+    for event in events:
+        day = date.fromisoformat(event["timestamp"][:10])
+        if day not in daily:
+            daily[day] = DailyRollup(day)
+        daily[day].add(event)
+        if event.get("user_hash"):
+            key = (day, event["user_hash"])
+            if key not in users:
+                users[key] = UserDailyRollup(day, event["user_hash"])
+            users[key].add(event)
+    return daily, users
+
+
+class IrisRollupStore:
+    """
+    Rollups de l'instance courante + lectures fusionnées.
+
+    record() met à jour les agrégats en mémoire (O(taille du batch)),
+    persist() upsert uniquement les lignes modifiées de cette instance.
+    """
+
+    def __init__(self, supabase_client, instance_id: Optional[str] = None, retention_days: int = 2):
+        """
+        Args:
+            instance_id: Identifiant des lignes écrites. Par défaut, préfixe
+                IRIS_INSTANCE_ID (ou hostname) suivi d'un suffixe propre au processus :
+                un redémarrage repart de zéro en mémoire et ne doit pas écraser
+                les lignes du jour écrites avant lui.
+        """
+        self.supabase = supabase_client
+        self.instance_id = instance_id or (
+            f"{os.getenv('IRIS_INSTANCE_ID') or socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )
+        self.retention_days = retention_days
+        self._daily: Dict[date, DailyRollup] = {}
+        self._users: Dict[Tuple[date, str], UserDailyRollup] = {}
+        self._dirty_days: set = set()
+        self._dirty_users: set = set()
+        # record() tourne sur la boucle, persist() dans le thread d'écriture du sink
+        self._lock = threading.Lock()
+
+    # === MISE À JOUR INCRÉMENTALE ===
+
+    def record(self, events: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for event in events:
+                day = date.fromisoformat(event["timestamp"][:10])
+                if day not in self._daily:
+                    self._daily[day] = DailyRollup(day)
+                self._daily[day].add(event)
+                self._dirty_days.add(day)
+
+                if event.get("user_hash"):
+                    key = (day, event["user_hash"])
+                    if key not in self._users:
+                        self._users[key] = UserDailyRollup(day, event["user_hash"])
+                    self._users[key].add(event)
+                    self._dirty_users.add(key)
+
+    def persist(self) -> None:
+        """Upsert des lignes modifiées ; en cas d'échec, elles restent à écrire."""
+        with self._lock:
+            dirty_days, self._dirty_days = self._dirty_days, set()
+            dirty_users, self._dirty_users = self._dirty_users, set()
+            day_rows = [self._daily[day].to_row(self.instance_id) for day in dirty_days]
+            user_rows = [self._users[key].to_row(self.instance_id) for key in dirty_users]
+        try:
+            if day_rows:
+                self.supabase.table(DAILY_TABLE).upsert(day_rows, on_conflict="date,instance_id").execute()
+            dirty_days = set()
+            if user_rows:
+                self.supabase.table(USER_DAILY_TABLE).upsert(
+                    user_rows, on_conflict="date,user_hash,instance_id"
+                ).execute()
+            dirty_users = set()
+        finally:
+            with self._lock:
+                self._dirty_days |= dirty_days
+                self._dirty_users |= dirty_users
+                self._prune()
+
+    def _prune(self) -> None:
+        """Oublie les journées closes déjà persistées (mémoire bornée)."""
+        cutoff = date.today() - timedelta(days=self.retention_days)
+        for day in [d for d in self._daily if d < cutoff and d not in self._dirty_days]:
+            del self._daily[day]
+        for key in [k for k in self._users if k[0] < cutoff and k not in self._dirty_users]:
+            del self._users[key]
+
+    # === LECTURES ===
+
+    def get_daily(self, day: date) -> Optional[DailyRollup]:
+        """Fusion des lignes de toutes les instances pour une journée."""
+        result = self.supabase.table(DAILY_TABLE).select("*").eq("date", day.isoformat()).execute()
+        if not result.data:
+            return None
+        merged = DailyRollup(day)
+        for row in result.data:
+            merged.merge(DailyRollup.from_row(row))
+        return merged
+
+    def get_user(self, user_hash: str, days: int) -> Dict[str, Any]:
+        since = (date.today() - timedelta(days=days)).isoformat()
+        result = self.supabase.table(USER_DAILY_TABLE)\
+            .select("date, message_count, total_events, last_activity")\
+            .eq("user_hash", user_hash)\
+            .gte("date", since)\
+            .execute()
+        rows = result.data or []
+        if not rows:
+            return {"message_count": 0, "days_active": 0}
+        return {
+            "message_count": sum(row["message_count"] for row in rows),
+            "days_active": len({row["date"] for row in rows}),
+            "last_activity": max((row["last_activity"] for row in rows if row["last_activity"]), default=None),
+            "total_events": sum(row["total_events"] for row in rows),
+        }
+
+    # === BACKFILL ===
+
+    def backfill(self, start: date, end: date, page_size: int = 1000) -> Dict[str, int]:
+        """
+        Reconstruit les rollups de [start, end] depuis iris_events.
+        Les lignes existantes de ces journées (toutes instances) sont remplacées ;
+        le jour courant, encore alimenté par les instances en cours, est exclu.
+        """
+        yesterday = date.today() - timedelta(days=1)
+        if end > yesterday:
+            logger.warning("⚠️ Backfill limité à la veille (jour courant encore en cours d'agrégation)")
+            end = yesterday
+        days_written = 0
+        users_written = 0
+        day = start
+        while day <= end:
+            daily, users = build_rollups(self._iter_events(day, page_size))
+            for table in (DAILY_TABLE, USER_DAILY_TABLE):
+                self.supabase.table(table).delete().eq("date", day.isoformat()).execute()
+            if day in daily:
+                self.supabase.table(DAILY_TABLE).insert(daily[day].to_row(BACKFILL_INSTANCE)).execute()
+                days_written += 1
+            user_rows = [rollup.to_row(BACKFILL_INSTANCE) for rollup in users.values()]
+            for offset in range(0, len(user_rows), page_size):
+                self.supabase.table(USER_DAILY_TABLE).insert(user_rows[offset:offset + page_size]).execute()
+            users_written += len(user_rows)
+            day += timedelta(days=1)
+        logger.info(f"📈 Backfill rollups Iris: {days_written} jours, {users_written} lignes utilisateur")
+        return {"days": days_written, "user_rows": users_written}
+
+    def _iter_events(self, day: date, page_size: int) -> Iterator[Dict[str, Any]]:
+        offset = 0
+        while True:
+            result = self.supabase.table("iris_events")\
+                .select("event_type, user_hash, user_tier, timestamp, metadata")\
+                .gte("timestamp", day.isoformat())\
+                .lt("timestamp", (day + timedelta(days=1)).isoformat())\
+                .order("timestamp")\
+                .range(offset, offset + page_size - 1)\
+                .execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rollups analytics Iris")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill = subparsers.add_parser("backfill", help="Reconstruit les rollups depuis iris_events")
+    backfill.add_argument("--start", required=True, type=date.fromisoformat)
+    backfill.add_argument("--end", type=date.fromisoformat, default=date.today() - timedelta(days=1))
+    args = parser.parse_args()
+
+    from supabase import create_client
+
+    supabase = create_client(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
+    )
+    result = IrisRollupStore(supabase, instance_id=BACKFILL_INSTANCE).backfill(args.start, args.end)
+    print(f"✅ Backfill terminé: {result}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,6 +1,29 @@
+import os
+import re
+import sys
 from typing import Dict
 from iris_core.event_processing.emotional_vector_state import EmotionalVectorState
 
+try:
+    from phoenix_scan import PatternScanner, literal_rules
+except ImportError:
+    # Running from the monorepo without installing the package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../packages'))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_scan import PatternScanner, literal_rules
+
+# Keywords per classification result (simulated NLP classifier)
+CLASSIFICATION_KEYWORDS = {
+    "medical_advice_detected": ["prends ce médicament", "tu as besoin de thérapie"],
+    "diagnosis_detected": ["tu es dépressif", "c'est un trouble"],
+    "judgmental_tone_detected": ["tu ne devrais pas", "c'est ta faute"],
+    "sensitive_topic_detected": ["suicide", "automutilation", "détresse sévère"],
+}
+
+# All keywords matched in a single case-insensitive pass
+_SCANNER = PatternScanner(literal_rules(CLASSIFICATION_KEYWORDS, re.IGNORECASE))
+
 class EthicalGuardian:
     def __init__(self):
         # In a real scenario, this would load a pre-trained NLP model
@@ -17,15 +40,8 @@ class EthicalGuardian:
         }
 
         # Simple keyword-based simulation for demonstration
-        text_lower = text.lower()
-        if "prends ce médicament" in text_lower or "tu as besoin de thérapie" in text_lower:
-            results["medical_advice_detected"] = True
-        if "tu es dépressif" in text_lower or "c'est un trouble" in text_lower:
-            results["diagnosis_detected"] = True
-        if "tu ne devrais pas" in text_lower or "c'est ta faute" in text_lower:
-            results["judgmental_tone_detected"] = True
-        if "suicide" in text_lower or "automutilation" in text_lower or "détresse sévère" in text_lower:
-            results["sensitive_topic_detected"] = True
+        for category in _SCANNER.categories(text):
+            results[category] = True
         
         return results
 
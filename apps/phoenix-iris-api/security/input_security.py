@@ -3,10 +3,22 @@
 Module dédié à la sécurisation de l'agent Iris contre les attaques communes.
 """
 
+import os
 import re
+import sys
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import List, Optional
+
+from security.rate_limiting import Quota, RateLimiter as SharedRateLimiter, create_backend_from_env
+
+try:
+    from phoenix_scan import PatternScanner, ScanRule
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../packages'))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_scan import PatternScanner, ScanRule
 
 # Configuration logging sécurisé
 logger = logging.getLogger(__name__)
@@ -43,8 +55,8 @@ class PromptInjectionGuard:
         r'new\s+(conversation|session|user)',
     ]
     
-    def __init__(self):
-        self.compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.DANGEROUS_PATTERNS]
+    # Tous les patterns évalués en un seul scan (compilé une fois pour la classe)
+    _scanner = PatternScanner(ScanRule(pattern, flags=re.IGNORECASE) for pattern in DANGEROUS_PATTERNS)
     
     def is_potentially_malicious(self, text: str) -> tuple[bool, List[str]]:
         """
@@ -53,11 +65,7 @@ class PromptInjectionGuard:
         Returns:
             tuple: (is_malicious, list_of_detected_patterns)
         """
-        detected_patterns = []
-        
-        for i, pattern in enumerate(self.compiled_patterns):
-            if pattern.search(text):
-                detected_patterns.append(self.DANGEROUS_PATTERNS[i])
+        detected_patterns = [rule.pattern for rule in self._scanner.matched_rules(text)]
         
         return len(detected_patterns) > 0, detected_patterns
     
@@ -83,39 +91,24 @@ class PromptInjectionGuard:
 
 class RateLimiter:
     """
-    Rate limiting simple en mémoire pour l'agent Alessio.
-    En production, utiliser Redis ou autre solution distribuée.
+    Rate limiting pour l'agent Alessio (GCRA partagé, état O(1) par utilisateur).
+    Distribué entre workers si PHOENIX_RATE_LIMIT_REDIS_URL est défini.
     """
     
     def __init__(self, max_requests: int = 10, window_minutes: int = 1):
         self.max_requests = max_requests
         self.window_minutes = window_minutes
-        self.requests: Dict[str, List[datetime]] = {}
+        self._limiter = SharedRateLimiter(
+            create_backend_from_env(),
+            default_quota=Quota(max_requests, window_minutes * 60),
+            namespace="iris-agent"
+        )
     
     def is_rate_limited(self, user_id: str) -> bool:
         """
         Vérifie si l'utilisateur a dépassé la limite de requêtes.
         """
-        now = datetime.now()
-        window_start = now - timedelta(minutes=self.window_minutes)
-        
-        # Initialise ou nettoie l'historique utilisateur
-        if user_id not in self.requests:
-            self.requests[user_id] = []
-        
-        # Supprime les requêtes anciennes
-        self.requests[user_id] = [
-            req_time for req_time in self.requests[user_id] 
-            if req_time > window_start
-        ]
-        
-        # Vérifie la limite
-        if len(self.requests[user_id]) >= self.max_requests:
-            return True
-        
-        # Enregistre la nouvelle requête
-        self.requests[user_id].append(now)
-        return False
+        return not self._limiter.hit(user_id).allowed
 
 def validate_user_id(user_id: str) -> bool:
     """
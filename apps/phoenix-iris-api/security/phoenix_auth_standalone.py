@@ -8,10 +8,15 @@ Version: 2.0.0 - Production Security Ready
 
 import os
 import jwt
+import time
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, List, Set, Tuple
+from dataclasses import dataclass, replace
 from enum import Enum
 
 from fastapi import HTTPException, Depends
@@ -19,6 +24,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from supabase import create_client, Client
 import httpx
 
+from database import get_postgrest_repository
+from security.rate_limiting import RateLimitResult, create_iris_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 class UserTier(Enum):
@@ -37,6 +45,202 @@ class IrisUser:
     daily_usage: int = 0
     last_usage_date: str = ""
 
+_MISS = object()
+
+class PrincipalCache:
+    """
+    Cache LRU + TTL des utilisateurs vérifiés, par token (jti ou empreinte)
+    
+    ✅ TTL borné par l'expiration du token
+    ✅ Cache négatif court (utilisateur inconnu)
+    ✅ Invalidation par utilisateur (changement d'abonnement)
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300, negative_ttl_seconds: int = 30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Optional[IrisUser], float, str]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[str]] = {}
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "invalidations": 0}
+    
+    def get(self, key: str) -> Any:
+        """Retourne l'utilisateur en cache, None si négatif, _MISS sinon"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return _MISS
+        
+        principal, expires_at, user_id = entry
+        if time.time() >= expires_at:
+            self._discard(key, user_id)
+            self.stats["misses"] += 1
+            return _MISS
+        
+        self._entries.move_to_end(key)
+        self.stats["hits" if principal is not None else "negative_hits"] += 1
+        return principal
+    
+    def set(self, key: str, user_id: str, principal: Optional[IrisUser], token_exp: Optional[float] = None):
+        """Met en cache un résultat (principal=None pour un résultat négatif)"""
+        ttl = self.ttl_seconds if principal is not None else self.negative_ttl_seconds
+        expires_at = time.time() + ttl
+        if token_exp:
+            expires_at = min(expires_at, token_exp)
+        
+        self._entries[key] = (principal, expires_at, user_id)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        
+        while len(self._entries) > self.max_entries:
+            oldest_key, (_, _, oldest_user) = next(iter(self._entries.items()))
+            self._discard(oldest_key, oldest_user)
+    
+    def _discard(self, key: str, user_id: str):
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+    
+    def invalidate_user(self, user_id: str) -> int:
+        """Supprime toutes les entrées d'un utilisateur"""
+        keys = self._keys_by_user.pop(user_id, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        self.stats["invalidations"] += 1
+        return len(keys)
+    
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_user.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": (self.stats["hits"] + self.stats["negative_hits"]) / lookups if lookups else 0.0
+        }
+
+class UsageCache:
+    """
+    Cache LRU + TTL de l'usage quotidien par utilisateur
+    
+    ✅ Taille bornée (éviction du moins récemment utilisé)
+    ✅ Entrée périmée au changement de jour ou après le TTL
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+    
+    def get(self, user_id: str, today: str) -> Optional[int]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] != today or time.time() - entry[2] >= self.ttl_seconds:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[1]
+    
+    def set(self, user_id: str, today: str, count: int):
+        self._entries[user_id] = (today, count, time.time())
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def increment(self, user_id: str, today: str):
+        """Incrémente l'usage en cache sans prolonger son TTL"""
+        entry = self._entries.get(user_id)
+        if entry and entry[0] == today:
+            self._entries[user_id] = (today, entry[1] + 1, entry[2])
+    
+    def pop(self, user_id: str):
+        self._entries.pop(user_id, None)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class AuthInvalidationBus:
+    """
+    Diffusion des invalidations du cache auth entre workers uvicorn (pub/sub Redis)
+    
+    Sans Redis, chaque worker n'invalide que son propre cache : les autres
+    convergent au plus tard après IRIS_AUTH_CACHE_TTL (principaux) et
+    IRIS_USAGE_CACHE_TTL (usage).
+    """
+    
+    CHANNEL = "iris:auth:invalidate"
+    
+    def __init__(self, client: Any = None, channel: str = CHANNEL):
+        self.client = client
+        self.channel = channel
+        self._pubsub = None
+        self._thread = None
+    
+    @classmethod
+    def from_env(cls) -> "AuthInvalidationBus":
+        """Redis si IRIS_AUTH_REDIS_URL (ou PHOENIX_RATE_LIMIT_REDIS_URL / REDIS_URL) est défini"""
+        url = (os.getenv("IRIS_AUTH_REDIS_URL") or os.getenv("PHOENIX_RATE_LIMIT_REDIS_URL")
+               or os.getenv("REDIS_URL"))
+        if not url:
+            return cls()
+        try:
+            import redis
+            return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+        except ImportError:
+            logger.warning("⚠️ Package redis absent, invalidations auth locales au worker")
+            return cls()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+    
+    def publish(self, user_id: str) -> bool:
+        """Diffuse l'invalidation aux autres workers (False si non diffusée)"""
+        if not self.enabled:
+            return False
+        try:
+            self.client.publish(self.channel, user_id)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Diffusion invalidation auth impossible: {e}")
+            return False
+    
+    def start(self, loop: asyncio.AbstractEventLoop, callback: Callable[[str], Any]) -> bool:
+        """Écoute le canal; le callback est exécuté sur la boucle asyncio du worker"""
+        if not self.enabled or self._thread is not None:
+            return False
+        
+        def on_message(message):
+            user_id = message.get("data")
+            if isinstance(user_id, bytes):
+                user_id = user_id.decode()
+            if user_id:
+                loop.call_soon_threadsafe(callback, user_id)
+        
+        try:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.channel: on_message})
+            self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Écoute des invalidations auth impossible: {e}")
+            self._pubsub = None
+            return False
+    
+    def stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
 class PhoenixAuthStandalone:
     """
     Gestionnaire d'authentification standalone pour Iris API
@@ -46,12 +250,37 @@ class PhoenixAuthStandalone:
     def __init__(self):
         self.jwt_secret = self._get_jwt_secret()
         self.supabase = self._init_supabase()
+        # Requêtes de table (usage quotidien) en asyncio natif, sans pool de threads
+        self.repository = get_postgrest_repository()
         self.rate_limits = {
             UserTier.FREE: {"daily_messages": 5, "context_retention_days": 1},
             UserTier.PREMIUM: {"daily_messages": 50, "context_retention_days": 7},
             UserTier.ENTERPRISE: {"daily_messages": -1, "context_retention_days": 30}
         }
         
+        # Débit de requêtes par tier (GCRA, partagé entre workers si Redis configuré)
+        self.request_limiter = create_iris_rate_limiter()
+        
+        # Cache des utilisateurs vérifiés + usage quotidien (rafraîchi toutes les N secondes)
+        self.principal_cache = PrincipalCache(
+            max_entries=int(os.getenv("IRIS_AUTH_CACHE_SIZE", "10000")),
+            ttl_seconds=int(os.getenv("IRIS_AUTH_CACHE_TTL", "300")),
+            negative_ttl_seconds=int(os.getenv("IRIS_AUTH_NEGATIVE_TTL", "30"))
+        )
+        self.usage_cache = UsageCache(
+            max_entries=int(os.getenv("IRIS_USAGE_CACHE_SIZE", "10000")),
+            ttl_seconds=int(os.getenv("IRIS_USAGE_CACHE_TTL", "30"))
+        )
+        
+        # Invalidations partagées entre workers (sinon bornées par les TTL ci-dessus)
+        self.invalidation_bus = AuthInvalidationBus.from_env()
+        
+        # Appels Supabase synchrones exécutés hors de la boucle asyncio
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("IRIS_AUTH_WORKERS", "8")),
+            thread_name_prefix="iris-auth"
+        )
+        
     def _get_jwt_secret(self) -> str:
         """Récupère la clé JWT sécurisée"""
         secret = os.getenv("JWT_SECRET_KEY")
@@ -69,10 +298,23 @@ class PhoenixAuthStandalone:
             
         return create_client(url, key)
     
+    async def _run_blocking(self, func, *args):
+        """Exécute un appel Supabase bloquant dans le pool dédié"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    @staticmethod
+    def _cache_key(token: str, payload: Dict[str, Any]) -> str:
+        """Clé de cache: jti du token, sinon empreinte du token"""
+        token_id = payload.get('jti') or hashlib.sha256(token.encode()).hexdigest()[:32]
+        return f"{payload['sub']}:{token_id}"
+    
     async def verify_token(self, token: str) -> Optional[IrisUser]:
         """
         Vérifie et décode un token JWT Phoenix
         
+        La signature et l'expiration sont toujours vérifiées; les lectures
+        Supabase ne sont faites qu'en cas de miss du cache des principaux.
+        
         Returns:
             IrisUser si token valide, None sinon
         """
@@ -90,23 +332,43 @@ class PhoenixAuthStandalone:
             if exp and datetime.utcnow().timestamp() > exp:
                 logger.info("Token expiré")
                 return None
+            
+            # 4. Chemin chaud: utilisateur déjà vérifié pour ce token
+            user_id = payload['sub']
+            cache_key = self._cache_key(token, payload)
+            cached = self.principal_cache.get(cache_key)
+            if cached is None:
+                return None
+            if cached is not _MISS:
+                return replace(cached, daily_usage=await self._get_daily_usage(user_id),
+                               last_usage_date=datetime.now().strftime('%Y-%m-%d'))
                 
-            # 4. Récupérer les données utilisateur depuis Supabase
-            user_data = await self._get_user_data(payload['sub'])
+            # 5. Récupérer les données utilisateur depuis Supabase
+            user_data, definitive = await self._run_blocking(self._fetch_user_data, user_id)
             if not user_data:
-                logger.warning(f"Utilisateur non trouvé: {payload['sub']}")
+                logger.warning(f"Utilisateur non trouvé: {user_id}")
+                if definitive:
+                    self.principal_cache.set(cache_key, user_id, None, exp)
                 return None
+            
+            # 6. Tier et usage en parallèle
+            tier, daily_usage = await asyncio.gather(
+                self._run_blocking(self._determine_user_tier, user_data),
+                self._get_daily_usage(user_data['id'])
+            )
                 
-            # 5. Construire l'objet utilisateur
-            return IrisUser(
+            # 7. Construire l'objet utilisateur
+            user = IrisUser(
                 id=user_data['id'],
                 email=user_data['email'],
-                tier=self._determine_user_tier(user_data),
+                tier=tier,
                 email_verified=user_data.get('email_confirmed_at') is not None,
                 status=user_data.get('status', 'active'),
-                daily_usage=await self._get_daily_usage(user_data['id']),
+                daily_usage=daily_usage,
                 last_usage_date=datetime.now().strftime('%Y-%m-%d')
             )
+            self.principal_cache.set(cache_key, user_id, user, exp)
+            return user
             
         except jwt.ExpiredSignatureError:
             logger.info("Token JWT expiré")
@@ -120,28 +382,42 @@ class PhoenixAuthStandalone:
     
     async def _get_user_data(self, user_id: str) -> Optional[Dict]:
         """Récupère les données utilisateur depuis Supabase"""
+        user_data, _ = await self._run_blocking(self._fetch_user_data, user_id)
+        return user_data
+    
+    def _fetch_user_data(self, user_id: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Lecture bloquante des données utilisateur
+        
+        Returns:
+            (données, définitif) - définitif=False si toutes les sources ont échoué
+            (panne réseau): le résultat négatif ne doit alors pas être mis en cache
+        """
+        definitive = False
         try:
             # Essai direct sur auth.users
             response = self.supabase.auth.admin.get_user_by_id(user_id)
+            definitive = True
             if response.user:
                 return {
                     'id': response.user.id,
                     'email': response.user.email,
                     'email_confirmed_at': response.user.email_confirmed_at,
                     'status': 'active'  # Supabase users are active by default
-                }
+                }, True
         except Exception as e:
             logger.warning(f"Auth admin API failed: {e}")
             
         # Fallback: tentative sur une table users personnalisée
         try:
             result = self.supabase.table('users').select('*').eq('id', user_id).single().execute()
+            definitive = True
             if result.data:
-                return result.data
+                return result.data, True
         except Exception as e:
             logger.warning(f"Users table fallback failed: {e}")
             
-        return None
+        return None, definitive
     
     def _determine_user_tier(self, user_data: Dict) -> UserTier:
         """Détermine le tier de l'utilisateur"""
@@ -168,10 +444,22 @@ class PhoenixAuthStandalone:
         return UserTier.FREE
     
     async def _get_daily_usage(self, user_id: str) -> int:
-        """Récupère l'usage quotidien de l'utilisateur"""
+        """Récupère l'usage quotidien de l'utilisateur (cache court, incrémenté localement)"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        cached = self.usage_cache.get(user_id, today)
+        if cached is not None:
+            return cached
+        
+        if self.repository is not None:
+            count = await self._read_daily_usage(user_id, today)
+        else:
+            count = await self._run_blocking(self._fetch_daily_usage, user_id, today)
+        self.usage_cache.set(user_id, today, count)
+        return count
+    
+    def _fetch_daily_usage(self, user_id: str, today: str) -> int:
+        """Lecture bloquante de l'usage quotidien"""
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            
             # Tenter de récupérer depuis une table d'usage
             result = self.supabase.table('iris_usage').select('message_count').eq('user_id', user_id).eq('date', today).single().execute()
             
@@ -182,25 +470,90 @@ class PhoenixAuthStandalone:
             
         return 0
     
+    async def _read_daily_usage(self, user_id: str, today: str) -> int:
+        """Lecture asynchrone de l'usage quotidien (dépôt PostgREST)"""
+        try:
+            row = await self.repository.table('iris_usage').select('message_count') \
+                .eq('user_id', user_id).eq('date', today).single().execute()
+            if row:
+                return row.get('message_count', 0)
+        except Exception as e:
+            logger.warning(f"⚠️ Lecture usage impossible: {e}")
+        return 0
+    
     async def increment_usage(self, user_id: str) -> bool:
         """Incrémente l'usage quotidien de l'utilisateur"""
         try:
             today = datetime.now().strftime('%Y-%m-%d')
             
             # Upsert dans la table d'usage
-            self.supabase.table('iris_usage').upsert({
+            usage = {
                 'user_id': user_id,
                 'date': today,
                 'message_count': 1
-            }, on_conflict='user_id,date').execute()
+            }
+            if self.repository is not None:
+                await self.repository.table('iris_usage').upsert(
+                    usage, on_conflict='user_id,date', returning='minimal'
+                ).execute()
+            else:
+                await self._run_blocking(
+                    lambda: self.supabase.table('iris_usage').upsert(usage, on_conflict='user_id,date').execute()
+                )
+            
+            # Le cache d'usage reste exact sans relecture
+            self.usage_cache.increment(user_id, today)
             
             return True
         except Exception as e:
             logger.error(f"Erreur incrémentation usage: {e}")
             return False
     
+    def invalidate_user(self, user_id: str) -> int:
+        """
+        Hook d'invalidation (changement d'abonnement, suspension, suppression):
+        la prochaine requête relit l'utilisateur et son tier depuis Supabase.
+        Invalidation locale au worker : voir on_subscription_changed pour la diffusion
+        """
+        self.usage_cache.pop(user_id)
+        removed = self.principal_cache.invalidate_user(user_id)
+        logger.info(f"🔄 Cache auth invalidé pour {user_id} ({removed} tokens)")
+        return removed
+    
+    def on_subscription_changed(self, user_id: str, new_tier: Optional[str] = None) -> int:
+        """
+        Hook appelé lors d'un changement d'abonnement (webhook Stripe, événement billing)
+        
+        Invalide ce worker puis diffuse aux autres via Redis si configuré; sinon
+        les autres workers servent l'ancien tier au plus IRIS_AUTH_CACHE_TTL secondes
+        """
+        removed = self.invalidate_user(user_id)
+        self.invalidation_bus.publish(user_id)
+        return removed
+    
+    def start_invalidation_listener(self) -> bool:
+        """À appeler au démarrage du worker, depuis la boucle asyncio"""
+        started = self.invalidation_bus.start(asyncio.get_running_loop(), self.invalidate_user)
+        if not started:
+            logger.info(
+                f"ℹ️ Invalidations auth locales au worker (cache borné à {self.principal_cache.ttl_seconds}s)"
+            )
+        return started
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache d'authentification"""
+        return {
+            **self.principal_cache.get_stats(),
+            "usage_entries": len(self.usage_cache),
+            "invalidation_broadcast": self.invalidation_bus.enabled
+        }
+    
+    def check_request_rate(self, user: IrisUser) -> RateLimitResult:
+        """Consomme une requête sur le quota de débit du tier (IRIS_RATE_LIMIT_<TIER>)"""
+        return self.request_limiter.hit(user.id, tier=user.tier)
+    
     def check_rate_limit(self, user: IrisUser) -> bool:
-        """Vérifie si l'utilisateur peut faire une requête"""
+        """Vérifie si l'utilisateur peut faire une requête (quota quotidien)"""
         limits = self.rate_limits[user.tier]
         daily_limit = limits["daily_messages"]
         
@@ -260,6 +613,16 @@ async def get_authenticated_user(credentials: HTTPAuthorizationCredentials = Dep
             detail="Accès refusé. Vérifiez votre email, le statut de votre compte ou vos limites d'usage."
         )
     
+    # Débit de requêtes par tier
+    rate = auth_service.check_request_rate(user)
+    if not rate.allowed:
+        logger.info(f"Requête refusée - débit {user.tier.value} dépassé: {user.id}")
+        raise HTTPException(
+            status_code=429,
+            detail="Trop de requêtes. Réessayez dans quelques instants.",
+            headers=rate.headers()
+        )
+    
     return user
 
 async def get_optional_authenticated_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Optional[IrisUser]:
@@ -0,0 +1,42 @@
+"""
+🚦 IRIS RATE LIMITING - Quotas de requêtes par tier
+Branche Iris API sur le package partagé phoenix_rate_limit (GCRA, backend Redis
+si PHOENIX_RATE_LIMIT_REDIS_URL est défini : limites communes aux workers uvicorn).
+"""
+
+import os
+import sys
+
+try:
+    from phoenix_rate_limit import (
+        Quota, RateLimiter, RateLimitResult, create_backend_from_env, create_rate_limiter_from_env
+    )
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../packages'))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_rate_limit import (
+        Quota, RateLimiter, RateLimitResult, create_backend_from_env, create_rate_limiter_from_env
+    )
+
+
+def _tier_quota(tier: str, default: str):
+    """Quota d'un tier depuis IRIS_RATE_LIMIT_<TIER> ("10/minute", "30/minute:60", "unlimited")"""
+    spec = os.getenv(f"IRIS_RATE_LIMIT_{tier}", default)
+    return None if spec.lower() == "unlimited" else Quota.parse(spec)
+
+
+def create_iris_rate_limiter() -> RateLimiter:
+    """Limiteur de requêtes par utilisateur, selon le tier d'abonnement"""
+    return create_rate_limiter_from_env(
+        "iris",
+        tier_quotas={
+            "FREE": _tier_quota("FREE", "10/minute"),
+            "PREMIUM": _tier_quota("PREMIUM", "30/minute"),
+            "ENTERPRISE": _tier_quota("ENTERPRISE", "120/minute"),
+        },
+    )
+
+
+__all__ = ["Quota", "RateLimiter", "RateLimitResult", "create_backend_from_env", "create_iris_rate_limiter"]
@@ -0,0 +1,75 @@
+"""
+🧪 Tests du cache des réponses Alessio : premiers messages servis par le cache
+partagé, conversations et profils utilisateur toujours envoyés à Gemini.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from ai.gemini_alessio_engine import GeminiAlessioEngine
+
+
+class FakeModel:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content_async(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=f" Réponse {len(self.prompts)}\n\nAlessio 🤝 ")
+
+
+class FakeCacheOptimizer:
+    """Même contrat que GeminiCacheOptimizer.get/set, sur un dictionnaire"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, prompt, user_data, model_config=None):
+        return self.entries.get((prompt, repr(user_data), repr(model_config)))
+
+    def set(self, prompt, user_data, content, model_config=None, **kwargs):
+        self.entries[(prompt, repr(user_data), repr(model_config))] = content
+        return True
+
+
+def _engine(cache=None):
+    engine = GeminiAlessioEngine(cache_optimizer=cache)
+    engine.model = FakeModel()
+    return engine
+
+
+class TestAlessioResponseCache:
+
+    def test_identical_first_messages_are_generated_once(self):
+        cache = FakeCacheOptimizer()
+        worker_a, worker_b = _engine(cache), _engine(cache)
+        context = {"app_context": "phoenix-cv"}
+
+        first = asyncio.run(worker_a.generate_response("Comment structurer mon CV ?", "u1", context))
+        second = asyncio.run(worker_b.generate_response("Comment structurer mon CV ?", "u2", context))
+
+        assert first.content == second.content == "Réponse 1\n\nAlessio 🤝"
+        assert len(worker_a.model.prompts) == 1
+        assert worker_b.model.prompts == []
+        # Le contexte conversationnel est mis à jour même sur un hit
+        assert worker_b.conversation_context["u2"][0]["alessio"] == second.content
+
+    def test_follow_ups_and_profiles_are_not_cached(self):
+        cache = FakeCacheOptimizer()
+        engine = _engine(cache)
+
+        asyncio.run(engine.generate_response("Bonjour", "u1"))
+        asyncio.run(engine.generate_response("Bonjour", "u1"))
+        asyncio.run(engine.generate_response("Bonjour", "u2", {"user_profile": "Infirmière, 42 ans"}))
+
+        assert len(engine.model.prompts) == 3
+        assert len(cache.entries) == 1
+
+    def test_without_shared_cache(self, monkeypatch):
+        monkeypatch.setattr("ai.gemini_alessio_engine.get_cache_optimizer", None)
+        engine = _engine()
+
+        asyncio.run(engine.generate_response("Bonjour", "u1"))
+        asyncio.run(engine.generate_response("Bonjour", "u2"))
+
+        assert len(engine.model.prompts) == 2
@@ -0,0 +1,14 @@
+import os
+import sys
+
+# Les modules de l'API s'importent depuis la racine de l'app (security, database, ...)
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+# Le service d'authentification et le moteur Alessio sont instanciés à l'import : configuration factice,
+# aucun appel réseau n'est fait à la construction des clients
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.test")
+os.environ.setdefault("GOOGLE_API_KEY", "test-google-api-key")
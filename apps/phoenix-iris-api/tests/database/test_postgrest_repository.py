@@ -0,0 +1,176 @@
+"""
+Tests du dépôt PostgREST asynchrone : construction des requêtes, objet unique,
+insert découpé en lots, upsert, erreurs et métriques de latence.
+"""
+
+import asyncio
+import json
+from datetime import date
+
+import httpx
+import pytest
+
+import database.postgrest_repository as postgrest_repository
+from database import PostgrestError, PostgrestRepository
+from database.postgrest_repository import TableMetrics
+
+
+def _run(handler, scenario):
+    """Exécute scenario(repo) sur un dépôt branché sur un transport httpx factice"""
+    repo = PostgrestRepository(
+        "http://supabase.test", "service-key", transport=httpx.MockTransport(handler)
+    )
+
+    async def main():
+        try:
+            return await scenario(repo)
+        finally:
+            await repo.aclose()
+
+    return asyncio.run(main()), repo
+
+
+class TestQueryBuilder:
+
+    def test_select_filters_and_modifiers(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=[{"id": 1}, {"id": 2}])
+
+        rows, _ = _run(handler, lambda repo: (
+            repo.table("kaizen").select("id,date").eq("user_id", "u1").is_("deleted_at", None)
+            .eq("done", True).in_("tier", ["free", "premium"]).order("date desc").range(10, 19)
+            .execute()
+        ))
+
+        request = requests[0]
+        assert rows == [{"id": 1}, {"id": 2}]
+        assert request.method == "GET"
+        assert request.url.path == "/rest/v1/kaizen"
+        assert list(request.url.params.multi_items()) == [
+            ("select", "id,date"),
+            ("user_id", "eq.u1"),
+            ("deleted_at", "is.null"),
+            ("done", "eq.true"),
+            ("tier", 'in.("free","premium")'),
+            ("order", "date.desc"),
+            ("offset", "10"),
+            ("limit", "10"),
+        ]
+        assert request.headers["apikey"] == "service-key"
+        assert request.headers["authorization"] == "Bearer service-key"
+
+    def test_single_returns_object_or_none(self):
+        statuses = iter([200, 406])
+
+        def handler(request):
+            assert request.headers["accept"] == "application/vnd.pgrst.object+json"
+            status = next(statuses)
+            return httpx.Response(status, json={"id": 1} if status == 200 else {"message": "0 rows"})
+
+        async def scenario(repo):
+            found = await repo.table("profiles").select().eq("id", 1).single().execute()
+            missing = await repo.table("profiles").select().eq("id", 2).single().execute()
+            return found, missing
+
+        (found, missing), repo = _run(handler, scenario)
+
+        assert found == {"id": 1}
+        assert missing is None
+        assert repo.get_metrics()["profiles.select"]["errors"] == 0
+
+    def test_insert_is_split_into_chunks(self):
+        bodies = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            bodies.append(body)
+            assert request.headers["prefer"] == "return=representation"
+            return httpx.Response(201, json=body)
+
+        rows = [{"n": i, "day": date(2026, 10, 16)} for i in range(5)]
+        result, repo = _run(handler, lambda repo: (
+            repo.table("iris_events").insert(rows, chunk_size=2).execute()
+        ))
+
+        assert sorted(len(body) for body in bodies) == [1, 2, 2]
+        assert [row["n"] for row in result] == [0, 1, 2, 3, 4]
+        assert result[0]["day"] == "2026-10-16"
+        assert repo.get_metrics()["iris_events.insert"]["requests"] == 3
+        assert repo.get_metrics()["iris_events.insert"]["rows"] == 5
+
+    def test_upsert_ignoring_duplicates(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(201)
+
+        result, _ = _run(handler, lambda repo: (
+            repo.table("iris_events").upsert(
+                [{"event_id": "e1"}], on_conflict="event_id", returning="minimal",
+                ignore_duplicates=True,
+            ).execute()
+        ))
+
+        request = requests[0]
+        assert result == []
+        assert request.method == "POST"
+        assert request.url.params["on_conflict"] == "event_id"
+        assert request.headers["prefer"] == "return=minimal,resolution=ignore-duplicates"
+
+
+class TestPostgrestRepository:
+
+    def test_http_errors_raise_and_are_counted(self):
+        def handler(request):
+            return httpx.Response(409, json={"message": "duplicate key value"})
+
+        async def scenario(repo):
+            with pytest.raises(PostgrestError) as raised:
+                await repo.table("kaizen").update({"done": True}).eq("id", 1).execute()
+            return raised.value
+
+        error, repo = _run(handler, scenario)
+
+        assert error.status_code == 409
+        assert error.message == "duplicate key value"
+        metrics = repo.get_metrics()["kaizen.update"]
+        assert (metrics["requests"], metrics["errors"], metrics["rows"]) == (1, 1, 0)
+
+    def test_base_url_points_to_rest_api(self):
+        repo = PostgrestRepository("http://supabase.test/", "key", http2=False)
+        try:
+            assert repo.base_url == "http://supabase.test/rest/v1"
+            assert repo.http2 is False
+        finally:
+            asyncio.run(repo.aclose())
+
+    def test_shared_repository_requires_configuration(self, monkeypatch):
+        monkeypatch.setattr(postgrest_repository, "_repository", None)
+        monkeypatch.delenv("SUPABASE_URL", raising=False)
+
+        assert postgrest_repository.get_postgrest_repository() is None
+
+
+class TestTableMetrics:
+
+    def test_percentiles_use_a_bounded_window(self):
+        metrics = TableMetrics(window=100)
+        for _ in range(1000):
+            metrics.record(1000.0, 1, False)
+        for elapsed_ms in range(1, 101):
+            metrics.record(float(elapsed_ms), 1, False)
+
+        stats = metrics.to_dict()
+
+        assert len(metrics.latencies) == 100
+        assert stats["requests"] == 1100
+        assert stats["p50_ms"] == 51.0
+        assert stats["p99_ms"] == 100.0
+        assert stats["avg_ms"] == round((1000 * 1000 + 5050) / 1100, 2)
+
+    def test_empty_metrics(self):
+        assert TableMetrics().to_dict()["p95_ms"] == 0.0
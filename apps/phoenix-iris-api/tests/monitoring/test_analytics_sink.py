@@ -0,0 +1,95 @@
+"""
+Tests du tampon AnalyticsSink : échantillonnage sous charge, file pleine,
+débordement disque privé et rejeu au retour de Supabase.
+"""
+
+import asyncio
+import json
+import os
+import stat
+import threading
+
+from monitoring.analytics_sink import AnalyticsSink, create_sink_from_env
+
+
+def _row(event_type, i=0):
+    return {"event_type": event_type, "user_hash": f"u{i}", "timestamp": "2026-10-16T10:00:00"}
+
+
+class TestAnalyticsSink:
+
+    def test_overload_keeps_critical_events_and_samples_the_rest(self):
+        written = []
+        sink = AnalyticsSink(written.extend, batch_size=100, flush_interval=0.05, high_water=0,
+                             overload_policy={"error": 1.0, "auth_success": 0.0})
+
+        async def scenario():
+            for i in range(10):
+                sink.offer(_row("error", i))
+                sink.offer(_row("auth_success", i))
+            await sink.close()
+
+        asyncio.run(scenario())
+
+        assert [row["event_type"] for row in written] == ["error"] * 10
+        assert sink.get_stats()["dropped_by_type"] == {"auth_success": 10}
+
+    def test_full_queue_spills_critical_events_only(self, tmp_path):
+        spill_path = tmp_path / "spill.jsonl"
+        sink = AnalyticsSink(lambda batch: None, max_queue_size=1, high_water=10,
+                             spill_path=str(spill_path), overload_policy={"error": 1.0})
+
+        async def scenario():
+            sink.offer(_row("chat_request"))
+            sink.offer(_row("error"))          # File pleine : débordé sur disque
+            sink.offer(_row("chat_request"))   # File pleine : abandonné
+            sink._task.cancel()
+            sink._executor.shutdown(wait=True)
+
+        asyncio.run(scenario())
+
+        assert [json.loads(line)["event_type"] for line in spill_path.read_text().splitlines()] == ["error"]
+        assert sink.get_stats()["dropped"] == 1
+        assert stat.S_IMODE(os.stat(spill_path).st_mode) == 0o600
+
+    def test_failed_batches_are_spilled_then_replayed(self, tmp_path):
+        state = {"down": True}
+        written, notified, threads = [], [], set()
+
+        def writer(batch):
+            threads.add(threading.get_ident())
+            if state["down"]:
+                raise ConnectionError("Supabase indisponible")
+            written.extend(batch)
+
+        sink = AnalyticsSink(writer, on_written=notified.extend, batch_size=5, flush_interval=0.05,
+                             max_retries=2, retry_base_delay=0, spill_path=str(tmp_path / "spill.jsonl"))
+
+        async def scenario():
+            for i in range(5):
+                sink.offer(_row("chat_request", i))
+            await sink.flush()
+            spilled = sink.get_stats()["spilled"]
+            state["down"] = False
+            sink.offer(_row("error"))
+            await sink.close()
+            return spilled
+
+        spilled = asyncio.run(scenario())
+
+        assert spilled == 5
+        assert len(written) == 6 and len(notified) == 6
+        assert sink.get_stats()["replayed"] == 5
+        assert not (tmp_path / "spill.jsonl").exists()
+        assert threading.get_ident() not in threads  # Writer synchrone hors de la boucle
+
+    def test_default_spill_directory_is_private(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("ANALYTICS_SPILL_DIR", raising=False)
+        monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+
+        sink = create_sink_from_env(lambda batch: None)
+        sink._executor.shutdown(wait=True)
+
+        directory = os.path.dirname(sink.spill_path)
+        assert directory == str(tmp_path / "state" / "phoenix" / "iris_analytics")
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
@@ -0,0 +1,146 @@
+"""
+Tests des rollups analytics Iris : fusion multi-instances, redémarrage,
+échec de persistance et comptage avant échantillonnage du tampon.
+"""
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+from monitoring.iris_analytics import IrisAnalytics
+from monitoring.iris_rollups import DAILY_TABLE, USERS_HLL_PRECISION, HyperLogLog, IrisRollupStore
+
+DAY = date(2026, 10, 16)
+
+
+class FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.filters = []
+        self.payload = None
+
+    def select(self, *args):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def upsert(self, rows, on_conflict):
+        self.payload = (rows, on_conflict.split(","))
+        return self
+
+    def execute(self):
+        if self.db.down:
+            raise ConnectionError("Supabase indisponible")
+        rows = self.db.rows.setdefault(self.name, [])
+        if self.payload is not None:
+            new_rows, keys = self.payload
+            for new in new_rows:
+                rows[:] = [row for row in rows if any(row[k] != new[k] for k in keys)]
+                rows.append(new)
+            return type("Response", (), {"data": new_rows})()
+        data = [row for row in rows if all(row.get(c) == v for c, v in self.filters)]
+        return type("Response", (), {"data": data})()
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.rows = {}
+        self.down = False
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+
+def _event(user, event_type="chat_request", processing_time=None):
+    metadata = {} if processing_time is None else {"processing_time_ms": processing_time}
+    return {
+        "event_type": event_type,
+        "user_hash": user,
+        "user_tier": "free",
+        "timestamp": f"{DAY.isoformat()}T10:00:00",
+        "metadata": metadata,
+    }
+
+
+class TestIrisRollupStore:
+
+    def test_rows_of_all_instances_are_merged(self):
+        supabase = FakeSupabase()
+        first, second = IrisRollupStore(supabase), IrisRollupStore(supabase)
+        first.record([_event(f"u{i}") for i in range(30)])
+        second.record([_event(f"u{i}", "chat_response", 100 + i) for i in range(20, 50)])
+        first.persist()
+        second.persist()
+
+        metrics = first.get_daily(DAY).to_metrics()
+
+        assert metrics["total_requests"] == 30
+        assert metrics["total_responses"] == 30
+        assert abs(metrics["unique_users"] - 50) <= 2
+        assert abs(metrics["p50_response_time_ms"] - 134.5) / 134.5 < 0.05
+
+    def test_restart_with_a_fixed_instance_id_does_not_overwrite_the_day(self, monkeypatch):
+        monkeypatch.setenv("IRIS_INSTANCE_ID", "iris-web")
+        supabase = FakeSupabase()
+        before = IrisRollupStore(supabase)
+        before.record([_event("u1")] * 5)
+        before.persist()
+
+        after = IrisRollupStore(supabase)  # Redémarrage : agrégats en mémoire vides
+        after.record([_event("u2")])
+        after.persist()
+
+        assert before.instance_id != after.instance_id
+        assert after.instance_id.startswith("iris-web-")
+        assert after.get_daily(DAY).to_metrics()["total_requests"] == 6
+
+    def test_failed_persist_keeps_rows_to_write(self):
+        supabase = FakeSupabase()
+        store = IrisRollupStore(supabase)
+        store.record([_event("u1")])
+        supabase.down = True
+
+        with pytest.raises(ConnectionError):
+            store.persist()
+
+        supabase.down = False
+        store.persist()
+        assert len(supabase.rows[DAILY_TABLE]) == 1
+
+    def test_users_sketch_is_the_shared_hyperloglog(self):
+        sketch = HyperLogLog(USERS_HLL_PRECISION)
+        sketch.add("u1")
+
+        decoded = HyperLogLog.from_b64(sketch.to_b64())
+
+        assert decoded.precision == USERS_HLL_PRECISION
+        assert decoded.count() == 1
+
+
+class TestIrisAnalyticsRollups:
+
+    def test_sampled_out_events_are_still_counted(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("ANALYTICS_HIGH_WATER", "0")
+        monkeypatch.setenv("ANALYTICS_SPILL_DIR", "none")
+        supabase = FakeSupabase()
+        analytics = IrisAnalytics(supabase)
+        analytics.sink.overload_policy = {"chat_request": 0.0}
+
+        async def scenario():
+            for i in range(20):
+                await analytics.track_chat_request(f"user-{i}", "free", 42)
+            await analytics.close()
+
+        asyncio.run(scenario())
+
+        assert analytics.get_sink_stats()["sampled_out"] == 20
+        metrics = analytics.rollups.get_daily(datetime.now().date()).to_metrics()
+        assert metrics["total_requests"] == 20
+        assert metrics["unique_users"] == 20
@@ -0,0 +1,54 @@
+"""
+🧪 Tests des gardes d'entrée Iris sur phoenix_scan : parité avec les anciennes
+boucles (une regex par pattern, mots-clés dans le texte en minuscules).
+"""
+
+import random
+import re
+
+import pytest
+
+from security.input_security import PromptInjectionGuard
+
+FRAGMENTS = [
+    "Ignore previous", "IGNORE ALL rules", "disregard context", "Forget everything", "You are now",
+    "act as", "pretend  to be", "Assistant:", "claude :", "### System", "show prompt",
+    "What are your instructions", "<script>", "<IFRAME", "javascript :", "eval (", "import(",
+    "end of chat", "new session", "Prends ce médicament", "TU ES DÉPRESSIF", "c'est ta faute",
+    "suicide", "détresse sévère", "bonjour", "merci", "\n", " ", "İ",
+]
+
+
+def _texts(count, seed):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(FRAGMENTS) + rng.choice(["", " ", ". "]) for _ in range(rng.randint(1, 8)))
+            for _ in range(count)]
+
+
+class TestPromptInjectionGuard:
+
+    def test_detected_patterns_match_one_search_per_pattern(self):
+        guard = PromptInjectionGuard()
+        compiled = [re.compile(pattern, re.IGNORECASE) for pattern in guard.DANGEROUS_PATTERNS]
+
+        for text in _texts(300, seed=1):
+            expected = [pattern.pattern for pattern in compiled if pattern.search(text)]
+            assert guard.is_potentially_malicious(text) == (bool(expected), expected), text
+
+    def test_clean_text(self):
+        assert PromptInjectionGuard().is_potentially_malicious("Je me sens fatigué ce matin") == (False, [])
+
+
+class TestEthicalGuardian:
+
+    def test_classification_matches_keyword_loop(self):
+        pytest.importorskip("iris_core.event_processing.emotional_vector_state")
+        from security.ethical_guardian import CLASSIFICATION_KEYWORDS, EthicalGuardian
+
+        guardian = EthicalGuardian()
+        for text in _texts(300, seed=2):
+            expected = {
+                category: any(keyword in text.lower() for keyword in keywords)
+                for category, keywords in CLASSIFICATION_KEYWORDS.items()
+            }
+            assert guardian._simulate_nlp_classification(text) == expected, text
@@ -0,0 +1,138 @@
+"""
+🧪 Tests des caches d'authentification Iris (usage quotidien, invalidation entre workers)
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from security.phoenix_auth_standalone import (
+    AuthInvalidationBus,
+    IrisUser,
+    PhoenixAuthStandalone,
+    UsageCache,
+    UserTier,
+)
+
+TODAY = "2026-10-16"
+
+
+class FakeRedis:
+    """Pub/sub Redis minimal, partagé par plusieurs « workers » du même test"""
+
+    def __init__(self):
+        self.handlers = []
+
+    def publish(self, channel, message):
+        for subscribed, handler in list(self.handlers):
+            if subscribed == channel:
+                handler({"type": "message", "channel": channel, "data": message.encode()})
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+
+    def subscribe(self, **handlers):
+        self.redis.handlers.extend(handlers.items())
+
+    def run_in_thread(self, sleep_time, daemon):
+        return self
+
+    def stop(self):
+        self.redis.handlers.clear()
+
+    def close(self):
+        pass
+
+
+def _user(user_id):
+    return IrisUser(id=user_id, email=f"{user_id}@phoenix.test", tier=UserTier.FREE,
+                    email_verified=True, status="active")
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def factory(bus=None):
+        service = PhoenixAuthStandalone()
+        if bus is not None:
+            service.invalidation_bus = bus
+        services.append(service)
+        return service
+
+    yield factory
+    for service in services:
+        service.invalidation_bus.stop()
+        service._executor.shutdown(wait=False)
+
+
+class TestUsageCache:
+
+    def test_size_is_bounded_lru(self):
+        cache = UsageCache(max_entries=3, ttl_seconds=60)
+        for i in range(3):
+            cache.set(f"u{i}", TODAY, i)
+        cache.get("u0", TODAY)  # u0 redevient le plus récent
+        cache.set("u3", TODAY, 3)
+
+        assert len(cache) == 3
+        assert cache.get("u1", TODAY) is None
+        assert cache.get("u0", TODAY) == 0
+
+    def test_entries_expire_with_ttl_and_day(self, monkeypatch):
+        cache = UsageCache(max_entries=10, ttl_seconds=30)
+        cache.set("u1", TODAY, 4)
+        cache.increment("u1", TODAY)
+
+        assert cache.get("u1", TODAY) == 5
+        assert cache.get("u1", "2026-10-17") is None
+        assert len(cache) == 0
+
+        cache.set("u2", TODAY, 1)
+        later = time.time() + 31
+        monkeypatch.setattr("security.phoenix_auth_standalone.time.time", lambda: later)
+        assert cache.get("u2", TODAY) is None
+
+
+class TestSubscriptionInvalidation:
+
+    def test_invalidation_is_broadcast_to_other_workers(self, make_service):
+        redis = FakeRedis()
+        worker_a = make_service(AuthInvalidationBus(redis))
+        worker_b = make_service(AuthInvalidationBus(redis))
+
+        async def scenario():
+            worker_b.start_invalidation_listener()
+            for worker in (worker_a, worker_b):
+                worker.principal_cache.set("u1:jti", "u1", _user("u1"))
+                worker.usage_cache.set("u1", TODAY, 3)
+
+            worker_a.on_subscription_changed("u1", "PREMIUM")
+            await asyncio.sleep(0)  # Le callback est planifié sur la boucle du worker B
+
+        asyncio.run(scenario())
+
+        for worker in (worker_a, worker_b):
+            assert worker.principal_cache.get_stats()["entries"] == 0
+            assert worker.usage_cache.get("u1", TODAY) is None
+        assert worker_b.get_cache_stats()["invalidation_broadcast"] is True
+
+    def test_without_redis_invalidation_stays_local(self, make_service):
+        worker_a = make_service(AuthInvalidationBus())
+        worker_b = make_service(AuthInvalidationBus())
+        worker_b.principal_cache.set("u1:jti", "u1", _user("u1"))
+
+        async def scenario():
+            return worker_b.start_invalidation_listener()
+
+        assert asyncio.run(scenario()) is False
+        assert worker_a.on_subscription_changed("u1") == 0
+        # Borne documentée : le TTL du cache des principaux
+        assert worker_b.principal_cache.get_stats()["entries"] == 1
+        assert worker_b.principal_cache.ttl_seconds == 300
@@ -69,10 +69,18 @@ class AIOptimizationManager:
                 personalized_prompt, request.user_tier, endpoint
             )
 
-            # 4. GÉNÉRATION - Appel IA optimisé
-            ai_response = self._call_ai_with_optimizations(
-                optimized_params, request.user_tier
-            )
+            # 4. GÉNÉRATION - Cache sémantique ou appel IA optimisé
+            ai_response = optimized_params.get("cached_response")
+            if ai_response is None:
+                ai_response = self._call_ai_with_optimizations(
+                    optimized_params, request.user_tier
+                )
+                self.cost_optimizer.cache_response(
+                    personalized_prompt,
+                    ai_response,
+                    endpoint=endpoint,
+                    max_tokens=optimized_params["max_tokens"],
+                )
 
             # 5. POST-TRAITEMENT - Validation et métriques
             final_response = self._post_process_response(
@@ -203,6 +211,9 @@ class AIOptimizationManager:
             "optimized_cost": optimization_result["optimized_cost"],
             "savings": optimization_result["savings_usd"],
             "optimizations": optimization_result["optimizations_applied"],
+            "cached_response": optimization_result["optimized_params"].get(
+                "cached_response"
+            ),
         }
 
     def _call_ai_with_optimizations(
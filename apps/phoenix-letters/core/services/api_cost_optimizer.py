@@ -1,11 +1,21 @@
 """Service d'optimisation des coûts API Gemini."""
 
 import logging
+import threading
 from collections import defaultdict
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
+from core.services.semantic_prompt_cache import (
+    SemanticCacheMatch,
+    SemanticCacheProbe,
+    SemanticPromptCache,
+)
+
+_api_cost_optimizer: Optional["APICostOptimizer"] = None
+_api_cost_optimizer_lock = threading.Lock()
+
 
 @dataclass
 class APIUsageMetrics:
@@ -38,11 +48,14 @@ class CostOptimizationRule:
 class APICostOptimizer:
     """Service d'optimisation des coûts d'API Gemini."""
 
-    def __init__(self):
+    def __init__(self, semantic_cache: Optional[SemanticPromptCache] = None):
         self.logger = logging.getLogger(__name__)
         self.usage_cache: Dict[str, List[APIUsageMetrics]] = defaultdict(list)
         self.optimization_rules = self._init_optimization_rules()
 
+        # Cache des réponses pour prompts quasi identiques (MinHash/LSH)
+        self.semantic_cache = semantic_cache or SemanticPromptCache()
+
         # Prix Gemini 1.5 Flash (estimations)
         self.pricing = {
             "gemini-1.5-flash": {
@@ -159,15 +172,26 @@ class APICostOptimizer:
             "temperature": temperature,
         }
 
+        # Une seule recherche MinHash/LSH, partagée par la condition et la lecture
+        cache_probe = self.semantic_cache.probe(prompt, endpoint)
+
         # Appliquer règles d'optimisation
         for rule in sorted(
             self.optimization_rules, key=lambda r: r.priority, reverse=True
         ):
             if self._evaluate_rule_condition(
-                rule, prompt, user_tier, max_tokens, endpoint
+                rule, prompt, user_tier, max_tokens, endpoint, cache_probe
             ):
 
-                if rule.action == "compress_prompt":
+                if rule.action == "use_cache":
+                    match = self.find_cached_response(prompt, endpoint, cache_probe)
+                    if match:
+                        # Réponse déjà payée : aucune autre optimisation utile
+                        return self._cached_response_result(
+                            optimized_params, original_estimate, match
+                        )
+
+                elif rule.action == "compress_prompt":
                     optimized_params["prompt"] = self._compress_prompt(prompt)
                     optimizations_applied.append("prompt_compression")
                     total_savings += rule.savings_pct
@@ -211,6 +235,24 @@ class APICostOptimizer:
             - optimized_estimate["estimated_total_tokens"],
         }
 
+    def _cached_response_result(
+        self,
+        optimized_params: Dict[str, Any],
+        original_estimate: Dict[str, Any],
+        match: SemanticCacheMatch,
+    ) -> Dict[str, Any]:
+        """Résultat d'optimisation pour un hit du cache sémantique."""
+        return {
+            "optimized_params": {**optimized_params, "cached_response": match.response},
+            "original_cost": original_estimate["total_cost_usd"],
+            "optimized_cost": 0.0,
+            "savings_usd": original_estimate["total_cost_usd"],
+            "savings_percentage": 100.0 if original_estimate["total_cost_usd"] > 0 else 0,
+            "optimizations_applied": ["semantic_cache"],
+            "token_reduction": original_estimate["estimated_total_tokens"],
+            "cache_similarity": match.similarity,
+        }
+
     def _evaluate_rule_condition(
         self,
         rule: CostOptimizationRule,
@@ -218,6 +260,7 @@ class APICostOptimizer:
         user_tier: str,
         max_tokens: int,
         endpoint: str,
+        cache_probe: Optional[SemanticCacheProbe] = None,
     ) -> bool:
         """Évalue si une règle d'optimisation s'applique."""
 
@@ -240,7 +283,9 @@ class APICostOptimizer:
             ]
 
         elif "similar_prompt_exists" in condition:
-            return self._check_prompt_similarity(prompt)
+            return self._check_prompt_similarity(
+                prompt, endpoint=endpoint, probe=cache_probe
+            )
 
         return False
 
@@ -283,21 +328,44 @@ class APICostOptimizer:
 
         return compressed
 
-    def _check_prompt_similarity(self, prompt: str, threshold: float = 0.8) -> bool:
-        """Vérifie si un prompt similaire existe dans le cache."""
-        # Implémentation simplifiée - à améliorer avec embeddings
-        prompt_words = set(prompt.lower().split())
+    def _check_prompt_similarity(
+        self,
+        prompt: str,
+        threshold: Optional[float] = None,
+        endpoint: str = "generate_content",
+        probe: Optional[SemanticCacheProbe] = None,
+    ) -> bool:
+        """Vérifie si un prompt similaire existe dans le cache.
 
-        for cached_metrics_list in self.usage_cache.values():
-            for metrics in cached_metrics_list[-10:]:  # Check last 10 requests
-                # Récupérer prompt du cache (à implémenter)
-                # cached_prompt_words = set(cached_prompt.lower().split())
-                # similarity = len(prompt_words & cached_prompt_words) / len(prompt_words | cached_prompt_words)
-                # if similarity > threshold:
-                #     return True
-                pass
+        Le seuil par défaut dépend de l'endpoint (voir DEFAULT_ENDPOINT_THRESHOLDS) ;
+        les lettres (DEFAULT_EXACT_ENDPOINTS) ne sont servies que sur prompt identique.
+        """
+        return self.semantic_cache.peek(prompt, endpoint, threshold, probe=probe)
 
-        return False
+    def find_cached_response(
+        self,
+        prompt: str,
+        endpoint: str = "generate_content",
+        probe: Optional[SemanticCacheProbe] = None,
+    ) -> Optional[SemanticCacheMatch]:
+        """Réponse en cache pour un prompt similaire (décision auditée)."""
+        return self.semantic_cache.lookup(prompt, endpoint, probe=probe)
+
+    def cache_response(
+        self,
+        prompt: str,
+        response: str,
+        endpoint: str = "generate_content",
+        max_tokens: int = 1000,
+        model: str = "gemini-1.5-flash",
+    ) -> None:
+        """Mémorise une réponse générée et le coût qu'un futur hit évitera."""
+        cost = self.estimate_request_cost(prompt, max_tokens, model)["total_cost_usd"]
+        self.semantic_cache.store(prompt, endpoint, response, cost)
+
+    def get_semantic_cache_report(self) -> Dict[str, Any]:
+        """Rapport taux de hit / coûts évités du cache sémantique."""
+        return self.semantic_cache.get_report()
 
     def _calculate_optimization_potential(
         self, total_tokens: int, prompt: str
@@ -368,6 +436,7 @@ class APICostOptimizer:
             ),
             "cost_by_tier": self._get_cost_by_tier(all_metrics),
             "top_expensive_endpoints": self._get_top_expensive_endpoints(all_metrics),
+            "semantic_cache": self.get_semantic_cache_report(),
         }
 
     def _get_recent_usage(
@@ -412,3 +481,15 @@ class APICostOptimizer:
                 cost_by_endpoint.items(), key=lambda x: x[1], reverse=True
             )
         ]
+
+
+def get_api_cost_optimizer() -> APICostOptimizer:
+    """
+    Instance partagée par les sessions Streamlit du processus : chaque rerun
+    reconstruit les services, le cache sémantique doit pourtant survivre.
+    """
+    global _api_cost_optimizer
+    with _api_cost_optimizer_lock:
+        if _api_cost_optimizer is None:
+            _api_cost_optimizer = APICostOptimizer()
+        return _api_cost_optimizer
@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 try:
     import streamlit as st
 except Exception:  # pragma: no cover - allow tests without streamlit installed
@@ -14,12 +14,14 @@ except Exception:  # pragma: no cover - allow tests without streamlit installed
     st = _Stub()  # type: ignore
 
 from core.entities.letter import GenerationRequest, Letter, UserTier
+from core.services.api_cost_optimizer import APICostOptimizer
 from core.services.job_offer_parser import JobOfferParser
 from core.services.letter_analyzer import LetterAnalysisResult, LetterAnalyzer
 from core.services.user_limit_manager import UserLimitManager
 from shared.exceptions.specific_exceptions import (
     AIServiceError,
     LetterGenerationError,
+    RateLimitError,
     ValidationError,
 )
 from tenacity import RetryError
@@ -28,14 +30,26 @@ from shared.interfaces.prompt_interface import PromptServiceInterface
 from shared.interfaces.validation_interface import ValidationServiceInterface
 from utils.monitoring import track_api_call
 
-# Import Event Bridge pour data pipeline
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../../..'))
-from phoenix_event_bridge import PhoenixEventBridge, PhoenixEventData, PhoenixEventType
+# Import Event Bridge pour data pipeline et rate limiting partagé
+try:
+    from phoenix_event_bridge import PhoenixEventData, PhoenixEventFactory, PhoenixEventType
+    from phoenix_rate_limit import RateLimiter
+except ImportError:
+    # Exécution depuis le monorepo sans installation des packages
+    import os
+    import sys
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../packages'))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_event_bridge import PhoenixEventData, PhoenixEventFactory, PhoenixEventType
+    from phoenix_rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Endpoint du cache sémantique : réponses personnelles, servies sur prompt identique
+LETTER_ENDPOINT = "generate_letter"
+LETTER_MAX_TOKENS = 2000
+
 
 class LetterService:
     """Service orchestrant la génération de lettres avec architecture refactorisée."""
@@ -46,6 +60,8 @@ class LetterService:
         validation_service: ValidationServiceInterface,
         prompt_service: PromptServiceInterface,
         session_manager,
+        rate_limiter: Optional[RateLimiter] = None,
+        cost_optimizer: Optional[APICostOptimizer] = None,
     ):
         """
         Initialise le service de génération de lettres.
@@ -55,18 +71,23 @@ class LetterService:
             validation_service: Service de validation des données
             prompt_service: Service de construction des prompts
             session_manager: Gestionnaire de session pour les données utilisateur
+            rate_limiter: Limiteur de débit des générations (None = pas de limite de débit)
+            cost_optimizer: Optimiseur de coûts dont le cache sémantique sert les
+                prompts déjà générés (None = chaque génération appelle l'IA)
         """
         self._ai_service = ai_service
         self._validation_service = validation_service
         self._prompt_service = prompt_service
+        self._cost_optimizer = cost_optimizer
         
-        # Initialiser Event Bridge pour data pipeline
-        self._event_bridge = PhoenixEventBridge()
+        # Event Bridge pour data pipeline (outbox partagée, publication non bloquante)
+        # Mode dégradé toléré : la génération ne dépend pas de la configuration Supabase
+        self._event_bridge = PhoenixEventFactory.create_bridge(allow_degraded=True)
 
         # Services spécialisés refactorisés
         self._job_parser = JobOfferParser()
         self._letter_analyzer = LetterAnalyzer(ai_service, prompt_service)
-        self._limit_manager = UserLimitManager(session_manager)
+        self._limit_manager = UserLimitManager(session_manager, rate_limiter)
 
         logger.info("LetterService initialized with refactored architecture")
 
@@ -83,34 +104,23 @@ class LetterService:
 
         Raises:
             ValidationError: Si les données sont invalides
+            RateLimitError: Si le débit de générations est dépassé
             LetterGenerationError: Si la génération échoue
             AIServiceError: Si le service IA échoue
         """
         try:
-            # IMPORTANT: ValidationError doit être propagée, pas transformée
-            self._validation_service.validate_generation_request(request)
+            prompt = self._prepare_generation(request, user_id)
 
-            # Vérification thread-safe de la limite de génération
-            self._limit_manager.check_generation_limit(request.user_tier, user_id)
-
-            logger.info(
-                f"Starting letter generation for user {user_id}",
-                extra={
-                    "user_tier": request.user_tier.value,
-                    "is_career_change": request.is_career_change,
-                    "tone": request.tone.value if request.tone else "default",
-                },
-            )
-
-            # Construction du prompt
-            prompt = self._prompt_service.build_letter_prompt(request)
+            content = self._cached_letter(prompt)
+            if content is not None:
+                return self._finalize_letter(request, user_id, prompt, content)
 
             # Génération via IA
             try:
                 content = self._ai_service.generate_content(
                     prompt=prompt,
                     user_tier=request.user_tier,
-                    max_tokens=2000,
+                    max_tokens=LETTER_MAX_TOKENS,
                     temperature=0.7,
                 )
             except (AIServiceError, RetryError) as e:
@@ -122,61 +132,11 @@ class LetterService:
                 else:
                     raise LetterGenerationError(f"Erreur du service IA: {e}")
 
-            # Création de l'entité Letter
-            letter = Letter(
-                content=content,
-                generation_request=request,
-                created_at=datetime.now(),
-                user_id=user_id,
-            )
-
-            # Mettre à jour le compteur de manière thread-safe
-            self._limit_manager.increment_generation_count(request.user_tier, user_id)
+            self._remember_letter(prompt, content)
+            return self._finalize_letter(request, user_id, prompt, content)
 
-            # 🔥 PUBLIER ÉVÉNEMENT DANS DATA PIPELINE
-            try:
-                event_data = PhoenixEventData(
-                    event_type=PhoenixEventType.LETTER_GENERATED,
-                    user_id=user_id,
-                    app_source="phoenix-letters",
-                    payload={
-                        "job_title": request.job_title,
-                        "company_name": request.company_name,
-                        "user_tier": request.user_tier.value,
-                        "is_career_change": request.is_career_change,
-                        "letter_length": len(content),
-                        "generation_time": datetime.now().isoformat()
-                    },
-                    metadata={
-                        "prompt_tokens": len(prompt),
-                        "response_tokens": len(content),
-                        "tone": request.tone.value if request.tone else "default"
-                    }
-                )
-                # Publier l'événement (async dans un thread séparé pour ne pas bloquer)
-                import asyncio
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # Si on est déjà dans un event loop, on schedule la tâche
-                        asyncio.create_task(self._event_bridge.publish_event(event_data))
-                    else:
-                        # Sinon on run dans le loop courant
-                        asyncio.run(self._event_bridge.publish_event(event_data))
-                except Exception:
-                    # Fallback: run dans un nouveau thread
-                    asyncio.run(self._event_bridge.publish_event(event_data))
-                    
-                logger.info(f"✅ Event LETTER_GENERATED published for user {user_id}")
-            except Exception as e:
-                # Event publishing ne doit pas faire crasher la génération
-                logger.warning(f"⚠️ Failed to publish event: {e}")
-
-            logger.info(f"Letter generated successfully for user {user_id}")
-            return letter
-
-        except ValidationError:
-            # ValidationError doit être propagée telle quelle
+        except (ValidationError, RateLimitError):
+            # ValidationError et RateLimitError doivent être propagées telles quelles
             raise
         except AIServiceError:
             # Déjà gérée dans le try interne
@@ -189,6 +149,134 @@ class LetterService:
             logger.exception(f"Unexpected error in letter generation: {e}")
             raise LetterGenerationError(f"Erreur système inattendue: {str(e)}")
 
+    @property
+    def supports_streaming(self) -> bool:
+        """Indique si le service IA sait produire la lettre en streaming."""
+        return callable(getattr(self._ai_service, "stream_content", None))
+
+    async def stream_letter(
+        self, request: GenerationRequest, user_id: str
+    ) -> AsyncIterator[str]:
+        """
+        Génère une lettre en streaming (fragments affichés au fil de l'eau).
+
+        Les validations, limites, compteur et événements sont identiques à
+        generate_letter ; la lettre est finalisée après le dernier fragment.
+
+        Raises:
+            ValidationError: Si les données sont invalides
+            RateLimitError: Si le débit de générations est dépassé
+            LetterGenerationError: Si la génération échoue
+        """
+        prompt = self._prepare_generation(request, user_id)
+
+        content = self._cached_letter(prompt)
+        if content is not None:
+            yield content
+            self._finalize_letter(request, user_id, prompt, content)
+            return
+
+        chunks = []
+        try:
+            async for chunk in self._ai_service.stream_content(
+                prompt,
+                request.user_tier,
+                max_tokens=LETTER_MAX_TOKENS,
+                temperature=0.7,
+            ):
+                chunks.append(chunk)
+                yield chunk
+        except AIServiceError as e:
+            logger.error(f"AI service error: {e}")
+            raise LetterGenerationError(f"Erreur du service IA: {e}")
+
+        content = "".join(chunks).strip()
+        self._remember_letter(prompt, content)
+        self._finalize_letter(request, user_id, prompt, content)
+
+    def _prepare_generation(self, request: GenerationRequest, user_id: str) -> str:
+        """Valide la requête, vérifie la limite et construit le prompt."""
+        # IMPORTANT: ValidationError doit être propagée, pas transformée
+        self._validation_service.validate_generation_request(request)
+
+        # Vérification thread-safe de la limite de génération
+        self._limit_manager.check_generation_limit(request.user_tier, user_id)
+        self._limit_manager.check_request_rate(request.user_tier, user_id)
+
+        logger.info(
+            f"Starting letter generation for user {user_id}",
+            extra={
+                "user_tier": request.user_tier.value,
+                "is_career_change": request.is_career_change,
+                "tone": request.tone.value if request.tone else "default",
+            },
+        )
+
+        # Construction du prompt
+        return self._prompt_service.build_letter_prompt(request)
+
+    def _cached_letter(self, prompt: str) -> Optional[str]:
+        """Lettre déjà générée pour ce prompt (correspondance stricte), sinon None."""
+        if self._cost_optimizer is None:
+            return None
+        match = self._cost_optimizer.find_cached_response(prompt, LETTER_ENDPOINT)
+        if match is None:
+            return None
+        logger.info(f"Letter served from semantic cache (saved ${match.cost_saved_usd:.6f})")
+        return match.response
+
+    def _remember_letter(self, prompt: str, content: str) -> None:
+        """Mémorise la lettre générée pour les prochains prompts identiques."""
+        if self._cost_optimizer is not None:
+            self._cost_optimizer.cache_response(
+                prompt, content, endpoint=LETTER_ENDPOINT, max_tokens=LETTER_MAX_TOKENS
+            )
+
+    def _finalize_letter(
+        self, request: GenerationRequest, user_id: str, prompt: str, content: str
+    ) -> Letter:
+        """Crée la lettre, incrémente le compteur et publie l'événement."""
+        # Création de l'entité Letter
+        letter = Letter(
+            content=content,
+            generation_request=request,
+            created_at=datetime.now(),
+            user_id=user_id,
+        )
+
+        # Mettre à jour le compteur de manière thread-safe
+        self._limit_manager.increment_generation_count(request.user_tier, user_id)
+
+        # 🔥 PUBLIER ÉVÉNEMENT DANS DATA PIPELINE
+        try:
+            event_data = PhoenixEventData(
+                event_type=PhoenixEventType.LETTER_GENERATED,
+                user_id=user_id,
+                app_source="phoenix-letters",
+                payload={
+                    "job_title": request.job_title,
+                    "company_name": request.company_name,
+                    "user_tier": request.user_tier.value,
+                    "is_career_change": request.is_career_change,
+                    "letter_length": len(content),
+                    "generation_time": datetime.now().isoformat()
+                },
+                metadata={
+                    "prompt_tokens": len(prompt),
+                    "response_tokens": len(content),
+                    "tone": request.tone.value if request.tone else "default"
+                }
+            )
+            # Mise en file O(1) : l'insertion Supabase se fait en arrière-plan, par lots
+            self._event_bridge.enqueue_event(event_data)
+            logger.info(f"✅ Event LETTER_GENERATED queued for user {user_id}")
+        except Exception as e:
+            # Event publishing ne doit pas faire crasher la génération
+            logger.warning(f"⚠️ Failed to publish event: {e}")
+
+        logger.info(f"Letter generated successfully for user {user_id}")
+        return letter
+
     def analyze_letter(
         self, letter: Letter, user_tier: UserTier
     ) -> LetterAnalysisResult:
@@ -0,0 +1,568 @@
+"""Index vectoriel des exemples de lettres pour la personnalisation RAG."""
+
+import json
+import logging
+import math
+import os
+import re
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FILTER_FIELDS = ("sector_source", "sector_target", "reconversion_type")
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+Filters = Optional[Dict[str, str]]
+
+
+# 2^18 buckets : à 100k lettres (quelques centaines de termes chacune), les
+# collisions de hashing restent marginales ; les vecteurs sont creux
+DEFAULT_DIM = 1 << 18
+
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+# Requêtes scorées ensemble : la matrice de scores (requêtes x documents, float32)
+# reste sous ~25 Mo à 100k lettres
+QUERY_CHUNK = 64
+
+
+class HashingTfIdfVectorizer:
+    """Vectorisation TF-IDF par hashing (unigrammes + bigrammes, CPU uniquement).
+
+    Les documents sont stockés en TF sous-linéaire normalisé : l'IDF, qui évolue
+    à chaque insertion, n'est appliquée qu'au vecteur de requête. Un ajout ne
+    demande donc jamais de revectoriser la base. Les vecteurs sont creux :
+    (buckets triés, poids).
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self.doc_freq = np.zeros(dim, dtype=np.float64)
+        self.num_docs = 0
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(char for char in text if not unicodedata.combining(char))
+        return _TOKEN_PATTERN.findall(text)
+
+    def _term_counts(self, text: str) -> Dict[int, float]:
+        tokens = self.tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts: Dict[int, float] = {}
+        for feature in features:
+            hashed = zlib.crc32(feature.encode("utf-8"))
+            bucket = hashed % self.dim
+            # Hashing signé : les collisions se compensent au lieu de s'additionner
+            sign = 1.0 if hashed & 0x80000000 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        return counts
+
+    def transform_document(self, text: str, update_stats: bool = True) -> SparseVector:
+        """Vecteur TF creux d'un document (met à jour les fréquences documentaires)."""
+        counts = self._term_counts(text)
+        buckets = np.array(sorted(b for b, c in counts.items() if c), dtype=np.int32)
+        weights = np.array(
+            [math.copysign(1.0 + math.log(abs(counts[b])), counts[b]) for b in buckets.tolist()],
+            dtype=np.float32,
+        )
+        if update_stats:
+            self.doc_freq[buckets] += 1
+            self.num_docs += 1
+        return buckets, _normalize(weights)
+
+    def transform_query(self, text: str) -> SparseVector:
+        """Vecteur de requête creux pondéré par l'IDF courante."""
+        buckets, weights = self.transform_document(text, update_stats=False)
+        idf = np.log((1.0 + self.num_docs) / (1.0 + self.doc_freq[buckets])) + 1.0
+        return buckets, _normalize(weights * idf.astype(np.float32))
+
+    def forget_document(self, buckets: np.ndarray) -> None:
+        """Retire un document remplacé des fréquences documentaires."""
+        self.doc_freq[buckets] -= 1
+        self.num_docs -= 1
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class LetterVectorIndex:
+    """Index top-k des exemples de lettres (NumPy, persistant, mmap au démarrage).
+
+    Les vecteurs creux sont rangés en listes inversées par bucket (format CSC) :
+    une recherche ne lit que les postings des termes de la requête.
+    Deux segments :
+    - base : listes inversées chargées en memory-map depuis le disque (lecture seule)
+    - delta : insertions depuis le dernier chargement, triplets extensibles
+    `save` fusionne les deux segments ; un ajout reste O(1) amorti.
+
+    Dans la base, les buckets présents dans au moins `DENSE_MIN_DOC_RATIO` des
+    documents (mots outils, vocabulaire commun à toutes les lettres) forment un
+    bloc dense buckets x documents : ils concentrent l'essentiel des postings lus
+    par requête et se scorent par un produit matriciel au lieu d'un scatter.
+    """
+
+    FORMAT_VERSION = 3
+    # Formats encore lisibles (le v2 n'a pas de bloc dense)
+    READABLE_FORMATS = (2, 3)
+    DENSE_MIN_DOC_RATIO = 0.25
+    DENSE_MIN_DOCUMENTS = 1000
+    # 64 buckets x 100k lettres en float32 : 25 Mo
+    MAX_DENSE_BUCKETS = 64
+
+    INDPTR_FILE = "indptr.npy"
+    ROWS_FILE = "rows.npy"
+    WEIGHTS_FILE = "weights.npy"
+    DOC_FREQ_FILE = "doc_freq.npy"
+    DENSE_BUCKETS_FILE = "dense_buckets.npy"
+    DENSE_FILE = "dense.npy"
+    CODES_FILE = "codes.npy"
+    DOCUMENTS_FILE = "documents.jsonl"
+    STATE_FILE = "state.json"
+
+    def __init__(self, dim: int = DEFAULT_DIM, directory: Optional[Union[str, Path]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.dim = dim
+        self.directory = Path(directory) if directory else None
+        self.vectorizer = HashingTfIdfVectorizer(dim)
+
+        # Base : postings du bucket b = rows/weights[indptr[b]:indptr[b + 1]]
+        # (lignes en int64 : un index int32 est converti à chaque scatter NumPy)
+        self._base_indptr = np.zeros(dim + 1, dtype=np.int64)
+        self._base_rows = np.zeros(0, dtype=np.int64)
+        self._base_weights = np.zeros(0, dtype=np.float32)
+        self._base_size = 0
+        # Bloc dense de la base : poids du bucket _dense_buckets[j] = _dense[j]
+        self._dense_buckets = np.zeros(0, dtype=np.int64)
+        self._dense = np.zeros((0, 0), dtype=np.float32)
+
+        # Delta : triplets (bucket, ligne, poids), regroupés par bucket à la demande
+        self._delta_buckets = np.zeros(1024, dtype=np.int32)
+        self._delta_rows = np.zeros(1024, dtype=np.int32)
+        self._delta_weights = np.zeros(1024, dtype=np.float32)
+        self._delta_nnz = 0
+        self._delta_postings: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+        # Métadonnées filtrables encodées en entiers (-1 = absente)
+        self._codes = np.full((64, len(FILTER_FIELDS)), -1, dtype=np.int32)
+        self._alive = np.zeros(64, dtype=bool)
+        self._vocab: Dict[str, Dict[str, int]] = {name: {} for name in FILTER_FIELDS}
+
+        self._doc_ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        # Documents de la base : offsets dans documents.jsonl (lecture paresseuse)
+        self._base_offsets = np.zeros(0, dtype=np.int64)
+        self._delta_documents: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    @property
+    def _size(self) -> int:
+        return len(self._doc_ids)
+
+    # ------------------------------------------------------------------
+    # Insertions
+    # ------------------------------------------------------------------
+
+    def add(self, doc_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Ajoute (ou remplace) un exemple de lettre."""
+        metadata = metadata or {}
+
+        previous_row = self._row_of.get(doc_id)
+        if previous_row is not None:
+            self._alive[previous_row] = False
+            previous = self.get_document(doc_id)["content"]
+            self.vectorizer.forget_document(
+                self.vectorizer.transform_document(previous, update_stats=False)[0]
+            )
+
+        buckets, weights = self.vectorizer.transform_document(content)
+        row = self._size
+        self._reserve(row + 1, self._delta_nnz + len(buckets))
+
+        end = self._delta_nnz + len(buckets)
+        self._delta_buckets[self._delta_nnz : end] = buckets
+        self._delta_rows[self._delta_nnz : end] = row
+        self._delta_weights[self._delta_nnz : end] = weights
+        self._delta_nnz = end
+        self._delta_postings = None
+
+        self._codes[row] = [self._encode(name, metadata.get(name)) for name in FILTER_FIELDS]
+        self._alive[row] = True
+
+        self._doc_ids.append(doc_id)
+        self._row_of[doc_id] = row
+        self._delta_documents.append({"doc_id": doc_id, "content": content, "metadata": metadata})
+
+    def add_many(self, documents: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        count = 0
+        for doc_id, content, metadata in documents:
+            self.add(doc_id, content, metadata)
+            count += 1
+        return count
+
+    def _reserve(self, rows: int, nnz: int) -> None:
+        """Agrandit les tableaux par doublement (O(1) amorti)."""
+        if rows > len(self._codes):
+            capacity = max(rows, 2 * len(self._codes))
+            self._codes = _grow(self._codes, capacity, fill=-1)
+            self._alive = _grow(self._alive, capacity, fill=False)
+        if nnz > len(self._delta_rows):
+            capacity = max(nnz, 2 * len(self._delta_rows))
+            self._delta_buckets = _grow(self._delta_buckets, capacity, fill=0)
+            self._delta_rows = _grow(self._delta_rows, capacity, fill=0)
+            self._delta_weights = _grow(self._delta_weights, capacity, fill=0)
+
+    def _encode(self, name: str, value: Any) -> int:
+        if value is None:
+            return -1
+        vocab = self._vocab[name]
+        return vocab.setdefault(str(value), len(vocab))
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def _mask(self, filters: Filters) -> Optional[np.ndarray]:
+        """Lignes éligibles (vivantes et conformes aux filtres), None si aucune possible."""
+        mask = self._alive[: self._size].copy()
+        for name, value in (filters or {}).items():
+            if name not in self._vocab:
+                raise ValueError(f"Filtre non supporté: {name}")
+            code = self._vocab[name].get(str(value))
+            if code is None:
+                return None
+            mask &= self._codes[: self._size, FILTER_FIELDS.index(name)] == code
+        return mask
+
+    def _segments(self) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Listes inversées (indptr, lignes, poids) de la base et du delta."""
+        segments = []
+        if self._base_size:
+            segments.append((self._base_indptr, self._base_rows, self._base_weights))
+        if self._delta_nnz:
+            if self._delta_postings is None:
+                buckets = self._delta_buckets[: self._delta_nnz]
+                order = np.argsort(buckets, kind="stable")
+                indptr = np.zeros(self.dim + 1, dtype=np.int64)
+                np.cumsum(np.bincount(buckets, minlength=self.dim), out=indptr[1:])
+                self._delta_postings = (
+                    indptr,
+                    self._delta_rows[: self._delta_nnz][order].astype(np.int64),
+                    self._delta_weights[: self._delta_nnz][order],
+                )
+            segments.append(self._delta_postings)
+        return segments
+
+    @staticmethod
+    def _query_matrix(queries: Sequence[SparseVector]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Matrice creuse des requêtes en triplets (bucket, requête, poids) triés par bucket."""
+        buckets = np.concatenate([query[0] for query in queries]).astype(np.int64)
+        query_ids = np.repeat(
+            np.arange(len(queries), dtype=np.int64), [len(query[0]) for query in queries]
+        )
+        weights = np.concatenate([query[1] for query in queries])
+        order = np.argsort(buckets, kind="stable")
+        return buckets[order], query_ids[order], weights[order]
+
+    def _score_matrix(self, queries: Sequence[SparseVector]) -> np.ndarray:
+        """Scores requêtes x documents : produit de la matrice des requêtes par l'index.
+
+        Le bloc dense est scoré en un produit matriciel ; les postings CSC de
+        chaque bucket ne sont lus qu'une fois pour toutes les requêtes du lot.
+        """
+        scores = np.zeros((len(queries), self._size), dtype=np.float32)
+        buckets, query_ids, weights = self._query_matrix(queries)
+
+        if len(self._dense_buckets) and self._base_size:
+            columns = np.minimum(
+                np.searchsorted(self._dense_buckets, buckets), len(self._dense_buckets) - 1
+            )
+            in_dense = self._dense_buckets[columns] == buckets
+            dense_queries = np.zeros((len(queries), len(self._dense_buckets)), dtype=np.float32)
+            dense_queries[query_ids[in_dense], columns[in_dense]] = weights[in_dense]
+            scores[:, : self._base_size] = dense_queries @ np.asarray(self._dense)
+
+        unique, first = np.unique(buckets, return_index=True)
+        last = np.append(first[1:], len(buckets))
+        query_ids, weights = query_ids.tolist(), weights.tolist()
+        for indptr, rows, values in self._segments():
+            # Vues ndarray : les tranches de np.memmap paient un wrapping à chaque opération
+            rows, values = np.asarray(rows), np.asarray(values)
+            starts, ends = indptr[unique], indptr[unique + 1]
+            nonempty = np.flatnonzero(ends > starts)
+            # Un scatter NumPy par bucket non vide : sans scipy, un gather global
+            # suivi de bincount/add.at est 3 à 5 fois plus lent sur le même volume
+            for start, end, lo, hi in zip(
+                starts[nonempty].tolist(),
+                ends[nonempty].tolist(),
+                first[nonempty].tolist(),
+                last[nonempty].tolist(),
+            ):
+                # La tranche de postings est lue une fois pour les requêtes qui
+                # partagent le bucket ; un document n'y apparaît qu'une fois
+                posting_rows, posting_values = rows[start:end], values[start:end]
+                for query_id, weight in zip(query_ids[lo:hi], weights[lo:hi]):
+                    row_scores = scores[query_id]
+                    row_scores[posting_rows] += weight * posting_values
+        return scores
+
+    def search(self, query: str, k: int = 5, filters: Filters = None) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) pour une requête."""
+        return self.search_batch([query], k, filters)[0]
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        k: int = 5,
+        filters: Union[Filters, Sequence[Filters]] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """Top-k pour plusieurs requêtes.
+
+        `filters` est soit commun à toutes les requêtes, soit une liste par requête.
+        """
+        if not queries:
+            return []
+        per_query_filters = (
+            list(filters) if isinstance(filters, (list, tuple)) else [filters] * len(queries)
+        )
+
+        # Un masque par jeu de filtres distinct, partagé par les requêtes du lot
+        candidates_by_filters: Dict[Tuple[Tuple[str, str], ...], Optional[np.ndarray]] = {}
+        query_candidates = []
+        for query_filters in per_query_filters:
+            key = tuple(sorted((name, str(value)) for name, value in (query_filters or {}).items()))
+            if key not in candidates_by_filters:
+                mask = self._mask(query_filters)
+                candidates_by_filters[key] = (
+                    np.flatnonzero(mask) if mask is not None and mask.any() else None
+                )
+            query_candidates.append(candidates_by_filters[key])
+
+        results: List[List[Tuple[str, float]]] = [[] for _ in queries]
+        pending = [i for i, candidates in enumerate(query_candidates) if candidates is not None]
+        for chunk_start in range(0, len(pending), QUERY_CHUNK):
+            chunk = pending[chunk_start : chunk_start + QUERY_CHUNK]
+            scores = self._score_matrix(
+                [self.vectorizer.transform_query(queries[i]) for i in chunk]
+            )
+            for row, i in enumerate(chunk):
+                results[i] = self._top_k(scores[row], query_candidates[i], k)
+        return results
+
+    def _top_k(
+        self, scores: np.ndarray, candidates: np.ndarray, k: int
+    ) -> List[Tuple[str, float]]:
+        candidate_scores = scores[candidates]
+        top = min(k, len(candidates))
+        best = np.argpartition(-candidate_scores, top - 1)[:top]
+        best = best[np.argsort(-candidate_scores[best])]
+        return [(self._doc_ids[candidates[i]], float(candidate_scores[i])) for i in best]
+
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Contenu et métadonnées d'un document indexé."""
+        row = self._row_of.get(doc_id)
+        if row is None:
+            return None
+        if row >= self._base_size:
+            return self._delta_documents[row - self._base_size]
+        with open(self.directory / self.DOCUMENTS_FILE, "rb") as handle:
+            handle.seek(int(self._base_offsets[row]))
+            return json.loads(handle.readline())
+
+    def _iter_documents(self) -> Iterable[Tuple[int, Dict[str, Any]]]:
+        """Tous les documents (vivants ou non) dans l'ordre des lignes."""
+        if self._base_size:
+            with open(self.directory / self.DOCUMENTS_FILE, "rb") as handle:
+                for row in range(self._base_size):
+                    yield row, json.loads(handle.readline())
+        for offset, document in enumerate(self._delta_documents):
+            yield self._base_size + offset, document
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def save(self, directory: Optional[Union[str, Path]] = None) -> Path:
+        """Écrit l'index compacté (base + delta, sans remplacés) puis le recharge en memory-map."""
+        directory = Path(directory) if directory else self.directory
+        if directory is None:
+            raise ValueError("Aucun répertoire de persistance configuré")
+        directory.mkdir(parents=True, exist_ok=True)
+
+        alive = self._alive[: self._size]
+        rows = np.flatnonzero(alive)
+        offsets = np.zeros(len(rows), dtype=np.int64)
+        alive_rows = set(rows.tolist())
+
+        tmp_documents = directory / f"{self.DOCUMENTS_FILE}.tmp"
+        with open(tmp_documents, "wb") as handle:
+            position = 0
+            for row, document in self._iter_documents():
+                if row not in alive_rows:
+                    continue
+                offsets[position] = handle.tell()
+                handle.write(json.dumps(document, ensure_ascii=False).encode("utf-8") + b"\n")
+                position += 1
+
+        buckets, posting_rows, posting_weights = self._merged_postings(alive)
+        dense_buckets, dense = self._dense_block(buckets, posting_rows, posting_weights, len(rows))
+        sparse = ~np.isin(buckets, dense_buckets)
+        indptr = np.zeros(self.dim + 1, dtype=np.int64)
+        np.cumsum(np.bincount(buckets[sparse], minlength=self.dim), out=indptr[1:])
+        _atomic_save(directory / self.INDPTR_FILE, indptr)
+        _atomic_save(directory / self.ROWS_FILE, posting_rows[sparse])
+        _atomic_save(directory / self.WEIGHTS_FILE, posting_weights[sparse])
+        _atomic_save(directory / self.DENSE_BUCKETS_FILE, dense_buckets)
+        _atomic_save(directory / self.DENSE_FILE, dense)
+        _atomic_save(directory / self.DOC_FREQ_FILE, self.vectorizer.doc_freq)
+        _atomic_save(directory / self.CODES_FILE, self._codes[rows])
+        os.replace(tmp_documents, directory / self.DOCUMENTS_FILE)
+
+        state = {
+            "format": self.FORMAT_VERSION,
+            "dim": self.dim,
+            "doc_ids": [self._doc_ids[row] for row in rows],
+            "offsets": offsets.tolist(),
+            "vocab": self._vocab,
+            "num_docs": self.vectorizer.num_docs,
+        }
+        tmp_state = directory / f"{self.STATE_FILE}.tmp"
+        tmp_state.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_state, directory / self.STATE_FILE)
+
+        self.logger.info(f"Letter vector index saved: {len(rows)} documents in {directory}")
+
+        self.directory = directory
+        self._load_state()
+        return directory
+
+    def _merged_postings(self, alive: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Fusionne base (creuse et dense) et delta en triplets (bucket, ligne, poids).
+
+        Les lignes remplacées sont retirées et les triplets triés par bucket puis ligne.
+        """
+        base_buckets = np.repeat(
+            np.arange(self.dim, dtype=np.int64), np.diff(self._base_indptr)
+        )
+        dense_columns, dense_rows = np.nonzero(self._dense)
+        buckets = np.concatenate([
+            base_buckets,
+            self._dense_buckets[dense_columns],
+            self._delta_buckets[: self._delta_nnz],
+        ])
+        rows = np.concatenate([
+            self._base_rows, dense_rows, self._delta_rows[: self._delta_nnz]
+        ]).astype(np.int64)
+        weights = np.concatenate([
+            self._base_weights,
+            self._dense[dense_columns, dense_rows],
+            self._delta_weights[: self._delta_nnz],
+        ])
+
+        keep = alive[rows]
+        renumber = np.cumsum(alive) - 1
+        buckets, rows, weights = buckets[keep], renumber[rows[keep]], weights[keep]
+
+        order = np.lexsort((rows, buckets))
+        return buckets[order], rows[order], weights[order]
+
+    def _dense_block(
+        self, buckets: np.ndarray, rows: np.ndarray, weights: np.ndarray, size: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Buckets les plus fréquents (triés) et leur bloc dense buckets x documents."""
+        if size < self.DENSE_MIN_DOCUMENTS:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, size), dtype=np.float32)
+
+        counts = np.bincount(buckets, minlength=self.dim)
+        eligible = np.flatnonzero(counts >= self.DENSE_MIN_DOC_RATIO * size)
+        most_frequent = np.argsort(-counts[eligible], kind="stable")[: self.MAX_DENSE_BUCKETS]
+        dense_buckets = np.sort(eligible[most_frequent]).astype(np.int64)
+
+        dense = np.zeros((len(dense_buckets), size), dtype=np.float32)
+        selected = np.isin(buckets, dense_buckets)
+        dense[np.searchsorted(dense_buckets, buckets[selected]), rows[selected]] = weights[selected]
+        return dense_buckets, dense
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> "LetterVectorIndex":
+        """Charge un index sauvegardé (listes inversées en memory-map par défaut)."""
+        directory = Path(directory)
+        state = json.loads((directory / cls.STATE_FILE).read_text(encoding="utf-8"))
+        if state.get("format") not in cls.READABLE_FORMATS:
+            raise ValueError(
+                f"Format d'index {state.get('format', 1)} obsolète, reconstruction nécessaire"
+            )
+        index = cls(dim=state["dim"], directory=directory)
+        index._load_state(state, mmap)
+        return index
+
+    def _load_state(self, state: Optional[Dict[str, Any]] = None, mmap: bool = True) -> None:
+        if state is None:
+            state = json.loads((self.directory / self.STATE_FILE).read_text(encoding="utf-8"))
+
+        mmap_mode = "r" if mmap else None
+        self._base_indptr = _load_array(self.directory / self.INDPTR_FILE, mmap_mode)
+        self._base_rows = _load_array(self.directory / self.ROWS_FILE, mmap_mode)
+        self._base_weights = _load_array(self.directory / self.WEIGHTS_FILE, mmap_mode)
+        size = len(state["doc_ids"])
+        self._base_size = size
+        if (self.directory / self.DENSE_FILE).exists():
+            self._dense_buckets = np.load(self.directory / self.DENSE_BUCKETS_FILE)
+            self._dense = _load_array(self.directory / self.DENSE_FILE, mmap_mode)
+        else:
+            # Format v2 : tout est en postings, le bloc dense apparaîtra au prochain save
+            self._dense_buckets = np.zeros(0, dtype=np.int64)
+            self._dense = np.zeros((0, size), dtype=np.float32)
+        capacity = max(size, 64)
+
+        self._delta_nnz = 0
+        self._delta_postings = None
+        self._delta_documents = []
+
+        self._codes = _grow(np.load(self.directory / self.CODES_FILE), capacity, fill=-1)
+        self._alive = _grow(np.ones(size, dtype=bool), capacity, fill=False)
+        self._vocab = {name: dict(state["vocab"].get(name, {})) for name in FILTER_FIELDS}
+        self._doc_ids = list(state["doc_ids"])
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._doc_ids)}
+        self._base_offsets = np.array(state["offsets"], dtype=np.int64)
+        self.vectorizer.doc_freq = np.load(self.directory / self.DOC_FREQ_FILE)
+        self.vectorizer.num_docs = state["num_docs"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self),
+            "base_rows": self._base_size,
+            "delta_rows": self._size - self._base_size,
+            "postings": len(self._base_rows) + self._delta_nnz,
+            "dense_buckets": len(self._dense_buckets),
+            "dim": self.dim,
+            "memory_mapped": isinstance(self._base_rows, np.memmap),
+        }
+
+
+def _grow(array: np.ndarray, capacity: int, fill: Any) -> np.ndarray:
+    grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+def _atomic_save(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def _load_array(path: Path, mmap_mode: Optional[str]) -> np.ndarray:
+    # Un tableau vide ne peut pas être projeté en mémoire
+    try:
+        return np.load(path, mmap_mode=mmap_mode)
+    except ValueError:
+        return np.load(path)
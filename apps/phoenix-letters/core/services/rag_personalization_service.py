@@ -2,10 +2,14 @@
 
 import json
 import logging
+import os
 from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from core.services.letter_vector_index import LetterVectorIndex
+
 
 @dataclass
 class UserContext:
@@ -49,13 +53,18 @@ class PersonalizationContext:
 class RAGPersonalizationService:
     """Service RAG pour personnalisation avancée des lettres."""
 
-    def __init__(self):
+    def __init__(self, index_dir: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
 
-        # Base de connaissances en mémoire (à migrer vers vraie DB)
+        # Documents ajoutés pendant la session (la base complète vit dans l'index)
         self.knowledge_base: Dict[str, RAGDocument] = {}
         self.user_contexts: Dict[str, UserContext] = {}
 
+        # Index vectoriel des exemples de lettres (memory-map si déjà persisté)
+        self.vector_index = self._load_vector_index(
+            index_dir or os.getenv("RAG_INDEX_DIR")
+        )
+
         # Templates de lettres par secteur/reconversion
         self.letter_templates = self._init_letter_templates()
 
@@ -65,6 +74,19 @@ class RAGPersonalizationService:
         # Patterns de reconversion
         self.reconversion_patterns = self._init_reconversion_patterns()
 
+    def _load_vector_index(self, index_dir: Optional[str]) -> LetterVectorIndex:
+        """Charge l'index persisté, ou en crée un vide."""
+        if index_dir and (Path(index_dir) / LetterVectorIndex.STATE_FILE).exists():
+            try:
+                index = LetterVectorIndex.load(index_dir)
+                self.logger.info(
+                    f"RAG vector index loaded: {len(index)} examples from {index_dir}"
+                )
+                return index
+            except Exception as e:
+                self.logger.warning(f"RAG vector index unreadable, starting empty: {e}")
+        return LetterVectorIndex(directory=index_dir)
+
     def _init_letter_templates(self) -> Dict[str, Dict[str, str]]:
         """Initialise templates de lettres par secteur."""
         return {
@@ -402,9 +424,12 @@ class RAGPersonalizationService:
     ) -> List[RAGDocument]:
         """Trouve exemples similaires dans base de connaissances."""
 
-        # Pour démo, retourner exemples statiques
-        # TODO: Implémenter recherche par embeddings
+        if len(self.vector_index):
+            examples = self._search_examples(user_context, job_offer, max_examples)
+            if examples:
+                return examples
 
+        # Base vide ou aucun exemple du secteur cible : exemple statique de démonstration
         examples = []
 
         # Exemple pour tech
@@ -425,6 +450,50 @@ class RAGPersonalizationService:
 
         return examples[:max_examples]
 
+    def _search_examples(
+        self, user_context: UserContext, job_offer: str, max_examples: int
+    ) -> List[RAGDocument]:
+        """Recherche top-k dans l'index, secteur cible imposé.
+
+        Les candidats sont sur-échantillonnés puis reclassés : un exemple
+        partageant aussi le secteur d'origine et le type de reconversion passe
+        devant un exemple seulement proche textuellement.
+        """
+        query = " ".join(
+            [user_context.role_target, " ".join(user_context.skills), job_offer]
+        )
+        hits = self.vector_index.search(
+            query,
+            k=max_examples * 4,
+            filters={"sector_target": user_context.sector_target},
+        )
+
+        wanted = {
+            "sector_source": user_context.sector_source,
+            "reconversion_type": user_context.reconversion_type,
+        }
+        examples = []
+        for doc_id, score in hits:
+            if score <= 0:
+                continue
+            document = self.vector_index.get_document(doc_id)
+            metadata = document["metadata"]
+            matches = sum(metadata.get(key) == value for key, value in wanted.items())
+            examples.append(
+                (
+                    matches,
+                    RAGDocument(
+                        doc_id=doc_id,
+                        content=document["content"],
+                        metadata=metadata,
+                        relevance_score=score,
+                    ),
+                )
+            )
+
+        examples.sort(key=lambda item: (item[0], item[1].relevance_score), reverse=True)
+        return [example for _, example in examples[:max_examples]]
+
     def _determine_personalization_strategy(self, user_context: UserContext) -> str:
         """Détermine stratégie de personnalisation optimale."""
 
@@ -524,15 +593,21 @@ Générez une lettre de motivation personnalisée et percutante.
         return enriched_prompt
 
     def add_to_knowledge_base(self, document: RAGDocument) -> None:
-        """Ajoute document à la base de connaissances."""
+        """Ajoute document à la base de connaissances (indexation incrémentale)."""
         self.knowledge_base[document.doc_id] = document
+        self.vector_index.add(document.doc_id, document.content, document.metadata)
         self.logger.info(f"Added document to knowledge base: {document.doc_id}")
 
+    def save_knowledge_base(self, index_dir: Optional[str] = None) -> None:
+        """Persiste l'index vectoriel (rechargé en memory-map au prochain démarrage)."""
+        self.vector_index.save(index_dir)
+
     def get_personalization_metrics(self) -> Dict[str, Any]:
         """Retourne métriques de personnalisation."""
         return {
             "total_users": len(self.user_contexts),
-            "knowledge_base_size": len(self.knowledge_base),
+            "knowledge_base_size": len(self.vector_index),
+            "vector_index": self.vector_index.get_stats(),
             "reconversion_types": {
                 reconversion_type: len(
                     [
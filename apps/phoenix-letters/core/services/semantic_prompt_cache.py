@@ -0,0 +1,442 @@
+"""Cache sémantique des prompts Gemini (quasi-doublons via MinHash/LSH)."""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Endpoints dont la réponse est personnelle : deux prompts de lettre qui ne
+# diffèrent que par le nom du candidat sont similaires à plus de 0.98, un
+# quasi-doublon servirait donc la lettre d'un autre utilisateur. Ils ne sont
+# servis que sur prompt identique (à la casse et à l'espacement près).
+DEFAULT_EXACT_ENDPOINTS: FrozenSet[str] = frozenset({"generate_letter"})
+
+# Seuils de similarité par endpoint : une analyse tolère davantage de
+# variations qu'un contenu généré.
+DEFAULT_ENDPOINT_THRESHOLDS: Dict[str, float] = {
+    "generate_content": 0.92,
+    "analysis": 0.85,
+    "ats_analyzer": 0.85,
+    "smart_coach": 0.88,
+    "mirror_match": 0.88,
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_prompt(prompt: str) -> List[str]:
+    """Normalise un prompt en tokens (casse, accents et espacement ignorés)."""
+    text = unicodedata.normalize("NFKD", prompt.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _TOKEN_PATTERN.findall(text)
+
+
+def normalized_prompt_hash(prompt: str) -> str:
+    """Empreinte du prompt normalisé (égalité stricte modulo casse et espacement)."""
+    return hashlib.sha256(" ".join(normalize_prompt(prompt)).encode("utf-8")).hexdigest()
+
+
+class MinHasher:
+    """Signatures MinHash sur shingles de mots (k mots consécutifs)."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Une permutation = un masque XOR 64 bits dérivé de la graine
+        self._masks = [
+            int.from_bytes(
+                hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=8).digest(), "big"
+            )
+            for i in range(num_perm)
+        ]
+
+    def shingles(self, tokens: List[str]) -> Set[int]:
+        """Hashs 64 bits des shingles d'un prompt normalisé."""
+        size = min(self.shingle_size, max(len(tokens), 1))
+        return {
+            int.from_bytes(
+                hashlib.blake2b(
+                    " ".join(tokens[i : i + size]).encode("utf-8"), digest_size=8
+                ).digest(),
+                "big",
+            )
+            for i in range(max(len(tokens) - size + 1, 1))
+        }
+
+    def signature(self, prompt: str) -> Tuple[int, ...]:
+        """Signature MinHash d'un prompt."""
+        hashes = self.shingles(normalize_prompt(prompt))
+        return tuple(min(h ^ mask for h in hashes) for mask in self._masks)
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimation de la similarité de Jaccard entre deux signatures."""
+        if not sig_a or len(sig_a) != len(sig_b):
+            return 0.0
+        return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+@dataclass
+class CachedPrompt:
+    """Réponse mise en cache avec sa signature."""
+
+    prompt_hash: str
+    endpoint: str
+    signature: Tuple[int, ...]
+    response: str
+    cost_usd: float
+    normalized_hash: str = ""
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+@dataclass
+class SemanticCacheMatch:
+    """Résultat positif d'une recherche sémantique."""
+
+    response: str
+    similarity: float
+    matched_prompt_hash: str
+    cost_saved_usd: float
+
+
+@dataclass
+class SemanticCacheProbe:
+    """Meilleur candidat d'un prompt, calculé une fois par requête."""
+
+    prompt_hash: str
+    best: Optional[CachedPrompt]
+    similarity: float
+    candidates: int
+
+
+@dataclass
+class SemanticCacheDecision:
+    """Trace d'audit d'une décision de cache."""
+
+    timestamp: str
+    endpoint: str
+    prompt_hash: str
+    decision: str  # "hit", "miss", "below_threshold"
+    similarity: float
+    threshold: float
+    matched_prompt_hash: Optional[str] = None
+    candidates: int = 0
+
+
+class SemanticPromptCache:
+    """Cache de réponses Gemini tolérant aux quasi-doublons de prompts.
+
+    Les prompts sont découpés en shingles de mots, signés par MinHash puis
+    indexés par LSH (bandes de la signature) : seuls les prompts partageant
+    au moins une bande sont comparés, la recherche reste donc sous-linéaire.
+
+    Les endpoints de `exact_endpoints` (réponses personnelles) échappent à la
+    recherche par similarité : seul un prompt identique une fois normalisé
+    est servi.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        default_threshold: float = 0.9,
+        endpoint_thresholds: Optional[Dict[str, float]] = None,
+        exact_endpoints: Optional[Iterable[str]] = None,
+        max_entries: int = 5000,
+        ttl_seconds: int = 24 * 3600,
+        audit_size: int = 1000,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands")
+
+        self.logger = logging.getLogger(__name__)
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.default_threshold = default_threshold
+        self.endpoint_thresholds = dict(
+            DEFAULT_ENDPOINT_THRESHOLDS
+            if endpoint_thresholds is None
+            else endpoint_thresholds
+        )
+        self.exact_endpoints = frozenset(
+            DEFAULT_EXACT_ENDPOINTS if exact_endpoints is None else exact_endpoints
+        )
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[str, CachedPrompt]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = defaultdict(set)
+        self._exact: Dict[Tuple[str, str], str] = {}
+        self._signature_memo: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self.audit_log: Deque[SemanticCacheDecision] = deque(maxlen=audit_size)
+        # Instance partagée par les sessions du processus (get_api_cost_optimizer)
+        self._lock = threading.RLock()
+
+        self._stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"lookups": 0, "hits": 0, "cost_saved_usd": 0.0}
+        )
+
+    # ------------------------------------------------------------------
+    # Signatures et index LSH
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _prompt_hash(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _signature(self, prompt_hash: str, prompt: str) -> Tuple[int, ...]:
+        """Signature mémorisée (lookup puis store sur le même prompt)."""
+        signature = self._signature_memo.get(prompt_hash)
+        if signature is None:
+            signature = self.hasher.signature(prompt)
+            self._signature_memo[prompt_hash] = signature
+            if len(self._signature_memo) > 256:
+                self._signature_memo.popitem(last=False)
+        return signature
+
+    def _band_keys(
+        self, endpoint: str, signature: Tuple[int, ...]
+    ) -> List[Tuple[str, int, Tuple[int, ...]]]:
+        rows = self.rows_per_band
+        return [
+            (endpoint, band, signature[band * rows : (band + 1) * rows])
+            for band in range(self.bands)
+        ]
+
+    def threshold_for(self, endpoint: str) -> float:
+        if endpoint in self.exact_endpoints:
+            return 1.0
+        return self.endpoint_thresholds.get(endpoint, self.default_threshold)
+
+    # ------------------------------------------------------------------
+    # Recherche
+    # ------------------------------------------------------------------
+
+    def probe(self, prompt: str, endpoint: str) -> SemanticCacheProbe:
+        """Recherche MinHash/LSH du meilleur candidat, sans statistiques ni audit.
+
+        Le résultat peut être passé à `peek` puis à `lookup` pour ne signer et
+        parcourir les bandes LSH qu'une seule fois par requête.
+        """
+        with self._lock:
+            return SemanticCacheProbe(*self._best_match(prompt, endpoint))
+
+    def _best_match(
+        self, prompt: str, endpoint: str
+    ) -> Tuple[str, Optional[CachedPrompt], float, int]:
+        prompt_hash = self._prompt_hash(prompt)
+        if endpoint in self.exact_endpoints:
+            return self._exact_match(prompt_hash, prompt, endpoint)
+
+        signature = self._signature(prompt_hash, prompt)
+
+        candidates: Set[str] = set()
+        for key in self._band_keys(endpoint, signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        best: Optional[CachedPrompt] = None
+        best_similarity = 0.0
+        now = time.time()
+        for candidate_hash in candidates:
+            entry = self._entries.get(candidate_hash)
+            if entry is None or now - entry.created_at > self.ttl_seconds:
+                continue
+            similarity = MinHasher.similarity(signature, entry.signature)
+            if similarity > best_similarity:
+                best, best_similarity = entry, similarity
+
+        return prompt_hash, best, best_similarity, len(candidates)
+
+    def _exact_match(
+        self, prompt_hash: str, prompt: str, endpoint: str
+    ) -> Tuple[str, Optional[CachedPrompt], float, int]:
+        """Recherche stricte pour les endpoints aux réponses personnelles."""
+        matched_hash = self._exact.get((endpoint, normalized_prompt_hash(prompt)))
+        entry = self._entries.get(matched_hash) if matched_hash else None
+        if entry is None or time.time() - entry.created_at > self.ttl_seconds:
+            return prompt_hash, None, 0.0, 0
+        return prompt_hash, entry, 1.0, 1
+
+    def peek(
+        self,
+        prompt: str,
+        endpoint: str,
+        threshold: Optional[float] = None,
+        probe: Optional[SemanticCacheProbe] = None,
+    ) -> bool:
+        """Indique si un prompt similaire est en cache (sans statistiques ni audit)."""
+        threshold = self._effective_threshold(endpoint, threshold)
+        if probe is None:
+            probe = self.probe(prompt, endpoint)
+        return probe.best is not None and probe.similarity >= threshold
+
+    def lookup(
+        self,
+        prompt: str,
+        endpoint: str,
+        threshold: Optional[float] = None,
+        probe: Optional[SemanticCacheProbe] = None,
+    ) -> Optional[SemanticCacheMatch]:
+        """Cherche une réponse pour un prompt similaire, décision auditée."""
+        threshold = self._effective_threshold(endpoint, threshold)
+        if probe is None:
+            probe = self.probe(prompt, endpoint)
+        with self._lock:
+            return self._record_lookup(endpoint, threshold, probe)
+
+    def _record_lookup(
+        self, endpoint: str, threshold: float, probe: SemanticCacheProbe
+    ) -> Optional[SemanticCacheMatch]:
+        prompt_hash, best, similarity, candidates = (
+            probe.prompt_hash, probe.best, probe.similarity, probe.candidates
+        )
+
+        stats = self._stats[endpoint]
+        stats["lookups"] += 1
+
+        # Entrée évincée depuis la sonde (écriture d'une autre session)
+        if best is not None and self._entries.get(best.prompt_hash) is not best:
+            best, similarity = None, 0.0
+
+        if best is None:
+            decision = "miss"
+        elif similarity < threshold:
+            decision = "below_threshold"
+        else:
+            decision = "hit"
+
+        self._audit(
+            SemanticCacheDecision(
+                timestamp=datetime.now().isoformat(),
+                endpoint=endpoint,
+                prompt_hash=prompt_hash[:16],
+                decision=decision,
+                similarity=round(similarity, 4),
+                threshold=threshold,
+                matched_prompt_hash=best.prompt_hash[:16] if best else None,
+                candidates=candidates,
+            )
+        )
+
+        if decision != "hit":
+            return None
+
+        best.hits += 1
+        self._entries.move_to_end(best.prompt_hash)
+        stats["hits"] += 1
+        stats["cost_saved_usd"] += best.cost_usd
+
+        return SemanticCacheMatch(
+            response=best.response,
+            similarity=similarity,
+            matched_prompt_hash=best.prompt_hash,
+            cost_saved_usd=best.cost_usd,
+        )
+
+    def _effective_threshold(self, endpoint: str, threshold: Optional[float]) -> float:
+        # Un seuil explicite ne peut pas assouplir un endpoint à correspondance stricte
+        if threshold is None or endpoint in self.exact_endpoints:
+            return self.threshold_for(endpoint)
+        return threshold
+
+    def _audit(self, decision: SemanticCacheDecision) -> None:
+        self.audit_log.append(decision)
+        self.logger.info(f"Semantic cache decision: {asdict(decision)}")
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def store(
+        self, prompt: str, endpoint: str, response: str, cost_usd: float = 0.0
+    ) -> None:
+        """Met en cache la réponse générée pour un prompt."""
+        if not response:
+            return
+        with self._lock:
+            self._insert(prompt, endpoint, response, cost_usd)
+
+    def _insert(
+        self, prompt: str, endpoint: str, response: str, cost_usd: float
+    ) -> None:
+        prompt_hash = self._prompt_hash(prompt)
+        if prompt_hash in self._entries:
+            self._remove(prompt_hash)
+
+        exact = endpoint in self.exact_endpoints
+        entry = CachedPrompt(
+            prompt_hash=prompt_hash,
+            endpoint=endpoint,
+            signature=() if exact else self._signature(prompt_hash, prompt),
+            response=response,
+            cost_usd=cost_usd,
+            normalized_hash=normalized_prompt_hash(prompt) if exact else "",
+        )
+        self._entries[prompt_hash] = entry
+        if exact:
+            self._exact[(endpoint, entry.normalized_hash)] = prompt_hash
+        else:
+            for key in self._band_keys(endpoint, entry.signature):
+                self._buckets[key].add(prompt_hash)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, prompt_hash: str) -> None:
+        entry = self._entries.pop(prompt_hash)
+        if entry.normalized_hash:
+            exact_key = (entry.endpoint, entry.normalized_hash)
+            if self._exact.get(exact_key) == prompt_hash:
+                del self._exact[exact_key]
+            return
+        for key in self._band_keys(entry.endpoint, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(prompt_hash)
+                if not bucket:
+                    del self._buckets[key]
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def get_report(self) -> Dict[str, Any]:
+        """Taux de hit et coûts évités, global et par endpoint."""
+        with self._lock:
+            return self._build_report()
+
+    def _build_report(self) -> Dict[str, Any]:
+        by_endpoint = {}
+        for endpoint, stats in self._stats.items():
+            by_endpoint[endpoint] = {
+                "lookups": int(stats["lookups"]),
+                "hits": int(stats["hits"]),
+                "hit_rate": stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0,
+                "cost_saved_usd": round(stats["cost_saved_usd"], 6),
+                "threshold": self.threshold_for(endpoint),
+            }
+
+        lookups = sum(s["lookups"] for s in by_endpoint.values())
+        hits = sum(s["hits"] for s in by_endpoint.values())
+        return {
+            "entries": len(self._entries),
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "cost_saved_usd": round(
+                sum(s["cost_saved_usd"] for s in by_endpoint.values()), 6
+            ),
+            "by_endpoint": by_endpoint,
+        }
+
+    def get_audit_log(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Dernières décisions de cache (plus récentes en dernier)."""
+        return [asdict(decision) for decision in list(self.audit_log)[-limit:]]
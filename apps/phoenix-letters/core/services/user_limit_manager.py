@@ -8,7 +8,8 @@ from datetime import datetime
 from typing import Optional
 
 from core.entities.letter import UserTier
-from shared.exceptions.specific_exceptions import ValidationError
+from phoenix_rate_limit import RateLimiter
+from shared.exceptions.specific_exceptions import RateLimitError, ValidationError
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +28,16 @@ class UserLimitManager:
     # Configuration
     FREE_MONTHLY_LIMIT = 2
 
-    def __init__(self, session_manager):
+    def __init__(self, session_manager, rate_limiter: Optional[RateLimiter] = None):
         """
         Initialise le gestionnaire de limites.
 
         Args:
             session_manager: Gestionnaire de session Streamlit
+            rate_limiter: Limiteur de débit par tier (None = pas de limite de débit)
         """
         self._session_manager = session_manager
+        self._rate_limiter = rate_limiter
         self._lock = threading.RLock()  # Réentrant lock pour sécurité
         logger.info("UserLimitManager initialized")
 
@@ -121,6 +124,25 @@ class UserLimitManager:
             },
         )
 
+    def check_request_rate(self, user_tier: UserTier, user_id: str) -> None:
+        """
+        Vérifie le débit de générations de l'utilisateur (quota par tier).
+
+        Raises:
+            RateLimitError: Si le débit autorisé est dépassé
+        """
+        if self._rate_limiter is None:
+            return
+        result = self._rate_limiter.hit(user_id, tier=user_tier)
+        if not result.allowed:
+            logger.warning(
+                f"Request rate exceeded for user {user_id}",
+                extra={"user_tier": user_tier.value, "retry_after": result.retry_after},
+            )
+            raise RateLimitError(
+                f"Trop de générations rapprochées. Réessayez dans {int(result.retry_after) + 1} secondes."
+            )
+
     def increment_generation_count(self, user_tier: UserTier, user_id: str) -> None:
         """
         Incrémente le compteur de génération après succès.
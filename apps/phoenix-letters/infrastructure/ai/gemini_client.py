@@ -1,8 +1,8 @@
 """Client Google Gemini optimisé avec batch processing et caching intelligent."""
 
+import asyncio
 import logging
-import time
-from typing import Any, Dict, Optional, List, Tuple
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 
@@ -11,9 +11,14 @@ import google.generativeai as genai
 from config.settings import Settings, ConfigurationError
 from core.entities.letter import UserTier
 from core.services.solidarity_ecological_fund import phoenix_solidarity_fund
+from infrastructure.ai.gemini_response_cache import (
+    CoalescedCallAbandoned,
+    GeminiResponseCache,
+)
+from infrastructure.ai.tier_priority_limiter import gemini_concurrency_limiter
 from infrastructure.monitoring.phoenix_green_metrics import phoenix_green_metrics
 from shared.exceptions.specific_exceptions import AIServiceError, RateLimitError
-from shared.interfaces.ai_interface import AIServiceInterface
+from shared.interfaces.ai_interface import AIServiceInterface, AsyncAIServiceInterface
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 logger = logging.getLogger(__name__)
@@ -28,27 +33,26 @@ class BatchRequest:
     feature_used: Optional[str] = None
     request_id: str = None
 
-@dataclass
-class CacheEntry:
-    """Entrée de cache optimisée."""
-    content: str
-    timestamp: float
-    user_tier: str
-    ttl: int = 3600  # 1 heure par défaut
-
 
-class GeminiClient(AIServiceInterface):
+class GeminiClient(AIServiceInterface, AsyncAIServiceInterface):
     """✅ Client optimisé pour Google Gemini AI avec batch processing."""
 
-    def __init__(self, settings: Optional[Settings] = None):
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        response_cache: Optional[GeminiResponseCache] = None,
+    ):
         """Initialise le client Gemini avec optimisations."""
         # Permet d'initialiser sans accès env en tests en injectant Settings
         self.settings = settings or Settings()
-        self._cache: Dict[str, CacheEntry] = {}
+        # Cache partagé entre sessions si injecté (voir get_gemini_response_cache)
+        self._response_cache = response_cache or GeminiResponseCache()
+        self._coalesce_timeout = 60.0
         self._batch_queue: List[BatchRequest] = []
         self._max_batch_size = 5
         self._batch_timeout = 2.0  # secondes
         self._executor = ThreadPoolExecutor(max_workers=3)
+        self._stream_attempts = 3
         
         try:
             # Gestion explicite de la clé API pour les tests: si absente, lever une erreur claire
@@ -61,47 +65,32 @@ class GeminiClient(AIServiceInterface):
             logger.error(f"Failed to initialize Gemini client: {e}")
             raise AIServiceError(f"Impossible d'initialiser le client IA: {e}")
 
-    def _get_cache_key(self, prompt: str, user_tier: UserTier, max_tokens: int, temperature: float) -> str:
-        """Génère clé de cache optimisée."""
-        prompt_hash = hash(f"{prompt}{user_tier.value}{max_tokens}{temperature}")
-        return f"gemini_{prompt_hash}"
-    
-    def _get_from_cache(self, cache_key: str) -> Optional[str]:
-        """Récupère du cache intelligent."""
-        if cache_key not in self._cache:
-            return None
-        
-        entry = self._cache[cache_key]
-        if time.time() - entry.timestamp > entry.ttl:
-            del self._cache[cache_key]
-            return None
-        
-        return entry.content
-    
-    def _set_cache(self, cache_key: str, content: str, user_tier: UserTier) -> None:
-        """Met en cache avec TTL adaptatif."""
-        # TTL plus long pour premium
-        ttl = 7200 if user_tier == UserTier.PREMIUM else 3600
-        
-        self._cache[cache_key] = CacheEntry(
-            content=content,
-            timestamp=time.time(),
-            user_tier=user_tier.value,
-            ttl=ttl
-        )
-        
-        # Nettoyer le cache si trop volumineux
-        if len(self._cache) > 100:
-            self._cleanup_cache()
-    def _cleanup_cache(self) -> None:
-        """Nettoie le cache des entrées expirées."""
-        now = time.time()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if now - entry.timestamp > entry.ttl
-        ]
-        for key in expired_keys:
-            del self._cache[key]
+    def _wait_coalesced(self, cache_args: tuple) -> Optional[str]:
+        """
+        Attend un appel identique déjà en cours (None si l'appelant doit
+        interroger Gemini lui-même : il devient alors le meneur).
+        """
+        while True:
+            future, leader = self._response_cache.begin(*cache_args)
+            if leader:
+                return None
+            try:
+                return future.result(timeout=self._coalesce_timeout)
+            except CoalescedCallAbandoned:
+                continue
+
+    async def _wait_coalesced_async(self, cache_args: tuple) -> Optional[str]:
+        """Équivalent asynchrone de _wait_coalesced."""
+        while True:
+            future, leader = self._response_cache.begin(*cache_args)
+            if leader:
+                return None
+            try:
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(future), timeout=self._coalesce_timeout
+                )
+            except CoalescedCallAbandoned:
+                continue
     
     @retry(
         stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10)
@@ -145,9 +134,11 @@ class GeminiClient(AIServiceInterface):
                 if len(prompt) > 100000:
                     raise AIServiceError("Prompt trop long (max 100k caractères)")
 
-                # ✅ Cache optimisé
-                cache_key = self._get_cache_key(prompt, user_tier, max_tokens, temperature)
-                cached_content = self._get_from_cache(cache_key)
+                # ✅ Cache puis appel identique déjà en cours
+                cache_args = (prompt, user_tier, max_tokens, temperature)
+                cached_content = self._response_cache.get(*cache_args)
+                if not cached_content:
+                    cached_content = self._wait_coalesced(cache_args)
                 
                 if cached_content:
                     logger.info(f"✅ Cache hit for {user_tier.value} user")
@@ -165,21 +156,27 @@ class GeminiClient(AIServiceInterface):
 
                 # ✅ Génération optimisée avec timeout adaptatif
                 timeout = 45 if user_tier == UserTier.PREMIUM else 30
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config=generation_config,
-                    request_options={"timeout": timeout},
-                )
-
-                if not response.text:
-                    raise AIServiceError("Réponse vide du service IA")
-
-                # Validation de la réponse
-                if len(response.text) < 50:
-                    raise AIServiceError("Réponse trop courte du service IA")
-
-                # ✅ Mise en cache intelligent
-                self._set_cache(cache_key, response.text, user_tier)
+                try:
+                    with gemini_concurrency_limiter.slot(user_tier):
+                        response = self.model.generate_content(
+                            prompt,
+                            generation_config=generation_config,
+                            request_options={"timeout": timeout},
+                        )
+
+                    if not response.text:
+                        raise AIServiceError("Réponse vide du service IA")
+
+                    # Validation de la réponse
+                    if len(response.text) < 50:
+                        raise AIServiceError("Réponse trop courte du service IA")
+                except BaseException as e:
+                    # Les appels en attente reçoivent la même erreur
+                    self._response_cache.fail(*cache_args, e)
+                    raise
+
+                # ✅ Mise en cache + réponse transmise aux appels en attente
+                self._response_cache.complete(*cache_args, response.text)
 
                 # 🌱 Enregistrement de la réponse
                 tracker.record_response(response.text, from_cache=False)
@@ -220,61 +217,211 @@ class GeminiClient(AIServiceInterface):
                 logger.error(f"Unexpected error in content generation: {e}")
                 raise AIServiceError(f"Erreur inattendue du service IA: {e}")
     
+    async def stream_content(
+        self,
+        prompt: str,
+        user_tier: UserTier,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        feature_used: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        ✅ Génération en streaming : les fragments sont produits dès leur réception.
+
+        Le slot du limiteur global est tenu pendant tout le flux. Les erreurs
+        transitoires sont réessayées tant qu'aucun fragment n'a été émis.
+
+        Raises:
+            AIServiceError: En cas d'erreur de génération
+            RateLimitError: En cas de limite de débit atteinte
+        """
+        if not prompt or len(prompt) < 10:
+            raise AIServiceError("Prompt trop court ou vide")
+
+        if len(prompt) > 100000:
+            raise AIServiceError("Prompt trop long (max 100k caractères)")
+
+        with phoenix_green_metrics.track_gemini_call(
+            user_tier.value, feature_used
+        ) as tracker:
+            tracker.record_request(prompt)
+
+            cache_args = (prompt, user_tier, max_tokens, temperature)
+            cached_content = self._response_cache.get(*cache_args)
+            if not cached_content:
+                cached_content = await self._wait_coalesced_async(cache_args)
+            if cached_content:
+                logger.info(f"✅ Cache hit for {user_tier.value} user (stream)")
+                tracker.record_first_token()
+                tracker.record_response(cached_content, from_cache=True)
+                yield cached_content
+                return
+
+            generation_config = self._get_generation_config(
+                user_tier, max_tokens, temperature
+            )
+            timeout = 45 if user_tier == UserTier.PREMIUM else 30
+            chunks: List[str] = []
+
+            try:
+                async with gemini_concurrency_limiter.async_slot(user_tier):
+                    for attempt in range(self._stream_attempts):
+                        try:
+                            response = await self.model.generate_content_async(
+                                prompt,
+                                generation_config=generation_config,
+                                stream=True,
+                                request_options={"timeout": timeout},
+                            )
+                            async for chunk in response:
+                                text = self._chunk_text(chunk)
+                                if not text:
+                                    continue
+                                tracker.record_first_token()
+                                chunks.append(text)
+                                yield text
+                            break
+
+                        except genai.types.BlockedPromptException:
+                            logger.warning("Prompt blocked by safety filters")
+                            raise AIServiceError("Contenu bloqué par les filtres de sécurité")
+
+                        except genai.types.StopCandidateException:
+                            logger.warning("Generation stopped by safety filters")
+                            raise AIServiceError(
+                                "Génération interrompue par les filtres de sécurité"
+                            )
+
+                        except Exception as e:
+                            tracker.record_retry()
+
+                            if "quota" in str(e).lower() or "rate limit" in str(e).lower():
+                                logger.error(f"Rate limit exceeded: {e}")
+                                raise RateLimitError(
+                                    "Limite de débit API atteinte. Veuillez réessayer plus tard."
+                                )
+
+                            # Après le premier fragment, un nouvel essai dupliquerait le texte affiché
+                            if chunks or attempt == self._stream_attempts - 1:
+                                logger.error(f"Unexpected error in streamed generation: {e}")
+                                raise AIServiceError(f"Erreur inattendue du service IA: {e}")
+
+                            await asyncio.sleep(min(4 * 2 ** attempt, 10))
+
+                content = "".join(chunks)
+                if not content:
+                    raise AIServiceError("Réponse vide du service IA")
+
+                if len(content) < 50:
+                    raise AIServiceError("Réponse trop courte du service IA")
+
+                self._response_cache.complete(*cache_args, content)
+            except (GeneratorExit, asyncio.CancelledError):
+                # Flux abandonné : les appels en attente interrogent Gemini eux-mêmes
+                self._response_cache.fail(*cache_args, CoalescedCallAbandoned())
+                raise
+            except BaseException as e:
+                self._response_cache.fail(*cache_args, e)
+                raise
+
+            tracker.record_response(content, from_cache=False)
+
+            phoenix_solidarity_fund.contribute_from_usage(
+                user_id=None,  # Anonyme pour RGPD
+                user_tier=user_tier.value,
+                trigger_event="letter_generation",
+            )
+
+            logger.info(
+                f"🌱💝 Content streamed for {user_tier.value} user "
+                f"(TTFT {tracker.time_to_first_token_ms} ms) - CO2 tracked + Fund contributed"
+            )
+
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Texte d'un fragment de flux (vide si le fragment ne contient pas de texte)."""
+        try:
+            return chunk.text or ""
+        except ValueError:
+            return ""
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        user_tier: UserTier,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        feature_used: Optional[str] = None,
+    ) -> str:
+        """✅ Version asynchrone de generate_content (agrège le flux)."""
+        chunks = [
+            chunk
+            async for chunk in self.stream_content(
+                prompt, user_tier, max_tokens, temperature, feature_used
+            )
+        ]
+        return "".join(chunks).strip()
+
     def generate_batch(
         self, 
         requests: List[BatchRequest]
     ) -> List[Tuple[str, Optional[str]]]:
-        """✅ Génération batch optimisée pour multiple prompts."""
+        """✅ Génération batch : toutes les requêtes sont soumises d'emblée, le pool reste plein."""
         if not requests:
             return []
         
-        results = []
-        
-        # Traiter par chunks pour éviter les timeouts
-        chunk_size = min(self._max_batch_size, len(requests))
-        
-        for i in range(0, len(requests), chunk_size):
-            chunk = requests[i:i + chunk_size]
-            
-            # Traitement parallèle du chunk
-            chunk_futures = []
-            for req in chunk:
-                future = self._executor.submit(
+        futures = [
+            (
+                req.request_id or f"req_{index}",
+                self._executor.submit(
                     self.generate_content,
                     req.prompt,
                     req.user_tier,
                     req.max_tokens,
                     req.temperature,
                     req.feature_used
-                )
-                chunk_futures.append((req.request_id or f"req_{i}", future))
-            
-            # Collecter les résultats
-            for req_id, future in chunk_futures:
-                try:
-                    result = future.result(timeout=60)
-                    results.append((req_id, result))
-                except Exception as e:
-                    logger.error(f"Batch request {req_id} failed: {e}")
-                    results.append((req_id, None))
+                ),
+            )
+            for index, req in enumerate(requests)
+        ]
+        
+        results = []
+        for req_id, future in futures:
+            try:
+                results.append((req_id, future.result(timeout=60)))
+            except Exception as e:
+                logger.error(f"Batch request {req_id} failed: {e}")
+                results.append((req_id, None))
         
         logger.info(f"✅ Batch processing completed: {len(results)} requests")
         return results
+
+    async def generate_batch_async(
+        self,
+        requests: List[BatchRequest]
+    ) -> List[Tuple[str, Optional[str]]]:
+        """✅ Génération batch asynchrone, concurrence bornée par le limiteur global."""
+        if not requests:
+            return []
+
+        async def run(index: int, req: BatchRequest) -> Tuple[str, Optional[str]]:
+            req_id = req.request_id or f"req_{index}"
+            try:
+                content = await self.generate_content_async(
+                    req.prompt, req.user_tier, req.max_tokens, req.temperature, req.feature_used
+                )
+                return req_id, content
+            except Exception as e:
+                logger.error(f"Batch request {req_id} failed: {e}")
+                return req_id, None
+
+        results = await asyncio.gather(*(run(i, req) for i, req in enumerate(requests)))
+        logger.info(f"✅ Async batch processing completed: {len(results)} requests")
+        return list(results)
     
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Retourne les statistiques du cache."""
-        now = time.time()
-        valid_entries = sum(
-            1 for entry in self._cache.values()
-            if now - entry.timestamp <= entry.ttl
-        )
-        
-        return {
-            "total_entries": len(self._cache),
-            "valid_entries": valid_entries,
-            "expired_entries": len(self._cache) - valid_entries,
-            "cache_hit_potential": valid_entries / max(len(self._cache), 1)
-        }
+        """Retourne les statistiques du cache (taille, taux de hit, appels partagés)."""
+        return self._response_cache.get_stats()
 
     def _get_generation_config(
         self, user_tier: UserTier, max_tokens: int, temperature: float
@@ -0,0 +1,296 @@
+"""Cache des réponses Gemini : LRU bornée en octets, clé stable et coalescence des appels."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+from core.entities.letter import UserTier
+
+logger = logging.getLogger(__name__)
+
+# Cache partagé (packages/phoenix-shared-ai), optionnel
+try:
+    from phoenix_shared_ai.services import CachePriority, get_cache_optimizer
+except ImportError:
+    CachePriority = None
+    get_cache_optimizer = None
+
+MODEL_NAME = "gemini-1.5-flash"
+
+
+class CoalescedCallAbandoned(Exception):
+    """L'appel partagé a été interrompu avant de produire une réponse."""
+
+
+class GeminiResponseCache:
+    """
+    ✅ Cache de réponses Gemini partagé entre sessions.
+
+    - Clé SHA-256 stable entre processus et redémarrages (pas de hash() salé)
+    - LRU bornée en octets avec TTL par tier
+    - Coalescence : des prompts identiques simultanés partagent un seul appel
+    - Niveau optionnel adossé au GeminiCacheOptimizer partagé
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, shared_cache: Any = None):
+        self.max_bytes = max_bytes
+        self.shared_cache = shared_cache
+
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._size_bytes = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Clés et TTL
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(
+        prompt: str, user_tier: UserTier, max_tokens: int, temperature: float
+    ) -> str:
+        """Clé déterministe d'une requête de génération."""
+        payload = json.dumps(
+            {
+                "model": MODEL_NAME,
+                "prompt": prompt,
+                "user_tier": user_tier.value,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return f"gemini_{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def ttl_for(user_tier: UserTier) -> int:
+        # TTL plus long pour premium
+        return 7200 if user_tier == UserTier.PREMIUM else 3600
+
+    # ------------------------------------------------------------------
+    # Lecture / écriture
+    # ------------------------------------------------------------------
+
+    def get(
+        self, prompt: str, user_tier: UserTier, max_tokens: int, temperature: float
+    ) -> Optional[str]:
+        """Réponse en cache (local puis partagé), None sinon."""
+        key = self.make_key(prompt, user_tier, max_tokens, temperature)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                content, expires_at, _ = entry
+                if time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return content
+                self._remove(key)
+
+        content = self._get_shared(prompt, user_tier, max_tokens, temperature)
+        with self._lock:
+            if content is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["shared_hits"] += 1
+            self._store(key, content, self.ttl_for(user_tier))
+        return content
+
+    def set(
+        self,
+        prompt: str,
+        user_tier: UserTier,
+        max_tokens: int,
+        temperature: float,
+        content: str,
+    ) -> None:
+        key = self.make_key(prompt, user_tier, max_tokens, temperature)
+        ttl = self.ttl_for(user_tier)
+        with self._lock:
+            self._store(key, content, ttl)
+        self._set_shared(prompt, user_tier, max_tokens, temperature, content, ttl)
+
+    def _store(self, key: str, content: str, ttl: int) -> None:
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (content, time.time() + ttl, size)
+        self._size_bytes += size
+        while self._size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size_bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Niveau partagé (GeminiCacheOptimizer)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _shared_args(user_tier: UserTier, max_tokens: int, temperature: float):
+        user_data = {"app": "phoenix-letters", "user_tier": user_tier.value}
+        model_config = {"model": MODEL_NAME, "max_tokens": max_tokens, "temperature": temperature}
+        return user_data, model_config
+
+    def _get_shared(self, prompt, user_tier, max_tokens, temperature) -> Optional[str]:
+        if self.shared_cache is None:
+            return None
+        user_data, model_config = self._shared_args(user_tier, max_tokens, temperature)
+        try:
+            return self.shared_cache.get(prompt, user_data, model_config)
+        except Exception as e:
+            logger.warning(f"Shared Gemini cache read failed: {e}")
+            return None
+
+    def _set_shared(self, prompt, user_tier, max_tokens, temperature, content, ttl) -> None:
+        if self.shared_cache is None:
+            return
+        user_data, model_config = self._shared_args(user_tier, max_tokens, temperature)
+        kwargs = {"ttl": ttl}
+        if CachePriority is not None:
+            kwargs["priority"] = (
+                CachePriority.HIGH if user_tier == UserTier.PREMIUM else CachePriority.MEDIUM
+            )
+        try:
+            self.shared_cache.set(prompt, user_data, content, model_config, **kwargs)
+        except Exception as e:
+            logger.warning(f"Shared Gemini cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Coalescence des appels identiques
+    # ------------------------------------------------------------------
+
+    def begin(
+        self, prompt: str, user_tier: UserTier, max_tokens: int, temperature: float
+    ) -> Tuple[Future, bool]:
+        """
+        Inscrit un appel en cours pour cette requête.
+
+        Returns:
+            (future, leader) - leader=True si l'appelant doit interroger Gemini
+            puis appeler complete()/fail() ; sinon attendre le future.
+        """
+        key = self.make_key(prompt, user_tier, max_tokens, temperature)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def complete(
+        self,
+        prompt: str,
+        user_tier: UserTier,
+        max_tokens: int,
+        temperature: float,
+        content: str,
+    ) -> None:
+        """Met en cache la réponse et la transmet aux appels en attente."""
+        self.set(prompt, user_tier, max_tokens, temperature, content)
+        self._finish(prompt, user_tier, max_tokens, temperature, result=content)
+
+    def fail(
+        self,
+        prompt: str,
+        user_tier: UserTier,
+        max_tokens: int,
+        temperature: float,
+        error: BaseException,
+    ) -> None:
+        """Transmet l'échec aux appels en attente."""
+        self._finish(prompt, user_tier, max_tokens, temperature, error=error)
+
+    def _finish(self, prompt, user_tier, max_tokens, temperature, result=None, error=None):
+        key = self.make_key(prompt, user_tier, max_tokens, temperature)
+        with self._lock:
+            future = self._in_flight.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    # ------------------------------------------------------------------
+    # Statistiques
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            valid_entries = sum(
+                1 for _, expires_at, _ in self._entries.values() if now < expires_at
+            )
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+            served = stats["hits"] + stats["shared_hits"] + stats["coalesced"]
+            return {
+                "total_entries": len(self._entries),
+                "valid_entries": valid_entries,
+                "expired_entries": len(self._entries) - valid_entries,
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "in_flight": len(self._in_flight),
+                **stats,
+                "lookups": lookups,
+                "hit_rate": round((stats["hits"] + stats["shared_hits"]) / lookups, 4)
+                if lookups
+                else 0.0,
+                # Requêtes servies sans appel Gemini (cache ou appel partagé)
+                "calls_saved_rate": round(served / (lookups + stats["coalesced"]), 4)
+                if lookups
+                else 0.0,
+                "shared_cache_enabled": self.shared_cache is not None,
+            }
+
+
+_response_cache: Optional[GeminiResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_gemini_response_cache() -> GeminiResponseCache:
+    """
+    Instance partagée par les clients Gemini du processus.
+
+    GEMINI_RESPONSE_CACHE_MB borne la mémoire ; GEMINI_SHARED_CACHE_ENABLED=true
+    ajoute le GeminiCacheOptimizer partagé (packages/phoenix-shared-ai) comme second niveau.
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            shared_cache = None
+            if os.getenv("GEMINI_SHARED_CACHE_ENABLED", "false").lower() == "true":
+                if get_cache_optimizer is not None:
+                    shared_cache = get_cache_optimizer()
+                else:
+                    logger.warning("GeminiCacheOptimizer non disponible - cache local uniquement")
+            _response_cache = GeminiResponseCache(
+                max_bytes=int(os.getenv("GEMINI_RESPONSE_CACHE_MB", "32")) * 1024 * 1024,
+                shared_cache=shared_cache,
+            )
+        return _response_cache
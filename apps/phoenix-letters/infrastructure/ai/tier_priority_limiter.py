@@ -0,0 +1,183 @@
+"""Limiteur de concurrence global des appels Gemini, avec priorité par tier."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional
+
+from core.entities.letter import UserTier
+
+logger = logging.getLogger(__name__)
+
+# Plus la valeur est basse, plus la requête est servie tôt
+TIER_PRIORITIES: Dict[UserTier, int] = {
+    UserTier.PREMIUM: 0,
+    UserTier.FREE: 1,
+}
+
+
+class _Waiter:
+    """Requête en attente d'un slot (thread bloqué ou coroutine)."""
+
+    __slots__ = ("event", "loop", "future", "granted", "cancelled")
+
+    def __init__(
+        self,
+        event: Optional[threading.Event] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        future: Optional[asyncio.Future] = None,
+    ):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+        self.cancelled = False
+
+    def notify(self) -> bool:
+        """Réveille le demandeur, retourne False si sa boucle n'existe plus."""
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+            return True
+        except RuntimeError:  # Boucle fermée
+            return False
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class TierPriorityLimiter:
+    """
+    ✅ Sémaphore partagé par tous les threads et boucles asyncio du processus.
+
+    Les slots libérés sont attribués au demandeur du tier le plus prioritaire
+    (PREMIUM avant FREE), puis par ordre d'arrivée.
+    """
+
+    def __init__(self, max_concurrency: int = 8):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency doit être >= 1")
+        self.max_concurrency = max_concurrency
+        self._available = max_concurrency
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "queued": 0, "total_wait_ms": 0.0}
+
+    @staticmethod
+    def priority_for(user_tier: UserTier) -> int:
+        return TIER_PRIORITIES.get(user_tier, max(TIER_PRIORITIES.values()))
+
+    def _try_acquire(self, user_tier: UserTier, waiter: _Waiter) -> bool:
+        """Prend un slot libre ou inscrit le demandeur dans la file (sous verrou)."""
+        if self._available > 0 and not self._waiters:
+            self._available -= 1
+            self._stats["acquired"] += 1
+            return True
+        heapq.heappush(
+            self._waiters, (self.priority_for(user_tier), next(self._sequence), waiter)
+        )
+        self._stats["queued"] += 1
+        return False
+
+    def _record_wait(self, started: float) -> None:
+        with self._lock:
+            self._stats["acquired"] += 1
+            self._stats["total_wait_ms"] += (time.perf_counter() - started) * 1000
+
+    def acquire(self, user_tier: UserTier, timeout: Optional[float] = None) -> bool:
+        """Acquisition bloquante (code synchrone)."""
+        waiter = _Waiter(event=threading.Event())
+        with self._lock:
+            if self._try_acquire(user_tier, waiter):
+                return True
+
+        started = time.perf_counter()
+        if waiter.event.wait(timeout):
+            self._record_wait(started)
+            return True
+
+        with self._lock:
+            if not waiter.granted:
+                waiter.cancelled = True
+                return False
+        # Slot attribué pendant l'expiration du délai
+        self._record_wait(started)
+        return True
+
+    async def acquire_async(self, user_tier: UserTier) -> None:
+        """Acquisition non bloquante pour la boucle asyncio courante."""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop=loop, future=loop.create_future())
+        with self._lock:
+            if self._try_acquire(user_tier, waiter):
+                return
+
+        started = time.perf_counter()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                waiter.cancelled = not granted
+            if granted:
+                self.release()
+            raise
+        self._record_wait(started)
+
+    def release(self) -> None:
+        """Libère un slot au profit du demandeur le plus prioritaire."""
+        with self._lock:
+            while self._waiters:
+                _, _, waiter = heapq.heappop(self._waiters)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                if waiter.notify():
+                    return
+                waiter.cancelled = True
+            self._available = min(self._available + 1, self.max_concurrency)
+
+    @contextmanager
+    def slot(self, user_tier: UserTier):
+        self.acquire(user_tier)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(self, user_tier: UserTier):
+        await self.acquire_async(user_tier)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting = [w for _, _, w in self._waiters if not w.cancelled]
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.max_concurrency - self._available,
+                "waiting": len(waiting),
+                "acquired": self._stats["acquired"],
+                "queued": self._stats["queued"],
+                "avg_wait_ms": round(
+                    self._stats["total_wait_ms"] / max(self._stats["acquired"], 1), 2
+                ),
+            }
+
+
+# Instance partagée par tous les clients Gemini du processus
+gemini_concurrency_limiter = TierPriorityLimiter(
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+)
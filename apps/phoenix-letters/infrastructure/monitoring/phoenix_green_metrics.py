@@ -60,6 +60,7 @@ class GeminiCallMetrics:
     model_version: str = "gemini-1.5-flash"
     feature_used: Optional[str] = None
     compression_ratio: Optional[float] = None
+    time_to_first_token_ms: Optional[int] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convertit en dictionnaire pour sérialisation."""
@@ -183,6 +184,7 @@ class PhoenixGreenMetrics:
             carbon_impact_level=impact_level,
             feature_used=tracker.feature_used,
             compression_ratio=tracker.compression_ratio,
+            time_to_first_token_ms=tracker.time_to_first_token_ms,
         )
 
     def _store_metrics(self, metrics: GeminiCallMetrics) -> None:
@@ -248,6 +250,11 @@ class PhoenixGreenMetrics:
         total_calls = len(daily_metrics)
         total_co2 = sum(m.estimated_co2_grams for m in daily_metrics)
         cache_hits = sum(1 for m in daily_metrics if m.cache_hit)
+        ttft_values = [
+            m.time_to_first_token_ms
+            for m in daily_metrics
+            if m.time_to_first_token_ms is not None and not m.cache_hit
+        ]
 
         stats = {
             # Métriques principales
@@ -260,6 +267,9 @@ class PhoenixGreenMetrics:
                 sum(m.response_time_ms for m in daily_metrics) / total_calls
             ),
             "total_tokens": sum(m.total_tokens for m in daily_metrics),
+            "avg_time_to_first_token_ms": (
+                round(sum(ttft_values) / len(ttft_values)) if ttft_values else None
+            ),
             # Impact distribution
             "impact_distribution": self._calculate_impact_distribution(daily_metrics),
             # Tendances
@@ -626,6 +636,7 @@ class GeminiCallTracker:
         self.cache_hit = False
         self.retry_count = 0
         self.compression_ratio: Optional[float] = None
+        self.time_to_first_token_ms: Optional[int] = None
 
         self._completed = False
 
@@ -651,6 +662,11 @@ class GeminiCallTracker:
 
         self._completed = True
 
+    def record_first_token(self) -> None:
+        """Enregistre le temps jusqu'au premier token (génération en streaming)."""
+        if self.time_to_first_token_ms is None:
+            self.time_to_first_token_ms = int((time.time() - self.start_time) * 1000)
+
     def record_retry(self) -> None:
         """Enregistre une tentative de retry."""
         self.retry_count += 1
@@ -0,0 +1,43 @@
+"""Limiteur de débit des générations, partagé par les sessions du processus."""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+from core.entities.letter import UserTier
+from phoenix_rate_limit import Quota, RateLimiter, create_rate_limiter_from_env
+
+logger = logging.getLogger(__name__)
+
+_generation_rate_limiter: Optional[RateLimiter] = None
+_generation_rate_limiter_lock = threading.Lock()
+
+
+def create_generation_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Limiteur de débit des générations par tier, ou None s'il est désactivé.
+
+    Configuration: LETTERS_RATE_LIMIT_FREE, LETTERS_RATE_LIMIT_PREMIUM
+    ("5/minute", "20/minute:40", "unlimited"). Backend Redis si
+    PHOENIX_RATE_LIMIT_REDIS_URL est défini (limites communes aux workers).
+    """
+    quotas = {}
+    for tier, default in ((UserTier.FREE, "5/minute"), (UserTier.PREMIUM, "20/minute")):
+        spec = os.getenv(f"LETTERS_RATE_LIMIT_{tier.name}", default)
+        quotas[tier] = None if spec.lower() == "unlimited" else Quota.parse(spec)
+    if all(quota is None for quota in quotas.values()):
+        return None
+    return create_rate_limiter_from_env("phoenix-letters", tier_quotas=quotas)
+
+
+def get_generation_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Instance partagée par les sessions Streamlit du processus : chaque rerun
+    reconstruit les services, le débit doit pourtant être compté au même endroit.
+    """
+    global _generation_rate_limiter
+    with _generation_rate_limiter_lock:
+        if _generation_rate_limiter is None:
+            _generation_rate_limiter = create_generation_rate_limiter()
+        return _generation_rate_limiter
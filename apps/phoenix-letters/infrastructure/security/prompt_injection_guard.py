@@ -1,11 +1,22 @@
 """Système de protection contre les injections de prompts."""
 
 import logging
+import os
 import re
+import sys
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List
 
+try:
+    from phoenix_scan import PatternScanner, ScanHit, ScanRule, literal_rules, regex_rules
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../packages'))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_scan import PatternScanner, ScanHit, ScanRule, literal_rules, regex_rules
+
 
 class ThreatLevel(Enum):
     """Niveaux de menace détectés."""
@@ -28,106 +39,130 @@ class InjectionDetection:
     blocked_content: List[str]
 
 
+# Patterns d'injection courantes
+INJECTION_PATTERNS = {
+    # Instructions de bypass
+    "bypass_instructions": [
+        r"ignore\s+(?:previous|above|all)\s+(?:instructions?|prompts?|rules?)",
+        r"forget\s+(?:everything|all|previous)",
+        r"disregard\s+(?:previous|above|all)",
+        r"override\s+(?:previous|system|default)",
+        r"new\s+(?:instruction|rule|system|prompt)",
+        r"change\s+(?:your|the)\s+(?:role|behavior|instruction)",
+        r"act\s+as\s+(?:if|a|an)\s+(?:different|new|admin|root)",
+    ],
+    # Tentatives d'extraction d'informations
+    "information_extraction": [
+        r"reveal\s+(?:your|the)\s+(?:prompt|instruction|system|secret)",
+        r"show\s+(?:me\s+)?(?:your|the)\s+(?:prompt|instruction|code)",
+        r"what\s+(?:are\s+)?your\s+(?:instruction|rule|prompt)",
+        r"repeat\s+(?:your|the)\s+(?:instruction|prompt|system)",
+        r"tell\s+me\s+(?:your|the)\s+(?:secret|key|password)",
+    ],
+    # Manipulation de rôle/personnalité
+    "role_manipulation": [
+        r"you\s+are\s+(?:now|actually|really)\s+(?:a|an)\s+\w+",
+        r"pretend\s+(?:to\s+be|you\s+are)",
+        r"roleplay\s+as",
+        r"simulate\s+(?:being|a|an)",
+        r"behave\s+(?:like|as)\s+(?:a|an)",
+        r"imagine\s+you\s+are\s+(?:a|an)",
+    ],
+    # Injections via contexte
+    "context_injection": [
+        r"---\s*(?:new|different|additional)\s+(?:context|prompt|instruction)",
+        r"###\s*(?:system|admin|override)",
+        r"\[(?:system|admin|override|new)\s*(?:message|prompt|instruction)",
+        r"<(?:system|admin|override)>",
+        r"```\s*(?:system|admin|new)",
+    ],
+    # Tentatives de jailbreak
+    "jailbreak_attempts": [
+        r"DAN\s+(?:mode|prompt)",
+        r"developer\s+mode",
+        r"jailbreak",
+        r"unrestricted\s+mode",
+        r"no\s+(?:filter|restriction|limit|safety)",
+        r"enable\s+(?:developer|admin|debug)\s+mode",
+    ],
+    # Manipulation de format de sortie
+    "output_manipulation": [
+        r"respond\s+(?:only\s+)?(?:with|in)\s+(?:json|xml|code|html)",
+        r"format\s+(?:your\s+)?response\s+as",
+        r"structure\s+(?:your\s+)?(?:answer|response)",
+        r"return\s+(?:only|just)\s+(?:the|a)\s+\w+",
+        r"output\s+(?:format|structure|template)",
+    ],
+}
+
+# Mots-clés suspects (pondérés par dangerosité)
+SUSPICIOUS_KEYWORDS = {
+    # Haute dangerosité
+    "admin": 0.8,
+    "root": 0.8,
+    "system": 0.7,
+    "override": 0.9,
+    "bypass": 0.9,
+    "jailbreak": 1.0,
+    "hack": 0.8,
+    "exploit": 0.8,
+    # Dangerosité moyenne
+    "ignore": 0.6,
+    "forget": 0.6,
+    "disregard": 0.6,
+    "pretend": 0.5,
+    "roleplay": 0.4,
+    "simulate": 0.4,
+    "imagine": 0.3,
+    # Surveillance (plus subtil)
+    "reveal": 0.5,
+    "show": 0.3,
+    "tell": 0.3,
+    "repeat": 0.4,
+    "secret": 0.6,
+    "hidden": 0.5,
+    "internal": 0.4,
+}
+
+# Caractères et patterns suspects
+SUSPICIOUS_CHARS = {
+    "multiple_newlines": r"\n{4,}",
+    "excessive_dashes": r"-{10,}",
+    "excessive_equals": r"={10,}",
+    "excessive_hashes": r"#{5,}",
+    "control_chars": r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]",
+    "unusual_unicode": r"[\u2000-\u200F\u2028-\u202F\u205F-\u206F]",
+}
+
+# Indices d'anomalie par contexte d'utilisation
+CONTEXT_ANOMALIES = {
+    # Un CV ne devrait pas contenir d'instructions système
+    "cv_upload": ["system", "admin", "override", "ignore"],
+}
+JOB_OFFER_ANOMALY = r"act\s+as|pretend|roleplay"
+
+# Toutes les règles compilées une fois : un seul scan par analyse
+_SCANNER = PatternScanner(
+    regex_rules(INJECTION_PATTERNS, re.IGNORECASE | re.MULTILINE)
+    + regex_rules({f"chars:{name}": [pattern] for name, pattern in SUSPICIOUS_CHARS.items()})
+    + literal_rules({"context:cv_upload": CONTEXT_ANOMALIES["cv_upload"]})
+    + [ScanRule(JOB_OFFER_ANOMALY, category="context:job_offer", flags=re.IGNORECASE)]
+)
+_RULE_ORDER = {rule: index for index, rule in enumerate(_SCANNER.rules)}
+SUSPICIOUS_CHAR_CATEGORIES = {f"chars:{name}" for name in SUSPICIOUS_CHARS}
+CONTEXT_CATEGORIES = {"context:cv_upload", "context:job_offer"}
+
+
 class PromptInjectionGuard:
     """Garde contre les injections de prompts et attaques adversariales."""
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
-        # Patterns d'injection courantes
-        self.injection_patterns = {
-            # Instructions de bypass
-            "bypass_instructions": [
-                r"ignore\s+(?:previous|above|all)\s+(?:instructions?|prompts?|rules?)",
-                r"forget\s+(?:everything|all|previous)",
-                r"disregard\s+(?:previous|above|all)",
-                r"override\s+(?:previous|system|default)",
-                r"new\s+(?:instruction|rule|system|prompt)",
-                r"change\s+(?:your|the)\s+(?:role|behavior|instruction)",
-                r"act\s+as\s+(?:if|a|an)\s+(?:different|new|admin|root)",
-            ],
-            # Tentatives d'extraction d'informations
-            "information_extraction": [
-                r"reveal\s+(?:your|the)\s+(?:prompt|instruction|system|secret)",
-                r"show\s+(?:me\s+)?(?:your|the)\s+(?:prompt|instruction|code)",
-                r"what\s+(?:are\s+)?your\s+(?:instruction|rule|prompt)",
-                r"repeat\s+(?:your|the)\s+(?:instruction|prompt|system)",
-                r"tell\s+me\s+(?:your|the)\s+(?:secret|key|password)",
-            ],
-            # Manipulation de rôle/personnalité
-            "role_manipulation": [
-                r"you\s+are\s+(?:now|actually|really)\s+(?:a|an)\s+\w+",
-                r"pretend\s+(?:to\s+be|you\s+are)",
-                r"roleplay\s+as",
-                r"simulate\s+(?:being|a|an)",
-                r"behave\s+(?:like|as)\s+(?:a|an)",
-                r"imagine\s+you\s+are\s+(?:a|an)",
-            ],
-            # Injections via contexte
-            "context_injection": [
-                r"---\s*(?:new|different|additional)\s+(?:context|prompt|instruction)",
-                r"###\s*(?:system|admin|override)",
-                r"\[(?:system|admin|override|new)\s*(?:message|prompt|instruction)",
-                r"<(?:system|admin|override)>",
-                r"```\s*(?:system|admin|new)",
-            ],
-            # Tentatives de jailbreak
-            "jailbreak_attempts": [
-                r"DAN\s+(?:mode|prompt)",
-                r"developer\s+mode",
-                r"jailbreak",
-                r"unrestricted\s+mode",
-                r"no\s+(?:filter|restriction|limit|safety)",
-                r"enable\s+(?:developer|admin|debug)\s+mode",
-            ],
-            # Manipulation de format de sortie
-            "output_manipulation": [
-                r"respond\s+(?:only\s+)?(?:with|in)\s+(?:json|xml|code|html)",
-                r"format\s+(?:your\s+)?response\s+as",
-                r"structure\s+(?:your\s+)?(?:answer|response)",
-                r"return\s+(?:only|just)\s+(?:the|a)\s+\w+",
-                r"output\s+(?:format|structure|template)",
-            ],
-        }
-
-        # Mots-clés suspects (pondérés par dangerosité)
-        self.suspicious_keywords = {
-            # Haute dangerosité
-            "admin": 0.8,
-            "root": 0.8,
-            "system": 0.7,
-            "override": 0.9,
-            "bypass": 0.9,
-            "jailbreak": 1.0,
-            "hack": 0.8,
-            "exploit": 0.8,
-            # Dangerosité moyenne
-            "ignore": 0.6,
-            "forget": 0.6,
-            "disregard": 0.6,
-            "pretend": 0.5,
-            "roleplay": 0.4,
-            "simulate": 0.4,
-            "imagine": 0.3,
-            # Surveillance (plus subtil)
-            "reveal": 0.5,
-            "show": 0.3,
-            "tell": 0.3,
-            "repeat": 0.4,
-            "secret": 0.6,
-            "hidden": 0.5,
-            "internal": 0.4,
-        }
-
-        # Caractères et patterns suspects
-        self.suspicious_chars = {
-            "multiple_newlines": r"\n{4,}",
-            "excessive_dashes": r"-{10,}",
-            "excessive_equals": r"={10,}",
-            "excessive_hashes": r"#{5,}",
-            "control_chars": r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]",
-            "unusual_unicode": r"[\u2000-\u200F\u2028-\u202F\u205F-\u206F]",
-        }
+        # Patterns partagés (compilés une fois au chargement du module)
+        self.injection_patterns = INJECTION_PATTERNS
+        self.suspicious_keywords = SUSPICIOUS_KEYWORDS
+        self.suspicious_chars = SUSPICIOUS_CHARS
 
     def analyze_input(
         self, user_input: str, context: str = "general"
@@ -149,27 +184,29 @@ class PromptInjectionGuard:
         # Normaliser input pour analyse
         normalized_input = self._normalize_input(user_input)
 
-        # 1. Détecter patterns d'injection
-        for category, patterns in self.injection_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(
-                    pattern, normalized_input, re.IGNORECASE | re.MULTILINE
-                )
-                for match in matches:
-                    detected_patterns.append(f"{category}: {match.group()}")
-                    threat_score += self._get_pattern_weight(category)
-                    blocked_content.append(match.group())
+        # Un seul scan : patterns d'injection, caractères suspects, indices contextuels
+        hits = _SCANNER.scan(normalized_input)
+
+        # 1. Détecter patterns d'injection (ordre des patterns, puis des positions)
+        injection_hits = sorted(
+            (hit for hit in hits if hit.category in INJECTION_PATTERNS),
+            key=lambda hit: (_RULE_ORDER[hit.rule], hit.start),
+        )
+        for hit in injection_hits:
+            detected_patterns.append(f"{hit.category}: {hit.text}")
+            threat_score += self._get_pattern_weight(hit.category)
+            blocked_content.append(hit.text)
 
         # 2. Analyser mots-clés suspects
         keyword_score = self._analyze_suspicious_keywords(normalized_input)
         threat_score += keyword_score
 
         # 3. Détecter caractères/formats suspects
-        char_score = self._analyze_suspicious_chars(normalized_input)
+        char_score = self._score_suspicious_chars(hits)
         threat_score += char_score
 
         # 4. Analyse contextuelle
-        context_score = self._analyze_context_anomalies(normalized_input, context)
+        context_score = self._score_context_anomalies(normalized_input, context, hits)
         threat_score += context_score
 
         # 5. Calculer niveau de menace
@@ -233,28 +270,36 @@ class PromptInjectionGuard:
 
     def _analyze_suspicious_chars(self, text: str) -> float:
         """Analyse caractères et formats suspects."""
-        score = 0.0
+        return self._score_suspicious_chars(_SCANNER.scan(text, SUSPICIOUS_CHAR_CATEGORIES))
 
-        for name, pattern in self.suspicious_chars.items():
-            matches = len(re.findall(pattern, text))
-            if matches > 0:
-                score += min(matches * 0.1, 0.3)
+    def _score_suspicious_chars(self, hits: List[ScanHit]) -> float:
+        """Score des caractères/formats suspects à partir des hits du scan."""
+        counts: Dict[str, int] = {}
+        for hit in hits:
+            if hit.category in SUSPICIOUS_CHAR_CATEGORIES:
+                counts[hit.category] = counts.get(hit.category, 0) + 1
 
+        score = sum(min(matches * 0.1, 0.3) for matches in counts.values())
         return min(score, 0.5)
 
     def _analyze_context_anomalies(self, text: str, context: str) -> float:
         """Analyse anomalies contextuelles."""
+        return self._score_context_anomalies(text, context, _SCANNER.scan(text, CONTEXT_CATEGORIES))
+
+    def _score_context_anomalies(self, text: str, context: str, hits: List[ScanHit]) -> float:
+        """Score des anomalies contextuelles à partir des hits du scan."""
         score = 0.0
+        categories = {hit.category for hit in hits}
 
         # Vérifications spécifiques au contexte
         if context == "cv_upload":
             # Un CV ne devrait pas contenir d'instructions système
-            if any(word in text for word in ["system", "admin", "override", "ignore"]):
+            if "context:cv_upload" in categories:
                 score += 0.4
 
         elif context == "job_offer":
             # Une offre d'emploi avec des instructions suspectes
-            if re.search(r"act\s+as|pretend|roleplay", text, re.IGNORECASE):
+            if "context:job_offer" in categories:
                 score += 0.3
 
         # Longueur anormale (très long = potentiellement malicieux)
@@ -287,12 +332,8 @@ class PromptInjectionGuard:
 
         sanitized = original_input
 
-        # Supprimer patterns détectés (approche conservative)
-        for category, patterns in self.injection_patterns.items():
-            for pattern in patterns:
-                sanitized = re.sub(
-                    pattern, "[CONTENU_FILTRÉ]", sanitized, flags=re.IGNORECASE
-                )
+        # Supprimer patterns détectés (approche conservative, dans l'ordre des patterns)
+        sanitized, _ = _SCANNER.sub(sanitized, "[CONTENU_FILTRÉ]", INJECTION_PATTERNS)
 
         # Supprimer caractères de contrôle
         sanitized = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", sanitized)
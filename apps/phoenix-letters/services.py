@@ -10,13 +10,16 @@ from dataclasses import dataclass
 
 from config.settings import Settings
 from infrastructure.ai.gemini_client import GeminiClient
+from infrastructure.ai.gemini_response_cache import get_gemini_response_cache
 from infrastructure.ai.mock_gemini_client import MockGeminiClient
 from infrastructure.database.db_connection import DatabaseConnection
+from infrastructure.security.generation_rate_limiter import get_generation_rate_limiter
 from infrastructure.security.input_validator import InputValidator
 from infrastructure.storage.session_manager import SecureSessionManager
 from ui.components.file_uploader import SecureFileUploader
 from ui.components.letter_editor import LetterEditor
 from ui.components.progress_bar import ProgressIndicator
+from core.services.api_cost_optimizer import get_api_cost_optimizer
 from core.services.letter_service import LetterService
 from core.services.job_offer_parser import JobOfferParser
 from core.services.prompt_service import PromptService
@@ -61,7 +64,9 @@ class PhoenixLettersServiceManager:
             return MockGeminiClient()
         else:
             self.logger.info("Utilisation du Gemini Client réel")
-            return GeminiClient(self.settings)
+            return GeminiClient(
+                self.settings, response_cache=get_gemini_response_cache()
+            )
 
     def initialize_all_services(
         self, gemini_client: Any, db_connection: DatabaseConnection
@@ -78,7 +83,12 @@ class PhoenixLettersServiceManager:
             letter_editor = LetterEditor()
 
             # Services métier Phoenix
-            letter_service = LetterService(gemini_client, self.settings)
+            letter_service = LetterService(
+                gemini_client,
+                self.settings,
+                rate_limiter=get_generation_rate_limiter(),
+                cost_optimizer=get_api_cost_optimizer(),
+            )
             job_offer_parser = JobOfferParser()
             prompt_service = PromptService()
 
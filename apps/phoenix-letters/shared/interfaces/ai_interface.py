@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import AsyncIterator, Protocol
 
 from core.entities.letter import UserTier
 
@@ -7,3 +7,13 @@ class AIServiceInterface(Protocol):
     def generate_content(
         self, prompt: str, user_tier: UserTier, max_tokens: int, temperature: float
     ) -> str: ...
+
+
+class AsyncAIServiceInterface(Protocol):
+    async def generate_content_async(
+        self, prompt: str, user_tier: UserTier, max_tokens: int, temperature: float
+    ) -> str: ...
+
+    def stream_content(
+        self, prompt: str, user_tier: UserTier, max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]: ...
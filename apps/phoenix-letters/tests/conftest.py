@@ -18,5 +18,17 @@ def load_env():
         )
 
 
+@pytest.fixture(autouse=True)
+def isolated_runtime_data(tmp_path, monkeypatch):
+    # Les contributions du fonds solidaire et le débordement de l'outbox
+    # sont écrits dans un répertoire temporaire, jamais dans data/
+    monkeypatch.setenv("PHOENIX_EVENT_OUTBOX_DIR", str(tmp_path / "event_outbox"))
+    from core.services.solidarity_ecological_fund import phoenix_solidarity_fund
+
+    storage_path = tmp_path / "solidarity_fund"
+    storage_path.mkdir()
+    monkeypatch.setattr(phoenix_solidarity_fund, "storage_path", storage_path)
+
+
 def pytest_configure(config):
     config.addinivalue_line("markers", "integration: mark test as integration test")
@@ -5,8 +5,14 @@ from unittest.mock import Mock
 
 import pytest
 from core.entities.letter import GenerationRequest, Letter, ToneType, UserTier
+from core.services.api_cost_optimizer import APICostOptimizer
 from core.services.letter_service import LetterService
-from shared.exceptions.specific_exceptions import LetterGenerationError, ValidationError
+from phoenix_rate_limit import Quota, RateLimiter
+from shared.exceptions.specific_exceptions import (
+    LetterGenerationError,
+    RateLimitError,
+    ValidationError,
+)
 from shared.interfaces.ai_interface import AIServiceInterface
 from shared.interfaces.prompt_interface import PromptServiceInterface
 from shared.interfaces.validation_interface import ValidationServiceInterface
@@ -210,6 +216,60 @@ class TestLetterService:
         with pytest.raises(LetterGenerationError, match="Erreur du service IA"):
             letter_service.generate_letter(valid_request, "test_user")
 
+    def test_generate_letter_rate_limited_by_tier(
+        self,
+        mock_ai_service,
+        mock_validation_service,
+        mock_prompt_service,
+        mock_session_manager,
+        valid_request,
+    ):
+        """Le débit de générations dépend du tier et l'erreur est propagée telle quelle."""
+        letter_service = LetterService(
+            mock_ai_service,
+            mock_validation_service,
+            mock_prompt_service,
+            mock_session_manager,
+            rate_limiter=RateLimiter(
+                tier_quotas={UserTier.FREE: Quota(1, 60), UserTier.PREMIUM: Quota(3, 60)}
+            ),
+        )
+
+        letter_service.generate_letter(valid_request, "rate_user")
+        with pytest.raises(RateLimitError):
+            letter_service.generate_letter(valid_request, "rate_user")
+
+        # Autre utilisateur : quota indépendant
+        letter_service.generate_letter(valid_request, "other_user")
+        assert mock_ai_service.generate_content.call_count == 2
+
+    def test_identical_prompt_served_from_semantic_cache(
+        self,
+        mock_ai_service,
+        mock_validation_service,
+        mock_prompt_service,
+        mock_session_manager,
+        valid_request,
+    ):
+        """Un prompt déjà généré est servi par le cache sans nouvel appel IA."""
+        cost_optimizer = APICostOptimizer()
+        letter_service = LetterService(
+            mock_ai_service,
+            mock_validation_service,
+            mock_prompt_service,
+            mock_session_manager,
+            cost_optimizer=cost_optimizer,
+        )
+
+        first = letter_service.generate_letter(valid_request, "test_user")
+        second = letter_service.generate_letter(valid_request, "test_user")
+
+        assert second.content == first.content
+        mock_ai_service.generate_content.assert_called_once()
+        report = cost_optimizer.get_semantic_cache_report()["by_endpoint"]["generate_letter"]
+        assert report["hits"] == 1
+        assert report["threshold"] == 1.0
+
     def test_analyze_letter_success_premium(self, letter_service):
         """Test d'analyse de lettre réussie pour utilisateur Premium."""
         # Arrange
@@ -0,0 +1,261 @@
+"""Tests unitaires pour l'index vectoriel RAG des exemples de lettres."""
+
+import json
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from core.services.letter_vector_index import LetterVectorIndex
+from core.services.rag_personalization_service import (
+    RAGDocument,
+    RAGPersonalizationService,
+    UserContext,
+)
+
+EXAMPLES = [
+    (
+        "tech_pivot",
+        "Infirmière en reconversion vers le développement Python et la data",
+        {"sector_source": "santé", "sector_target": "tech", "reconversion_type": "pivot"},
+    ),
+    (
+        "tech_lateral",
+        "Comptable devenu analyste data, SQL et Python au quotidien",
+        {"sector_source": "finance", "sector_target": "tech", "reconversion_type": "lateral"},
+    ),
+    (
+        "marketing_lateral",
+        "Commercial terrain vers le marketing digital, SEO et campagnes",
+        {"sector_source": "commerce", "sector_target": "marketing", "reconversion_type": "lateral"},
+    ),
+]
+
+
+@pytest.fixture
+def index():
+    index = LetterVectorIndex()
+    index.add_many(EXAMPLES)
+    return index
+
+
+class TestLetterVectorIndex:
+    """Tests pour LetterVectorIndex."""
+
+    def test_search_ranks_closest_example_first(self, index):
+        results = index.search("développement python data", k=2)
+
+        assert [doc_id for doc_id, _ in results][0] == "tech_pivot"
+        assert results[0][1] >= results[1][1]
+
+    def test_metadata_filters(self, index):
+        results = index.search(
+            "python data", k=5, filters={"sector_target": "tech", "reconversion_type": "lateral"}
+        )
+
+        assert [doc_id for doc_id, _ in results] == ["tech_lateral"]
+        assert index.search("python", filters={"sector_target": "juridique"}) == []
+
+    def test_distinct_terms_do_not_collide_at_scale(self):
+        index = LetterVectorIndex()
+        vectorizer = index.vectorizer
+        vocabulary = [f"terme{i}" for i in range(20_000)]
+        buckets = {int(vectorizer.transform_document(word, update_stats=False)[0][0]) for word in vocabulary}
+
+        # À 256 dimensions, 20k termes se partageaient 256 buckets
+        assert len(buckets) > 0.95 * len(vocabulary)
+
+    def test_obsolete_dense_index_is_rejected(self, index, tmp_path):
+        index.save(tmp_path)
+        state_path = tmp_path / LetterVectorIndex.STATE_FILE
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        del state["format"]
+        state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            LetterVectorIndex.load(tmp_path)
+
+    def test_unknown_filter_field_raises(self, index):
+        with pytest.raises(ValueError):
+            index.search("python", filters={"ville": "Paris"})
+
+    def test_search_batch_with_per_query_filters(self, index):
+        results = index.search_batch(
+            ["python data", "marketing seo"],
+            k=1,
+            filters=[{"sector_target": "tech"}, {"sector_target": "marketing"}],
+        )
+
+        assert results[0][0][0] in {"tech_pivot", "tech_lateral"}
+        assert results[1][0][0] == "marketing_lateral"
+
+    def test_replacing_document_keeps_single_entry(self, index):
+        index.add("tech_pivot", "Reconversion vers la finance de marché", {"sector_target": "finance"})
+
+        assert len(index) == 3
+        assert index.search("python", filters={"reconversion_type": "pivot"}) == []
+        assert index.get_document("tech_pivot")["metadata"]["sector_target"] == "finance"
+
+    def test_save_load_mmap_then_incremental_insert(self, index, tmp_path):
+        index.save(tmp_path)
+        loaded = LetterVectorIndex.load(tmp_path)
+
+        assert isinstance(loaded._base_rows, np.memmap)
+        assert len(loaded) == 3
+        assert loaded.get_document("marketing_lateral")["content"].startswith("Commercial")
+
+        loaded.add("finance_vertical", "Manager logistique vers contrôle de gestion et budget", {"sector_target": "finance"})
+        assert loaded.search("contrôle de gestion budget", k=1)[0][0] == "finance_vertical"
+
+        loaded.save()
+        reloaded = LetterVectorIndex.load(tmp_path)
+        assert len(reloaded) == 4
+        assert reloaded.get_stats()["delta_rows"] == 0
+
+
+VOCABULARY = "python data cloud analyse rigueur équipe client projet budget audit vente soins".split()
+SECTORS = ["tech", "finance", "santé"]
+
+
+def _random_corpus(rng, size):
+    return [
+        (
+            f"letter_{i}",
+            " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(5, 40))),
+            {"sector_target": rng.choice(SECTORS), "reconversion_type": rng.choice(["pivot", "lateral"])},
+        )
+        for i in range(size)
+    ]
+
+
+def _brute_force(index, query, k, filters):
+    """Référence : produit scalaire explicite requête x chaque document vivant."""
+    buckets, weights = index.vectorizer.transform_query(query)
+    query_vector = dict(zip(buckets.tolist(), weights.tolist()))
+    scored = []
+    for doc_id in index._row_of:
+        document = index.get_document(doc_id)
+        metadata = document["metadata"]
+        if any(metadata.get(name) != value for name, value in (filters or {}).items()):
+            continue
+        doc_buckets, doc_weights = index.vectorizer.transform_document(
+            document["content"], update_stats=False
+        )
+        score = sum(
+            query_vector.get(bucket, 0.0) * weight
+            for bucket, weight in zip(doc_buckets.tolist(), doc_weights.tolist())
+        )
+        scored.append((doc_id, score))
+    return sorted(scored, key=lambda item: -item[1])[:k]
+
+
+class TestLetterVectorIndexParity:
+    """Le scoring bloc dense + postings CSC donne les scores d'un produit scalaire explicite."""
+
+    @pytest.fixture
+    def small_dense_threshold(self, monkeypatch):
+        # Active le bloc dense dès quelques documents
+        monkeypatch.setattr(LetterVectorIndex, "DENSE_MIN_DOCUMENTS", 10)
+
+    def _assert_matches_reference(self, index, queries, filters):
+        results = index.search_batch(queries, k=5, filters=filters)
+        per_query_filters = filters if isinstance(filters, list) else [filters] * len(queries)
+        for query, query_filters, result in zip(queries, per_query_filters, results):
+            expected = _brute_force(index, query, 5, query_filters)
+            assert [score for _, score in result] == pytest.approx(
+                [score for _, score in expected], abs=1e-5
+            )
+            # Produit matrice x matrice (lot) ou vecteur (seule) : arrondis float32 près
+            single = index.search(query, k=5, filters=query_filters)
+            assert [doc_id for doc_id, _ in single] == [doc_id for doc_id, _ in result]
+            assert [score for _, score in single] == pytest.approx(
+                [score for _, score in result], abs=1e-6
+            )
+
+    def test_dense_block_base_and_delta_match_brute_force(self, small_dense_threshold, tmp_path):
+        rng = random.Random(3)
+        index = LetterVectorIndex()
+        index.add_many(_random_corpus(rng, 200))
+        index.save(tmp_path)
+        loaded = LetterVectorIndex.load(tmp_path)
+        assert loaded.get_stats()["dense_buckets"] > 0
+
+        # Delta et remplacement d'un document de la base
+        loaded.add_many(
+            (f"delta_{i}", content, metadata)
+            for i, (_, content, metadata) in enumerate(_random_corpus(rng, 30))
+        )
+        loaded.add("letter_7", "python cloud python data", {"sector_target": "tech"})
+
+        queries = [" ".join(rng.choice(VOCABULARY) for _ in range(12)) for _ in range(12)]
+        self._assert_matches_reference(loaded, queries, None)
+        self._assert_matches_reference(
+            loaded, queries, [{"sector_target": rng.choice(SECTORS)} for _ in queries]
+        )
+
+        # Le bloc dense est refondu au save suivant sans perdre de postings
+        loaded.save()
+        self._assert_matches_reference(LetterVectorIndex.load(tmp_path), queries, {"sector_target": "tech"})
+
+    def test_format_v2_index_without_dense_block_is_readable(self, tmp_path):
+        rng = random.Random(5)
+        index = LetterVectorIndex()
+        index.add_many(_random_corpus(rng, 50))
+        index.save(tmp_path)
+
+        # Un index v2 n'a que des postings CSC
+        (tmp_path / LetterVectorIndex.DENSE_FILE).unlink()
+        (tmp_path / LetterVectorIndex.DENSE_BUCKETS_FILE).unlink()
+        state_path = tmp_path / LetterVectorIndex.STATE_FILE
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        state["format"] = 2
+        state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        loaded = LetterVectorIndex.load(tmp_path)
+
+        self._assert_matches_reference(loaded, ["python data audit", "vente client soins"], None)
+
+
+class TestRAGPersonalizationRetrieval:
+    """Recherche d'exemples dans RAGPersonalizationService."""
+
+    def _user_context(self):
+        return UserContext(
+            user_id="u1",
+            sector_source="santé",
+            sector_target="tech",
+            role_target="Développeuse Python",
+            experience_years=8,
+            skills=["python", "sql"],
+            previous_letters=[],
+            preferences={},
+            reconversion_type="pivot",
+            urgency_level="medium",
+            last_updated=datetime.now(),
+        )
+
+    def test_indexed_examples_are_retrieved_and_reranked(self, tmp_path):
+        service = RAGPersonalizationService(index_dir=str(tmp_path))
+        for doc_id, content, metadata in EXAMPLES:
+            service.add_to_knowledge_base(RAGDocument(doc_id, content, metadata))
+
+        examples = service._find_similar_examples(
+            self._user_context(), "Poste de développeur Python data", max_examples=2
+        )
+
+        assert [example.doc_id for example in examples] == ["tech_pivot", "tech_lateral"]
+        assert all(example.metadata["sector_target"] == "tech" for example in examples)
+
+        service.save_knowledge_base()
+        restarted = RAGPersonalizationService(index_dir=str(tmp_path))
+        assert restarted.get_personalization_metrics()["knowledge_base_size"] == 3
+
+    def test_falls_back_to_static_example_when_no_sector_match(self):
+        service = RAGPersonalizationService()
+        service.add_to_knowledge_base(RAGDocument(*EXAMPLES[2]))
+
+        examples = service._find_similar_examples(
+            self._user_context(), "Poste de développeur Python data", max_examples=2
+        )
+
+        assert [example.doc_id for example in examples] == ["tech_example_1"]
@@ -0,0 +1,179 @@
+"""Tests unitaires pour le cache sémantique des prompts."""
+
+import pytest
+from core.services.api_cost_optimizer import APICostOptimizer
+from core.services.semantic_prompt_cache import SemanticPromptCache
+
+BASE_PROMPT = (
+    "Rédigez une lettre de motivation pour le poste de développeur Python "
+    "chez Phoenix. Le candidat a dix ans d'expérience en logistique et une "
+    "formation récente en développement web. Mettez en avant la rigueur, "
+    "l'organisation, la gestion des priorités et la capacité d'apprentissage. "
+    "Ton professionnel, trois paragraphes maximum, sans formule creuse."
+)
+
+
+def _letter_prompt(candidate: str) -> str:
+    """Prompt de lettre réaliste (~450 mots) personnalisé par le nom du candidat."""
+    achievements = " ".join(
+        f"Réalisation {i} : pilotage du chantier {i} avec une équipe de {i + 3} personnes "
+        f"et une réduction de {i + 5} % des délais."
+        for i in range(1, 21)
+    )
+    return (
+        f"Candidat : {candidate}. Poste visé : chef de projet logistique chez Phoenix. "
+        f"{BASE_PROMPT} Parcours détaillé du candidat : {achievements}"
+    )
+
+
+class TestSemanticPromptCache:
+    """Tests pour SemanticPromptCache."""
+
+    @pytest.fixture
+    def cache(self):
+        return SemanticPromptCache(endpoint_thresholds={"analysis": 0.8})
+
+    def test_whitespace_and_case_variants_hit(self, cache):
+        cache.store(BASE_PROMPT, "analysis", "Analyse générée", cost_usd=0.01)
+
+        variant = "  " + BASE_PROMPT.upper().replace(" ", "\n  ")
+        match = cache.lookup(variant, "analysis")
+
+        assert match is not None
+        assert match.response == "Analyse générée"
+        assert match.similarity == 1.0
+
+    def test_small_edit_hits_above_threshold(self, cache):
+        cache.store(BASE_PROMPT, "analysis", "Analyse générée", cost_usd=0.01)
+
+        edited = BASE_PROMPT.replace("dix ans", "onze ans")
+        match = cache.lookup(edited, "analysis")
+
+        assert match is not None
+        assert match.similarity >= 0.8
+
+    def test_different_prompt_misses(self, cache):
+        cache.store(BASE_PROMPT, "analysis", "Analyse générée", cost_usd=0.01)
+
+        match = cache.lookup(
+            "Analysez la culture d'entreprise de cette offre de commercial terrain",
+            "analysis",
+        )
+
+        assert match is None
+        assert cache.get_audit_log()[-1]["decision"] in {"miss", "below_threshold"}
+
+    def test_endpoints_are_isolated(self, cache):
+        cache.store(BASE_PROMPT, "analysis", "Analyse générée")
+
+        assert cache.lookup(BASE_PROMPT, "ats_analyzer") is None
+
+    def test_report_tracks_hit_rate_and_cost_saved(self, cache):
+        cache.store(BASE_PROMPT, "analysis", "Analyse générée", cost_usd=0.02)
+        cache.lookup(BASE_PROMPT, "analysis")
+        cache.lookup("Prompt sans rapport avec la lettre", "analysis")
+
+        report = cache.get_report()
+
+        assert report["lookups"] == 2
+        assert report["hits"] == 1
+        assert report["hit_rate"] == 0.5
+        assert report["cost_saved_usd"] == pytest.approx(0.02)
+        assert report["by_endpoint"]["analysis"]["threshold"] == 0.8
+
+    def test_max_entries_evicts_oldest(self):
+        cache = SemanticPromptCache(max_entries=2)
+        for i in range(3):
+            cache.store(f"{BASE_PROMPT} variante numéro {i} " * 3, "analysis", f"r{i}")
+
+        assert cache.get_report()["entries"] == 2
+
+
+    def test_letters_differing_only_by_candidate_do_not_hit(self, cache):
+        marie, jean = _letter_prompt("Marie Dupont"), _letter_prompt("Jean Martin")
+        assert 400 <= len(marie.split()) <= 500
+        assert cache.hasher.similarity(
+            cache.hasher.signature(marie), cache.hasher.signature(jean)
+        ) >= 0.95
+
+        cache.store(marie, "generate_letter", "Lettre de Marie", cost_usd=0.01)
+
+        assert cache.lookup(jean, "generate_letter") is None
+        assert cache.lookup(jean, "generate_letter", threshold=0.5) is None
+        assert cache.get_audit_log()[-1]["threshold"] == 1.0
+
+    def test_identical_letter_prompt_still_hits(self, cache):
+        marie = _letter_prompt("Marie Dupont")
+        cache.store(marie, "generate_letter", "Lettre de Marie")
+
+        match = cache.lookup("  " + marie.upper(), "generate_letter")
+
+        assert match is not None
+        assert match.response == "Lettre de Marie"
+
+    def test_exact_entries_are_evicted_cleanly(self):
+        cache = SemanticPromptCache(max_entries=1)
+        cache.store(_letter_prompt("Marie Dupont"), "generate_letter", "Lettre de Marie")
+        cache.store(_letter_prompt("Jean Martin"), "generate_letter", "Lettre de Jean")
+
+        assert cache.lookup(_letter_prompt("Marie Dupont"), "generate_letter") is None
+        assert cache.lookup(_letter_prompt("Jean Martin"), "generate_letter").response == "Lettre de Jean"
+        assert len(cache._exact) == 1
+
+
+class TestAPICostOptimizerSemanticCache:
+    """Intégration du cache sémantique dans APICostOptimizer."""
+
+    def test_similar_prompt_uses_cached_response(self):
+        optimizer = APICostOptimizer()
+        optimizer.cache_response(BASE_PROMPT, "Lettre générée", endpoint="analysis")
+
+        assert optimizer._check_prompt_similarity(BASE_PROMPT, endpoint="analysis")
+
+        result = optimizer.optimize_request_parameters(
+            BASE_PROMPT + "  ", user_tier="premium", endpoint="analysis"
+        )
+
+        assert result["optimized_params"]["cached_response"] == "Lettre générée"
+        assert result["optimized_cost"] == 0.0
+        assert result["optimizations_applied"] == ["semantic_cache"]
+        assert optimizer.get_semantic_cache_report()["hits"] == 1
+
+    def test_no_cache_entry_keeps_regular_optimizations(self):
+        optimizer = APICostOptimizer()
+
+        result = optimizer.optimize_request_parameters(
+            BASE_PROMPT, user_tier="free", endpoint="generate_letter"
+        )
+
+        assert "cached_response" not in result["optimized_params"]
+        assert "token_limit_optimization" in result["optimizations_applied"]
+
+    def test_lsh_lookup_runs_once_per_request(self, monkeypatch):
+        optimizer = APICostOptimizer()
+        optimizer.cache_response(BASE_PROMPT, "Analyse générée", endpoint="analysis")
+        calls = []
+        best_match = optimizer.semantic_cache._best_match
+        monkeypatch.setattr(
+            optimizer.semantic_cache,
+            "_best_match",
+            lambda *args: calls.append(args) or best_match(*args),
+        )
+
+        result = optimizer.optimize_request_parameters(
+            BASE_PROMPT, user_tier="premium", endpoint="analysis"
+        )
+
+        assert result["optimized_params"]["cached_response"] == "Analyse générée"
+        assert len(calls) == 1
+
+    def test_probe_of_evicted_entry_is_a_miss(self):
+        optimizer = APICostOptimizer(SemanticPromptCache(max_entries=1))
+        optimizer.cache_response(BASE_PROMPT, "Analyse générée", endpoint="analysis")
+        probe = optimizer.semantic_cache.probe(BASE_PROMPT, "analysis")
+
+        # Une autre session évince l'entrée entre la sonde et la lecture
+        optimizer.cache_response("Prompt sans rapport " * 5, "Autre", endpoint="analysis")
+
+        assert optimizer.find_cached_response(BASE_PROMPT, "analysis", probe) is None
+        assert optimizer.semantic_cache.get_audit_log()[-1]["decision"] == "miss"
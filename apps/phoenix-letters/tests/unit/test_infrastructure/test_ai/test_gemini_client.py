@@ -8,14 +8,15 @@ Quality Standards:
 - Couverture complète des cas d'erreur
 """
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import google.generativeai as genai
 import pytest
 from core.entities.letter import UserTier
 
 # Import des classes nécessaires après le patching potentiel
-from infrastructure.ai.gemini_client import GeminiClient
+from infrastructure.ai.gemini_client import BatchRequest, GeminiClient
 from shared.exceptions.specific_exceptions import AIServiceError, RateLimitError
 
 # Neutralise le décorateur retry pour tous les tests de ce module
@@ -206,3 +207,76 @@ class TestGeminiClient:
         assert config["max_output_tokens"] == custom_tokens
         # Vérifie qu'une autre valeur du tier est toujours présente
         assert config["top_p"] == 0.8
+
+
+class _FakeStream:
+    """Flux asynchrone de fragments, comme AsyncGenerateContentResponse."""
+
+    def __init__(self, texts):
+        self._texts = list(texts)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._texts:
+            raise StopAsyncIteration
+        return MagicMock(text=self._texts.pop(0))
+
+
+class TestGeminiClientStreaming:
+    """Tests de la génération asynchrone en streaming."""
+
+    STREAMED = ["Madame, Monsieur, ", "je souhaite rejoindre votre équipe ", "en tant que développeur Python."]
+
+    def test_stream_content_yields_chunks_and_records_ttft(self, gemini_client):
+        gemini_client.model.generate_content_async = AsyncMock(
+            return_value=_FakeStream(self.STREAMED)
+        )
+
+        async def consume():
+            return [
+                chunk
+                async for chunk in gemini_client.stream_content(
+                    "a valid streaming prompt", UserTier.PREMIUM
+                )
+            ]
+
+        with patch(
+            "infrastructure.ai.gemini_client.phoenix_green_metrics._store_metrics"
+        ) as store:
+            chunks = asyncio.run(consume())
+
+        assert chunks == self.STREAMED
+        assert gemini_client.model.generate_content_async.call_args.kwargs["stream"] is True
+        assert store.call_args.args[0].time_to_first_token_ms is not None
+
+    def test_generate_content_async_uses_cache_on_second_call(self, gemini_client):
+        gemini_client.model.generate_content_async = AsyncMock(
+            side_effect=lambda *args, **kwargs: _FakeStream(self.STREAMED)
+        )
+
+        first = asyncio.run(
+            gemini_client.generate_content_async("a valid streaming prompt", UserTier.FREE)
+        )
+        second = asyncio.run(
+            gemini_client.generate_content_async("a valid streaming prompt", UserTier.FREE)
+        )
+
+        assert first == second == "".join(self.STREAMED)
+        assert gemini_client.model.generate_content_async.await_count == 1
+
+    def test_generate_batch_async_reports_failures_per_request(self, gemini_client):
+        gemini_client.model.generate_content_async = AsyncMock(
+            side_effect=lambda prompt, **kwargs: _FakeStream(
+                self.STREAMED if "ok" in prompt else ["court"]
+            )
+        )
+        requests = [
+            BatchRequest(prompt="prompt ok numéro 1", user_tier=UserTier.FREE),
+            BatchRequest(prompt="prompt ko numéro 2", user_tier=UserTier.FREE, request_id="ko"),
+        ]
+
+        results = asyncio.run(gemini_client.generate_batch_async(requests))
+
+        assert results == [("req_0", "".join(self.STREAMED)), ("ko", None)]
@@ -0,0 +1,97 @@
+"""Tests unitaires pour le cache de réponses Gemini."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from core.entities.letter import UserTier
+from infrastructure.ai.gemini_response_cache import (
+    CoalescedCallAbandoned,
+    GeminiResponseCache,
+)
+
+
+class TestGeminiResponseCache:
+    """Tests pour GeminiResponseCache."""
+
+    def test_key_is_stable_and_parameter_sensitive(self):
+        key = GeminiResponseCache.make_key("prompt", UserTier.FREE, 1000, 0.7)
+
+        assert key == GeminiResponseCache.make_key("prompt", UserTier.FREE, 1000, 0.7)
+        assert key.startswith("gemini_")
+        assert key != GeminiResponseCache.make_key("prompt", UserTier.PREMIUM, 1000, 0.7)
+        assert key != GeminiResponseCache.make_key("prompt", UserTier.FREE, 1000, 0.8)
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self):
+        cache = GeminiResponseCache(max_bytes=250)
+        for name in ("a", "b", "c"):
+            cache.set(name, UserTier.FREE, 1000, 0.7, name * 100)
+
+        assert cache.get("a", UserTier.FREE, 1000, 0.7) is None
+        assert cache.get("c", UserTier.FREE, 1000, 0.7) == "c" * 100
+
+        stats = cache.get_stats()
+        assert stats["size_bytes"] <= 250
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_identical_concurrent_calls_share_one_result(self):
+        cache = GeminiResponseCache()
+        args = ("prompt", UserTier.FREE, 1000, 0.7)
+        _, leader = cache.begin(*args)
+        assert leader
+
+        ready = threading.Barrier(4)
+
+        def follower():
+            future, is_leader = cache.begin(*args)
+            ready.wait()
+            return is_leader, future.result(timeout=5)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(follower) for _ in range(3)]
+            ready.wait()
+            cache.complete(*args, "shared response")
+            results = [f.result() for f in futures]
+
+        assert results == [(False, "shared response")] * 3
+        assert cache.get(*args) == "shared response"
+        stats = cache.get_stats()
+        assert stats["coalesced"] == 3
+        assert stats["in_flight"] == 0
+
+    def test_failure_is_propagated_and_slot_released(self):
+        cache = GeminiResponseCache()
+        args = ("prompt", UserTier.PREMIUM, 1000, 0.7)
+        cache.begin(*args)
+        follower, leader = cache.begin(*args)
+        assert not leader
+
+        cache.fail(*args, CoalescedCallAbandoned())
+
+        with pytest.raises(CoalescedCallAbandoned):
+            follower.result(timeout=1)
+        _, leader = cache.begin(*args)
+        assert leader
+
+    def test_shared_cache_is_consulted_on_local_miss(self):
+        class FakeSharedCache:
+            def __init__(self):
+                self.stored = {}
+
+            def get(self, prompt, user_data, model_config):
+                return self.stored.get(prompt)
+
+            def set(self, prompt, user_data, response, model_config, **kwargs):
+                self.stored[prompt] = response
+
+        shared = FakeSharedCache()
+        GeminiResponseCache(shared_cache=shared).set(
+            "prompt", UserTier.FREE, 1000, 0.7, "from another process"
+        )
+
+        cache = GeminiResponseCache(shared_cache=shared)
+        assert cache.get("prompt", UserTier.FREE, 1000, 0.7) == "from another process"
+        assert cache.get_stats()["shared_hits"] == 1
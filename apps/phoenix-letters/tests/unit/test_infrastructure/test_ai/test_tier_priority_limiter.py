@@ -0,0 +1,87 @@
+"""Tests unitaires pour le limiteur de concurrence par tier."""
+
+import asyncio
+import threading
+
+import pytest
+from core.entities.letter import UserTier
+from infrastructure.ai.tier_priority_limiter import TierPriorityLimiter
+
+
+class TestTierPriorityLimiter:
+    """Tests pour TierPriorityLimiter."""
+
+    def test_rejects_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            TierPriorityLimiter(max_concurrency=0)
+
+    def test_premium_waiters_are_served_first(self):
+        async def scenario():
+            limiter = TierPriorityLimiter(max_concurrency=1)
+            order = []
+
+            async def worker(name, tier):
+                async with limiter.async_slot(tier):
+                    order.append(name)
+                    await asyncio.sleep(0)
+
+            await limiter.acquire_async(UserTier.FREE)
+            tasks = [
+                asyncio.create_task(worker("free_1", UserTier.FREE)),
+                asyncio.create_task(worker("free_2", UserTier.FREE)),
+                asyncio.create_task(worker("premium", UserTier.PREMIUM)),
+            ]
+            await asyncio.sleep(0)
+            limiter.release()
+            await asyncio.gather(*tasks)
+            return order, limiter.get_stats()
+
+        order, stats = asyncio.run(scenario())
+
+        assert order == ["premium", "free_1", "free_2"]
+        assert stats["in_flight"] == 0
+        assert stats["waiting"] == 0
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        async def scenario():
+            limiter = TierPriorityLimiter(max_concurrency=1)
+            await limiter.acquire_async(UserTier.FREE)
+
+            waiter = asyncio.create_task(limiter.acquire_async(UserTier.FREE))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+            limiter.release()
+            await asyncio.wait_for(limiter.acquire_async(UserTier.PREMIUM), timeout=1)
+            return limiter.get_stats()
+
+        assert asyncio.run(scenario())["in_flight"] == 1
+
+    def test_sync_and_async_callers_share_slots(self):
+        limiter = TierPriorityLimiter(max_concurrency=1)
+        limiter.acquire(UserTier.FREE)
+        acquired = threading.Event()
+
+        def blocking_caller():
+            with limiter.slot(UserTier.PREMIUM):
+                acquired.set()
+
+        thread = threading.Thread(target=blocking_caller)
+        thread.start()
+        assert not acquired.wait(0.05)
+
+        limiter.release()
+        thread.join(timeout=1)
+
+        assert acquired.is_set()
+        assert limiter.acquire(UserTier.FREE, timeout=0.1)
+
+    def test_sync_acquire_times_out(self):
+        limiter = TierPriorityLimiter(max_concurrency=1)
+        limiter.acquire(UserTier.FREE)
+
+        assert limiter.acquire(UserTier.FREE, timeout=0.01) is False
+        limiter.release()
+        assert limiter.get_stats()["in_flight"] == 0
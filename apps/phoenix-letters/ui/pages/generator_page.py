@@ -11,7 +11,7 @@ from core.services.conversion_optimizer import ConversionOptimizer
 from core.services.job_offer_parser import JobOfferParser
 from core.services.letter_service import LetterService
 from infrastructure.storage.session_manager import SecureSessionManager
-from shared.exceptions.specific_exceptions import LetterGenerationError, ValidationError
+from shared.exceptions.specific_exceptions import LetterGenerationError, RateLimitError, ValidationError
 from ui.components.conversion_popup import ConversionPopup
 from ui.components.file_uploader import SecureFileUploader
 from ui.components.letter_editor import LetterEditor
@@ -798,11 +798,19 @@ class GeneratorPage:
                 self.session_manager.set("generation_progress", 75)
                 user_id = self.session_manager.get("user_id", "default_user_id")
                 generation_start = time.time()
-                letter = self.letter_service.generate_letter(request, user_id)
+                if self.letter_service.supports_streaming:
+                    # Affichage progressif des tokens pendant la génération
+                    letter_content = st.write_stream(
+                        self.letter_service.stream_letter(request, user_id)
+                    )
+                else:
+                    letter_content = self.letter_service.generate_letter(
+                        request, user_id
+                    ).content
                 generation_time = time.time() - generation_start
 
                 # Sauvegarde
-                self.session_manager.set("generated_letter", letter.content)
+                self.session_manager.set("generated_letter", letter_content)
                 self.session_manager.set("generation_progress", 100)
                 self.session_manager.set("last_generation_time", time.time())
 
@@ -857,6 +865,9 @@ class GeneratorPage:
                 st.warning(f"💡 **Petit ajustement nécessaire** : {e}")
                 st.info("✨ **Conseil** : Vérifiez que vos fichiers sont bien uploadés et que tous les champs requis sont remplis.")
                 logger.warning(f"Validation error in generation: {e}")
+        except RateLimitError as e:
+            st.warning(f"⏳ **Un instant** : {e}")
+            logger.info(f"Generation rate limited: {e}")
         except LetterGenerationError as e:
             st.warning(f"🔄 **Génération temporairement indisponible** : {e}")
             st.info("⏰ **Pas de panique** : Essayez à nouveau dans quelques instants. Si le problème persiste, contactez notre support.")
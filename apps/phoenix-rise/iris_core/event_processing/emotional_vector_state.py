@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from collections import deque
 import pytz
@@ -123,4 +123,36 @@ class EmotionalVectorState:
         obj_dict['confidence_scores_30d'] = list(self.confidence_scores_30d) # Convertir deque en liste
         obj_dict['event_history_7d'] = [ (ts.isoformat(), et, val) for ts, et, val in self.event_history_7d ]
         obj_dict['event_history_30d'] = [ (ts.isoformat(), et, val) for ts, et, val in self.event_history_30d ]
-        return json.dumps(obj_dict, indent=2)
\ No newline at end of file
+        return json.dumps(obj_dict, indent=2)
+
+    def copy(self) -> "EmotionalVectorState":
+        # Copie indépendante sans passer par JSON : les tuples (timestamp, type, valeur)
+        # sont immuables, seuls les conteneurs mutables sont dupliqués
+        evs = replace(self)
+        evs.confidence_scores_30d = deque(self.confidence_scores_30d, maxlen=self.confidence_scores_30d.maxlen)
+        evs.actions_count_7d = dict(self.actions_count_7d)
+        evs.event_history_7d = deque(self.event_history_7d)
+        evs.event_history_30d = deque(self.event_history_30d)
+        return evs
+
+    @classmethod
+    def from_json(cls, json_str: str) -> "EmotionalVectorState":
+        # Inverse de to_json: reconstruit l'EEV depuis un checkpoint sérialisé
+        data = json.loads(json_str)
+        evs = cls(user_id=data['user_id'])
+        evs.last_updated = datetime.fromisoformat(data['last_updated'])
+        evs.mood_sum_7d = data.get('mood_sum_7d', 0.0)
+        evs.mood_count_7d = data.get('mood_count_7d', 0)
+        evs.mood_average_7d = data.get('mood_average_7d', 0.0)
+        evs.confidence_scores_30d = deque(data.get('confidence_scores_30d', []), maxlen=30)
+        evs.confidence_trend = data.get('confidence_trend', 0.0)
+        evs.last_action_type = data.get('last_action_type')
+        evs.actions_count_7d = dict(data.get('actions_count_7d', {}))
+        evs.burnout_risk_score = data.get('burnout_risk_score', 0.0)
+        evs.event_history_7d = deque(
+            (datetime.fromisoformat(ts), et, val) for ts, et, val in data.get('event_history_7d', [])
+        )
+        evs.event_history_30d = deque(
+            (datetime.fromisoformat(ts), et, val) for ts, et, val in data.get('event_history_30d', [])
+        )
+        return evs
@@ -0,0 +1,280 @@
+"""
+Store de snapshots EmotionalVectorState pour Phoenix Rise.
+
+Garde en mémoire l'EEV vivant de chaque utilisateur actif avec la position du
+dernier événement rejoué. Une lecture n'applique que les événements postérieurs
+à cet état : son coût devient O(nouveaux événements) au lieu de O(historique
+complet de l'utilisateur). L'état n'est sérialisé que lors de la persistance du
+checkpoint dans Supabase, tous les `snapshot_interval` événements.
+
+La position est l'horodatage d'insertion (`created_at`, posé par la base) et non
+le `timestamp` métier : un événement inséré en retard avec un `timestamp` plus
+ancien reste ainsi visible au delta. Comme deux transactions concurrentes
+peuvent rendre visibles leurs lignes dans le désordre, le delta relit une
+fenêtre de recouvrement et déduplique par event_id.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from iris_core.event_processing.emotional_vector_state import EmotionalVectorState
+
+logger = logging.getLogger(__name__)
+
+# Types d'événements rejoués dans l'EEV
+EVS_EVENT_TYPES = [
+    'MoodLogged',
+    'ConfidenceScoreLogged',
+    'CVGenerated',
+    'SkillSuggested',
+    'TrajectoryBuilt',
+    'GoalSet',
+]
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    """Parse un horodatage ISO renvoyé par PostgREST."""
+    if value is None:
+        return None
+    parsed = value if isinstance(value, datetime) else \
+        datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    # Les horodatages sans fuseau sont en UTC (datetime.utcnow côté services)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _event_position(event: Dict[str, Any]) -> Optional[datetime]:
+    """Position d'insertion d'un événement (created_at, sinon timestamp)."""
+    return _parse_ts(event.get('created_at') or event.get('timestamp'))
+
+
+@dataclass
+class EVSSnapshot:
+    """Checkpoint d'un EEV et position du dernier événement rejoué."""
+
+    user_id: str
+    # EEV vivant, avancé en place par EVSSnapshotStore.apply_events
+    state: EmotionalVectorState
+    # created_at maximal parmi les événements intégrés au checkpoint
+    last_created_at: Optional[str] = None
+    # event_id -> created_at des événements situés dans la fenêtre de
+    # recouvrement : la requête delta les relit, ils sont ignorés au replay
+    recent_event_ids: Dict[str, str] = field(default_factory=dict)
+    event_count: int = 0
+    # Événements rejoués depuis la dernière persistance du checkpoint
+    pending_events: int = 0
+
+    def restore(self) -> EmotionalVectorState:
+        """
+        Retourne une copie de l'EEV du checkpoint.
+
+        Les appelants modifient l'EEV reçu (update_mood, update_action...) puis
+        émettent l'événement correspondant : l'état vivant ne doit pas être
+        exposé, sinon cet événement serait appliqué deux fois au delta suivant.
+        """
+        return self.state.copy()
+
+    def is_new_event(self, event: Dict[str, Any]) -> bool:
+        """Indique si l'événement n'a pas déjà été intégré au checkpoint."""
+        event_id = event.get('event_id')
+        return event_id is None or str(event_id) not in self.recent_event_ids
+
+    def to_row(self) -> Dict[str, Any]:
+        """Sérialise le snapshot pour la table evs_snapshots."""
+        return {
+            "user_id": self.user_id,
+            "state": json.loads(self.state.to_json()),
+            "last_created_at": self.last_created_at,
+            "recent_event_ids": self.recent_event_ids,
+            "event_count": self.event_count,
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "EVSSnapshot":
+        """Reconstruit un snapshot depuis une ligne evs_snapshots."""
+        state = row["state"]
+        return cls(
+            user_id=row["user_id"],
+            state=EmotionalVectorState.from_json(state if isinstance(state, str) else json.dumps(state)),
+            last_created_at=row.get("last_created_at"),
+            recent_event_ids=dict(row.get("recent_event_ids") or {}),
+            event_count=row.get("event_count", 0),
+        )
+
+
+class EVSSnapshotStore:
+    """
+    Store de checkpoints EEV à deux niveaux.
+
+    Un cache mémoire LRU garde l'EEV vivant de chaque utilisateur actif ;
+    la table Supabase evs_snapshots n'est rafraîchie que tous les
+    `snapshot_interval` événements rejoués pour limiter les écritures.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        snapshot_interval: int = 50,
+        max_cached_users: int = 1000,
+        table_name: str = "evs_snapshots",
+        overlap_seconds: float = 60.0,
+    ):
+        self._client = client
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.snapshot_interval = snapshot_interval
+        self.max_cached_users = max_cached_users
+        self.table_name = table_name
+        self._cache: "OrderedDict[str, EVSSnapshot]" = OrderedDict()
+        self._stats = {
+            "cache_hits": 0,
+            "store_hits": 0,
+            "misses": 0,
+            "events_replayed": 0,
+            "snapshots_persisted": 0,
+        }
+
+    def load(self, user_id: str) -> Optional[EVSSnapshot]:
+        """Récupère le dernier checkpoint connu (mémoire puis Supabase)."""
+        snapshot = self._cache.get(user_id)
+        if snapshot is not None:
+            self._cache.move_to_end(user_id)
+            self._stats["cache_hits"] += 1
+            return snapshot
+
+        if self._client is not None:
+            try:
+                result = self._client.table(self.table_name) \
+                    .select('*') \
+                    .eq('user_id', user_id) \
+                    .limit(1) \
+                    .execute()
+                if result.data:
+                    snapshot = EVSSnapshot.from_row(result.data[0])
+                    self._remember(snapshot)
+                    self._stats["store_hits"] += 1
+                    return snapshot
+            except Exception as e:
+                logger.warning(f"⚠️ Lecture snapshot EEV impossible pour {user_id}: {e}")
+
+        self._stats["misses"] += 1
+        return None
+
+    def delta_start(self, snapshot: EVSSnapshot) -> Optional[str]:
+        """
+        Borne basse `created_at` de la requête delta.
+
+        Recule de la fenêtre de recouvrement pour rattraper les lignes dont la
+        transaction a été validée après celle du dernier événement rejoué.
+        """
+        last_created_at = _parse_ts(snapshot.last_created_at)
+        if last_created_at is None:
+            return None
+        return (last_created_at - self.overlap).isoformat()
+
+    def apply_events(
+        self,
+        user_id: str,
+        events: List[Dict[str, Any]],
+        snapshot: Optional[EVSSnapshot] = None,
+    ) -> Optional[EVSSnapshot]:
+        """
+        Applique au checkpoint les événements qu'il n'a pas encore intégrés.
+
+        Sans snapshot, un nouvel EEV est construit depuis `events` (replay
+        complet). Les événements doivent être triés par timestamp croissant ;
+        ceux déjà intégrés (fenêtre de recouvrement) sont ignorés. Retourne le
+        checkpoint à jour, ou None s'il n'existe aucun état.
+        """
+        if snapshot is None:
+            if not events:
+                return None
+            snapshot = EVSSnapshot(user_id=user_id, state=EmotionalVectorState(user_id=user_id))
+
+        replayed = 0
+        last_created_at = _parse_ts(snapshot.last_created_at)
+        recent_ids = snapshot.recent_event_ids
+
+        try:
+            for event in events:
+                if not snapshot.is_new_event(event):
+                    continue
+                snapshot.state.update_from_event({
+                    'type': event['event_type'],
+                    'timestamp': event['timestamp'],
+                    'payload': event['payload'],
+                })
+                replayed += 1
+                position = _event_position(event)
+                if position is not None:
+                    if event.get('event_id') is not None:
+                        recent_ids[str(event['event_id'])] = position.isoformat()
+                    if last_created_at is None or position > last_created_at:
+                        last_created_at = position
+        except Exception:
+            # L'état vivant est partiellement avancé : le prochain appel
+            # repartira du checkpoint Supabase ou d'un replay complet
+            self.invalidate(user_id)
+            raise
+
+        if replayed == 0:
+            return snapshot
+
+        # Seuls les événements encore relus par la prochaine requête delta
+        # ont besoin d'être mémorisés
+        if last_created_at is not None:
+            window_start = last_created_at - self.overlap
+            recent_ids = {
+                event_id: created_at
+                for event_id, created_at in recent_ids.items()
+                if _parse_ts(created_at) >= window_start
+            }
+
+        snapshot.last_created_at = last_created_at.isoformat() if last_created_at else None
+        snapshot.recent_event_ids = recent_ids
+        snapshot.event_count += replayed
+        snapshot.pending_events += replayed
+        self._remember(snapshot)
+        self._stats["events_replayed"] += replayed
+
+        if snapshot.pending_events >= self.snapshot_interval:
+            self.persist(snapshot)
+        return snapshot
+
+    def persist(self, snapshot: EVSSnapshot) -> bool:
+        """Écrit le checkpoint dans Supabase (upsert par user_id)."""
+        if self._client is None:
+            return False
+        try:
+            self._client.table(self.table_name) \
+                .upsert(snapshot.to_row(), on_conflict='user_id') \
+                .execute()
+            snapshot.pending_events = 0
+            self._stats["snapshots_persisted"] += 1
+            logger.debug(f"✅ Snapshot EEV persisté pour {snapshot.user_id} ({snapshot.event_count} événements)")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Persistance snapshot EEV impossible pour {snapshot.user_id}: {e}")
+            return False
+
+    def invalidate(self, user_id: str) -> None:
+        """Oublie le checkpoint mémoire d'un utilisateur."""
+        self._cache.pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """📊 Retourne les statistiques du store de snapshots."""
+        return {
+            **self._stats,
+            "cached_users": len(self._cache),
+            "snapshot_interval": self.snapshot_interval,
+            "overlap_seconds": self.overlap.total_seconds(),
+        }
+
+    def _remember(self, snapshot: EVSSnapshot) -> None:
+        self._cache[snapshot.user_id] = snapshot
+        self._cache.move_to_end(snapshot.user_id)
+        while len(self._cache) > self.max_cached_users:
+            self._cache.popitem(last=False)
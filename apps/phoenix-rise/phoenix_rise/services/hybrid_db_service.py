@@ -14,6 +14,7 @@ from datetime import datetime
 from ..models.journal_entry import JournalEntry
 from .mock_db_service import MockDBService
 from .phoenix_rise_event_helper import phoenix_rise_event_helper
+from .evs_snapshot_store import EVS_EVENT_TYPES, EVSSnapshotStore
 from ..core.supabase_client import supabase_client
 from iris_core.event_processing.emotional_vector_state import EmotionalVectorState
 from phoenix_shared_db.services.supabase_batch_service import get_batch_service
@@ -45,6 +46,9 @@ class HybridDBService:
         self.event_helper = phoenix_rise_event_helper
         self._supabase_available = self._check_supabase_connection()
         self._batch_service = get_batch_service()
+        self._evs_snapshots = EVSSnapshotStore(
+            client=supabase_client if self._supabase_available else None
+        )
         
         # ✅ Configuration batching optimisé
         self._pending_events = []
@@ -264,30 +268,39 @@ class HybridDBService:
             return self._get_evs_from_session(user_id)
     
     def _rebuild_evs_from_events(self, user_id: str) -> EmotionalVectorState:
-        """Reconstruit l'EEV depuis les événements stockés dans Supabase."""
+        """
+        Reconstruit l'EEV depuis les événements stockés dans Supabase.
+        Repart du dernier snapshot et ne rejoue que les événements postérieurs.
+        """
         try:
-            # Récupérer tous les événements pertinents pour ce user
-            result = supabase_client.table('events') \
+            snapshot = self._evs_snapshots.load(user_id)
+            query = supabase_client.table('events') \
                 .select('*') \
                 .eq('stream_id', user_id) \
-                .in_('event_type', ['MoodLogged', 'ConfidenceScoreLogged', 'CVGenerated', 'SkillSuggested', 'TrajectoryBuilt', 'GoalSet']) \
-                .order('timestamp', desc=False) \
-                .execute()
+                .in_('event_type', EVS_EVENT_TYPES)
             
-            events = result.data
-            evs = EmotionalVectorState(user_id=user_id)
+            delta_start = self._evs_snapshots.delta_start(snapshot) if snapshot else None
+            if delta_start is not None:
+                # Position d'insertion : rattrape les événements arrivés en
+                # retard avec un timestamp métier antérieur au checkpoint
+                query = query.gte('created_at', delta_start)
+            else:
+                snapshot = None
+            known_events = snapshot.event_count if snapshot else 0
+            from_snapshot = snapshot is not None
             
-            # Rejouer tous les événements pour reconstruire l'état
-            for event in events:
-                event_formatted = {
-                    'type': event['event_type'],
-                    'timestamp': event['timestamp'],
-                    'payload': event['payload']
-                }
-                evs.update_from_event(event_formatted)
+            result = query.order('timestamp', desc=False).execute()
             
-            logger.info(f"✅ EEV reconstruit pour {user_id} depuis {len(events)} événements")
-            return evs
+            # Avancer l'EEV du checkpoint avec le seul delta
+            snapshot = self._evs_snapshots.apply_events(user_id, result.data, snapshot)
+            if snapshot is None:
+                return EmotionalVectorState(user_id=user_id)
+            
+            logger.info(
+                f"✅ EEV reconstruit pour {user_id} depuis "
+                f"{'snapshot + ' if from_snapshot else ''}{snapshot.event_count - known_events} événements"
+            )
+            return snapshot.restore()
             
         except Exception as e:
             logger.error(f"❌ Erreur reconstruction EEV pour {user_id}: {e}")
@@ -432,5 +445,6 @@ class HybridDBService:
             "last_batch_time": datetime.fromtimestamp(self._last_batch_time).isoformat(),
             "time_since_last_batch": time.time() - self._last_batch_time,
             "retry_config": self._retry_config,
-            "supabase_available": self._supabase_available
+            "supabase_available": self._supabase_available,
+            "evs_snapshots": self._evs_snapshots.get_stats()
         }
\ No newline at end of file
@@ -6,7 +6,7 @@ Service pour publier les événements Phoenix Rise vers la data pipeline Event S
 import logging
 from datetime import datetime
 from typing import Optional
-from packages.phoenix_event_bridge import PhoenixEventBridge
+from packages.phoenix_event_bridge import PhoenixEventData, PhoenixEventFactory, PhoenixEventType
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,8 @@ class PhoenixRiseEventHelper:
     
     def __init__(self):
         try:
-            self.event_bridge = PhoenixEventBridge()
+            # Outbox partagée : publication non bloquante, insertions groupées en arrière-plan
+            self.event_bridge = PhoenixEventFactory.create_bridge()
             self.is_available = True
             logger.info("✅ Phoenix Rise Event Helper initialisé avec succès")
         except Exception as e:
@@ -26,6 +27,16 @@ class PhoenixRiseEventHelper:
             self.event_bridge = None
             self.is_available = False
 
+    def _publish(self, event_type: PhoenixEventType, user_id: str, event_data: dict) -> bool:
+        """Met l'événement en file dans l'outbox (aucune I/O sur le thread appelant)."""
+        event = PhoenixEventData(
+            event_type=event_type,
+            user_id=user_id,
+            app_source="phoenix_rise",
+            payload=event_data,
+        )
+        return bool(self.event_bridge.enqueue_event(event))
+
     def publish_mood_logged(
         self, 
         user_id: str, 
@@ -64,14 +75,10 @@ class PhoenixRiseEventHelper:
                 "version": "1.0"
             }
             
-            success = self.event_bridge.publish_event(
-                event_type="MoodLogged",
-                data=event_data,
-                source="phoenix_rise"
-            )
+            success = self._publish(PhoenixEventType.MOOD_LOGGED, user_id, event_data)
             
             if success:
-                logger.info(f"✅ Événement MoodLogged publié pour user {user_id}")
+                logger.info(f"✅ Événement MoodLogged mis en file pour user {user_id}")
             else:
                 logger.error(f"❌ Échec publication MoodLogged pour user {user_id}")
                 
@@ -119,14 +126,10 @@ class PhoenixRiseEventHelper:
                 "version": "1.0"
             }
             
-            success = self.event_bridge.publish_event(
-                event_type="ObjectiveCreated",
-                data=event_data,
-                source="phoenix_rise"
-            )
+            success = self._publish(PhoenixEventType.OBJECTIVE_CREATED, user_id, event_data)
             
             if success:
-                logger.info(f"✅ Événement ObjectiveCreated publié pour user {user_id}")
+                logger.info(f"✅ Événement ObjectiveCreated mis en file pour user {user_id}")
             else:
                 logger.error(f"❌ Échec publication ObjectiveCreated pour user {user_id}")
                 
@@ -171,14 +174,10 @@ class PhoenixRiseEventHelper:
                 "version": "1.0"
             }
             
-            success = self.event_bridge.publish_event(
-                event_type="CoachingSessionStarted", 
-                data=event_data,
-                source="phoenix_rise"
-            )
+            success = self._publish(PhoenixEventType.COACHING_SESSION_STARTED, user_id, event_data)
             
             if success:
-                logger.info(f"✅ Événement CoachingSessionStarted publié pour user {user_id}")
+                logger.info(f"✅ Événement CoachingSessionStarted mis en file pour user {user_id}")
             else:
                 logger.error(f"❌ Échec publication CoachingSessionStarted pour user {user_id}")
                 
@@ -220,14 +219,10 @@ class PhoenixRiseEventHelper:
                 "version": "1.0"
             }
             
-            success = self.event_bridge.publish_event(
-                event_type="ProfileCreated",
-                data=event_data,
-                source="phoenix_rise"
-            )
+            success = self._publish(PhoenixEventType.PROFILE_CREATED, user_id, event_data)
             
             if success:
-                logger.info(f"✅ Événement ProfileCreated publié pour user {user_id}")
+                logger.info(f"✅ Événement ProfileCreated mis en file pour user {user_id}")
             else:
                 logger.error(f"❌ Échec publication ProfileCreated pour user {user_id}")
                 
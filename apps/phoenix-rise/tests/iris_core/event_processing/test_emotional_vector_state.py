@@ -169,3 +169,25 @@ class TestEmotionalVectorState:
         # No actions, negative confidence trend (default for empty)
         assert eev.burnout_risk_score > 0.5
 
+
+    def test_from_json_roundtrip(self, eev):
+        now = datetime.now(pytz.utc)
+        eev.update_mood(now - timedelta(days=1), 0.6)
+        eev.update_confidence(now, 0.7)
+        eev.update_action(now, "GoalSet")
+        eev.calculate_burnout_risk()
+
+        restored = EmotionalVectorState.from_json(eev.to_json())
+
+        assert restored.user_id == eev.user_id
+        assert restored.mood_average_7d == eev.mood_average_7d
+        assert restored.mood_count_7d == eev.mood_count_7d
+        assert list(restored.confidence_scores_30d) == list(eev.confidence_scores_30d)
+        assert restored.actions_count_7d == eev.actions_count_7d
+        assert restored.burnout_risk_score == eev.burnout_risk_score
+        assert list(restored.event_history_7d) == list(eev.event_history_7d)
+
+        # L'état restauré continue d'évoluer comme l'original
+        restored.update_mood(now, 0.9)
+        eev.update_mood(now, 0.9)
+        assert restored.mood_average_7d == pytest.approx(eev.mood_average_7d)
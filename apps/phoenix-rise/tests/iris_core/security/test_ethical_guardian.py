@@ -74,3 +74,18 @@ class TestEthicalGuardian:
     def test_get_fallback_response(self, guardian):
         fallback = guardian.get_fallback_response()
         assert "Je suis désolé, je ne peux pas répondre à cela directement." in fallback
+
+    def test_classification_is_case_insensitive(self, guardian):
+        results = guardian._simulate_nlp_classification("PRENDS CE MÉDICAMENT. C'est ta faute.")
+        assert results == {
+            "medical_advice_detected": True,
+            "diagnosis_detected": False,
+            "judgmental_tone_detected": True,
+            "sensitive_topic_detected": False,
+        }
+
+    def test_classification_multiple_categories(self, guardian):
+        results = guardian._simulate_nlp_classification("Tu es dépressif, avec des idées d'automutilation.")
+        assert results["diagnosis_detected"] is True
+        assert results["sensitive_topic_detected"] is True
+        assert results["medical_advice_detected"] is False
@@ -0,0 +1,183 @@
+"""
+Tests du store de snapshots EmotionalVectorState.
+
+Vérifie que snapshot + delta produit le même état qu'un replay complet.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+import pytz
+
+from iris_core.event_processing.emotional_vector_state import EmotionalVectorState
+from phoenix_rise.services.evs_snapshot_store import EVSSnapshotStore
+
+
+def _make_events(count: int, start: datetime):
+    events = []
+    for i in range(count):
+        event_type = ["MoodLogged", "ConfidenceScoreLogged", "GoalSet"][i % 3]
+        events.append({
+            "event_id": str(uuid.uuid4()),
+            "event_type": event_type,
+            "timestamp": (start + timedelta(hours=i)).isoformat(),
+            "payload": {"score": 0.3 + (i % 7) / 10},
+        })
+    return events
+
+
+def _full_replay(user_id, events):
+    evs = EmotionalVectorState(user_id=user_id)
+    for event in events:
+        evs.update_from_event({
+            "type": event["event_type"],
+            "timestamp": event["timestamp"],
+            "payload": event["payload"],
+        })
+    return evs
+
+
+class TestEVSSnapshotStore:
+    """Tests du checkpointing EEV."""
+
+    def setup_method(self):
+        self.user_id = str(uuid.uuid4())
+        self.events = _make_events(60, datetime.now(pytz.utc) - timedelta(days=3))
+
+    def test_snapshot_plus_delta_matches_full_replay(self):
+        store = EVSSnapshotStore(snapshot_interval=1000)
+
+        assert store.apply_events(self.user_id, self.events[:40]).event_count == 40
+
+        snapshot = store.load(self.user_id)
+        # La requête delta relit la fenêtre de recouvrement
+        store.apply_events(self.user_id, self.events[39:], snapshot)
+        restored = store.load(self.user_id).restore()
+
+        expected = _full_replay(self.user_id, self.events)
+        assert restored.mood_average_7d == expected.mood_average_7d
+        assert restored.confidence_trend == expected.confidence_trend
+        assert restored.actions_count_7d == expected.actions_count_7d
+        assert store.load(self.user_id).event_count == 60
+
+    def test_no_new_events_keeps_checkpoint(self):
+        store = EVSSnapshotStore()
+        store.apply_events(self.user_id, self.events)
+        snapshot = store.load(self.user_id)
+
+        assert store.apply_events(self.user_id, self.events[-1:], snapshot) is snapshot
+        assert snapshot.event_count == 60
+        assert store.load(self.user_id) is snapshot
+
+    def test_no_events_without_checkpoint_returns_none(self):
+        store = EVSSnapshotStore()
+
+        assert store.apply_events(self.user_id, []) is None
+        assert store.load(self.user_id) is None
+
+    def test_restore_returns_independent_copy(self):
+        store = EVSSnapshotStore()
+        snapshot = store.apply_events(self.user_id, self.events)
+        mood_average = snapshot.state.mood_average_7d
+
+        # Les appelants modifient l'EEV restauré avant d'émettre l'événement
+        evs = snapshot.restore()
+        evs.update_mood(datetime.now(pytz.utc), -1.0)
+        evs.update_action(datetime.now(pytz.utc), "GoalSet")
+
+        assert snapshot.state.mood_average_7d == mood_average
+        assert snapshot.state.actions_count_7d == _full_replay(self.user_id, self.events).actions_count_7d
+        assert len(snapshot.state.event_history_7d) == len(evs.event_history_7d) - 1
+
+    def test_delta_is_not_serialized_between_persists(self, monkeypatch):
+        client = MagicMock()
+        store = EVSSnapshotStore(client=client, snapshot_interval=1000)
+        snapshot = store.apply_events(self.user_id, self.events[:40])
+
+        def fail_to_json(self):
+            raise AssertionError("EEV sérialisé hors persistance")
+
+        monkeypatch.setattr(EmotionalVectorState, "to_json", fail_to_json)
+        for start in range(40, 60, 5):
+            snapshot = store.apply_events(self.user_id, self.events[start:start + 5], snapshot)
+
+        assert snapshot.event_count == 60
+        assert not client.table.return_value.upsert.called
+
+    def test_snapshot_persisted_every_interval(self):
+        client = MagicMock()
+        store = EVSSnapshotStore(client=client, snapshot_interval=25)
+
+        store.apply_events(self.user_id, self.events[:10])
+        assert not client.table.return_value.upsert.called
+
+        snapshot = store.load(self.user_id)
+        store.apply_events(self.user_id, self.events[9:30], snapshot)
+
+        client.table.assert_called_with("evs_snapshots")
+        assert client.table.return_value.upsert.call_count == 1
+        assert store.load(self.user_id).pending_events == 0
+        assert store.get_stats()["snapshots_persisted"] == 1
+
+    def test_load_from_supabase_when_not_cached(self):
+        source = EVSSnapshotStore()
+        source.apply_events(self.user_id, self.events)
+        row = source.load(self.user_id).to_row()
+
+        client = MagicMock()
+        client.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value = \
+            MagicMock(data=[row])
+        store = EVSSnapshotStore(client=client)
+
+        snapshot = store.load(self.user_id)
+
+        assert snapshot is not None
+        assert snapshot.event_count == 60
+        assert snapshot.restore().mood_average_7d == _full_replay(self.user_id, self.events).mood_average_7d
+
+    def test_late_event_with_older_timestamp_is_replayed(self):
+        store = EVSSnapshotStore(snapshot_interval=1000)
+        store.apply_events(self.user_id, self.events[:40])
+        snapshot = store.load(self.user_id)
+
+        # Inséré après le checkpoint mais daté (timestamp métier) d'avant
+        late = dict(self.events[40])
+        late["timestamp"] = self.events[5]["timestamp"]
+        late["created_at"] = (
+            datetime.fromisoformat(self.events[39]["timestamp"]) + timedelta(minutes=5)
+        ).isoformat()
+
+        store.apply_events(self.user_id, [late], snapshot)
+
+        assert store.load(self.user_id).event_count == 41
+        assert store.load(self.user_id).last_created_at == late["created_at"]
+
+    def test_overlap_window_is_deduplicated(self):
+        store = EVSSnapshotStore(snapshot_interval=1000, overlap_seconds=3 * 3600)
+        store.apply_events(self.user_id, self.events[:40])
+        snapshot = store.load(self.user_id)
+
+        # Seuls les événements encore couverts par la fenêtre sont mémorisés
+        assert set(snapshot.recent_event_ids) == {e["event_id"] for e in self.events[36:40]}
+        assert store.delta_start(snapshot) == (
+            datetime.fromisoformat(self.events[39]["timestamp"]) - timedelta(hours=3)
+        ).isoformat()
+
+        store.apply_events(self.user_id, self.events[36:45], snapshot)
+
+        assert store.load(self.user_id).event_count == 45
+
+    def test_failed_delta_drops_live_state(self):
+        store = EVSSnapshotStore()
+        snapshot = store.apply_events(self.user_id, self.events[:40])
+
+        broken = dict(self.events[40])
+        broken["event_id"] = str(uuid.uuid4())
+        broken["timestamp"] = "pas une date"
+        with pytest.raises(ValueError):
+            store.apply_events(self.user_id, [self.events[40], broken], snapshot)
+
+        # L'état partiellement avancé n'est plus servi depuis la mémoire
+        assert store.load(self.user_id) is None
@@ -0,0 +1,22 @@
+-- 📊 PHOENIX EVENT ROLLUPS - Agrégats pour get_ecosystem_stats
+-- Un bucket par (granularité, début de période, application) :
+-- compteurs par type d'événement + HyperLogLog des utilisateurs (registres zlib + base64)
+-- Alimentée par: python -m phoenix_event_bridge.event_rollups
+
+CREATE TABLE IF NOT EXISTS event_rollups (
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('day', 'month')),
+    bucket_start DATE NOT NULL,
+    app_source VARCHAR(50) NOT NULL,
+
+    total_events BIGINT NOT NULL DEFAULT 0,
+    event_counts JSONB NOT NULL DEFAULT '{}',
+    users_hll TEXT NOT NULL,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (granularity, bucket_start, app_source)
+);
+
+CREATE INDEX IF NOT EXISTS idx_event_rollups_bucket ON event_rollups(granularity, bucket_start);
+
+-- Lecture/écriture réservées au service role (pas de données personnelles, mais usage interne)
+ALTER TABLE event_rollups ENABLE ROW LEVEL SECURITY;
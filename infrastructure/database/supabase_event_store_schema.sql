@@ -21,6 +21,7 @@ CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type);
 CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
 CREATE INDEX IF NOT EXISTS idx_events_app_source ON events(app_source);
 CREATE INDEX IF NOT EXISTS idx_events_stream_timestamp ON events(stream_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_stream_created_at ON events(stream_id, created_at);
 
 -- RLS pour sécurité RGPD
 ALTER TABLE events ENABLE ROW LEVEL SECURITY;
@@ -52,6 +53,26 @@ ALTER TABLE user_profile_snapshots ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Users can view own snapshots" ON user_profile_snapshots
     FOR SELECT USING (user_id = auth.uid());
 
+-- Checkpoints EmotionalVectorState (reconstruction incrémentale Phoenix Rise)
+CREATE TABLE IF NOT EXISTS evs_snapshots (
+    user_id UUID PRIMARY KEY,
+    state JSONB NOT NULL,
+    last_created_at TIMESTAMPTZ,
+    recent_event_ids JSONB DEFAULT '{}'::jsonb,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- RLS pour checkpoints EEV
+ALTER TABLE evs_snapshots ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Users can view own evs snapshots" ON evs_snapshots
+    FOR SELECT USING (user_id = auth.uid());
+-- Le checkpoint est écrit par upsert (INSERT ... ON CONFLICT DO UPDATE)
+CREATE POLICY "Services can insert evs snapshots" ON evs_snapshots
+    FOR INSERT WITH CHECK (true);
+CREATE POLICY "Services can update evs snapshots" ON evs_snapshots
+    FOR UPDATE USING (true) WITH CHECK (true);
+
 -- Vue pour analytics en temps réel
 CREATE OR REPLACE VIEW user_activity_summary AS
 SELECT 
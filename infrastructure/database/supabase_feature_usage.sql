@@ -0,0 +1,49 @@
+-- 📊 PHOENIX FEATURE USAGE - Compteurs d'usage mensuels par fonctionnalité
+-- Une ligne par (utilisateur, app, fonctionnalité, mois "YYYY-MM").
+-- Alimentés par UsageCounterBuffer (phoenix-shared-auth) : les incréments sont
+-- accumulés en mémoire puis envoyés par lots via increment_feature_usage.
+
+CREATE TABLE IF NOT EXISTS phoenix_feature_usage (
+    user_id UUID NOT NULL,
+    app VARCHAR(20) NOT NULL,
+    feature VARCHAR(100) NOT NULL,
+    period CHAR(7) NOT NULL,
+
+    count INTEGER NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (user_id, period, app, feature)
+);
+
+ALTER TABLE phoenix_feature_usage ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own feature usage" ON phoenix_feature_usage
+    FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Services can manage feature usage" ON phoenix_feature_usage
+    FOR ALL USING (auth.jwt() ->> 'role' = 'service_role');
+
+-- Incréments groupés : p_rows = [{"user_id", "app", "feature", "period", "delta"}, ...]
+-- L'addition se fait côté base : des flushs concurrents de plusieurs instances s'additionnent.
+CREATE OR REPLACE FUNCTION increment_feature_usage(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    INSERT INTO phoenix_feature_usage (user_id, app, feature, period, count)
+    SELECT
+        (row->>'user_id')::UUID,
+        row->>'app',
+        row->>'feature',
+        row->>'period',
+        SUM((row->>'delta')::INTEGER)
+    FROM jsonb_array_elements(p_rows) AS row
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (user_id, period, app, feature) DO UPDATE
+        SET count = phoenix_feature_usage.count + EXCLUDED.count,
+            updated_at = NOW();
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
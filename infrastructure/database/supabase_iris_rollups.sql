@@ -0,0 +1,35 @@
+-- 📈 IRIS ROLLUPS - Agrégats analytics de l'API Iris
+-- Une ligne par (jour, instance) : les lectures fusionnent les instances.
+-- Alimentées à chaque flush de IrisAnalytics ; reconstruction :
+--   python -m monitoring.iris_rollups backfill --start YYYY-MM-DD
+
+CREATE TABLE IF NOT EXISTS iris_rollups_daily (
+    date DATE NOT NULL,
+    instance_id VARCHAR(100) NOT NULL,
+
+    event_counts JSONB NOT NULL DEFAULT '{}',
+    tier_breakdown JSONB NOT NULL DEFAULT '{}',
+    response_time_histogram JSONB NOT NULL DEFAULT '[]',
+    response_time_total_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    users_hll TEXT NOT NULL,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (date, instance_id)
+);
+
+CREATE TABLE IF NOT EXISTS iris_user_rollups_daily (
+    date DATE NOT NULL,
+    user_hash VARCHAR(16) NOT NULL,
+    instance_id VARCHAR(100) NOT NULL,
+
+    message_count INTEGER NOT NULL DEFAULT 0,
+    total_events INTEGER NOT NULL DEFAULT 0,
+    last_activity TIMESTAMPTZ,
+
+    PRIMARY KEY (date, user_hash, instance_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_iris_user_rollups_user ON iris_user_rollups_daily(user_hash, date);
+
+ALTER TABLE iris_rollups_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE iris_user_rollups_daily ENABLE ROW LEVEL SECURITY;
@@ -3,11 +3,22 @@
 Module dédié à la sécurisation de l'agent Iris contre les attaques communes.
 """
 
+import os
 import re
+import sys
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+try:
+    from phoenix_scan import PatternScanner, ScanRule
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_scan import PatternScanner, ScanRule
+
 # Configuration logging sécurisé
 logger = logging.getLogger(__name__)
 
@@ -43,8 +54,8 @@ class PromptInjectionGuard:
         r'new\s+(conversation|session|user)',
     ]
     
-    def __init__(self):
-        self.compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.DANGEROUS_PATTERNS]
+    # Tous les patterns évalués en un seul scan (compilé une fois pour la classe)
+    _scanner = PatternScanner(ScanRule(pattern, flags=re.IGNORECASE) for pattern in DANGEROUS_PATTERNS)
     
     def is_potentially_malicious(self, text: str) -> tuple[bool, List[str]]:
         """
@@ -53,11 +64,7 @@ class PromptInjectionGuard:
         Returns:
             tuple: (is_malicious, list_of_detected_patterns)
         """
-        detected_patterns = []
-        
-        for i, pattern in enumerate(self.compiled_patterns):
-            if pattern.search(text):
-                detected_patterns.append(self.DANGEROUS_PATTERNS[i])
+        detected_patterns = [rule.pattern for rule in self._scanner.matched_rules(text)]
         
         return len(detected_patterns) > 0, detected_patterns
     
@@ -73,6 +73,20 @@ class PyPDFDoSMitigator:
             signal.alarm(0)  # Cancel alarm
             signal.signal(signal.SIGALRM, old_handler)  # Restore old handler
     
+    @classmethod
+    def check_pdf_bytes(cls, pdf_content: bytes) -> None:
+        """
+        Contrôles DoS sans parsing (taille, motifs CVE-2023-36810, PDF bombs).
+        
+        Pour les extracteurs autres que pypdf, qui appliquent leur propre timeout.
+        
+        Raises:
+            ValueError: Si le PDF est trop volumineux ou suspect
+        """
+        if len(pdf_content) > cls.MAX_PDF_SIZE_MB * 1024 * 1024:
+            raise ValueError(f"PDF trop volumineux: {len(pdf_content)} bytes")
+        cls._scan_dangerous_pdf_patterns(pdf_content)
+    
     @classmethod
     def safe_pdf_text_extraction(cls, pdf_content: bytes, filename: str = "upload.pdf") -> str:
         """
@@ -235,6 +249,13 @@ def safe_extract_pdf_text(pdf_content: bytes, filename: str = "upload.pdf") -> s
     """
     return PyPDFDoSMitigator.safe_pdf_text_extraction(pdf_content, filename)
 
+def check_pdf_bytes(pdf_content: bytes) -> None:
+    """
+    Interface simplifiée des contrôles DoS sans parsing.
+    Lève ValueError si le PDF est trop volumineux ou contient des motifs dangereux.
+    """
+    PyPDFDoSMitigator.check_pdf_bytes(pdf_content)
+
 # Test de sécurité pour l'équipe
 def test_pdf_vulnerability_protection():
     """Test de protection contre la vulnérabilité pypdf DoS"""
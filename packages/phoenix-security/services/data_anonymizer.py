@@ -7,12 +7,75 @@ Version: 1.0.0 - Privacy by Design
 """
 
 import re
+import sys
 import hashlib
 import html
 import bleach
+from pathlib import Path
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 
+try:
+    from phoenix_scan import PatternScanner, ScanRule
+except ImportError:
+    # Exécution depuis le monorepo sans installation du package
+    PACKAGES_PATH = next(
+        (str(parent) for parent in Path(__file__).resolve().parents if (parent / "phoenix_scan").is_dir()),
+        None,
+    )
+    if PACKAGES_PATH and PACKAGES_PATH not in sys.path:
+        sys.path.insert(0, PACKAGES_PATH)
+    from phoenix_scan import PatternScanner, ScanRule
+
+
+# Patterns PII : (type PII, pattern, flags), dans l'ordre de priorité d'anonymisation.
+# Quand deux PII se chevauchent, la première l'emporte : les identifiants structurés
+# (email, IBAN, carte) passent avant les noms ou les téléphones trouvés à l'intérieur
+PII_PATTERNS = [
+    ("email", r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE),
+    ("iban", r'\b[A-Z]{2}\d{2}[A-Z0-9]{4}\d{7}[A-Z0-9]{1,7}\b', 0),
+    ("carte_bancaire", r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', 0),
+    ("telephone", r'(?:\+33|0)[1-9](?:[0-9]{8})|(?:\+33\s?|0)[1-9](?:\s?[0-9]{2}){4}', re.IGNORECASE),
+    ("nom_prenom", r'\b[A-Z][a-z]+ [A-Z][a-z]+\b', 0),        # Prénom Nom
+    ("nom_prenom", r'\bMonsieur [A-Z][a-z]+\b', 0),           # M. Nom
+    ("nom_prenom", r'\bMadame [A-Z][a-z]+\b', 0),             # Mme Nom
+    ("nom_prenom", r'\bMademoiselle [A-Z][a-z]+\b', 0),       # Mlle Nom
+    ("adresse", r'\d+\s+(rue|avenue|boulevard|place|impasse|chemin)\s+[A-Za-z\s]+', re.IGNORECASE),
+    ("code_postal", r'\b\d{5}\b', 0),
+]
+
+PII_PLACEHOLDERS = {
+    "email": "[EMAIL_ANONYME]",
+    "telephone": "[TELEPHONE_ANONYME]",
+    "nom_prenom": "[NOM_ANONYME]",
+    "adresse": "[ADRESSE_ANONYME]",
+    "code_postal": "[CP_ANONYME]",
+    "carte_bancaire": "[CB_ANONYME]",
+    "iban": "[IBAN_ANONYME]",
+}
+
+# PII supprimées (et non remplacées) quand preserve_structure=False
+STRUCTURAL_PII = {"email", "telephone", "nom_prenom", "adresse"}
+
+# PII traitées par niveau (un niveau inconnu est traité comme BASIC)
+LEVEL_PII = {
+    "BASIC": {"email", "telephone", "carte_bancaire", "iban"},
+    "ADVANCED": {"email", "telephone", "nom_prenom", "carte_bancaire", "iban"},
+    "RESEARCH": set(PII_PLACEHOLDERS),
+}
+
+# PII qui rendent un texte non anonyme
+IDENTIFYING_PII = {"email", "telephone", "nom_prenom", "carte_bancaire", "iban"}
+
+_PII_RULES = [ScanRule(pattern, category=pii_type, flags=flags) for pii_type, pattern, flags in PII_PATTERNS]
+
+# Scanners compilés une fois à l'import (un par niveau)
+_LEVEL_SCANNERS = {
+    level: PatternScanner(rule for rule in _PII_RULES if rule.category in pii_types)
+    for level, pii_types in LEVEL_PII.items()
+}
+_IDENTIFYING_SCANNER = PatternScanner(rule for rule in _PII_RULES if rule.category in IDENTIFYING_PII)
+
 
 @dataclass
 class AnonymizationResult:
@@ -43,45 +106,6 @@ class DataAnonymizer:
             anonymization_level: BASIC, ADVANCED, ou RESEARCH
         """
         self.level = anonymization_level
-        self._setup_patterns()
-    
-    def _setup_patterns(self):
-        """Configuration des patterns de détection PII"""
-        
-        # Patterns emails
-        self.email_pattern = re.compile(
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            re.IGNORECASE
-        )
-        
-        # Patterns téléphones français
-        self.phone_pattern = re.compile(
-            r'(?:\+33|0)[1-9](?:[0-9]{8})|(?:\+33\s?|0)[1-9](?:\s?[0-9]{2}){4}',
-            re.IGNORECASE
-        )
-        
-        # Patterns noms/prénoms (patterns simples)
-        self.name_patterns = [
-            re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b'),  # Prénom Nom
-            re.compile(r'\bMonsieur [A-Z][a-z]+\b'),      # M. Nom
-            re.compile(r'\bMadame [A-Z][a-z]+\b'),        # Mme Nom
-            re.compile(r'\bMademoiselle [A-Z][a-z]+\b'),  # Mlle Nom
-        ]
-        
-        # Patterns adresses (basique)
-        self.address_pattern = re.compile(
-            r'\d+\s+(rue|avenue|boulevard|place|impasse|chemin)\s+[A-Za-z\s]+',
-            re.IGNORECASE
-        )
-        
-        # Patterns codes postaux français
-        self.postal_code_pattern = re.compile(r'\b\d{5}\b')
-        
-        # Patterns cartes bancaires
-        self.credit_card_pattern = re.compile(r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b')
-        
-        # Patterns IBAN/RIB
-        self.iban_pattern = re.compile(r'\b[A-Z]{2}\d{2}[A-Z0-9]{4}\d{7}[A-Z0-9]{1,7}\b')
     
     def anonymize_text(self, text: str, preserve_structure: bool = True) -> AnonymizationResult:
         """
@@ -104,57 +128,17 @@ class DataAnonymizer:
             )
         
         original_length = len(text)
-        anonymized_text = text
-        pii_detected = []
-        
-        # 1. Anonymisation emails
-        if self.email_pattern.search(anonymized_text):
-            pii_detected.append("email")
-            if preserve_structure:
-                anonymized_text = self.email_pattern.sub("[EMAIL_ANONYME]", anonymized_text)
-            else:
-                anonymized_text = self.email_pattern.sub("", anonymized_text)
         
-        # 2. Anonymisation téléphones
-        if self.phone_pattern.search(anonymized_text):
-            pii_detected.append("telephone")
-            if preserve_structure:
-                anonymized_text = self.phone_pattern.sub("[TELEPHONE_ANONYME]", anonymized_text)
-            else:
-                anonymized_text = self.phone_pattern.sub("", anonymized_text)
+        # 1-5. Emails, téléphones, noms, adresses, codes postaux et données financières
+        # selon le niveau, dans l'ordre de PII_PATTERNS (la première PII l'emporte en cas de chevauchement)
+        def replacement(hit) -> str:
+            if not preserve_structure and hit.category in STRUCTURAL_PII:
+                return ""
+            return PII_PLACEHOLDERS[hit.category]
         
-        # 3. Anonymisation noms/prénoms (niveau ADVANCED et RESEARCH seulement)
-        if self.level in ["ADVANCED", "RESEARCH"]:
-            for pattern in self.name_patterns:
-                if pattern.search(anonymized_text):
-                    pii_detected.append("nom_prenom")
-                    if preserve_structure:
-                        anonymized_text = pattern.sub("[NOM_ANONYME]", anonymized_text)
-                    else:
-                        anonymized_text = pattern.sub("", anonymized_text)
-        
-        # 4. Anonymisation adresses (niveau RESEARCH seulement)
-        if self.level == "RESEARCH":
-            if self.address_pattern.search(anonymized_text):
-                pii_detected.append("adresse")
-                if preserve_structure:
-                    anonymized_text = self.address_pattern.sub("[ADRESSE_ANONYME]", anonymized_text)
-                else:
-                    anonymized_text = self.address_pattern.sub("", anonymized_text)
-            
-            # Codes postaux
-            if self.postal_code_pattern.search(anonymized_text):
-                pii_detected.append("code_postal")
-                anonymized_text = self.postal_code_pattern.sub("[CP_ANONYME]", anonymized_text)
-        
-        # 5. Anonymisation données financières
-        if self.credit_card_pattern.search(anonymized_text):
-            pii_detected.append("carte_bancaire")
-            anonymized_text = self.credit_card_pattern.sub("[CB_ANONYME]", anonymized_text)
-        
-        if self.iban_pattern.search(anonymized_text):
-            pii_detected.append("iban")
-            anonymized_text = self.iban_pattern.sub("[IBAN_ANONYME]", anonymized_text)
+        scanner = _LEVEL_SCANNERS.get(self.level, _LEVEL_SCANNERS["BASIC"])
+        anonymized_text, applied = scanner.sub(text, replacement)
+        pii_detected = [hit.category for hit in applied]
         
         # 6. Nettoyage final des espaces multiples
         anonymized_text = re.sub(r'\s+', ' ', anonymized_text).strip()
@@ -165,7 +149,7 @@ class DataAnonymizer:
         return AnonymizationResult(
             original_length=original_length,
             anonymized_text=anonymized_text,
-            pii_detected=list(set(pii_detected)),  # Suppression des doublons
+            pii_detected=list(dict.fromkeys(pii_detected)),  # Suppression des doublons
             anonymization_level=self.level,
             success=True
         )
@@ -318,24 +302,8 @@ class DataAnonymizer:
         if not text:
             return True
         
-        # Test des patterns PII
-        pii_patterns = [
-            self.email_pattern,
-            self.phone_pattern,
-            self.credit_card_pattern,
-            self.iban_pattern
-        ]
-        
-        for pattern in pii_patterns:
-            if pattern.search(text):
-                return False
-        
-        # Test des noms (basique)
-        for pattern in self.name_patterns:
-            if pattern.search(text):
-                return False
-        
-        return True
+        # Test des patterns PII (emails, téléphones, données financières, noms)
+        return not _IDENTIFYING_SCANNER.scan(text)
 
 
 # Instance globale pour utilisation facile
@@ -0,0 +1,15 @@
+import os
+import sys
+import types
+
+# Le dossier du package (phoenix-security) n'est pas un nom importable :
+# on l'enregistre sous son nom d'import phoenix_security, sans exécuter __init__
+PACKAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if "phoenix_security" not in sys.modules:
+    package = types.ModuleType("phoenix_security")
+    package.__path__ = [PACKAGE_DIR]
+    package.__file__ = os.path.join(PACKAGE_DIR, "__init__.py")
+    sys.modules["phoenix_security"] = package
+    # pytest importe le __init__.py d'un dossier au nom non importable sous le nom "__init__"
+    sys.modules.setdefault("__init__", package)
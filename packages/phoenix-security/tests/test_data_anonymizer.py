@@ -0,0 +1,68 @@
+"""
+Tests de l'anonymiseur : PII qui se chevauchent (la PII prioritaire l'emporte),
+niveaux d'anonymisation, suppression sans structure et vérification d'anonymat.
+"""
+
+import pytest
+
+from phoenix_security.services.data_anonymizer import DataAnonymizer, anonymize_text
+
+
+class TestOverlappingPII:
+
+    def test_email_is_not_split_by_a_name(self):
+        result = DataAnonymizer("RESEARCH").anonymize_text("Contact Jean.Dupont@gmail.com")
+
+        assert result.anonymized_text == "Contact [EMAIL_ANONYME]"
+        assert result.pii_detected == ["email"]
+
+    def test_iban_is_not_split_by_a_phone_number(self):
+        result = DataAnonymizer("BASIC").anonymize_text("IBAN DE89370400440532013000 merci")
+
+        assert result.anonymized_text == "IBAN [IBAN_ANONYME] merci"
+        assert "0532013000" not in result.anonymized_text
+
+    def test_card_is_not_split_by_a_postal_code(self):
+        assert anonymize_text("Carte 4970-1012-3456-7890") == "Carte [CB_ANONYME]"
+
+    def test_later_pii_is_masked_around_replaced_spans(self):
+        assert anonymize_text("Ecrire a Jean Dupont, 12 rue de la Paix Madame Curie") == (
+            "Ecrire a [NOM_ANONYME], [ADRESSE_ANONYME][NOM_ANONYME] Curie"
+        )
+
+
+class TestAnonymizationLevels:
+    TEXT = "Jean Dupont, jean@mail.fr, 0612345678, 75002 Paris"
+
+    @pytest.mark.parametrize("level, expected", [
+        ("BASIC", "Jean Dupont, [EMAIL_ANONYME], [TELEPHONE_ANONYME], 75002 Paris"),
+        ("ADVANCED", "[NOM_ANONYME], [EMAIL_ANONYME], [TELEPHONE_ANONYME], 75002 Paris"),
+        ("RESEARCH", "[NOM_ANONYME], [EMAIL_ANONYME], [TELEPHONE_ANONYME], [CP_ANONYME] Paris"),
+        ("INCONNU", "Jean Dupont, [EMAIL_ANONYME], [TELEPHONE_ANONYME], 75002 Paris"),
+    ])
+    def test_levels(self, level, expected):
+        assert DataAnonymizer(level).anonymize_text(self.TEXT).anonymized_text == expected
+
+    def test_structure_is_removed_without_placeholders(self):
+        result = DataAnonymizer("RESEARCH").anonymize_text(self.TEXT, preserve_structure=False)
+
+        assert result.anonymized_text == ", , , [CP_ANONYME] Paris"
+        assert result.pii_detected == ["nom_prenom", "email", "telephone", "code_postal"]
+
+    def test_output_is_html_escaped(self):
+        assert anonymize_text("<b>Jean Dupont</b>") == "&lt;b&gt;[NOM_ANONYME]&lt;/b&gt;"
+
+    def test_empty_text(self):
+        result = DataAnonymizer().anonymize_text("")
+        assert (result.anonymized_text, result.pii_detected, result.success) == ("", [], True)
+
+
+class TestIsDataAnonymous:
+
+    def test_identifying_pii_is_detected(self):
+        anonymizer = DataAnonymizer()
+
+        assert anonymizer.is_data_anonymous("75002 Paris, 12 rue de la Paix") is True
+        assert anonymizer.is_data_anonymous("Appeler Marie Curie") is False
+        assert anonymizer.is_data_anonymous("FR1420041010050500013M02606") is False
+        assert anonymizer.is_data_anonymous(anonymize_text("Contact Jean.Dupont@gmail.com")) is True
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark GeminiCacheOptimizer : latence set/get à 1k/10k/100k entrées.
+
+Pour chaque taille, le cache est rempli puis mesuré :
+- get (hit) sur des clés existantes
+- set sur des clés nouvelles, cache plein (éviction à chaque dépassement)
+- nettoyage TTL quand toutes les entrées ont expiré
+
+Une latence stable d'une taille à l'autre confirme le coût O(1) amorti.
+
+Usage: python benchmark_gemini_cache.py
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.gemini_cache_optimizer import CachePriority, GeminiCacheOptimizer
+
+SIZES = [1_000, 10_000, 100_000]
+SAMPLES = 5_000
+PROMPT = "Rédige une lettre de motivation pour {poste}"
+CONTENT = "Madame, Monsieur, " + "x" * 400
+PRIORITIES = list(CachePriority)
+
+
+def user_data(i: int) -> dict:
+    return {"poste": f"poste_{i}", "entreprise": f"entreprise_{i % 97}"}
+
+
+def fill(size: int) -> GeminiCacheOptimizer:
+    # Budget calé pour que le cache soit plein à `size` entrées
+    entry_bytes = len(CONTENT.encode("utf-8"))
+    cache = GeminiCacheOptimizer(max_size_mb=size * entry_bytes / (1024 * 1024))
+    for i in range(size):
+        cache.set(PROMPT, user_data(i), CONTENT, ttl=3600,
+                  priority=PRIORITIES[i % len(PRIORITIES)])
+    return cache
+
+
+def per_op_us(func, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+def main():
+    logging.disable(logging.INFO)
+
+    print(f"{'entrées':>8} | {'get hit':>10} | {'set plein':>10} | {'expiration':>12} | {'évictions':>9}")
+    print("-" * 62)
+
+    for size in SIZES:
+        cache = fill(size)
+
+        get_us = per_op_us(lambda i: cache.get(PROMPT, user_data(i % size)), SAMPLES)
+        set_us = per_op_us(
+            lambda i: cache.set(PROMPT, user_data(size + i), CONTENT, ttl=3600),
+            SAMPLES,
+        )
+
+        # Toutes les entrées sont échues : la roue les retire en une passe
+        entries = len(cache._cache)
+        start = time.perf_counter()
+        cache._expire_due(now=time.time() + 7200)
+        expire_us = (time.perf_counter() - start) / max(entries, 1) * 1_000_000
+
+        stats = cache.get_stats()
+        print(f"{size:>8} | {get_us:>7.2f} µs | {set_us:>7.2f} µs | "
+              f"{expire_us:>6.2f} µs/ent | {stats['total_evictions']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,13 @@ from .gemini_cache_optimizer import (
     get_cache_optimizer,
     cache_gemini_call
 )
+from .gemini_cache_l2 import (
+    CacheBackend,
+    EncryptedCacheBackend,
+    SQLiteCacheBackend,
+    RedisCacheBackend,
+    L2CacheTier
+)
 
 __all__ = [
     "EthicalNLPTagger",
@@ -26,5 +33,10 @@ __all__ = [
     "CacheEntry", 
     "CachePriority",
     "get_cache_optimizer",
-    "cache_gemini_call"
+    "cache_gemini_call",
+    "CacheBackend",
+    "EncryptedCacheBackend",
+    "SQLiteCacheBackend",
+    "RedisCacheBackend",
+    "L2CacheTier"
 ]
\ No newline at end of file
@@ -0,0 +1,491 @@
+"""
+Tier persistant (L2) pour GeminiCacheOptimizer.
+Cache partagé entre processus et redémarrages : SQLite local ou Redis.
+
+Les entrées sont stockées compressées, indexées par la clé SHA-256 de
+`GeminiCacheOptimizer._generate_cache_key`, et expirent selon leur TTL
+quel que soit le processus qui les relit. Les écritures partent en
+write-behind sur un thread dédié pour ne jamais bloquer l'appel Gemini.
+
+Les réponses Gemini dérivent de CV et de lettres (données personnelles RGPD) :
+le tier est désactivé par défaut, ses charges utiles sont chiffrées (Fernet)
+et le fichier SQLite vit dans un répertoire privé (0700).
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import stat
+import struct
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import redis
+except ImportError:
+    # Backend Redis indisponible sans le client redis-py
+    redis = None
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    # Chiffrement L2 indisponible sans cryptography : le tier L2 reste désactivé
+    Fernet = None
+    InvalidToken = Exception
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class L2Record:
+    """Entrée du tier L2 (contenu compressé + métadonnées d'expiration)."""
+    payload: bytes
+    created_at: float
+    ttl_seconds: int
+    priority: int
+
+    @classmethod
+    def from_content(cls, content: str, created_at: float, ttl_seconds: int, priority: int) -> "L2Record":
+        return cls(zlib.compress(content.encode('utf-8')), created_at, ttl_seconds, priority)
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + self.ttl_seconds
+
+    @property
+    def is_expired(self) -> bool:
+        return time.time() > self.expires_at
+
+    @property
+    def content(self) -> str:
+        return zlib.decompress(self.payload).decode('utf-8')
+
+class CacheBackend(ABC):
+    """Interface d'un backend L2 (appels synchrones, thread-safe)."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, cache_key: str) -> Optional[L2Record]:
+        pass
+
+    @abstractmethod
+    def set_many(self, items: List[Tuple[str, L2Record]]) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, cache_key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> int:
+        pass
+
+    def purge_expired(self) -> int:
+        """Supprime les entrées expirées (no-op si le backend gère les TTL)."""
+        return 0
+
+    def count(self) -> int:
+        return -1
+
+    def close(self) -> None:
+        pass
+
+def _ensure_private_dir(directory: Path) -> None:
+    """Crée le répertoire en 0700 et refuse un répertoire partagé ou d'un autre utilisateur."""
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = directory.stat()
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"L2 cache directory not owned by current user: {directory}")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(directory, 0o700)
+
+class EncryptedCacheBackend(CacheBackend):
+    """🔐 Chiffre les charges utiles (Fernet) avant tout backend L2."""
+
+    def __init__(self, backend: CacheBackend, key: bytes):
+        """
+        Args:
+            backend: Backend de stockage sous-jacent
+            key: Clé Fernet (32 octets encodés en base64 url-safe)
+        """
+        if Fernet is None:
+            raise ImportError("cryptography requis pour chiffrer le tier L2 (pip install cryptography)")
+        self.backend = backend
+        self.name = backend.name
+        self._fernet = Fernet(key)
+        self.decrypt_errors = 0
+
+    def get(self, cache_key: str) -> Optional[L2Record]:
+        record = self.backend.get(cache_key)
+        if record is None:
+            return None
+        try:
+            payload = self._fernet.decrypt(record.payload)
+        except InvalidToken:
+            # Clé changée ou entrée altérée : traité comme un miss
+            self.decrypt_errors += 1
+            return None
+        return L2Record(payload, record.created_at, record.ttl_seconds, record.priority)
+
+    def set_many(self, items: List[Tuple[str, L2Record]]) -> None:
+        self.backend.set_many([
+            (key, L2Record(self._fernet.encrypt(record.payload), record.created_at,
+                           record.ttl_seconds, record.priority))
+            for key, record in items
+        ])
+
+    def delete(self, cache_key: str) -> None:
+        self.backend.delete(cache_key)
+
+    def clear(self) -> int:
+        return self.backend.clear()
+
+    def purge_expired(self) -> int:
+        return self.backend.purge_expired()
+
+    def count(self) -> int:
+        return self.backend.count()
+
+    def close(self) -> None:
+        self.backend.close()
+
+class SQLiteCacheBackend(CacheBackend):
+    """💾 Backend SQLite local (WAL) partagé entre les processus d'une même machine."""
+
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS gemini_cache (
+        cache_key TEXT PRIMARY KEY,
+        payload BLOB NOT NULL,
+        created_at REAL NOT NULL,
+        ttl_seconds INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        priority INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_gemini_cache_expires_at ON gemini_cache(expires_at);
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 100_000):
+        """
+        Args:
+            db_path: Fichier SQLite (partagé par tous les processus)
+            max_entries: Nombre max d'entrées conservées après purge
+        """
+        self.db_path = Path(db_path)
+        _ensure_private_dir(self.db_path.parent)
+        # Fichier créé en 0600 (SQLite applique les mêmes droits au WAL et au -shm)
+        os.close(os.open(self.db_path, os.O_RDWR | os.O_CREAT, 0o600))
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def get(self, cache_key: str) -> Optional[L2Record]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at, ttl_seconds, priority FROM gemini_cache "
+                "WHERE cache_key = ? AND expires_at > ?",
+                (cache_key, time.time())
+            ).fetchone()
+        return L2Record(*row) if row else None
+
+    def set_many(self, items: List[Tuple[str, L2Record]]) -> None:
+        rows = [
+            (key, record.payload, record.created_at, record.ttl_seconds, record.expires_at, record.priority)
+            for key, record in items
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO gemini_cache "
+                "(cache_key, payload, created_at, ttl_seconds, expires_at, priority) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def delete(self, cache_key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM gemini_cache WHERE cache_key = ?", (cache_key,))
+
+    def clear(self) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM gemini_cache").rowcount
+
+    def purge_expired(self) -> int:
+        """Supprime les entrées expirées puis les plus proches d'expirer au-delà de max_entries."""
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM gemini_cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            excess = self._conn.execute("SELECT COUNT(*) FROM gemini_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM gemini_cache WHERE cache_key IN "
+                    "(SELECT cache_key FROM gemini_cache ORDER BY priority, expires_at LIMIT ?)",
+                    (excess,)
+                ).rowcount
+        return removed
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM gemini_cache").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class RedisCacheBackend(CacheBackend):
+    """🌐 Backend Redis partagé entre machines (TTL natif Redis)."""
+
+    name = "redis"
+
+    # created_at (double), ttl_seconds (uint32), priority (uint8)
+    _HEADER = struct.Struct(">dIB")
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "phoenix:gemini:", client: Any = None):
+        """
+        Args:
+            url: URL de connexion Redis
+            prefix: Préfixe des clés Phoenix
+            client: Client redis-py existant (prioritaire sur url)
+        """
+        if client is None:
+            if redis is None:
+                raise ImportError("redis-py requis pour RedisCacheBackend (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self.prefix = prefix
+
+    def _key(self, cache_key: str) -> str:
+        return f"{self.prefix}{cache_key}"
+
+    def get(self, cache_key: str) -> Optional[L2Record]:
+        raw = self._client.get(self._key(cache_key))
+        if not raw:
+            return None
+        created_at, ttl_seconds, priority = self._HEADER.unpack_from(raw)
+        record = L2Record(raw[self._HEADER.size:], created_at, ttl_seconds, priority)
+        return None if record.is_expired else record
+
+    def set_many(self, items: List[Tuple[str, L2Record]]) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        now = time.time()
+        for key, record in items:
+            remaining_ms = int((record.expires_at - now) * 1000)
+            if remaining_ms <= 0:
+                continue
+            header = self._HEADER.pack(record.created_at, record.ttl_seconds, record.priority)
+            pipeline.set(self._key(key), header + record.payload, px=remaining_ms)
+        pipeline.execute()
+
+    def delete(self, cache_key: str) -> None:
+        self._client.delete(self._key(cache_key))
+
+    def clear(self) -> int:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+        return len(keys)
+
+    def close(self) -> None:
+        self._client.close()
+
+_STOP = object()
+
+class L2CacheTier:
+    """
+    🗄️ Tier L2 devant un backend : lectures directes, écritures write-behind.
+
+    Les écritures en attente restent lisibles immédiatement dans le processus
+    courant, puis sont envoyées par lots au backend par un thread dédié.
+    """
+
+    def __init__(self, backend: CacheBackend, max_batch_size: int = 200, purge_every: int = 1000):
+        """
+        Args:
+            backend: Backend de stockage L2
+            max_batch_size: Taille max d'un lot d'écriture
+            purge_every: Purge des expirés toutes les N écritures
+        """
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.purge_every = purge_every
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._pending: Dict[str, L2Record] = {}
+        self._pending_lock = threading.Lock()
+        self._writes_since_purge = 0
+        self._closed = False
+
+        self._stats = {
+            'lookups': 0,
+            'hits': 0,
+            'misses': 0,
+            'read_errors': 0,
+            'writes': 0,
+            'write_batches': 0,
+            'write_errors': 0,
+            'purged': 0
+        }
+
+        self._writer = threading.Thread(target=self._writer_loop, name="gemini-cache-l2-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def get(self, cache_key: str) -> Optional[L2Record]:
+        """Lit une entrée (écritures en attente incluses)."""
+        self._stats['lookups'] += 1
+
+        with self._pending_lock:
+            record = self._pending.get(cache_key)
+
+        if record is None:
+            try:
+                record = self.backend.get(cache_key)
+            except Exception as e:
+                self._stats['read_errors'] += 1
+                logger.warning(f"⚠️ L2 cache read failed ({self.backend.name}): {e}")
+                record = None
+
+        if record is None or record.is_expired:
+            self._stats['misses'] += 1
+            return None
+
+        self._stats['hits'] += 1
+        return record
+
+    def put(self, cache_key: str, record: L2Record) -> None:
+        """Programme l'écriture d'une entrée (O(1), non bloquant)."""
+        if self._closed:
+            return
+        with self._pending_lock:
+            self._pending[cache_key] = record
+        self._queue.put((cache_key, record))
+
+    def _writer_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [item for item in batch if item is not _STOP]
+            if writes:
+                self._write_batch(writes)
+
+            for _ in batch:
+                self._queue.task_done()
+
+            if len(writes) != len(batch):
+                return
+
+    def _write_batch(self, writes: List[Tuple[str, L2Record]]) -> None:
+        # Dernière version par clé uniquement
+        latest = dict(writes)
+        try:
+            self.backend.set_many(list(latest.items()))
+            self._stats['writes'] += len(latest)
+            self._stats['write_batches'] += 1
+        except Exception as e:
+            self._stats['write_errors'] += len(latest)
+            logger.warning(f"⚠️ L2 cache write failed ({self.backend.name}, {len(latest)} entries): {e}")
+        finally:
+            with self._pending_lock:
+                for key, record in latest.items():
+                    if self._pending.get(key) is record:
+                        del self._pending[key]
+
+        self._writes_since_purge += len(latest)
+        if self._writes_since_purge >= self.purge_every:
+            self._writes_since_purge = 0
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        try:
+            purged = self.backend.purge_expired()
+        except Exception as e:
+            logger.warning(f"⚠️ L2 cache purge failed ({self.backend.name}): {e}")
+            return 0
+        self._stats['purged'] += purged
+        return purged
+
+    def flush(self) -> None:
+        """Attend que toutes les écritures en attente soient persistées."""
+        self._queue.join()
+
+    def clear(self) -> int:
+        self.flush()
+        with self._pending_lock:
+            self._pending.clear()
+        return self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats['lookups']
+        return {
+            'backend': self.backend.name,
+            **self._stats,
+            'hit_rate_percent': round(self._stats['hits'] / max(lookups, 1) * 100, 2),
+            'pending_writes': self._queue.qsize(),
+            'decrypt_errors': getattr(self.backend, 'decrypt_errors', 0),
+            'entries': self.backend.count()
+        }
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Vide la file d'écriture puis ferme le backend."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout=timeout)
+        self.backend.close()
+
+def default_l2_path() -> str:
+    """Fichier SQLite par défaut, dans un répertoire privé de l'utilisateur."""
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "phoenix", "gemini_cache.db")
+
+def create_l2_backend_from_env() -> Optional[CacheBackend]:
+    """
+    Construit le backend L2 depuis l'environnement (opt-in).
+
+    GEMINI_CACHE_L2_BACKEND: none (défaut) | sqlite | redis
+    GEMINI_CACHE_L2_KEY: clé Fernet obligatoire, les entrées sont chiffrées
+    GEMINI_CACHE_L2_PATH: fichier SQLite (défaut: ~/.cache/phoenix/gemini_cache.db, répertoire 0700)
+    GEMINI_CACHE_REDIS_URL: URL Redis (défaut: REDIS_URL)
+    """
+    backend_name = os.getenv("GEMINI_CACHE_L2_BACKEND", "none").lower()
+    if backend_name not in ("sqlite", "redis"):
+        return None
+
+    key = os.getenv("GEMINI_CACHE_L2_KEY")
+    if not key:
+        logger.warning("⚠️ GEMINI_CACHE_L2_KEY missing, L2 cache disabled (entries must be encrypted)")
+        return None
+
+    try:
+        if backend_name == "sqlite":
+            backend: CacheBackend = SQLiteCacheBackend(
+                os.getenv("GEMINI_CACHE_L2_PATH") or default_l2_path(),
+                max_entries=int(os.getenv("GEMINI_CACHE_L2_MAX_ENTRIES", "100000"))
+            )
+        else:
+            url = os.getenv("GEMINI_CACHE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+            backend = RedisCacheBackend(url)
+        return EncryptedCacheBackend(backend, key.encode())
+    except Exception as e:
+        logger.warning(f"⚠️ L2 cache backend '{backend_name}' unavailable, L1 only: {e}")
+
+    return None
@@ -1,21 +1,29 @@
 """
 Optimiseur de cache avancé pour appels Gemini.
 Cache intelligent avec compression, TTL adaptatif et stratégies d'éviction.
+Structures O(1) amorties : LRU par priorité, taille incrémentale, roue d'expiration TTL,
+tas de protection des entrées critiques récentes.
+Tier L2 persistant optionnel (SQLite/Redis) partagé entre processus et redémarrages.
 
 Author: Claude Phoenix DevSecOps Guardian
 Version: 1.0.0 - Performance Optimization
 """
 
 import hashlib
+import heapq
 import json
 import logging
+import math
 import time
 import zlib
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Tuple, List, Set
 from datetime import datetime, timedelta
 from enum import Enum
 
+from .gemini_cache_l2 import CacheBackend, L2CacheTier, L2Record, create_l2_backend_from_env
+
 logger = logging.getLogger(__name__)
 
 class CachePriority(Enum):
@@ -49,6 +57,11 @@ class CacheEntry:
             return zlib.decompress(self.compressed_content).decode('utf-8')
         return self.content
     
+    @property
+    def expires_at(self) -> float:
+        """Timestamp d'expiration de l'entrée."""
+        return self.created_at + self.ttl_seconds
+    
     @property
     def is_expired(self) -> bool:
         """Vérifie si l'entrée est expirée."""
@@ -73,10 +86,15 @@ class CacheEntry:
 class GeminiCacheOptimizer:
     """🚀 Cache optimisé pour appels Gemini avec compression et éviction intelligente."""
     
+    # Protection des entrées critiques récentes contre l'éviction
+    CRITICAL_PROTECTION_SECONDS = 300
+    
     def __init__(self, 
                  max_size_mb: int = 50,
                  default_ttl: int = 3600,
-                 cleanup_interval: int = 300):
+                 cleanup_interval: int = 300,
+                 expiry_resolution: int = 10,
+                 l2_backend: Optional[CacheBackend] = None):
         """
         Initialise l'optimiseur de cache.
         
@@ -84,24 +102,47 @@ class GeminiCacheOptimizer:
             max_size_mb: Taille max cache en MB
             default_ttl: TTL par défaut en secondes
             cleanup_interval: Intervalle nettoyage en secondes
+            expiry_resolution: Largeur d'un créneau de la roue d'expiration en secondes
+            l2_backend: Backend persistant derrière le cache mémoire (optionnel)
         """
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.default_ttl = default_ttl
         self.cleanup_interval = cleanup_interval
+        self.expiry_resolution = max(1, expiry_resolution)
         
         self._cache: Dict[str, CacheEntry] = {}
         self._last_cleanup = time.time()
         
-        # Statistiques
+        # Ordre LRU par priorité (tête = moins récemment utilisée)
+        self._lru: Dict[CachePriority, "OrderedDict[str, None]"] = {
+            priority: OrderedDict() for priority in CachePriority
+        }
+        # Entrées critiques récentes, hors LRU tant qu'elles sont protégées :
+        # clé -> created_at, et tas (created_at, clé) pour les libérer dans l'ordre
+        self._protected: Dict[str, float] = {}
+        self._protection_heap: List[Tuple[float, str]] = []
+        # Taille totale tenue à jour à chaque insertion/suppression
+        self._size_bytes = 0
+        # Roue d'expiration : créneau -> clés expirant dans ce créneau
+        self._expiry_slots: Dict[int, Set[str]] = {}
+        self._expiry_heap: List[int] = []
+        
+        # Tier L2 : lectures sur miss L1, écritures en write-behind
+        self._l2: Optional[L2CacheTier] = L2CacheTier(l2_backend) if l2_backend is not None else None
+        
+        # Statistiques (hits = L1 + L2)
         self._stats = {
             'hits': 0,
+            'l1_hits': 0,
+            'l2_hits': 0,
             'misses': 0,
             'evictions': 0,
             'cleanups': 0,
             'bytes_saved': 0
         }
         
-        logger.info(f"✅ GeminiCacheOptimizer initialized (max_size={max_size_mb}MB, ttl={default_ttl}s)")
+        logger.info(f"✅ GeminiCacheOptimizer initialized (max_size={max_size_mb}MB, ttl={default_ttl}s, "
+                    f"l2={l2_backend.name if l2_backend is not None else 'none'})")
     
     def _generate_cache_key(self, 
                           prompt: str, 
@@ -149,27 +190,54 @@ class GeminiCacheOptimizer:
         # Nettoyage périodique
         self._maybe_cleanup()
         
-        if cache_key not in self._cache:
-            self._stats['misses'] += 1
-            return None
-        
-        entry = self._cache[cache_key]
+        entry = self._cache.get(cache_key)
         
         # Vérifier expiration
-        if entry.is_expired:
-            del self._cache[cache_key]
-            self._stats['misses'] += 1
+        if entry is not None and entry.is_expired:
+            self._remove(cache_key)
             logger.debug(f"🗑️ Cache entry expired and removed: {cache_key[:8]}")
-            return None
+            entry = None
+        
+        if entry is None:
+            return self._get_from_l2(cache_key)
         
         # Hit de cache !
         content = entry.access()
+        if cache_key not in self._protected:
+            self._lru[entry.priority].move_to_end(cache_key)
         self._stats['hits'] += 1
+        self._stats['l1_hits'] += 1
         self._stats['bytes_saved'] += len(content.encode('utf-8'))
         
         logger.debug(f"✅ Cache hit: {cache_key[:8]} (age: {entry.age_seconds:.1f}s, accesses: {entry.access_count})")
         return content
     
+    def _get_from_l2(self, cache_key: str) -> Optional[str]:
+        """Miss L1 : lit le tier L2 et promeut l'entrée trouvée en mémoire."""
+        record = self._l2.get(cache_key) if self._l2 is not None else None
+        if record is None:
+            self._stats['misses'] += 1
+            return None
+        
+        content = record.content
+        entry = CacheEntry(
+            content=content,
+            created_at=record.created_at,
+            ttl_seconds=record.ttl_seconds,
+            priority=CachePriority(record.priority),
+            metadata={'content_length': len(content), 'source': 'l2'}
+        )
+        entry.access()
+        if self._ensure_space_available(entry.size_bytes):
+            self._insert(cache_key, entry)
+        
+        self._stats['hits'] += 1
+        self._stats['l2_hits'] += 1
+        self._stats['bytes_saved'] += len(content.encode('utf-8'))
+        
+        logger.debug(f"✅ L2 cache hit promoted: {cache_key[:8]} (age: {entry.age_seconds:.1f}s)")
+        return content
+    
     def set(self, 
             prompt: str, 
             user_data: Dict[str, Any], 
@@ -211,12 +279,25 @@ class GeminiCacheOptimizer:
             }
         )
         
+        # Remplacement : l'ancienne version ne compte plus dans la taille
+        if cache_key in self._cache:
+            self._remove(cache_key)
+        
+        # Write-behind L2 : persisté même si le tier mémoire est saturé
+        if self._l2 is not None:
+            self._l2.put(cache_key, L2Record(
+                payload=entry.compressed_content or zlib.compress(content.encode('utf-8')),
+                created_at=entry.created_at,
+                ttl_seconds=entry.ttl_seconds,
+                priority=priority.value
+            ))
+        
         # Vérifier si espace suffisant
         if not self._ensure_space_available(entry.size_bytes):
             logger.warning(f"⚠️ Cannot cache entry, insufficient space: {cache_key[:8]}")
-            return False
+            return self._l2 is not None
         
-        self._cache[cache_key] = entry
+        self._insert(cache_key, entry)
         
         logger.debug(f"💾 Cached entry: {cache_key[:8]} (size: {entry.size_bytes}B, ttl: {effective_ttl}s)")
         return True
@@ -255,6 +336,81 @@ class GeminiCacheOptimizer:
         
         return max(300, min(base_ttl, 7200))  # Entre 5min et 2h
     
+    def _expiry_slot(self, entry: CacheEntry) -> int:
+        """Créneau de la roue contenant l'instant d'expiration de l'entrée."""
+        return math.ceil(entry.expires_at / self.expiry_resolution)
+    
+    def _insert(self, cache_key: str, entry: CacheEntry) -> None:
+        """Insère une entrée dans toutes les structures d'index (O(1))."""
+        self._cache[cache_key] = entry
+        if (entry.priority == CachePriority.CRITICAL
+                and entry.created_at > time.time() - self.CRITICAL_PROTECTION_SECONDS):
+            self._protected[cache_key] = entry.created_at
+            heapq.heappush(self._protection_heap, (entry.created_at, cache_key))
+        else:
+            self._lru[entry.priority][cache_key] = None
+        self._size_bytes += entry.size_bytes
+        
+        slot = self._expiry_slot(entry)
+        keys = self._expiry_slots.get(slot)
+        if keys is None:
+            keys = self._expiry_slots[slot] = set()
+            heapq.heappush(self._expiry_heap, slot)
+        keys.add(cache_key)
+    
+    def _remove(self, cache_key: str) -> CacheEntry:
+        """Retire une entrée de toutes les structures d'index (O(1))."""
+        entry = self._unlink(cache_key)
+        keys = self._expiry_slots.get(self._expiry_slot(entry))
+        if keys is not None:
+            keys.discard(cache_key)
+        return entry
+    
+    def _unlink(self, cache_key: str) -> CacheEntry:
+        """Retire l'entrée du dictionnaire, de son ordre LRU et de la taille."""
+        entry = self._cache.pop(cache_key)
+        # Les éléments du tas de protection sont invalidés paresseusement
+        if self._protected.pop(cache_key, None) is None:
+            del self._lru[entry.priority][cache_key]
+        self._size_bytes -= entry.size_bytes
+        return entry
+    
+    def _release_protection(self, protection_cutoff: float) -> None:
+        """
+        Rend évinçables les entrées critiques créées avant protection_cutoff.
+        
+        Chaque entrée ne sort du tas qu'une fois (O(log n) amorti). Elle entre
+        en queue de LRU : la fin de protection compte comme un accès.
+        """
+        heap = self._protection_heap
+        while heap and heap[0][0] <= protection_cutoff:
+            created_at, cache_key = heapq.heappop(heap)
+            if self._protected.get(cache_key) == created_at:
+                del self._protected[cache_key]
+                self._lru[CachePriority.CRITICAL][cache_key] = None
+    
+    def _expire_due(self, now: Optional[float] = None) -> int:
+        """
+        Fait tourner la roue d'expiration : retire les créneaux échus.
+        
+        Seuls les créneaux entièrement passés sont visités, le coût est donc
+        proportionnel au nombre d'entrées expirées (O(1) amorti par entrée).
+        
+        Returns:
+            Nombre d'entrées expirées retirées
+        """
+        now = time.time() if now is None else now
+        current_slot = now / self.expiry_resolution
+        removed = 0
+        
+        while self._expiry_heap and self._expiry_heap[0] <= current_slot:
+            slot = heapq.heappop(self._expiry_heap)
+            for cache_key in self._expiry_slots.pop(slot, ()):
+                self._unlink(cache_key)
+                removed += 1
+        
+        return removed
+    
     def _ensure_space_available(self, required_bytes: int) -> bool:
         """
         S'assure qu'il y a assez d'espace libre.
@@ -265,20 +421,41 @@ class GeminiCacheOptimizer:
         Returns:
             True si espace disponible
         """
-        current_size = self.get_cache_size_bytes()
+        if self._size_bytes + required_bytes <= self.max_size_bytes:
+            return True
         
-        if current_size + required_bytes <= self.max_size_bytes:
+        # Les entrées expirées partent avant toute éviction
+        self._expire_due()
+        if self._size_bytes + required_bytes <= self.max_size_bytes:
             return True
         
         # Éviction intelligente nécessaire
-        bytes_to_free = (current_size + required_bytes) - self.max_size_bytes + (self.max_size_bytes // 10)  # +10% marge
+        bytes_to_free = (self._size_bytes + required_bytes) - self.max_size_bytes + (self.max_size_bytes // 10)  # +10% marge
         
         return self._evict_entries(bytes_to_free)
     
+    def _eviction_candidates(self, protection_cutoff: float):
+        """
+        Produit les clés à évincer : priorités croissantes, ordre LRU.
+        
+        Chaque clé produite doit être retirée avant de demander la suivante.
+        Les entrées critiques récentes ne sont pas dans les LRU et ne sont
+        donc jamais proposées.
+        """
+        self._release_protection(protection_cutoff)
+        for priority in CachePriority:
+            lru = self._lru[priority]
+            while lru:
+                yield next(iter(lru))
+    
     def _evict_entries(self, bytes_to_free: int) -> bool:
         """
         Éviction intelligente des entrées selon LRU + priorité.
         
+        Les priorités sont parcourues de LOW à CRITICAL, chacune en ordre LRU :
+        chaque éviction coûte O(1). Les entrées critiques récentes (protégées)
+        sont tenues hors LRU et n'ont pas à être sautées.
+        
         Args:
             bytes_to_free: Nombre de bytes à libérer
             
@@ -288,25 +465,16 @@ class GeminiCacheOptimizer:
         if not self._cache:
             return False
         
-        # Trier par priorité (asc) puis par dernier accès (asc) puis par taille (desc)
-        entries_to_evict = sorted(
-            [(k, v) for k, v in self._cache.items()],
-            key=lambda x: (x[1].priority.value, x[1].last_accessed, -x[1].size_bytes)
-        )
-        
         freed_bytes = 0
         evicted_count = 0
+        protection_cutoff = time.time() - self.CRITICAL_PROTECTION_SECONDS
         
-        for cache_key, entry in entries_to_evict:
+        for cache_key in self._eviction_candidates(protection_cutoff):
             if freed_bytes >= bytes_to_free:
                 break
             
-            # Ne pas évincer les entrées critiques récentes
-            if entry.priority == CachePriority.CRITICAL and entry.age_seconds < 300:
-                continue
-            
+            entry = self._remove(cache_key)
             freed_bytes += entry.size_bytes
-            del self._cache[cache_key]
             evicted_count += 1
             
             logger.debug(f"🗑️ Evicted entry: {cache_key[:8]} (priority: {entry.priority.name}, size: {entry.size_bytes}B)")
@@ -323,30 +491,30 @@ class GeminiCacheOptimizer:
         if time.time() - self._last_cleanup < self.cleanup_interval:
             return
         
-        expired_keys = []
-        for cache_key, entry in self._cache.items():
-            if entry.is_expired:
-                expired_keys.append(cache_key)
-        
-        for key in expired_keys:
-            del self._cache[key]
+        expired_count = self._expire_due()
+        # Purge aussi les éléments périmés du tas de protection
+        self._release_protection(time.time() - self.CRITICAL_PROTECTION_SECONDS)
         
-        if expired_keys:
-            logger.info(f"🧹 Cleanup: removed {len(expired_keys)} expired entries")
+        if expired_count:
+            logger.info(f"🧹 Cleanup: removed {expired_count} expired entries")
             self._stats['cleanups'] += 1
         
         self._last_cleanup = time.time()
     
     def get_cache_size_bytes(self) -> int:
         """Retourne la taille actuelle du cache en bytes."""
-        return sum(entry.size_bytes for entry in self._cache.values())
+        return self._size_bytes
     
     def get_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques du cache."""
         total_requests = self._stats['hits'] + self._stats['misses']
         hit_rate = (self._stats['hits'] / max(total_requests, 1)) * 100
+        l1_hit_rate = (self._stats['l1_hits'] / max(total_requests, 1)) * 100
+        # Taux L2 mesuré sur les seuls miss L1 (requêtes parvenues au tier L2)
+        l2_requests = total_requests - self._stats['l1_hits']
+        l2_hit_rate = (self._stats['l2_hits'] / max(l2_requests, 1)) * 100
         
-        return {
+        stats = {
             'cache_entries': len(self._cache),
             'cache_size_mb': self.get_cache_size_bytes() / (1024 * 1024),
             'max_size_mb': self.max_size_bytes / (1024 * 1024),
@@ -356,13 +524,35 @@ class GeminiCacheOptimizer:
             'total_evictions': self._stats['evictions'],
             'total_cleanups': self._stats['cleanups'],
             'bytes_saved_mb': self._stats['bytes_saved'] / (1024 * 1024),
-            'avg_entry_size_kb': (self.get_cache_size_bytes() / max(len(self._cache), 1)) / 1024
+            'avg_entry_size_kb': (self.get_cache_size_bytes() / max(len(self._cache), 1)) / 1024,
+            'l1_hits': self._stats['l1_hits'],
+            'l1_hit_rate_percent': round(l1_hit_rate, 2),
+            'l2_enabled': self._l2 is not None,
+            'l2_hits': self._stats['l2_hits'],
+            'l2_hit_rate_percent': round(l2_hit_rate, 2)
         }
+        if self._l2 is not None:
+            stats['l2'] = self._l2.get_stats()
+        return stats
     
-    def clear(self) -> int:
-        """Vide complètement le cache."""
+    def clear(self, include_l2: bool = False) -> int:
+        """
+        Vide le cache mémoire.
+        
+        Le tier L2 est partagé par toutes les apps : il n'est vidé que sur
+        demande explicite (include_l2=True).
+        """
         cleared_count = len(self._cache)
         self._cache.clear()
+        for lru in self._lru.values():
+            lru.clear()
+        self._protected.clear()
+        self._protection_heap.clear()
+        self._size_bytes = 0
+        self._expiry_slots.clear()
+        self._expiry_heap.clear()
+        if include_l2 and self._l2 is not None:
+            cleared_count += self._l2.clear()
         logger.info(f"🗑️ Cache cleared: {cleared_count} entries removed")
         return cleared_count
     
@@ -386,21 +576,41 @@ class GeminiCacheOptimizer:
             'is_expired': entry.is_expired,
             'metadata': entry.metadata
         }
+    
+    def flush(self) -> None:
+        """Attend la persistance des écritures L2 en attente."""
+        if self._l2 is not None:
+            self._l2.flush()
+    
+    def close(self) -> None:
+        """Vide la file L2 et ferme le backend persistant."""
+        if self._l2 is not None:
+            self._l2.close()
 
 
 # Instance globale pour utilisation dans les clients Gemini
 _global_cache_optimizer: Optional[GeminiCacheOptimizer] = None
 
 def get_cache_optimizer(max_size_mb: int = 50) -> GeminiCacheOptimizer:
-    """Retourne l'instance globale du cache optimizer."""
+    """
+    Retourne l'instance globale du cache optimizer.
+    
+    Le tier L2 est opt-in et configuré par l'environnement
+    (GEMINI_CACHE_L2_BACKEND et GEMINI_CACHE_L2_KEY, voir
+    create_l2_backend_from_env) : les apps qui l'activent partagent alors les
+    générations déjà payées, chiffrées au repos.
+    """
     global _global_cache_optimizer
     if _global_cache_optimizer is None:
-        _global_cache_optimizer = GeminiCacheOptimizer(max_size_mb=max_size_mb)
+        _global_cache_optimizer = GeminiCacheOptimizer(
+            max_size_mb=max_size_mb,
+            l2_backend=create_l2_backend_from_env()
+        )
     return _global_cache_optimizer
 
 def cache_gemini_call(cache_optimizer: GeminiCacheOptimizer = None):
     """
-    Décorateur pour cache automatique des appels Gemini.
+    Décorateur pour cache automatique des appels Gemini (tiers L1 mémoire + L2 persistant).
     
     Usage:
         @cache_gemini_call()
@@ -0,0 +1,17 @@
+import importlib.util
+import os
+import sys
+
+# Le dossier du package (phoenix-shared-ai) n'est pas un nom importable :
+# on l'enregistre sous son nom de distribution phoenix_shared_ai
+PACKAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if "phoenix_shared_ai" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "phoenix_shared_ai",
+        os.path.join(PACKAGE_DIR, "__init__.py"),
+        submodule_search_locations=[PACKAGE_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["phoenix_shared_ai"] = module
+    spec.loader.exec_module(module)
@@ -0,0 +1,129 @@
+"""
+Tests du tier L2 persistant : opt-in, chiffrement au repos, répertoire privé
+et portée de GeminiCacheOptimizer.clear().
+"""
+
+import os
+import sqlite3
+import stat
+
+import pytest
+from cryptography.fernet import Fernet
+
+from phoenix_shared_ai.services.gemini_cache_l2 import (
+    EncryptedCacheBackend,
+    SQLiteCacheBackend,
+    create_l2_backend_from_env,
+)
+from phoenix_shared_ai.services.gemini_cache_optimizer import GeminiCacheOptimizer
+
+PROMPT = "Analyse ce CV"
+USER_DATA = {"cv": "Marie Dupont, marie.dupont@example.com, 10 ans de comptabilité"}
+CONTENT = "Profil : Marie Dupont, comptable confirmée"
+
+
+@pytest.fixture
+def l2_env(monkeypatch, tmp_path):
+    for name in ("GEMINI_CACHE_L2_BACKEND", "GEMINI_CACHE_L2_KEY", "GEMINI_CACHE_L2_PATH"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return monkeypatch
+
+
+def _encrypted_sqlite(path, key=None):
+    return EncryptedCacheBackend(SQLiteCacheBackend(str(path)), key or Fernet.generate_key())
+
+
+class TestL2Configuration:
+
+    def test_l2_is_disabled_by_default(self, l2_env):
+        assert create_l2_backend_from_env() is None
+
+    def test_l2_requires_an_encryption_key(self, l2_env):
+        l2_env.setenv("GEMINI_CACHE_L2_BACKEND", "sqlite")
+        assert create_l2_backend_from_env() is None
+
+    def test_sqlite_l2_lives_in_a_private_directory(self, l2_env, tmp_path):
+        l2_env.setenv("GEMINI_CACHE_L2_BACKEND", "sqlite")
+        l2_env.setenv("GEMINI_CACHE_L2_KEY", Fernet.generate_key().decode())
+
+        backend = create_l2_backend_from_env()
+
+        try:
+            assert isinstance(backend, EncryptedCacheBackend)
+            db_path = backend.backend.db_path
+            assert db_path.parent == tmp_path / "cache" / "phoenix"
+            assert stat.S_IMODE(os.stat(db_path.parent).st_mode) == 0o700
+            assert stat.S_IMODE(os.stat(db_path).st_mode) == 0o600
+        finally:
+            backend.close()
+
+    def test_existing_shared_directory_is_tightened(self, tmp_path):
+        shared = tmp_path / "shared"
+        shared.mkdir(mode=0o777)
+        os.chmod(shared, 0o777)
+
+        SQLiteCacheBackend(str(shared / "cache.db")).close()
+
+        assert stat.S_IMODE(os.stat(shared).st_mode) == 0o700
+
+
+class TestEncryptedL2:
+
+    def test_entries_are_encrypted_at_rest(self, tmp_path):
+        db_path = tmp_path / "l2" / "cache.db"
+        cache = GeminiCacheOptimizer(l2_backend=_encrypted_sqlite(db_path))
+        cache.set(PROMPT, USER_DATA, CONTENT)
+        cache.flush()
+        cache.close()
+
+        conn = sqlite3.connect(db_path)
+        payloads = [row[0] for row in conn.execute("SELECT payload FROM gemini_cache")]
+        conn.close()
+
+        assert len(payloads) == 1
+        assert b"Dupont" not in payloads[0]
+
+    def test_round_trip_across_instances(self, tmp_path):
+        db_path = tmp_path / "l2" / "cache.db"
+        key = Fernet.generate_key()
+        writer = GeminiCacheOptimizer(l2_backend=_encrypted_sqlite(db_path, key))
+        writer.set(PROMPT, USER_DATA, CONTENT)
+        writer.close()
+
+        reader = GeminiCacheOptimizer(l2_backend=_encrypted_sqlite(db_path, key))
+        try:
+            assert reader.get(PROMPT, USER_DATA) == CONTENT
+            assert reader.get_stats()["l2_hits"] == 1
+        finally:
+            reader.close()
+
+    def test_wrong_key_is_a_miss(self, tmp_path):
+        db_path = tmp_path / "l2" / "cache.db"
+        writer = GeminiCacheOptimizer(l2_backend=_encrypted_sqlite(db_path))
+        writer.set(PROMPT, USER_DATA, CONTENT)
+        writer.close()
+
+        reader = GeminiCacheOptimizer(l2_backend=_encrypted_sqlite(db_path))
+        try:
+            assert reader.get(PROMPT, USER_DATA) is None
+            assert reader.get_stats()["l2"]["decrypt_errors"] == 1
+        finally:
+            reader.close()
+
+
+class TestClearScope:
+
+    def test_clear_keeps_shared_l2_by_default(self, tmp_path):
+        cache = GeminiCacheOptimizer(l2_backend=_encrypted_sqlite(tmp_path / "l2" / "cache.db"))
+        try:
+            cache.set(PROMPT, USER_DATA, CONTENT)
+            cache.flush()
+
+            assert cache.clear() == 1
+            assert cache.get(PROMPT, USER_DATA) == CONTENT  # Relu depuis L2
+
+            cache.clear(include_l2=True)
+            assert cache.get(PROMPT, USER_DATA) is None
+        finally:
+            cache.close()
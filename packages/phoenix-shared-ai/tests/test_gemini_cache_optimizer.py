@@ -0,0 +1,97 @@
+"""
+Tests du cache mémoire GeminiCacheOptimizer : éviction LRU par priorité,
+protection des entrées critiques, taille incrémentale et expiration TTL.
+"""
+
+import time
+
+from phoenix_shared_ai.services.gemini_cache_optimizer import CachePriority, GeminiCacheOptimizer
+
+PROMPT = "Rédige une lettre pour {poste}"
+CONTENT = "x" * 400
+ENTRY_BYTES = len(CONTENT)
+
+
+def _cache(entries: int) -> GeminiCacheOptimizer:
+    return GeminiCacheOptimizer(max_size_mb=entries * ENTRY_BYTES / (1024 * 1024))
+
+
+def _set(cache, i, priority=CachePriority.MEDIUM, ttl=3600):
+    return cache.set(PROMPT, {"poste": f"p{i}"}, CONTENT, ttl=ttl, priority=priority)
+
+
+def _has(cache, i) -> bool:
+    return cache._generate_cache_key(PROMPT, {"poste": f"p{i}"}) in cache._cache
+
+
+class TestGeminiCacheOptimizer:
+
+    def test_size_is_tracked_incrementally(self):
+        cache = _cache(100)
+        for i in range(10):
+            _set(cache, i)
+        _set(cache, 3)  # Remplacement : ne double pas la taille
+
+        assert cache.get_cache_size_bytes() == 10 * ENTRY_BYTES
+        assert cache.get(PROMPT, {"poste": "p3"}) == CONTENT
+
+    def test_lowest_priority_least_recently_used_is_evicted_first(self):
+        cache = _cache(10)
+        _set(cache, 0, CachePriority.HIGH)
+        for i in range(1, 10):
+            _set(cache, i, CachePriority.LOW)
+        cache.get(PROMPT, {"poste": "p1"})  # p1 redevient la plus récente
+
+        _set(cache, 10, CachePriority.LOW)
+
+        assert _has(cache, 0)
+        assert _has(cache, 1)
+        assert not _has(cache, 2)
+        assert cache.get_cache_size_bytes() <= cache.max_size_bytes
+
+    def test_recent_critical_entries_are_never_evicted(self):
+        cache = _cache(4)
+        for i in range(4):
+            _set(cache, i, CachePriority.CRITICAL)
+
+        # Aucune place ne peut être libérée : l'entrée n'est pas mise en cache
+        assert _set(cache, 4, CachePriority.LOW) is False
+        assert all(_has(cache, i) for i in range(4))
+        assert not cache._lru[CachePriority.CRITICAL]
+
+    def test_critical_entries_become_evictable_after_protection(self, monkeypatch):
+        cache = _cache(4)
+        for i in range(4):
+            _set(cache, i, CachePriority.CRITICAL)
+
+        later = time.time() + GeminiCacheOptimizer.CRITICAL_PROTECTION_SECONDS + 1
+        monkeypatch.setattr("phoenix_shared_ai.services.gemini_cache_optimizer.time.time", lambda: later)
+
+        assert _set(cache, 4, CachePriority.LOW) is True
+        assert not _has(cache, 0)
+        assert not cache._protected
+
+    def test_eviction_cost_does_not_scan_protected_entries(self):
+        cache = _cache(1000)
+        for i in range(999):
+            _set(cache, i, CachePriority.CRITICAL)
+        _set(cache, 999, CachePriority.LOW)
+
+        visited = []
+        for cache_key in cache._eviction_candidates(time.time() - cache.CRITICAL_PROTECTION_SECONDS):
+            visited.append(cache_key)
+            cache._remove(cache_key)
+
+        # Seule l'entrée LOW est candidate, sans parcourir les 999 critiques
+        assert len(visited) == 1
+        assert len(cache._protected) == 999
+
+    def test_expired_entries_are_removed_before_eviction(self):
+        cache = _cache(3)
+        for i in range(3):
+            _set(cache, i, ttl=1)
+        cache._expire_due(now=time.time() + 20)
+
+        assert cache.get_cache_size_bytes() == 0
+        assert _set(cache, 3)
+        assert cache.get_stats()["total_evictions"] == 0
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark droits d'accès Phoenix (snapshot en cache + compteurs d'usage groupés)
+Compare l'ancien check_feature_access (lecture phoenix_subscriptions à chaque appel)
+au snapshot EntitlementCache, et les incréments d'usage unitaires aux flushs groupés.
+Supabase est remplacé par un client en mémoire avec latence simulée (--latency-ms).
+
+Usage:
+    python benchmark_entitlements.py [--checks 2000] [--latency-ms 15]
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+
+def _import_package(name: str = "phoenix_shared_auth") -> None:
+    """Le dossier du package contient un tiret : exposé sous son nom d'import"""
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+        sys.modules[name] = package
+
+
+_import_package()
+_subscription = importlib.import_module("phoenix_shared_auth.entities.phoenix_subscription")
+_entitlements = importlib.import_module("phoenix_shared_auth.services.entitlement_cache")
+_service = importlib.import_module("phoenix_shared_auth.services.phoenix_subscription_service")
+PhoenixApp, PhoenixUserSubscription = _subscription.PhoenixApp, _subscription.PhoenixUserSubscription
+UsageCounterBuffer, evaluate_feature = _entitlements.UsageCounterBuffer, _entitlements.evaluate_feature
+PhoenixSubscriptionService = _service.PhoenixSubscriptionService
+
+FEATURES = [(PhoenixApp.CV, "ats_optimization"), (PhoenixApp.LETTERS, "letters_count_monthly"),
+            (PhoenixApp.LETTERS, "export_formats"), (PhoenixApp.CV, "is_premium")]
+
+
+class SimulatedSupabase:
+    """Client Supabase minimal : chaque execute() coûte un aller-retour réseau"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+
+    def _execute(self, data):
+        self.round_trips += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(data=data)
+
+    def table(self, name: str):
+        query = SimpleNamespace()
+        for method in ("select", "eq", "single", "upsert", "insert"):
+            setattr(query, method, lambda *args, **kwargs: query)
+        row = PhoenixUserSubscription(user_id="bench").to_dict() if name == "phoenix_subscriptions" else []
+        query.execute = lambda: self._execute(row)
+        return query
+
+    def rpc(self, name: str, params):
+        return SimpleNamespace(execute=lambda: self._execute(None))
+
+
+def legacy_check(service: PhoenixSubscriptionService, user_id: str, app: PhoenixApp, feature: str):
+    """Ancien chemin : abonnement relu en base puis features recalculées à chaque vérification"""
+    return evaluate_feature(service.get_user_subscription(user_id).get_app_features(app), feature)
+
+
+def chrono(fonction, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fonction(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    db = SimulatedSupabase(args.latency_ms / 1000)
+    service = PhoenixSubscriptionService(db_connection=SimpleNamespace(client=db))
+    service.supabase_available = True
+    legacy_iterations = max(1, min(args.checks, 200))
+
+    print(f"⏱️ Vérifications de droits (latence simulée {args.latency_ms:.0f} ms):")
+    db.round_trips = 0
+    legacy = chrono(lambda i: legacy_check(service, "bench", *FEATURES[i % len(FEATURES)]), legacy_iterations)
+    print(f"  • {'ancien check_feature_access':<34} {legacy:10.1f} µs   {db.round_trips / legacy_iterations:.2f} requête/vérif")
+
+    db.round_trips = 0
+    cached = chrono(lambda i: service.check_feature_access("bench", *FEATURES[i % len(FEATURES)]), args.checks)
+    print(f"  • {'snapshot en cache':<34} {cached:10.1f} µs   {db.round_trips} requête(s) pour {args.checks}")
+
+    def après_webhook(i):
+        service.invalidate_entitlements("bench")
+        service.check_feature_access("bench", *FEATURES[i % len(FEATURES)])
+
+    cold = chrono(après_webhook, legacy_iterations)
+    print(f"  • {'après invalidation (webhook)':<34} {cold:10.1f} µs")
+    print(f"  📊 {service.entitlements.get_stats()}\n")
+
+    print(f"📈 Compteurs d'usage ({args.checks} incréments, 50 utilisateurs):")
+    unitaire = chrono(lambda i: db.rpc("increment_feature_usage", {}).execute(), legacy_iterations)
+    print(f"  • {'une requête par incrément':<34} {unitaire:10.1f} µs")
+
+    buffer = UsageCounterBuffer(db, flush_interval=10, batch_size=100)
+    db.round_trips = 0
+    groupé = chrono(lambda i: buffer.increment(f"user-{i % 50}", "cv", "optimizations"), args.checks)
+    buffer.flush()
+    print(f"  • {'incréments groupés':<34} {groupé:10.1f} µs   {db.round_trips} requête(s) au total")
+    print(f"  📊 {buffer.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
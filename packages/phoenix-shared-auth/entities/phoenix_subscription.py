@@ -173,7 +173,7 @@ class PhoenixUserSubscription:
         
         return False
     
-    def get_package_type(self) -> PackageType:
+    def get_package_type(self) -> "PackageType":
         """Détermine le type de package de l'utilisateur"""
         premium_apps = self.get_premium_apps()
         
@@ -8,11 +8,14 @@ Version: 1.0.0 - Production Ready
 
 import logging
 import streamlit as st
-from typing import Dict, Any, Callable, Optional, Tuple
+from typing import Dict, Any, Callable, Optional, Tuple, Union
 from datetime import datetime
 from enum import Enum
 from functools import wraps
 
+from ..entities.phoenix_subscription import PhoenixApp
+from ..services.entitlement_cache import UsageCounterBuffer
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,9 +32,12 @@ class FeatureAccessControl:
     Gère les restrictions et les paywalls dynamiques
     """
     
-    def __init__(self, auth_service):
+    def __init__(self, auth_service, app: Union[PhoenixApp, str]):
         self.auth_service = auth_service
-        self.usage_tracker = {}
+        # Application dont les droits et l'usage sont contrôlés ("cv", "letters", ...)
+        self.app = PhoenixApp(getattr(app, "value", app)).value
+        # Compteurs partagés avec le service d'abonnements (persistés par lots), sinon en mémoire
+        self.usage_counters = getattr(auth_service, "usage_counters", None) or UsageCounterBuffer()
         
     def require_feature_access(self, feature: str, required_level: AccessLevel = AccessLevel.PREMIUM):
         """
@@ -100,7 +106,10 @@ class FeatureAccessControl:
         """Vérifie l'accès à une fonctionnalité"""
         try:
             # Récupérer informations d'abonnement
-            if hasattr(self.auth_service, 'check_cv_feature_access'):
+            if hasattr(self.auth_service, 'get_entitlements'):
+                # Snapshot des droits en cache : vérification sans I/O
+                return self.auth_service.get_entitlements(user_id).check(self.app, feature)
+            elif hasattr(self.auth_service, 'check_cv_feature_access'):
                 # Service Phoenix CV
                 return self.auth_service.check_cv_feature_access(user_id, feature)
             elif hasattr(self.auth_service, 'check_letters_feature_access'):
@@ -123,17 +132,11 @@ class FeatureAccessControl:
     def _track_usage(self, user_id: str, feature: str):
         """Suit l'utilisation des fonctionnalités"""
         try:
-            # Obtenir mois actuel
-            current_month = datetime.now().strftime("%Y-%m")
-            usage_key = f"{user_id}_{feature}_{current_month}"
-            
-            # Incrémenter compteur en session
-            if usage_key not in st.session_state:
-                st.session_state[usage_key] = 0
-            st.session_state[usage_key] += 1
+            # Incrément local, envoyé en base par lots
+            usage = self.usage_counters.increment(user_id, self.app, feature)
             
             # Logger usage
-            logger.info(f"📊 Usage {feature} pour {user_id}: {st.session_state[usage_key]}")
+            logger.info(f"📊 Usage {feature} pour {user_id}: {usage}")
             
         except Exception as e:
             logger.error(f"❌ Erreur suivi usage: {e}")
@@ -141,9 +144,7 @@ class FeatureAccessControl:
     def _get_monthly_usage(self, user_id: str, feature: str) -> int:
         """Récupère l'usage mensuel d'une fonctionnalité"""
         try:
-            current_month = datetime.now().strftime("%Y-%m")
-            usage_key = f"{user_id}_{feature}_{current_month}"
-            return st.session_state.get(usage_key, 0)
+            return self.usage_counters.get(user_id, self.app, feature)
         except:
             return 0
     
@@ -314,12 +315,12 @@ def get_cv_access_control(auth_service) -> FeatureAccessControl:
     """Factory pour contrôleur d'accès Phoenix CV"""
     global cv_access_control
     if cv_access_control is None:
-        cv_access_control = FeatureAccessControl(auth_service)
+        cv_access_control = FeatureAccessControl(auth_service, app="cv")
     return cv_access_control
 
 def get_letters_access_control(auth_service) -> FeatureAccessControl:
     """Factory pour contrôleur d'accès Phoenix Letters"""
     global letters_access_control
     if letters_access_control is None:
-        letters_access_control = FeatureAccessControl(auth_service)
+        letters_access_control = FeatureAccessControl(auth_service, app="letters")
     return letters_access_control
\ No newline at end of file
@@ -0,0 +1,355 @@
+"""
+⚡ Phoenix Entitlement Cache - Droits d'accès sans I/O
+Snapshot immuable des fonctionnalités par utilisateur (TTL court, invalidé à chaque
+mise à jour d'abonnement) et compteurs d'usage mensuels persistés par incréments groupés
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENTITLEMENT_TTL_SECONDS = float(os.getenv("PHOENIX_ENTITLEMENT_TTL", "60"))
+ENTITLEMENT_CACHE_SIZE = int(os.getenv("PHOENIX_ENTITLEMENT_CACHE_SIZE", "10000"))
+USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("PHOENIX_USAGE_FLUSH_INTERVAL", "10"))
+USAGE_FLUSH_BATCH_SIZE = int(os.getenv("PHOENIX_USAGE_FLUSH_BATCH", "100"))
+USAGE_CACHE_USERS = int(os.getenv("PHOENIX_USAGE_CACHE_USERS", "10000"))
+# Échecs unitaires consécutifs (sans aucun succès) au-delà desquels Supabase est considéré en panne
+USAGE_OUTAGE_THRESHOLD = 3
+
+USAGE_TABLE = "phoenix_feature_usage"
+USAGE_INCREMENT_RPC = "increment_feature_usage"
+
+
+def _app_key(app: Any) -> str:
+    """PhoenixApp ou nom d'application ("cv", "letters", ...)"""
+    return getattr(app, "value", app)
+
+
+def evaluate_feature(features: Mapping[str, Any], feature: str) -> Tuple[bool, str]:
+    """
+    Règle d'accès à une fonctionnalité (limites numériques, booléens, modes)
+
+    Returns:
+        Tuple[bool, str]: (accès autorisé, message)
+    """
+    if feature not in features:
+        return False, "Fonctionnalité non trouvée"
+
+    feature_value = features[feature]
+
+    # Gestion des limites numériques (bool exclu : sous-classe d'int)
+    if isinstance(feature_value, int) and not isinstance(feature_value, bool):
+        if feature_value == -1:  # Illimité
+            return True, "Accès illimité"
+        elif feature_value > 0:
+            return True, f"Limite: {feature_value}"
+        else:
+            return False, "Limite atteinte"
+
+    # Gestion des booléens
+    elif isinstance(feature_value, bool):
+        return feature_value, "Fonctionnalité disponible" if feature_value else "Fonctionnalité Premium requise"
+
+    # Gestion des chaînes (et listes figées en tuples)
+    else:
+        if isinstance(feature_value, tuple):
+            feature_value = list(feature_value)
+        return True, f"Mode: {feature_value}"
+
+
+@dataclass(frozen=True)
+class EntitlementSnapshot:
+    """
+    Droits d'un utilisateur figés à un instant donné (lecture seule)
+    Toutes les vérifications de fonctionnalités se font sur ce snapshot, sans I/O.
+    """
+
+    user_id: str
+    apps: Mapping[str, Mapping[str, Any]]
+    loaded_at: float
+    expires_at: float
+
+    @classmethod
+    def build(
+        cls,
+        user_id: str,
+        app_features: Mapping[Any, Mapping[str, Any]],
+        ttl: float = ENTITLEMENT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> "EntitlementSnapshot":
+        now = clock()
+        apps = {
+            _app_key(app): MappingProxyType({
+                name: tuple(value) if isinstance(value, list) else value
+                for name, value in features.items()
+            })
+            for app, features in app_features.items()
+        }
+        return cls(user_id, MappingProxyType(apps), now, now + ttl)
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def features(self, app: Any) -> Dict[str, Any]:
+        """Copie modifiable des fonctionnalités d'une app (format de get_app_features)"""
+        return {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in self.apps.get(_app_key(app), {}).items()
+        }
+
+    def check(self, app: Any, feature: str) -> Tuple[bool, str]:
+        return evaluate_feature(self.apps.get(_app_key(app), {}), feature)
+
+    def is_premium(self, app: Any) -> bool:
+        return bool(self.apps.get(_app_key(app), {}).get("is_premium", False))
+
+
+class EntitlementCache:
+    """
+    Cache processus des snapshots de droits:
+    - TTL court (les autres instances voient une mise à jour au plus tard après ttl)
+    - un seul chargement par utilisateur à la fois (les rendus concurrents attendent)
+    - invalidation explicite lors des mises à jour d'abonnement
+    """
+
+    def __init__(
+        self,
+        ttl: float = ENTITLEMENT_TTL_SECONDS,
+        max_entries: int = ENTITLEMENT_CACHE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._snapshots: "OrderedDict[str, EntitlementSnapshot]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        # Incrémentée à chaque invalidation : un chargement commencé avant n'est pas mis en cache
+        self._generation = 0
+        self.stats: Counter = Counter()
+
+    def _fresh(self, user_id: str) -> Optional[EntitlementSnapshot]:
+        snapshot = self._snapshots.get(user_id)
+        if snapshot is not None and snapshot.is_fresh(self._clock()):
+            self._snapshots.move_to_end(user_id)
+            return snapshot
+        return None
+
+    def get(self, user_id: str, loader: Callable[[], EntitlementSnapshot]) -> EntitlementSnapshot:
+        """Snapshot en cache, sinon résultat de loader() (une exception n'est pas mise en cache)"""
+        with self._lock:
+            snapshot = self._fresh(user_id)
+            if snapshot is not None:
+                self.stats["hits"] += 1
+                return snapshot
+            user_lock = self._loading.setdefault(user_id, threading.Lock())
+
+        with user_lock:
+            with self._lock:
+                snapshot = self._fresh(user_id)
+                if snapshot is not None:
+                    self.stats["coalesced"] += 1
+                    return snapshot
+                generation = self._generation
+
+            self.stats["misses"] += 1
+            try:
+                snapshot = loader()
+            finally:
+                with self._lock:
+                    self._loading.pop(user_id, None)
+
+            with self._lock:
+                if generation == self._generation:
+                    self._snapshots[user_id] = snapshot
+                    self._snapshots.move_to_end(user_id)
+                    while len(self._snapshots) > self.max_entries:
+                        self._snapshots.popitem(last=False)
+                        self.stats["evictions"] += 1
+            return snapshot
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._snapshots.pop(user_id, None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshots.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._snapshots), "ttl_seconds": self.ttl}
+
+
+class UsageCounterBuffer:
+    """
+    Compteurs d'usage mensuels par (utilisateur, app, fonctionnalité):
+    - lecture locale (compteurs de l'utilisateur chargés une fois par mois et par processus)
+    - au plus max_users utilisateurs gardés en mémoire (LRU), mois précédents oubliés
+    - incréments accumulés et envoyés par lots (une RPC par flush, addition côté SQL)
+    - une ligne refusée par la base est isolée et écartée, sans bloquer les suivantes
+    - sans client Supabase : compteurs en mémoire du processus (perdus à l'éviction)
+    """
+
+    def __init__(
+        self,
+        db_client=None,
+        flush_interval: float = USAGE_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = USAGE_FLUSH_BATCH_SIZE,
+        max_users: int = USAGE_CACHE_USERS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.db_client = db_client
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_users = max_users
+        self._clock = clock
+        # (user_id, période) -> {(app, fonctionnalité): total}
+        self._users: "OrderedDict[Tuple[str, str], Dict[Tuple[str, str], int]]" = OrderedDict()
+        self._period: Optional[str] = None
+        self._pending: Counter = Counter()
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+        if db_client is not None:
+            atexit.register(self.flush)
+
+    @staticmethod
+    def current_period() -> str:
+        return datetime.now().strftime("%Y-%m")
+
+    def _cached(self, user_id: str, period: str) -> Optional[Dict[Tuple[str, str], int]]:
+        """Compteurs en mémoire de l'utilisateur (appel sous verrou)"""
+        if period != self._period:
+            # Nouveau mois : les compteurs du mois précédent ne sont plus lus
+            self._users.clear()
+            self._period = period
+        counts = self._users.get((user_id, period))
+        if counts is not None:
+            self._users.move_to_end((user_id, period))
+        return counts
+
+    def _load_user(self, user_id: str, period: str) -> Dict[Tuple[str, str], int]:
+        """Compteurs de l'utilisateur pour la période (une requête, puis lectures locales)"""
+        with self._lock:
+            counts = self._cached(user_id, period)
+        if counts is not None:
+            return counts
+
+        rows: Iterable[Dict[str, Any]] = []
+        if self.db_client is not None:
+            try:
+                rows = self.db_client.table(USAGE_TABLE).select("app, feature, count") \
+                    .eq("user_id", user_id).eq("period", period).execute().data or []
+            except Exception as e:
+                logger.error(f"❌ Erreur lecture usage {user_id}: {e}")
+                # Non mis en cache : nouvelle lecture au prochain appel
+                return self._pending_counts(user_id, period)
+
+        with self._lock:
+            counts = self._cached(user_id, period)
+            if counts is not None:
+                return counts
+            # Les incréments locaux non encore envoyés s'ajoutent au total persisté
+            counts = self._pending_counts(user_id, period)
+            for row in rows:
+                key = (row["app"], row["feature"])
+                counts[key] = counts.get(key, 0) + row["count"]
+            self._users[(user_id, period)] = counts
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.stats["evictions"] += 1
+            return counts
+
+    def _pending_counts(self, user_id: str, period: str) -> Dict[Tuple[str, str], int]:
+        return {
+            (app, feature): delta
+            for (pending_user, app, feature, pending_period), delta in self._pending.items()
+            if pending_user == user_id and pending_period == period
+        }
+
+    def get(self, user_id: str, app: Any, feature: str) -> int:
+        counts = self._load_user(user_id, self.current_period())
+        return counts.get((_app_key(app), feature), 0)
+
+    def increment(self, user_id: str, app: Any, feature: str, amount: int = 1) -> int:
+        """Incrémente localement et retourne le nouveau total (envoi groupé)"""
+        period = self.current_period()
+        counts = self._load_user(user_id, period)
+        key = (_app_key(app), feature)
+        with self._lock:
+            counts[key] = counts.get(key, 0) + amount
+            self._pending[(user_id, *key, period)] += amount
+            total = counts[key]
+            due = (len(self._pending) >= self.batch_size
+                   or self._clock() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+        return total
+
+    def flush(self) -> int:
+        """Envoie les incréments en attente ; retourne le nombre de compteurs envoyés"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = self._clock()
+        if not pending or self.db_client is None:
+            return 0
+
+        rows = [
+            {"user_id": user_id, "app": app, "feature": feature, "period": period, "delta": delta}
+            for (user_id, app, feature, period), delta in pending.items()
+        ]
+        try:
+            self._send(rows)
+            sent, failed = len(rows), []
+        except Exception as e:
+            logger.warning(f"⚠️ Envoi groupé usage refusé ({len(rows)} compteurs), isolation: {e}")
+            sent, failed = self._send_rows(rows)
+
+        if failed and not sent:
+            # Aucune ligne acceptée : panne probable, tout est conservé pour le prochain flush
+            # (après les nouveaux incréments : une ligne refusée ne passe pas en tête du lot)
+            self.stats["flush_errors"] += 1
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+
+        # La base accepte d'autres lignes : celles-ci sont rejetées pour de bon
+        if failed:
+            self.stats["rows_rejected"] += len(failed)
+        self.stats["flushes"] += 1
+        self.stats["rows_flushed"] += sent
+        return sent
+
+    def _send(self, rows: List[Dict[str, Any]]) -> None:
+        self.db_client.rpc(USAGE_INCREMENT_RPC, {"p_rows": rows}).execute()
+
+    def _send_rows(self, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Envoi ligne à ligne (une tentative chacune) pour isoler les compteurs refusés"""
+        sent = 0
+        failed: List[Dict[str, Any]] = []
+        for index, row in enumerate(rows):
+            if not sent and len(failed) >= USAGE_OUTAGE_THRESHOLD:
+                failed.extend(rows[index:])
+                break
+            try:
+                self._send([row])
+                sent += 1
+            except Exception as e:
+                failed.append(row)
+                logger.error(f"❌ Compteur usage rejeté {row}: {e}")
+        return sent, failed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self._pending), "users": len(self._users)}
@@ -11,14 +11,14 @@ from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import json
 
+from ..entities.phoenix_subscription import (
+    PhoenixUserSubscription, SubscriptionTier, SubscriptionStatus, PhoenixApp, STRIPE_PRICE_IDS
+)
+from .entitlement_cache import EntitlementCache, EntitlementSnapshot, UsageCounterBuffer
+
 try:
     from supabase import Client
-    from phoenix_shared_authentities.phoenix_subscription import (
-        PhoenixUserSubscription, AppSubscriptionDetails, 
-        SubscriptionTier, SubscriptionStatus, PhoenixApp,
-        STRIPE_PRICE_IDS, BUNDLE_PRICE_IDS
-    )
-    from phoenix_shared_authdatabase.phoenix_db_connection import get_phoenix_db_connection
+    from ..database.phoenix_db_connection import get_phoenix_db_connection
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
@@ -51,6 +51,10 @@ class PhoenixSubscriptionService:
         
         if not self.supabase_available:
             logger.warning("⚠️ PhoenixSubscriptionService en mode dégradé")
+        
+        # Droits par utilisateur en mémoire (TTL court) et compteurs d'usage groupés
+        self.entitlements = EntitlementCache()
+        self.usage_counters = UsageCounterBuffer(self.db_client)
     
     def get_user_subscription(self, user_id: str) -> PhoenixUserSubscription:
         """
@@ -62,23 +66,58 @@ class PhoenixSubscriptionService:
         Returns:
             PhoenixUserSubscription: Abonnement utilisateur
         """
+        try:
+            return self._fetch_user_subscription(user_id)
+        except Exception as e:
+            logger.error(f"❌ Erreur récupération abonnement {user_id}: {e}")
+            return PhoenixUserSubscription(user_id=user_id)
+    
+    def _fetch_user_subscription(self, user_id: str) -> PhoenixUserSubscription:
+        """Lecture Supabase de l'abonnement (lève en cas d'erreur base)"""
         if not self.supabase_available or not self.db_client:
             # Mode dégradé - abonnement gratuit par défaut
             return PhoenixUserSubscription(user_id=user_id)
         
-        try:
-            # Récupérer abonnements depuis Supabase
-            response = self.db_client.table('phoenix_subscriptions').select('*').eq('user_id', user_id).single().execute()
+        # Récupérer abonnements depuis Supabase
+        response = self.db_client.table('phoenix_subscriptions').select('*').eq('user_id', user_id).single().execute()
+        
+        if response.data:
+            return PhoenixUserSubscription.from_dict(response.data)
+        else:
+            # Créer abonnement gratuit par défaut
+            return self._create_default_subscription(user_id)
+    
+    def get_entitlements(self, user_id: str) -> EntitlementSnapshot:
+        """
+        Snapshot immuable des droits d'un utilisateur sur toutes les apps
+        Une lecture Supabase au plus par utilisateur et par TTL ; les vérifications
+        de fonctionnalités se font ensuite sans I/O.
+        
+        Args:
+            user_id: ID utilisateur Phoenix
             
-            if response.data:
-                return PhoenixUserSubscription.from_dict(response.data)
-            else:
-                # Créer abonnement gratuit par défaut
-                return self._create_default_subscription(user_id)
-                
+        Returns:
+            EntitlementSnapshot: Droits de l'utilisateur
+        """
+        try:
+            return self.entitlements.get(
+                user_id, lambda: self._build_entitlements(self._fetch_user_subscription(user_id))
+            )
         except Exception as e:
-            logger.error(f"❌ Erreur récupération abonnement {user_id}: {e}")
-            return PhoenixUserSubscription(user_id=user_id)
+            logger.error(f"❌ Erreur récupération droits {user_id}: {e}")
+            # Droits gratuits non mis en cache : la prochaine requête relit la base
+            return self._build_entitlements(PhoenixUserSubscription(user_id=user_id))
+    
+    def _build_entitlements(self, subscription: PhoenixUserSubscription) -> EntitlementSnapshot:
+        return EntitlementSnapshot.build(
+            subscription.user_id,
+            {app: subscription.get_app_features(app) for app in PhoenixApp},
+            ttl=self.entitlements.ttl,
+        )
+    
+    def invalidate_entitlements(self, user_id: str):
+        """Invalide les droits en cache (mise à jour d'abonnement, webhook Stripe)"""
+        self.entitlements.invalidate(user_id)
     
     def update_app_subscription(
         self, 
@@ -128,7 +167,7 @@ class PhoenixSubscriptionService:
             )
             
             if success and self.supabase_available:
-                # Sauvegarder en base
+                # Sauvegarder en base (invalide les droits en cache)
                 self._save_subscription_to_db(user_subscription)
                 
                 # Synchroniser vers les applications
@@ -318,8 +357,7 @@ class PhoenixSubscriptionService:
             Dict contenant les fonctionnalités disponibles
         """
         try:
-            user_subscription = self.get_user_subscription(user_id)
-            return user_subscription.get_app_features(app)
+            return self.get_entitlements(user_id).features(app)
             
         except Exception as e:
             logger.error(f"❌ Erreur récupération fonctionnalités {app.value} pour {user_id}: {e}")
@@ -350,30 +388,7 @@ class PhoenixSubscriptionService:
             Tuple[bool, str]: (accès autorisé, message)
         """
         try:
-            features = self.get_app_features(user_id, app)
-            
-            if feature in features:
-                feature_value = features[feature]
-                
-                # Gestion des limites numériques
-                if isinstance(feature_value, int):
-                    if feature_value == -1:  # Illimité
-                        return True, "Accès illimité"
-                    elif feature_value > 0:
-                        return True, f"Limite: {feature_value}"
-                    else:
-                        return False, "Limite atteinte"
-                
-                # Gestion des booléens
-                elif isinstance(feature_value, bool):
-                    return feature_value, "Fonctionnalité disponible" if feature_value else "Fonctionnalité Premium requise"
-                
-                # Gestion des chaînes
-                else:
-                    return True, f"Mode: {feature_value}"
-            
-            return False, "Fonctionnalité non trouvée"
-            
+            return self.get_entitlements(user_id).check(app, feature)
         except Exception as e:
             logger.error(f"❌ Erreur vérification accès {feature} pour {user_id}: {e}")
             return False, f"Erreur: {str(e)}"
@@ -474,6 +489,8 @@ class PhoenixSubscriptionService:
         except Exception as e:
             logger.error(f"❌ Erreur sauvegarde abonnement: {e}")
             return False
+        finally:
+            self.invalidate_entitlements(subscription.user_id)
     
     def _sync_subscription_to_apps(
         self, 
@@ -0,0 +1,16 @@
+import os
+import sys
+import types
+
+# Le dossier du package (phoenix-shared-auth) n'est pas un nom importable :
+# on l'enregistre sous son nom d'import phoenix_shared_auth, sans exécuter __init__
+# qui charge tous les services (Streamlit, Supabase, configuration)
+PACKAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if "phoenix_shared_auth" not in sys.modules:
+    package = types.ModuleType("phoenix_shared_auth")
+    package.__path__ = [PACKAGE_DIR]
+    package.__file__ = os.path.join(PACKAGE_DIR, "__init__.py")
+    sys.modules["phoenix_shared_auth"] = package
+    # pytest importe le __init__.py d'un dossier au nom non importable sous le nom "__init__"
+    sys.modules.setdefault("__init__", package)
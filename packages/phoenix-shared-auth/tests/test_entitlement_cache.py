@@ -0,0 +1,257 @@
+"""
+Tests du cache de droits (TTL, invalidation, LRU, chargement unique) et des
+compteurs d'usage groupés (flush, isolation des lignes refusées, bornes mémoire).
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from phoenix_shared_auth.middleware.feature_access_control import FeatureAccessControl
+from phoenix_shared_auth.services.entitlement_cache import (
+    EntitlementCache,
+    EntitlementSnapshot,
+    UsageCounterBuffer,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeUsageDb:
+    """Table phoenix_feature_usage et RPC increment_feature_usage en mémoire"""
+
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+        self.down = False
+        self.rpc_calls = []
+        self.reads = 0
+
+    def table(self, name):
+        filters = {}
+        query = SimpleNamespace()
+        query.select = lambda *args: query
+
+        def eq(column, value):
+            filters[column] = value
+            return query
+
+        def execute():
+            self.reads += 1
+            if self.down:
+                raise ConnectionError("Supabase indisponible")
+            rows = [
+                {"app": app, "feature": feature, "count": count}
+                for (user_id, app, feature, period), count in self.counts.items()
+                if user_id == filters["user_id"] and period == filters["period"]
+            ]
+            return SimpleNamespace(data=rows)
+
+        query.eq = eq
+        query.execute = execute
+        return query
+
+    def rpc(self, name, params):
+        def execute():
+            rows = params["p_rows"]
+            self.rpc_calls.append(rows)
+            if self.down:
+                raise ConnectionError("Supabase indisponible")
+            if any(row["feature"] == "invalide" for row in rows):
+                raise ValueError("violates check constraint")
+            for row in rows:
+                key = (row["user_id"], row["app"], row["feature"], row["period"])
+                self.counts[key] = self.counts.get(key, 0) + row["delta"]
+            return SimpleNamespace(data=None)
+
+        return SimpleNamespace(execute=execute)
+
+
+def _snapshot(user_id, limit=5, clock=None):
+    return EntitlementSnapshot.build(
+        user_id, {"cv": {"optimizations": limit, "formats": ["pdf"], "is_premium": False}},
+        clock=clock or time.monotonic,
+    )
+
+
+class TestEntitlementCache:
+
+    def test_snapshot_is_reused_until_ttl(self):
+        clock = Clock()
+        cache = EntitlementCache(ttl=60, clock=clock)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return _snapshot("u1", clock=clock)
+
+        first = cache.get("u1", loader)
+        clock.now = 59
+        assert cache.get("u1", loader) is first
+        clock.now = 61
+        assert cache.get("u1", loader) is not first
+
+        assert len(loads) == 2
+        assert first.check("cv", "optimizations") == (True, "Limite: 5")
+
+    def test_invalidation_during_load_is_not_cached(self):
+        cache = EntitlementCache()
+
+        def loader():
+            # Webhook Stripe reçu pendant la lecture de l'abonnement
+            cache.invalidate("u1")
+            return _snapshot("u1", limit=0)
+
+        cache.get("u1", loader)
+
+        assert cache.get_stats()["entries"] == 0
+        assert cache.get("u1", lambda: _snapshot("u1", limit=3)).check("cv", "optimizations")[0]
+
+    def test_failed_load_is_not_cached(self):
+        cache = EntitlementCache()
+
+        def failing():
+            raise ConnectionError("Supabase indisponible")
+
+        with pytest.raises(ConnectionError):
+            cache.get("u1", failing)
+        assert cache.get("u1", lambda: _snapshot("u1")).user_id == "u1"
+
+    def test_least_recently_used_user_is_evicted(self):
+        cache = EntitlementCache(max_entries=2)
+        for user_id in ("u1", "u2"):
+            cache.get(user_id, lambda user_id=user_id: _snapshot(user_id))
+        cache.get("u1", lambda: pytest.fail("u1 doit être en cache"))
+        cache.get("u3", lambda: _snapshot("u3"))
+
+        reloaded = []
+        cache.get("u2", lambda: reloaded.append(1) or _snapshot("u2"))
+
+        assert reloaded == [1]
+        assert cache.get_stats()["evictions"] == 2
+
+    def test_concurrent_misses_load_once(self):
+        cache = EntitlementCache()
+        loads = []
+
+        def loader():
+            loads.append(1)
+            time.sleep(0.05)
+            return _snapshot("u1")
+
+        threads = [threading.Thread(target=cache.get, args=("u1", loader)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1
+        assert cache.get_stats()["coalesced"] == 7
+
+    def test_snapshot_is_read_only(self):
+        snapshot = _snapshot("u1")
+        features = snapshot.features("cv")
+        features["formats"].append("docx")
+        features["optimizations"] = -1
+
+        assert snapshot.features("cv")["formats"] == ["pdf"]
+        assert snapshot.check("cv", "optimizations") == (True, "Limite: 5")
+        with pytest.raises(TypeError):
+            snapshot.apps["cv"]["optimizations"] = -1
+
+
+class TestUsageCounterBuffer:
+
+    def test_increments_are_read_locally_and_flushed_in_one_call(self):
+        period = UsageCounterBuffer.current_period()
+        db = FakeUsageDb({("u1", "cv", "optimizations", period): 4})
+        buffer = UsageCounterBuffer(db, flush_interval=3600, batch_size=100)
+
+        for _ in range(3):
+            buffer.increment("u1", "cv", "optimizations")
+        buffer.increment("u2", "letters", "letters_count_monthly")
+
+        assert buffer.get("u1", "cv", "optimizations") == 7
+        assert db.reads == 2
+        assert buffer.flush() == 2
+        assert len(db.rpc_calls) == 1
+        assert db.counts[("u1", "cv", "optimizations", period)] == 7
+
+    def test_rejected_row_is_isolated_and_dropped(self):
+        db = FakeUsageDb()
+        buffer = UsageCounterBuffer(db, flush_interval=3600, batch_size=100)
+        buffer.increment("u1", "cv", "invalide")
+        buffer.increment("u1", "cv", "optimizations")
+        buffer.increment("u2", "cv", "optimizations")
+
+        assert buffer.flush() == 2
+        stats = buffer.get_stats()
+        assert stats["rows_rejected"] == 1
+        assert stats["pending"] == 0
+
+        # La ligne refusée ne fait plus échouer les lots suivants
+        db.rpc_calls.clear()
+        buffer.increment("u3", "cv", "optimizations")
+        assert buffer.flush() == 1
+        assert len(db.rpc_calls) == 1
+
+    def test_outage_keeps_increments_for_the_next_flush(self):
+        period = UsageCounterBuffer.current_period()
+        db = FakeUsageDb()
+        buffer = UsageCounterBuffer(db, flush_interval=3600, batch_size=100)
+        for user_id in ("u1", "u2", "u3", "u4", "u5"):
+            buffer.increment(user_id, "cv", "optimizations")
+
+        db.down = True
+        assert buffer.flush() == 0
+        # Lot puis au plus USAGE_OUTAGE_THRESHOLD envois unitaires
+        assert len(db.rpc_calls) == 4
+        assert buffer.get_stats()["pending"] == 5
+
+        db.down = False
+        assert buffer.flush() == 5
+        assert db.counts[("u5", "cv", "optimizations", period)] == 1
+
+    def test_users_in_memory_are_bounded(self):
+        period = UsageCounterBuffer.current_period()
+        db = FakeUsageDb({("u1", "cv", "optimizations", period): 10})
+        buffer = UsageCounterBuffer(db, flush_interval=3600, batch_size=100, max_users=2)
+
+        buffer.increment("u1", "cv", "optimizations")
+        for i in range(50):
+            buffer.increment(f"other-{i}", "cv", "optimizations")
+
+        assert buffer.get_stats()["users"] == 2
+        assert buffer.get_stats()["evictions"] == 49
+        # Rechargé : total persisté + incréments non encore envoyés
+        assert buffer.get("u1", "cv", "optimizations") == 11
+
+    def test_previous_month_counters_are_dropped(self, monkeypatch):
+        buffer = UsageCounterBuffer(flush_interval=3600, batch_size=100)
+        monkeypatch.setattr(UsageCounterBuffer, "current_period", staticmethod(lambda: "2026-09"))
+        buffer.increment("u1", "cv", "optimizations")
+        buffer.increment("u2", "cv", "optimizations")
+
+        monkeypatch.setattr(UsageCounterBuffer, "current_period", staticmethod(lambda: "2026-10"))
+
+        assert buffer.get("u1", "cv", "optimizations") == 0
+        assert buffer.get_stats()["users"] == 1
+
+
+class TestFeatureAccessControl:
+
+    def test_app_is_required_and_must_exist(self):
+        service = SimpleNamespace(usage_counters=UsageCounterBuffer())
+
+        with pytest.raises(TypeError):
+            FeatureAccessControl(service)
+        with pytest.raises(ValueError):
+            FeatureAccessControl(service, app="phoenix")
+        assert FeatureAccessControl(service, app="letters").app == "letters"
@@ -12,6 +12,8 @@ from .phoenix_event_bridge import (
     PhoenixEventType,
     PhoenixEventFactory
 )
+from .event_outbox import EventOutbox, get_event_outbox
+from .event_rollups import EventRollupService, HyperLogLog
 
 # Définit explicitement ce qui est exporté lorsque 'from phoenix_event_bridge import *' est utilisé
 # ou ce que les outils d'introspection doivent considérer comme l'API publique.
@@ -21,4 +23,8 @@ __all__ = [
     "PhoenixEventType",
     "PhoenixEventFactory",
     "PhoenixEventData",
+    "EventOutbox",
+    "get_event_outbox",
+    "EventRollupService",
+    "HyperLogLog",
 ]
\ No newline at end of file
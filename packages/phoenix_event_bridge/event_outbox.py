@@ -0,0 +1,422 @@
+"""
+📮 Phoenix Event Outbox - File d'envoi partagée par les Event Bridges du processus
+La publication se réduit à un ajout en mémoire ; un thread d'arrière-plan insère
+les événements par lots dans Supabase, avec retry, débordement disque et flush à l'arrêt.
+Une ligne rejetée par la base est isolée du lot puis mise en quarantaine (dead-letter)
+au lieu de bloquer les autres événements.
+"""
+
+import atexit
+import json
+import logging
+import os
+import stat
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EventRow = Dict[str, Any]
+BatchWriter = Callable[[List[EventRow]], None]
+
+# Échecs consécutifs sans aucun succès au-delà desquels l'isolation ligne à ligne
+# conclut à une panne de Supabase (et non à des lignes invalides)
+ISOLATION_OUTAGE_THRESHOLD = 3
+
+
+class EventOutbox:
+    """
+    ✅ Outbox d'événements non bloquante.
+
+    - enqueue() : O(1), ne fait jamais d'I/O réseau sur le thread appelant
+    - Lots multi-lignes (une requête INSERT par lot) avec backoff exponentiel
+    - Débordement JSONL sur disque si Supabase est indisponible ou la file pleine,
+      rejoué automatiquement dès que les insertions réussissent à nouveau
+    - Lot en échec : insertion ligne à ligne ; si Supabase répond pour les autres
+      lignes, les lignes rejetées partent en dead-letter au lieu d'être rejouées
+    - flush() / shutdown() pour vider la file (enregistré via atexit)
+
+    Le writer doit être idempotent sur event_id : un lot inséré dont la réponse
+    s'est perdue (timeout) est renvoyé tel quel.
+    """
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_queue_size: int = 10000,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 30.0,
+        spill_path: Optional[str] = None,
+        dead_letter_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            writer: Insère une liste de lignes en une requête (lève une exception en cas d'échec)
+            batch_size: Nombre maximal d'événements par insertion
+            flush_interval: Délai maximal avant l'envoi d'un lot incomplet (secondes)
+            max_queue_size: Au-delà, les événements sont écrits directement sur disque
+            max_retries: Tentatives par lot avant débordement disque
+            spill_path: Fichier JSONL de débordement (None = pas de débordement)
+            dead_letter_path: Fichier JSONL des lignes rejetées par la base (None = journalisées puis perdues)
+        """
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+
+        self._queue: Deque[EventRow] = deque()
+        self._condition = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._in_flight = 0
+        self._next_replay = 0.0
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "retries": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "isolated": 0,
+            "dead_lettered": 0,
+            "dropped": 0,
+        }
+
+        self._worker = threading.Thread(
+            target=self._run, name="phoenix-event-outbox", daemon=True
+        )
+        self._worker.start()
+        logger.info(
+            f"✅ EventOutbox initialisé (batch_size={batch_size}, flush_interval={flush_interval}s)"
+        )
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def enqueue(self, row: EventRow) -> bool:
+        """
+        Ajoute un événement à la file (jamais bloquant).
+
+        Returns:
+            bool: False si l'événement a été écrit sur disque ou perdu (outbox arrêtée/file pleine)
+        """
+        with self._condition:
+            if not self._stop.is_set() and len(self._queue) < self.max_queue_size:
+                self._queue.append(row)
+                self._stats["enqueued"] += 1
+                if len(self._queue) >= self.batch_size:
+                    self._condition.notify()
+                return True
+
+        # File pleine ou outbox arrêtée : on préserve l'événement sur disque
+        self._spill([row])
+        return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Attend que la file soit vidée. Retourne False si le délai expire."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify()
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._worker.is_alive():
+                    return False
+                self._condition.wait(min(remaining, 0.05))
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Vide la file puis arrête le worker ; le reliquat part sur disque."""
+        if self._stop.is_set():
+            return
+        self.flush(timeout)
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._worker.join(timeout)
+
+        with self._condition:
+            remaining = list(self._queue)
+            self._queue.clear()
+        if remaining:
+            self._spill(remaining)
+        logger.info(
+            f"✅ EventOutbox arrêtée ({self._stats['written']} événements écrits, "
+            f"{len(remaining)} débordés sur disque)"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                **self._stats,
+                "queue_size": len(self._queue),
+                "in_flight": self._in_flight,
+                "spill_pending": self._has_spill(),
+            }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._condition:
+                if len(self._queue) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                batch = self._take_batch()
+
+            if batch:
+                reachable, undelivered = self._deliver(batch)
+                if reachable:
+                    self._replay_spill(reachable=True)
+                else:
+                    self._spill(undelivered)
+                self._done(len(batch))
+            elif self._has_spill() and time.monotonic() >= self._next_replay:
+                # Rejoue les événements d'un arrêt précédent ou d'une panne Supabase
+                self._replay_spill()
+
+    def _take_batch(self) -> List[EventRow]:
+        """Retire un lot de la file (sous verrou)."""
+        count = min(self.batch_size, len(self._queue))
+        batch = [self._queue.popleft() for _ in range(count)]
+        self._in_flight += count
+        return batch
+
+    def _done(self, count: int) -> None:
+        with self._condition:
+            self._in_flight -= count
+            self._condition.notify_all()
+
+    def _write_with_retry(self, batch: List[EventRow]) -> bool:
+        for attempt in range(self.max_retries):
+            try:
+                self.writer(batch)
+                with self._condition:
+                    self._stats["written"] += len(batch)
+                    self._stats["batches"] += 1
+                logger.debug(f"📤 Lot de {len(batch)} événements publié")
+                return True
+            except Exception as e:
+                with self._condition:
+                    self._stats["retries"] += 1
+                delay = min(self.retry_base_delay * 2 ** attempt, self.retry_max_delay)
+                logger.warning(
+                    f"⚠️ Échec insertion lot ({len(batch)} événements, "
+                    f"tentative {attempt + 1}/{self.max_retries}): {e}"
+                )
+                # Interrompu par shutdown() : le lot est conservé sur disque
+                if attempt < self.max_retries - 1 and self._stop.wait(delay):
+                    return False
+        return False
+
+    def _deliver(self, batch: List[EventRow], reachable: bool = False) -> Tuple[bool, List[EventRow]]:
+        """
+        Écrit un lot ; en cas d'échec, isole les lignes fautives.
+
+        Args:
+            reachable: Une écriture a déjà réussi dans ce cycle (Supabase répond)
+
+        Returns:
+            (Supabase joignable, lignes à conserver sur disque pour un rejeu)
+        """
+        if self._write_with_retry(batch):
+            return True, []
+        if self._stop.is_set():
+            # Arrêt en cours : pas d'isolation, le lot est conservé sur disque
+            return False, batch
+
+        failed, written = self._write_rows(batch, reachable)
+        reachable = reachable or written > 0
+        if not reachable:
+            # Aucune ligne acceptée : panne probable, tout est rejoué plus tard
+            return False, batch
+
+        # Supabase accepte d'autres lignes : celles-ci sont rejetées pour de bon
+        self._dead_letter(failed)
+        return True, []
+
+    def _write_rows(self, batch: List[EventRow], reachable: bool) -> Tuple[List[EventRow], int]:
+        """Insertion ligne à ligne (une tentative chacune) pour isoler les lignes invalides."""
+        failed: List[EventRow] = []
+        written = 0
+        for index, row in enumerate(batch):
+            if not reachable and not written and len(failed) >= ISOLATION_OUTAGE_THRESHOLD:
+                failed.extend(batch[index:])
+                break
+            try:
+                self.writer([row])
+                written += 1
+            except Exception as e:
+                failed.append(row)
+                logger.warning(f"⚠️ Événement {row.get('event_id')} rejeté: {e}")
+
+        with self._condition:
+            self._stats["isolated"] += len(batch)
+            self._stats["written"] += written
+        return failed, written
+
+    # ------------------------------------------------------------------
+    # Débordement disque (JSONL)
+    # ------------------------------------------------------------------
+
+    def _has_spill(self) -> bool:
+        return bool(self.spill_path) and os.path.exists(self.spill_path)
+
+    def _spill(self, rows: List[EventRow]) -> None:
+        if not self.spill_path:
+            with self._condition:
+                self._stats["dropped"] += len(rows)
+            logger.error(f"❌ {len(rows)} événements perdus (débordement disque désactivé)")
+            return
+        try:
+            with self._spill_lock:
+                _append_jsonl(self.spill_path, rows)
+            with self._condition:
+                self._stats["spilled"] += len(rows)
+            logger.warning(f"💾 {len(rows)} événements sauvegardés sur disque ({self.spill_path})")
+        except OSError as e:
+            with self._condition:
+                self._stats["dropped"] += len(rows)
+            logger.error(f"❌ Débordement disque impossible, {len(rows)} événements perdus: {e}")
+
+    def _dead_letter(self, rows: List[EventRow]) -> None:
+        """Met de côté les lignes rejetées par la base : elles ne sont plus rejouées."""
+        if not rows:
+            return
+        with self._condition:
+            self._stats["dead_lettered"] += len(rows)
+        if not self.dead_letter_path:
+            logger.error(f"❌ {len(rows)} événements rejetés par la base et perdus (dead-letter désactivé)")
+            return
+        try:
+            with self._spill_lock:
+                _append_jsonl(self.dead_letter_path, rows)
+            logger.error(f"☠️ {len(rows)} événements rejetés mis en quarantaine ({self.dead_letter_path})")
+        except OSError as e:
+            logger.error(f"❌ Écriture dead-letter impossible, {len(rows)} événements perdus: {e}")
+
+    def _replay_spill(self, reachable: bool = False) -> None:
+        """
+        Réinjecte les événements débordés (fichier renommé pour éviter un double rejeu).
+
+        Args:
+            reachable: Un lot vient d'être inséré ; une ligne du débordement qui échoue
+                encore est alors rejetée par la base et part en dead-letter
+        """
+        if not self._has_spill():
+            return
+        replay_path = f"{self.spill_path}.{uuid.uuid4().hex[:8]}.replay"
+        try:
+            with self._spill_lock:
+                os.replace(self.spill_path, replay_path)
+            rows = self._read_spill(replay_path)
+        except OSError as e:
+            logger.error(f"❌ Lecture du débordement disque impossible: {e}")
+            return
+
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            reachable, undelivered = self._deliver(batch, reachable)
+            if not reachable:
+                # Supabase toujours indisponible : on remet le reliquat sur disque
+                self._spill(undelivered + rows[start + self.batch_size:])
+                self._next_replay = time.monotonic() + self.retry_max_delay
+                break
+            with self._condition:
+                self._stats["replayed"] += len(batch)
+
+        try:
+            os.remove(replay_path)
+        except OSError:
+            pass
+
+    def _read_spill(self, path: str) -> List[EventRow]:
+        """Lit un fichier de débordement ; une ligne corrompue part en dead-letter."""
+        rows: List[EventRow] = []
+        corrupted: List[EventRow] = []
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    corrupted.append({"raw": line.rstrip("\n")})
+        self._dead_letter(corrupted)
+        return rows
+
+
+def _append_jsonl(path: str, rows: List[EventRow]) -> None:
+    """Ajoute des lignes JSONL dans un fichier lisible par le seul propriétaire (0600)."""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    with os.fdopen(fd, "a", encoding="utf-8") as handle:
+        for row in rows:
+            handle.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+
+def _ensure_private_dir(directory: str) -> None:
+    """Crée le répertoire en 0700 et refuse un répertoire d'un autre utilisateur."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Event outbox directory not owned by current user: {directory}")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(directory, 0o700)
+
+
+def default_outbox_dir() -> str:
+    """Répertoire d'état privé de l'outbox (hors /tmp, partagé entre utilisateurs)."""
+    state_home = os.getenv("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(state_home, "phoenix", "event_outbox")
+
+
+# ========================================
+# 🌍 INSTANCE PARTAGÉE DU PROCESSUS
+# ========================================
+
+_event_outbox: Optional[EventOutbox] = None
+_event_outbox_lock = threading.Lock()
+
+
+def get_event_outbox(writer: Optional[BatchWriter] = None) -> Optional[EventOutbox]:
+    """
+    Retourne l'outbox du processus, créée au premier appel fournissant un writer.
+
+    Configuration: PHOENIX_EVENT_OUTBOX_BATCH_SIZE, PHOENIX_EVENT_OUTBOX_FLUSH_INTERVAL,
+    PHOENIX_EVENT_OUTBOX_MAX_QUEUE, PHOENIX_EVENT_OUTBOX_DIR (répertoire privé 0700,
+    "none" désactive le disque ; défaut $XDG_STATE_HOME/phoenix/event_outbox).
+    """
+    global _event_outbox
+    with _event_outbox_lock:
+        if _event_outbox is None and writer is not None:
+            directory = os.getenv("PHOENIX_EVENT_OUTBOX_DIR", default_outbox_dir())
+            spill_path = dead_letter_path = None
+            if directory.lower() != "none":
+                try:
+                    _ensure_private_dir(directory)
+                    spill_path = os.path.join(directory, "spill.jsonl")
+                    dead_letter_path = os.path.join(directory, "dead_letter.jsonl")
+                except OSError as e:
+                    logger.error(f"❌ Répertoire de l'outbox inutilisable, débordement disque désactivé: {e}")
+            _event_outbox = EventOutbox(
+                writer,
+                batch_size=int(os.getenv("PHOENIX_EVENT_OUTBOX_BATCH_SIZE", "50")),
+                flush_interval=float(os.getenv("PHOENIX_EVENT_OUTBOX_FLUSH_INTERVAL", "0.5")),
+                max_queue_size=int(os.getenv("PHOENIX_EVENT_OUTBOX_MAX_QUEUE", "10000")),
+                spill_path=spill_path,
+                dead_letter_path=dead_letter_path,
+            )
+            atexit.register(_event_outbox.shutdown)
+        return _event_outbox
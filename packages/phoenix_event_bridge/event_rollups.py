@@ -0,0 +1,372 @@
+"""
+📊 Phoenix Event Rollups - Agrégats incrémentaux pour les statistiques de l'écosystème
+Compteurs par jour/application/type d'événement + HyperLogLog des utilisateurs uniques.
+Une fenêtre de N jours se calcule en fusionnant quelques buckets (mensuels puis journaliers),
+sans relire la table events. Les jours pas encore compactés sont relus depuis events
+(dans une limite) ; au-delà, le résultat est signalé comme partiel.
+
+Compaction (cron quotidien):
+    python -m phoenix_event_bridge.event_rollups --days-back 35
+"""
+
+import argparse
+import base64
+import hashlib
+import logging
+import math
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DAILY = "day"
+MONTHLY = "month"
+ROLLUPS_TABLE = "event_rollups"
+# app_source d'une ligne témoin : période compactée mais sans événement
+EMPTY_MARKER = "_empty"
+
+
+# ========================================
+# 🔢 HYPERLOGLOG
+# ========================================
+
+class HyperLogLog:
+    """
+    Estimateur de cardinalité à mémoire fixe (2^p registres, erreur ~1.04/sqrt(2^p)).
+    Les sketches se fusionnent par maximum registre à registre.
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.size)
+
+    def add(self, value: str) -> None:
+        hashed = int.from_bytes(
+            hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Précisions HyperLogLog incompatibles")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Correction petites cardinalités (linear counting)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def to_b64(self) -> str:
+        return base64.b64encode(zlib.compress(bytes(self.registers))).decode("ascii")
+
+    @classmethod
+    def from_b64(cls, encoded: str, precision: Optional[int] = None) -> "HyperLogLog":
+        """Décode un sketch ; la précision se déduit du nombre de registres si omise."""
+        registers = bytearray(zlib.decompress(base64.b64decode(encoded)))
+        return cls(precision or len(registers).bit_length() - 1, registers)
+
+
+# ========================================
+# 🪣 BUCKETS
+# ========================================
+
+class RollupBucket:
+    """Agrégat d'une application sur une période : compteurs par type + sketch des utilisateurs."""
+
+    def __init__(self, app_source: str, event_counts: Optional[Dict[str, int]] = None,
+                 users: Optional[HyperLogLog] = None):
+        self.app_source = app_source
+        self.event_counts: Counter = Counter(event_counts or {})
+        self.users = users or HyperLogLog()
+
+    @property
+    def total_events(self) -> int:
+        return sum(self.event_counts.values())
+
+    def add(self, event_type: str, stream_id: str) -> None:
+        self.event_counts[event_type] += 1
+        self.users.add(str(stream_id))
+
+    def merge(self, other: "RollupBucket") -> None:
+        self.event_counts.update(other.event_counts)
+        self.users.merge(other.users)
+
+    def to_row(self, granularity: str, bucket_start: date) -> Dict[str, Any]:
+        return {
+            "granularity": granularity,
+            "bucket_start": bucket_start.isoformat(),
+            "app_source": self.app_source,
+            "total_events": self.total_events,
+            "event_counts": dict(self.event_counts),
+            "users_hll": self.users.to_b64(),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "RollupBucket":
+        return cls(row["app_source"], row.get("event_counts") or {},
+                   HyperLogLog.from_b64(row["users_hll"]))
+
+
+def build_buckets(events: Iterable[Dict[str, Any]]) -> Dict[str, RollupBucket]:
+    """Agrège des événements bruts (app_source, event_type, stream_id) par application."""
+    buckets: Dict[str, RollupBucket] = {}
+    for event in events:
+        app = event["app_source"]
+        if app not in buckets:
+            buckets[app] = RollupBucket(app)
+        buckets[app].add(event["event_type"], event["stream_id"])
+    return buckets
+
+
+def merge_buckets(target: Dict[str, RollupBucket], buckets: Iterable[RollupBucket]) -> None:
+    """Fusionne des buckets dans l'accumulateur par application (mémoire constante)."""
+    for bucket in buckets:
+        if bucket.app_source in target:
+            target[bucket.app_source].merge(bucket)
+        else:
+            target[bucket.app_source] = RollupBucket(
+                bucket.app_source, bucket.event_counts, HyperLogLog(registers=bytearray(bucket.users.registers))
+            )
+
+
+@dataclass
+class RollupWindow:
+    """Résultat d'une fenêtre : buckets fusionnés + jours relus ou manquants."""
+    buckets: Dict[str, RollupBucket]
+    raw_days: List[date] = field(default_factory=list)
+    missing_days: List[date] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        """True si des jours non compactés n'ont pas pu être comptés."""
+        return bool(self.missing_days)
+
+
+def _contiguous_runs(days: List[date]) -> List[Tuple[date, date]]:
+    """Regroupe des jours triés en plages consécutives [premier, dernier]."""
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def plan_window(start: date, end: date) -> Tuple[List[date], List[date]]:
+    """
+    Découpe [start, end] (jours inclus) en mois complets + jours restants.
+
+    Returns:
+        (mois complets, jours hors mois complets)
+    """
+    months: List[date] = []
+    days: List[date] = []
+    cursor = start
+    while cursor <= end:
+        month_end = _next_month(cursor) - timedelta(days=1)
+        if cursor.day == 1 and month_end <= end:
+            months.append(cursor)
+            cursor = month_end + timedelta(days=1)
+        else:
+            days.append(cursor)
+            cursor += timedelta(days=1)
+    return months, days
+
+
+# ========================================
+# 🗄️ SERVICE DE ROLLUPS
+# ========================================
+
+class EventRollupService:
+    """
+    Maintient et interroge la table event_rollups.
+
+    - compact(): recalcule (idempotent) les jours clos, puis les mois clos ; un jour
+      ou un mois sans événement reçoit une ligne témoin (EMPTY_MARKER)
+    - get_window(): fusionne mois + jours de la fenêtre, et le jour courant lu depuis
+      la table events ; les jours clos sans rollup sont relus eux aussi (les plus
+      récents d'abord, jusqu'à raw_fallback_days), les autres rendent la fenêtre partielle
+    """
+
+    def __init__(self, supabase, page_size: int = 1000, raw_fallback_days: int = 7):
+        self.supabase = supabase
+        self.page_size = page_size
+        self.raw_fallback_days = raw_fallback_days
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def get_window(self, days: int, today: Optional[date] = None) -> RollupWindow:
+        """Buckets fusionnés par application pour les `days` derniers jours (jour courant inclus)."""
+        today = today or datetime.now(timezone.utc).date()
+        start = today - timedelta(days=days - 1)
+        window = RollupWindow({})
+
+        if start < today:
+            months, closed_days = plan_window(start, today - timedelta(days=1))
+            stored_months = self._fetch_rollups(MONTHLY, months)
+            # Mois non encore compactés : on retombe sur leurs jours
+            for month in months:
+                if month not in stored_months:
+                    closed_days.extend(self._days_of_month(month))
+            for buckets in stored_months.values():
+                merge_buckets(window.buckets, buckets)
+            stored_days = self._fetch_rollups(DAILY, closed_days)
+            for buckets in stored_days.values():
+                merge_buckets(window.buckets, buckets)
+
+            # Jours clos sans rollup (compaction en retard) : relus depuis events
+            uncompacted = sorted(day for day in closed_days if day not in stored_days)
+            split = max(len(uncompacted) - self.raw_fallback_days, 0)
+            window.missing_days = uncompacted[:split]
+            window.raw_days = uncompacted[split:]
+            for first_day, last_day in _contiguous_runs(window.raw_days):
+                merge_buckets(window.buckets, build_buckets(self._iter_events(first_day, last_day)).values())
+            if window.missing_days:
+                logger.warning(
+                    f"⚠️ Rollups manquants pour {len(window.missing_days)} jours "
+                    f"({window.missing_days[0]} → {window.missing_days[-1]}) : statistiques partielles"
+                )
+
+        # Jour courant : agrégé à la volée
+        merge_buckets(window.buckets, build_buckets(self._iter_events(today, today)).values())
+        return window
+
+    def get_window_buckets(self, days: int, today: Optional[date] = None) -> Dict[str, RollupBucket]:
+        """Raccourci de get_window() : buckets seuls."""
+        return self.get_window(days, today).buckets
+
+    def _fetch_rollups(self, granularity: str, starts: List[date]) -> Dict[date, List[RollupBucket]]:
+        if not starts:
+            return {}
+        response = self.supabase.table(ROLLUPS_TABLE)\
+            .select('bucket_start, app_source, event_counts, users_hll')\
+            .eq('granularity', granularity)\
+            .in_('bucket_start', [start.isoformat() for start in starts])\
+            .execute()
+        rollups: Dict[date, List[RollupBucket]] = {}
+        for row in response.data or []:
+            buckets = rollups.setdefault(date.fromisoformat(row["bucket_start"][:10]), [])
+            # Ligne témoin : la période est compactée, sans bucket à fusionner
+            if row["app_source"] != EMPTY_MARKER:
+                buckets.append(RollupBucket.from_row(row))
+        return rollups
+
+    def _iter_events(self, first_day: date, last_day: date) -> Iterator[Dict[str, Any]]:
+        """Événements bruts de [first_day, last_day], paginés."""
+        offset = 0
+        while True:
+            response = self.supabase.table('events')\
+                .select('app_source, event_type, stream_id')\
+                .gte('timestamp', first_day.isoformat())\
+                .lt('timestamp', (last_day + timedelta(days=1)).isoformat())\
+                .order('timestamp')\
+                .range(offset, offset + self.page_size - 1)\
+                .execute()
+            rows = response.data or []
+            yield from rows
+            if len(rows) < self.page_size:
+                return
+            offset += self.page_size
+
+    @staticmethod
+    def _days_of_month(month: date) -> List[date]:
+        days = []
+        cursor = month
+        while cursor < _next_month(month):
+            days.append(cursor)
+            cursor += timedelta(days=1)
+        return days
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self, days_back: int = 35, today: Optional[date] = None) -> Dict[str, int]:
+        """
+        Calcule les rollups journaliers manquants (et toujours la veille, pour les
+        événements arrivés en retard), puis les rollups des mois clos.
+        """
+        today = today or datetime.now(timezone.utc).date()
+        yesterday = today - timedelta(days=1)
+        candidates = [yesterday - timedelta(days=offset) for offset in range(days_back)]
+        existing = self._fetch_rollups(DAILY, candidates)
+
+        compacted_days = 0
+        for day in candidates:
+            if day in existing and day != yesterday:
+                continue
+            buckets = build_buckets(self._iter_events(day, day)) or {EMPTY_MARKER: RollupBucket(EMPTY_MARKER)}
+            self._upsert([bucket.to_row(DAILY, day) for bucket in buckets.values()])
+            compacted_days += 1
+
+        compacted_months = 0
+        months, _ = plan_window(candidates[-1], yesterday)
+        stored_months = self._fetch_rollups(MONTHLY, months)
+        for month in months:
+            if month in stored_months:
+                continue
+            month_days = self._days_of_month(month)
+            stored_days = self._fetch_rollups(DAILY, month_days)
+            if len(stored_days) < len(month_days):
+                # Un mois incomplet figerait un total faux : on garde ses jours
+                logger.warning(f"⚠️ Mois {month:%Y-%m} non compacté : rollups journaliers incomplets")
+                continue
+            merged: Dict[str, RollupBucket] = {}
+            for buckets in stored_days.values():
+                merge_buckets(merged, buckets)
+            merged = merged or {EMPTY_MARKER: RollupBucket(EMPTY_MARKER)}
+            self._upsert([bucket.to_row(MONTHLY, month) for bucket in merged.values()])
+            compacted_months += 1
+
+        logger.info(f"📊 Rollups compactés: {compacted_days} jours, {compacted_months} mois")
+        return {"days": compacted_days, "months": compacted_months}
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        self.supabase.table(ROLLUPS_TABLE)\
+            .upsert(rows, on_conflict='granularity,bucket_start,app_source')\
+            .execute()
+
+
+def main() -> None:
+    """Job de compaction (à planifier une fois par jour, après minuit UTC)."""
+    parser = argparse.ArgumentParser(description="Compaction des rollups d'événements Phoenix")
+    parser.add_argument("--days-back", type=int, default=35)
+    args = parser.parse_args()
+
+    from .phoenix_event_bridge import PhoenixEventBridge
+
+    try:
+        bridge = PhoenixEventBridge()
+    except ValueError:
+        raise SystemExit("SUPABASE_URL et SUPABASE_KEY requis pour la compaction")
+    result = EventRollupService(bridge.supabase).compact(days_back=args.days_back)
+    print(f"✅ Compaction terminée: {result}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -8,6 +8,7 @@ import asyncio
 import logging
 import os
 import uuid
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -15,6 +16,9 @@ from typing import Any, Dict, List, Optional
 
 from supabase import Client, create_client
 
+from .event_outbox import EventOutbox, get_event_outbox
+from .event_rollups import EventRollupService, RollupBucket, RollupWindow
+
 logger = logging.getLogger(__name__)
 
 # ========================================
@@ -47,6 +51,8 @@ class PhoenixEventType(Enum):
     COACHING_SESSION_COMPLETED = "CoachingSessionCompleted"
     MOOD_LOGGED = "MoodLogged"
     GOAL_SET = "GoalSet"
+    OBJECTIVE_CREATED = "ObjectiveCreated"
+    PROFILE_CREATED = "ProfileCreated"
     PROGRESS_TRACKED = "ProgressTracked"
     
     # Événements système
@@ -85,23 +91,97 @@ class PhoenixEventBridge:
     Simplifie la publication et consommation d'événements
     """
 
-    def __init__(self, supabase_url: str = None, supabase_key: str = None):
+    def __init__(self, supabase_url: str = None, supabase_key: str = None,
+                 outbox: Optional[EventOutbox] = None, allow_degraded: bool = False):
         """
         Initialise le bridge avec connexion Supabase
         
         Args:
             supabase_url: URL Supabase (env SUPABASE_URL si None)
-            supabase_key: Clé Supabase (env SUPABASE_KEY si None)
+            supabase_key: Clé Supabase (env SUPABASE_KEY / SUPABASE_ANON_KEY si None)
+            outbox: File d'envoi partagée ; si fournie, la publication ne fait plus d'I/O
+            allow_degraded: Sans configuration Supabase, passer en mode dégradé
+                (événements logés localement) au lieu de lever ValueError
         """
         self.supabase_url = supabase_url or os.getenv("SUPABASE_URL")
-        self.supabase_key = supabase_key or os.getenv("SUPABASE_KEY")
+        self.supabase_key = supabase_key or os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+        self.outbox = outbox
+        self.rollups: Optional[EventRollupService] = None
         
-        if not self.supabase_url or not self.supabase_key:
+        self.degraded_mode = not self.supabase_url or not self.supabase_key
+        if self.degraded_mode and not allow_degraded:
             raise ValueError("SUPABASE_URL et SUPABASE_ANON_KEY requis")
+        if self.degraded_mode:
+            logger.warning("⚠️ EventBridge en mode dégradé - Configuration Supabase manquante")
+            self.supabase = None
+        else:
+            self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
         
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        logger.info("✅ PhoenixEventBridge initialisé" + (" (mode dégradé)" if self.degraded_mode else ""))
+
+    def _to_supabase_row(self, event_data: PhoenixEventData) -> Dict[str, Any]:
+        """
+        Ligne de la table events (ID généré côté client pour l'envoi différé).
+        
+        Raises:
+            ValueError: user_id n'est pas un UUID (colonne stream_id UUID NOT NULL) ;
+                rejeté ici plutôt qu'à l'insertion différée, où il ferait échouer le lot
+        """
+        try:
+            stream_id = str(uuid.UUID(str(event_data.user_id)))
+        except ValueError:
+            raise ValueError(f"user_id invalide pour le Event Store (UUID attendu): {event_data.user_id!r}")
+        return {
+            "event_id": str(uuid.uuid4()),
+            "stream_id": stream_id,
+            "event_type": event_data.event_type.value,
+            "payload": event_data.payload,
+            "app_source": event_data.app_source,
+            "timestamp": event_data.timestamp.isoformat(),
+            "metadata": {
+                **event_data.metadata,
+                "bridge_version": "v1.0",
+                "published_at": datetime.now().isoformat()
+            }
+        }
+
+    def insert_events(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insère un lot d'événements en une seule requête (writer de l'outbox).
+        Idempotent sur event_id : un lot renvoyé après un timeout n'est pas dupliqué.
+        """
+        if self.supabase is None:
+            raise SupabaseError("Client Supabase non configuré")
+        self.supabase.table('events').upsert(
+            rows, on_conflict='event_id', ignore_duplicates=True
+        ).execute()
+
+    def enqueue_event(self, event_data: PhoenixEventData) -> str:
+        """
+        Publication non bloquante : l'événement est confié à l'outbox du processus.
+        Sans outbox, insertion synchrone immédiate.
         
-        logger.info("✅ PhoenixEventBridge initialisé")
+        Returns:
+            str: ID de l'événement
+        """
+        if self.degraded_mode:
+            mock_id = f"mock_{uuid.uuid4().hex[:8]}"
+            logger.debug(f"🔄 Mode dégradé - Événement {event_data.event_type.value} logé localement (ID: {mock_id})")
+            return mock_id
+
+        row = self._to_supabase_row(event_data)
+        if self.outbox is not None:
+            self.outbox.enqueue(row)
+        else:
+            self.insert_events([row])
+        logger.debug(f"📤 Événement mis en file: {event_data.event_type.value} - {row['event_id']}")
+        return row["event_id"]
+
+    def flush_events(self, timeout: float = 10.0) -> bool:
+        """Attend l'envoi des événements en file (True si tout est publié)."""
+        if self.outbox is None:
+            return True
+        return self.outbox.flush(timeout)
 
     async def publish_event(self, event_data: PhoenixEventData) -> str:
         """
@@ -113,20 +193,12 @@ class PhoenixEventBridge:
         Returns:
             str: ID de l'événement créé
         """
+        if self.degraded_mode or self.outbox is not None:
+            return self.enqueue_event(event_data)
+
         try:
             # Préparer les données pour Supabase
-            supabase_event = {
-                "stream_id": event_data.user_id,
-                "event_type": event_data.event_type.value,
-                "payload": event_data.payload,
-                "app_source": event_data.app_source,
-                "timestamp": event_data.timestamp.isoformat(),
-                "metadata": {
-                    **event_data.metadata,
-                    "bridge_version": "v1.0",
-                    "published_at": datetime.now().isoformat()
-                }
-            }
+            supabase_event = self._to_supabase_row(event_data)
             
             # Insérer dans Supabase
             response = self.supabase.table('events').insert(supabase_event).execute()
@@ -182,34 +254,43 @@ class PhoenixEventBridge:
         """
         Génère des statistiques de l'écosystème Phoenix.
         
+        Calculées à partir des rollups (compteurs + HyperLogLog par jour/mois et
+        par application) : coût constant quelle que soit la longueur de la fenêtre.
+        Les utilisateurs uniques sont une estimation (~1.6% d'erreur). Les jours pas
+        encore compactés sont relus depuis events ; au-delà de la limite de relecture,
+        "partial" vaut True et "missing_days" liste les jours non comptés.
+        
         Args:
-            days: Nombre de jours à analyser
+            days: Nombre de jours calendaires à analyser (jour courant inclus)
             
         Returns:
             Dict: Statistiques globales
         """
+        if self.degraded_mode:
+            return self._empty_stats_report(days)
+
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
+            if self.rollups is None:
+                self.rollups = EventRollupService(self.supabase)
+            window = await asyncio.to_thread(self.rollups.get_window, days)
+            buckets = window.buckets
             
-            events = await self._fetch_events_for_stats(cutoff_date)
-            
-            if not events:
+            if not buckets:
                 logger.info("📊 Aucune donnée d'événement pour la période.")
-                return self._empty_stats_report(days)
+                return {**self._empty_stats_report(days), **self._coverage(window)}
 
-            total_events = len(events)
-            unique_users = len(set(event['stream_id'] for event in events))
-            
-            app_stats = self._calculate_app_statistics(events)
-            top_events = self._calculate_top_events(events)
+            total_events = sum(bucket.total_events for bucket in buckets.values())
+            unique_users = self._estimate_unique_users(buckets)
             
             stats = {
                 "period_days": days,
                 "total_events": total_events,
                 "unique_users": unique_users,
                 "avg_events_per_user": round(total_events / max(unique_users, 1), 2),
-                "app_statistics": app_stats,
-                "top_events": top_events,
+                "app_statistics": self._calculate_app_statistics(buckets),
+                "top_events": self._calculate_top_events(buckets),
+                "unique_users_estimated": True,
+                **self._coverage(window),
                 "generated_at": datetime.now().isoformat()
             }
             
@@ -220,42 +301,42 @@ class PhoenixEventBridge:
             logger.error(f"❌ Erreur génération stats: {e}")
             return self._empty_stats_report(days)
 
-    async def _fetch_events_for_stats(self, cutoff_date: datetime) -> List[Dict[str, Any]]:
+    def _coverage(self, window: RollupWindow) -> Dict[str, Any]:
         """
-        Récupère les événements depuis Supabase pour l'analyse statistique.
+        Couverture de la fenêtre : jours relus depuis events, jours non comptés.
         """
-        response = await self.supabase.table('events')\
-            .select('app_source, event_type, stream_id')\
-            .gte('timestamp', cutoff_date.isoformat())\
-            .execute()
-        return response.data
+        return {
+            "partial": window.partial,
+            "missing_days": [day.isoformat() for day in window.missing_days],
+            "raw_fallback_days": len(window.raw_days),
+        }
 
-    def _calculate_app_statistics(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _estimate_unique_users(self, buckets: Dict[str, RollupBucket]) -> int:
+        """
+        Utilisateurs uniques toutes applications confondues (union des sketches).
+        """
+        union = RollupBucket("all")
+        for bucket in buckets.values():
+            union.users.merge(bucket.users)
+        return union.users.count()
+
+    def _calculate_app_statistics(self, buckets: Dict[str, RollupBucket]) -> Dict[str, Any]:
         """
         Calcule les statistiques de répartition par application.
         """
-        app_stats = {}
-        for event in events:
-            app = event['app_source']
-            if app not in app_stats:
-                app_stats[app] = {"events": 0, "users": set()}
-            app_stats[app]["events"] += 1
-            app_stats[app]["users"].add(event['stream_id'])
-        
-        for app in app_stats:
-            app_stats[app]["unique_users"] = len(app_stats[app]["users"])
-            del app_stats[app]["users"]
-        return app_stats
+        return {
+            app: {"events": bucket.total_events, "unique_users": bucket.users.count()}
+            for app, bucket in buckets.items()
+        }
 
-    def _calculate_top_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+    def _calculate_top_events(self, buckets: Dict[str, RollupBucket]) -> Dict[str, int]:
         """
         Calcule les événements les plus fréquents.
         """
-        event_counts = {}
-        for event in events:
-            event_type = event['event_type']
-            event_counts[event_type] = event_counts.get(event_type, 0) + 1
-        return dict(sorted(event_counts.items(), key=lambda x: x[1], reverse=True)[:10])
+        event_counts = Counter()
+        for bucket in buckets.values():
+            event_counts.update(bucket.event_counts)
+        return dict(event_counts.most_common(10))
 
     def _empty_stats_report(self, days: int) -> Dict[str, Any]:
         """
@@ -417,29 +498,38 @@ class PhoenixEventFactory:
     """
     
     @staticmethod
-    def create_bridge(supabase_url: str = None, supabase_key: str = None) -> PhoenixEventBridge:
-        """Crée un Event Bridge"""
-        return PhoenixEventBridge(supabase_url, supabase_key)
+    def create_bridge(supabase_url: str = None, supabase_key: str = None,
+                      buffered: bool = True, allow_degraded: bool = False) -> PhoenixEventBridge:
+        """
+        Crée un Event Bridge.
+        Par défaut, les publications passent par l'outbox partagée du processus
+        (insertions groupées en arrière-plan) ; buffered=False pour l'insertion directe.
+        allow_degraded=True tolère l'absence de configuration Supabase (mode dégradé).
+        """
+        bridge = PhoenixEventBridge(supabase_url, supabase_key, allow_degraded=allow_degraded)
+        if buffered and not bridge.degraded_mode:
+            bridge.outbox = get_event_outbox(bridge.insert_events)
+        return bridge
     
     @staticmethod
     def create_cv_helper(bridge: PhoenixEventBridge = None) -> PhoenixCVEventHelper:
         """Crée un helper pour Phoenix CV"""
         if bridge is None:
-            bridge = PhoenixEventBridge()
+            bridge = PhoenixEventFactory.create_bridge()
         return PhoenixCVEventHelper(bridge)
     
     @staticmethod
     def create_letters_helper(bridge: PhoenixEventBridge = None) -> PhoenixLettersEventHelper:
         """Crée un helper pour Phoenix Letters"""
         if bridge is None:
-            bridge = PhoenixEventBridge()
+            bridge = PhoenixEventFactory.create_bridge()
         return PhoenixLettersEventHelper(bridge)
     
     @staticmethod
     def create_rise_helper(bridge: PhoenixEventBridge = None) -> PhoenixRiseEventHelper:
         """Crée un helper pour Phoenix Rise"""
         if bridge is None:
-            bridge = PhoenixEventBridge()
+            bridge = PhoenixEventFactory.create_bridge()
         return PhoenixRiseEventHelper(bridge)
 
 # ========================================
@@ -0,0 +1,168 @@
+"""
+Tests de l'outbox d'événements : isolation des lignes rejetées, dead-letter,
+rejeu du débordement disque et validation côté bridge.
+"""
+
+import json
+import os
+import stat
+import uuid
+
+import pytest
+
+from phoenix_event_bridge import PhoenixEventBridge, PhoenixEventData, PhoenixEventType
+from phoenix_event_bridge.event_outbox import EventOutbox, _ensure_private_dir, default_outbox_dir
+
+
+class FakeEventsTable:
+    """Table events factice : stream_id UUID NOT NULL, panne simulable."""
+
+    def __init__(self):
+        self.rows = {}
+        self.down = False
+        self.calls = 0
+
+    def write(self, rows):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("Supabase indisponible")
+        for row in rows:
+            uuid.UUID(row["stream_id"])  # Violation de type : tout le lot échoue
+        for row in rows:
+            self.rows[row["event_id"]] = row
+
+
+def _row(stream_id=None):
+    return {"event_id": str(uuid.uuid4()), "stream_id": stream_id or str(uuid.uuid4())}
+
+
+def _outbox(table, tmp_path, **kwargs):
+    return EventOutbox(
+        table.write,
+        batch_size=kwargs.pop("batch_size", 10),
+        flush_interval=0.01,
+        max_retries=2,
+        retry_base_delay=0,
+        spill_path=str(tmp_path / "spill.jsonl"),
+        dead_letter_path=str(tmp_path / "dead_letter.jsonl"),
+        **kwargs,
+    )
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+class TestEventOutbox:
+
+    def test_invalid_row_is_dead_lettered_without_sinking_the_batch(self, tmp_path):
+        table = FakeEventsTable()
+        outbox = _outbox(table, tmp_path)
+        good = [_row() for _ in range(5)]
+        bad = _row("default_user_id")
+        with outbox._condition:
+            for row in good[:2] + [bad] + good[2:]:
+                outbox.enqueue(row)
+
+        assert outbox.flush(5)
+        outbox.shutdown()
+
+        assert set(table.rows) == {row["event_id"] for row in good}
+        assert _read(tmp_path / "dead_letter.jsonl") == [bad]
+        assert not (tmp_path / "spill.jsonl").exists()
+        stats = outbox.get_stats()
+        assert stats["dead_lettered"] == 1
+        assert stats["written"] == 5
+
+    def test_outage_spills_without_dead_lettering_then_replays(self, tmp_path):
+        table = FakeEventsTable()
+        table.down = True
+        outbox = _outbox(table, tmp_path)
+        lost = [_row() for _ in range(6)]
+        for row in lost:
+            outbox.enqueue(row)
+        assert outbox.flush(5)
+
+        assert len(_read(tmp_path / "spill.jsonl")) == 6
+        assert not (tmp_path / "dead_letter.jsonl").exists()
+
+        table.down = False
+        outbox.enqueue(_row())
+        assert outbox.flush(5)
+        outbox.shutdown()
+
+        assert {row["event_id"] for row in lost} <= set(table.rows)
+        assert not (tmp_path / "spill.jsonl").exists()
+        assert outbox.get_stats()["replayed"] == 6
+
+    def test_spilled_invalid_row_does_not_block_replay_forever(self, tmp_path):
+        table = FakeEventsTable()
+        bad = _row("anonymous_123")
+        with open(tmp_path / "spill.jsonl", "w", encoding="utf-8") as handle:
+            handle.write(json.dumps(bad) + "\n")
+            handle.write("{ligne tronquée\n")
+        outbox = _outbox(table, tmp_path)
+
+        outbox.enqueue(_row())
+        assert outbox.flush(5)
+        outbox.shutdown()
+
+        dead = _read(tmp_path / "dead_letter.jsonl")
+        assert bad in dead
+        assert {"raw": "{ligne tronquée"} in dead
+        assert not (tmp_path / "spill.jsonl").exists()
+
+    def test_default_directory_is_private_and_outside_tmp(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+        directory = default_outbox_dir()
+        os.makedirs(directory, mode=0o755)
+        os.chmod(directory, 0o755)
+
+        _ensure_private_dir(directory)
+
+        assert directory.startswith(str(tmp_path / "state"))
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.upserts = []
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.upserts.append((rows, kwargs))
+        return self
+
+    def execute(self):
+        return None
+
+
+class TestPhoenixEventBridge:
+
+    def test_missing_configuration_raises_unless_degraded_is_allowed(self, monkeypatch):
+        for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_ANON_KEY"):
+            monkeypatch.delenv(name, raising=False)
+
+        with pytest.raises(ValueError):
+            PhoenixEventBridge()
+        assert PhoenixEventBridge(allow_degraded=True).degraded_mode
+
+    def test_non_uuid_user_is_rejected_at_enqueue(self):
+        bridge = PhoenixEventBridge(allow_degraded=True)
+        event = PhoenixEventData(PhoenixEventType.CV_GENERATED, "default_user_id", "cv", {})
+
+        with pytest.raises(ValueError):
+            bridge._to_supabase_row(event)
+
+    def test_batch_insert_is_idempotent_on_event_id(self):
+        bridge = PhoenixEventBridge(allow_degraded=True)
+        bridge.supabase = FakeSupabase()
+        event = PhoenixEventData(PhoenixEventType.CV_GENERATED, str(uuid.uuid4()), "cv", {})
+
+        bridge.insert_events([bridge._to_supabase_row(event)])
+
+        (_, options), = bridge.supabase.upserts
+        assert options == {"on_conflict": "event_id", "ignore_duplicates": True}
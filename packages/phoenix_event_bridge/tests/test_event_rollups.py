@@ -0,0 +1,231 @@
+"""
+Tests des rollups d'événements : HyperLogLog, découpage des fenêtres,
+compaction et repli sur les événements bruts des jours non compactés.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from phoenix_event_bridge.event_rollups import (
+    DAILY,
+    EMPTY_MARKER,
+    MONTHLY,
+    EventRollupService,
+    HyperLogLog,
+    plan_window,
+)
+
+TODAY = date(2026, 10, 16)
+
+
+class FakeQuery:
+    """Sous-ensemble du query builder PostgREST utilisé par EventRollupService."""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.bounds = None
+        self.payload = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row[column] in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row[column] < value)
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end + 1)
+        return self
+
+    def upsert(self, rows, on_conflict):
+        self.payload = (rows, on_conflict.split(","))
+        return self
+
+    def execute(self):
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.payload is not None:
+            new_rows, keys = self.payload
+            for new in new_rows:
+                rows[:] = [row for row in rows if any(row[k] != new[k] for k in keys)]
+                rows.append(dict(new))
+            return type("Response", (), {"data": new_rows})()
+        if self.table == "events":
+            self.db.event_reads += 1
+        data = [row for row in rows if all(check(row) for check in self.filters)]
+        if self.bounds:
+            data = data[self.bounds[0]:self.bounds[1]]
+        return type("Response", (), {"data": data})()
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+        self.event_reads = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def add_events(self, day, count, app="letters", users=5):
+        events = self.tables.setdefault("events", [])
+        for i in range(count):
+            timestamp = datetime.combine(day, datetime.min.time()) + timedelta(minutes=i)
+            events.append({
+                "timestamp": timestamp.isoformat(),
+                "app_source": app,
+                "event_type": "LetterGenerated",
+                "stream_id": f"user-{i % users}",
+            })
+
+
+def _history(supabase, days, per_day=3):
+    """Événements sur les `days` jours précédant TODAY (jours sans événement tous les 5 jours)."""
+    for offset in range(1, days + 1):
+        day = TODAY - timedelta(days=offset)
+        if offset % 5:
+            supabase.add_events(day, per_day)
+
+
+class TestHyperLogLog:
+
+    def test_estimate_is_within_a_few_percent(self):
+        sketch = HyperLogLog()
+        for i in range(20000):
+            sketch.add(f"user-{i}")
+
+        assert abs(sketch.count() - 20000) / 20000 < 0.05
+
+    def test_merge_counts_the_union_and_serialization_round_trips(self):
+        left, right = HyperLogLog(), HyperLogLog()
+        for i in range(600):
+            left.add(f"user-{i}")
+        for i in range(300, 900):
+            right.add(f"user-{i}")
+
+        left.merge(HyperLogLog.from_b64(right.to_b64()))
+
+        assert abs(left.count() - 900) / 900 < 0.05
+
+    def test_incompatible_precisions_are_rejected(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(12).merge(HyperLogLog(10))
+
+
+class TestPlanWindow:
+
+    def test_window_is_split_into_full_months_and_remaining_days(self):
+        months, days = plan_window(date(2026, 8, 15), date(2026, 10, 15))
+
+        assert months == [date(2026, 9, 1)]
+        assert days[0] == date(2026, 8, 15)
+        assert days[-1] == date(2026, 10, 15)
+        assert len(days) == 17 + 15
+
+    def test_month_ending_on_the_last_day_is_complete(self):
+        months, days = plan_window(date(2024, 2, 1), date(2024, 2, 29))
+
+        assert months == [date(2024, 2, 1)]
+        assert days == []
+
+    def test_partial_month_is_kept_as_days(self):
+        months, days = plan_window(date(2026, 10, 1), date(2026, 10, 15))
+
+        assert months == []
+        assert len(days) == 15
+
+
+class TestCompaction:
+
+    def test_compacted_window_matches_raw_events_without_reading_them(self):
+        supabase = FakeSupabase()
+        _history(supabase, 40)
+        supabase.add_events(TODAY, 2)
+        service = EventRollupService(supabase)
+        service.compact(days_back=40, today=TODAY)
+        supabase.event_reads = 0
+
+        window = service.get_window(40, today=TODAY)
+
+        expected = sum(1 for event in supabase.tables["events"] if event["timestamp"] >= "2026-09-07")
+        assert window.buckets["letters"].total_events == expected
+        assert window.buckets["letters"].users.count() == 3
+        assert not window.partial and window.raw_days == []
+        assert supabase.event_reads == 1  # Jour courant uniquement
+
+    def test_empty_days_and_months_are_recorded_as_compacted(self):
+        supabase = FakeSupabase()
+        supabase.add_events(TODAY - timedelta(days=1), 1)
+        service = EventRollupService(supabase)
+
+        result = service.compact(days_back=50, today=TODAY)
+
+        rows = supabase.tables["event_rollups"]
+        markers = [row for row in rows if row["app_source"] == EMPTY_MARKER]
+        assert result == {"days": 50, "months": 1}
+        assert any(row["granularity"] == MONTHLY and row["bucket_start"] == "2026-09-01" for row in markers)
+        assert sum(row["granularity"] == DAILY for row in markers) == 49
+        window = service.get_window(50, today=TODAY)
+        assert not window.partial and window.raw_days == []
+
+    def test_second_run_only_recomputes_yesterday(self):
+        supabase = FakeSupabase()
+        _history(supabase, 10)
+        service = EventRollupService(supabase)
+        service.compact(days_back=10, today=TODAY)
+
+        assert service.compact(days_back=10, today=TODAY)["days"] == 1
+
+    def test_month_with_missing_days_is_not_frozen(self):
+        supabase = FakeSupabase()
+        _history(supabase, 60)
+        service = EventRollupService(supabase)
+
+        # Fenêtre de compaction trop courte pour couvrir tout septembre
+        service.compact(days_back=20, today=TODAY)
+
+        assert not any(row["granularity"] == MONTHLY for row in supabase.tables["event_rollups"])
+
+
+class TestUncompactedDays:
+
+    def test_uncompacted_days_fall_back_to_raw_events(self):
+        supabase = FakeSupabase()
+        _history(supabase, 10)
+        service = EventRollupService(supabase)
+        service.compact(days_back=10, today=TODAY - timedelta(days=3))
+
+        window = service.get_window(10, today=TODAY)
+
+        assert window.buckets["letters"].total_events == len(supabase.tables["events"])
+        assert window.raw_days == [TODAY - timedelta(days=offset) for offset in (3, 2, 1)]
+        assert not window.partial
+
+    def test_days_beyond_the_fallback_budget_flag_the_window_as_partial(self):
+        supabase = FakeSupabase()
+        _history(supabase, 10)
+        service = EventRollupService(supabase, raw_fallback_days=2)
+
+        window = service.get_window(10, today=TODAY)
+
+        assert window.partial
+        assert window.raw_days == [TODAY - timedelta(days=2), TODAY - timedelta(days=1)]
+        assert window.missing_days[0] == TODAY - timedelta(days=9)
+        assert len(window.missing_days) == 7
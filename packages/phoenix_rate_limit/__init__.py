@@ -0,0 +1,22 @@
+"""
+🚦 Phoenix Rate Limit - Package partagé de l'écosystème Phoenix
+Rate limiting GCRA (token bucket) : état O(1) par clé, expiration des clés,
+quotas par tier et backend en mémoire ou Redis (limites communes aux workers).
+"""
+
+from .backends import InMemoryBackend, RateLimitBackend, RedisBackend, create_backend_from_env
+from .limiter import RateLimiter, create_rate_limiter_from_env, tier_name
+from .quota import Quota, RateLimitResult
+
+__version__ = "1.0.0"
+__all__ = [
+    "Quota",
+    "RateLimitResult",
+    "RateLimiter",
+    "create_rate_limiter_from_env",
+    "tier_name",
+    "RateLimitBackend",
+    "InMemoryBackend",
+    "RedisBackend",
+    "create_backend_from_env",
+]
@@ -0,0 +1,165 @@
+"""
+🗄️ Phoenix Rate Limit - Backends de stockage des TAT
+- InMemoryBackend : dictionnaire du processus, clés expirées balayées périodiquement
+- RedisBackend : script Lua atomique, limites partagées entre workers uvicorn
+"""
+
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+import time
+from typing import Any, Dict, Tuple
+
+from .quota import TIME_EPSILON, gcra
+
+logger = logging.getLogger(__name__)
+
+# (autorisé, retry_after, avance du TAT sur l'horloge)
+Decision = Tuple[bool, float, float]
+
+
+class RateLimitBackend(ABC):
+    """Interface : applique GCRA à une clé et stocke le nouveau TAT"""
+
+    @abstractmethod
+    def update(self, key: str, emission_interval: float, tolerance: float, cost: int = 1) -> Decision:
+        pass
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        pass
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    ✅ Backend en mémoire, thread-safe.
+
+    Un TAT dépassé équivaut à une clé absente : il expire donc de lui-même.
+    Les clés expirées sont supprimées par un balayage toutes les `sweep_interval`
+    secondes ; au-delà de `max_keys`, les clés les plus anciennes sont évincées.
+    """
+
+    def __init__(self, max_keys: int = 200_000, sweep_interval: float = 30.0, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + sweep_interval
+        self._evicted = 0
+
+    def update(self, key: str, emission_interval: float, tolerance: float, cost: int = 1) -> Decision:
+        with self._lock:
+            now = self.clock()
+            if now >= self._next_sweep or len(self._tats) >= self.max_keys:
+                self._sweep(now)
+            allowed, tat, retry_after, advance = gcra(
+                self._tats.get(key), now, emission_interval, tolerance, cost
+            )
+            if allowed and cost:
+                self._tats[key] = tat
+            return allowed, retry_after, advance
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._tats.pop(key, None)
+
+    def _sweep(self, now: float) -> None:
+        """Supprime les TAT expirés, puis les plus anciennes clés si la borne est atteinte"""
+        expired = [key for key, tat in self._tats.items() if tat <= now]
+        for key in expired:
+            del self._tats[key]
+        # Éviction par paquets (10 %) : pas de balayage à chaque nouvelle clé une fois la borne atteinte
+        overflow = len(self._tats) - int(self.max_keys * 0.9)
+        if len(self._tats) >= self.max_keys and overflow > 0:
+            for key in list(self._tats)[:overflow]:
+                del self._tats[key]
+            self._evicted += overflow
+        self._evicted += len(expired)
+        self._next_sweep = now + self.sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "keys": len(self._tats), "evicted": self._evicted}
+
+
+# Même décision que quota.gcra, exécutée atomiquement côté Redis avec l'horloge
+# du serveur (les workers n'ont pas besoin d'horloges synchronisées).
+# Les flottants sont renvoyés en chaînes au µs près (tostring n'en garde que 14 chiffres,
+# soit 0.1 ms sur un horodatage epoch) : Lua tronquerait les nombres en entiers.
+# ARGV[4] = TIME_EPSILON, même tolérance d'arrondi que la version Python.
+_GCRA_LUA = """
+local emission_interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local epsilon = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if tat == nil or tat < now then
+    tat = now
+end
+local new_tat = tat + emission_interval * cost
+local allow_at = new_tat - tolerance
+if now < allow_at - epsilon then
+    return {0, string.format('%.6f', allow_at - now), string.format('%.6f', tat - now)}
+end
+if cost > 0 then
+    redis.call('SET', KEYS[1], string.format('%.6f', new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+end
+return {1, '0', string.format('%.6f', new_tat - now)}
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    ✅ Backend Redis (ou compatible : Valkey, KeyDB, Upstash).
+
+    Une clé Redis par clé limitée, avec expiration = instant où le TAT est dépassé :
+    Redis se charge seul de l'éviction.
+    """
+
+    def __init__(self, client, prefix: str = "phoenix:rl:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_GCRA_LUA)
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "phoenix:rl:") -> "RedisBackend":
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5), prefix)
+
+    def update(self, key: str, emission_interval: float, tolerance: float, cost: int = 1) -> Decision:
+        allowed, retry_after, advance = self._script(
+            keys=[self.prefix + key], args=[emission_interval, tolerance, cost, TIME_EPSILON]
+        )
+        return bool(int(allowed)), float(retry_after), float(advance)
+
+    def reset(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+def create_backend_from_env(prefix: str = "phoenix:rl:") -> RateLimitBackend:
+    """
+    Backend selon l'environnement : Redis si PHOENIX_RATE_LIMIT_REDIS_URL (ou REDIS_URL)
+    est défini et que le client redis est installé, mémoire sinon.
+    """
+    url = os.getenv("PHOENIX_RATE_LIMIT_REDIS_URL") or os.getenv("REDIS_URL")
+    if url:
+        try:
+            backend = RedisBackend.from_url(url, prefix)
+            logger.info("✅ Rate limiting partagé via Redis")
+            return backend
+        except ImportError:
+            logger.warning("⚠️ Package redis absent, rate limiting en mémoire (par processus)")
+    return InMemoryBackend(
+        max_keys=int(os.getenv("PHOENIX_RATE_LIMIT_MAX_KEYS", "200000")),
+        sweep_interval=float(os.getenv("PHOENIX_RATE_LIMIT_SWEEP_INTERVAL", "30")),
+    )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark rate limiting - 100k clés distinctes
+Compare l'ancienne fenêtre glissante (liste d'horodatages reconstruite à chaque appel,
+clés jamais évincées) au RateLimiter GCRA en mémoire ; Redis si PHOENIX_RATE_LIMIT_REDIS_URL est défini.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phoenix_rate_limit import InMemoryBackend, Quota, RateLimiter, RedisBackend
+
+KEYS = 100_000
+HITS = 500_000
+QUOTA = Quota(limit=60, period=60)
+
+
+class LegacySlidingWindow:
+    """Ancien limiteur (phoenix_cv.utils.rate_limiter / iris input_security)"""
+
+    def __init__(self):
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def is_allowed(self, key: str, max_requests: int, window_seconds: int) -> bool:
+        now = time.time()
+        with self._lock:
+            if key not in self._limits:
+                self._limits[key] = []
+            self._limits[key] = [t for t in self._limits[key] if now - t < window_seconds]
+            if len(self._limits[key]) >= max_requests:
+                return False
+            self._limits[key].append(now)
+            return True
+
+
+def workload(seed: int = 7):
+    """Trafic réaliste : 20 % des clés concentrent 80 % des requêtes"""
+    rng = random.Random(seed)
+    hot = KEYS // 5
+    keys = [f"user_{i}" for i in range(KEYS)]
+    order = keys[:]  # chaque clé vue au moins une fois
+    for _ in range(HITS - KEYS):
+        order.append(keys[rng.randrange(hot)] if rng.random() < 0.8 else keys[rng.randrange(KEYS)])
+    return order
+
+
+def run(name: str, check, order) -> None:
+    start = time.perf_counter()
+    allowed = sum(1 for key in order if check(key))
+    elapsed = time.perf_counter() - start
+    print(f"  • {name:<22} {elapsed / len(order) * 1e6:6.2f} µs/appel  ({allowed:,} autorisés)")
+
+
+def memory(name: str, check) -> None:
+    """Mémoire retenue après une requête sur chacune des 100k clés"""
+    tracemalloc.start()
+    for i in range(KEYS):
+        check(f"user_{i}")
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  • {name:<22} {current / 1e6:6.1f} Mo pour {KEYS:,} clés")
+
+
+def main() -> None:
+    order = workload()
+    print(f"🚦 {len(order):,} appels sur {KEYS:,} clés distinctes (quota {QUOTA.limit}/{QUOTA.period:g}s)")
+
+    legacy = LegacySlidingWindow()
+    run("Fenêtre glissante", lambda key: legacy.is_allowed(key, QUOTA.limit, int(QUOTA.period)), order)
+    backend = InMemoryBackend(max_keys=2 * KEYS)
+    limiter = RateLimiter(backend, default_quota=QUOTA, namespace="bench")
+    run("GCRA mémoire", lambda key: limiter.hit(key).allowed, order)
+
+    # Clé chaude proche de sa limite (quota Iris Premium à l'heure) : la liste atteint 1000 entrées
+    hot_quota = Quota(limit=1000, period=3600)
+    hot_order = ["hot_user"] * 2000
+    print(f"🔥 Clé unique, quota {hot_quota.limit}/{hot_quota.period:g}s, {len(hot_order):,} appels")
+    run("Fenêtre glissante", lambda key: legacy.is_allowed(key, hot_quota.limit, int(hot_quota.period)), hot_order)
+    run("GCRA mémoire", lambda key: limiter.hit(key, hot_quota).allowed, hot_order)
+
+    print("💾 Mémoire")
+    fresh_legacy = LegacySlidingWindow()
+    memory("Fenêtre glissante", lambda key: fresh_legacy.is_allowed(key, QUOTA.limit, int(QUOTA.period)))
+    fresh_limiter = RateLimiter(InMemoryBackend(max_keys=2 * KEYS), default_quota=QUOTA, namespace="bench")
+    memory("GCRA mémoire", lambda key: fresh_limiter.hit(key).allowed)
+
+    # Éviction : une fois les TAT dépassés, le balayage libère toutes les clés
+    backend._sweep(backend.clock() + hot_quota.period)
+    print(f"  • Après expiration des quotas: GCRA {len(backend)} clés, "
+          f"fenêtre glissante {len(legacy._limits):,} clés (jamais évincées)")
+
+    url = os.getenv("PHOENIX_RATE_LIMIT_REDIS_URL")
+    if url:
+        redis_limiter = RateLimiter(RedisBackend.from_url(url, "phoenix:rl:bench:"), default_quota=QUOTA)
+        print("🌐 Redis")
+        run("GCRA Redis", lambda key: redis_limiter.hit(key).allowed, order[:50_000])
+
+
+if __name__ == "__main__":
+    main()
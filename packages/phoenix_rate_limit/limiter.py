@@ -0,0 +1,114 @@
+"""
+🚦 Phoenix Rate Limit - Limiteur par clé et par tier
+"""
+
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from .backends import InMemoryBackend, RateLimitBackend, create_backend_from_env
+from .quota import UNLIMITED, Quota, RateLimitResult, remaining_requests
+
+logger = logging.getLogger(__name__)
+
+
+def tier_name(tier: Any) -> str:
+    """Normalise un tier (Enum, chaîne) : UserTier.PREMIUM, "premium" -> "PREMIUM" """
+    return str(getattr(tier, "value", tier)).upper()
+
+
+class RateLimiter:
+    """
+    ✅ Limiteur GCRA : état O(1) par clé, expiration automatique, backend interchangeable.
+
+    - hit() consomme une requête, peek() lit le quota restant sans consommer
+    - tier_quotas : quota par tier d'abonnement (None = illimité)
+    - Si le backend distant échoue, bascule sur un backend mémoire local pendant
+      `backend_retry_interval` secondes (limites par processus plutôt qu'aucune limite)
+    """
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        tier_quotas: Optional[Mapping[Any, Optional[Quota]]] = None,
+        default_quota: Optional[Quota] = None,
+        namespace: str = "",
+        backend_retry_interval: float = 30.0,
+    ):
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.tier_quotas: Dict[str, Optional[Quota]] = {
+            tier_name(tier): quota for tier, quota in (tier_quotas or {}).items()
+        }
+        self.default_quota = default_quota
+        self.namespace = namespace
+        self.backend_retry_interval = backend_retry_interval
+        self._fallback: Optional[InMemoryBackend] = None
+        self._backend_retry_at = 0.0
+
+    def quota_for(self, tier: Any = None) -> Optional[Quota]:
+        """Quota d'un tier (tier inconnu ou absent : default_quota)"""
+        if tier is not None:
+            name = tier_name(tier)
+            if name in self.tier_quotas:
+                return self.tier_quotas[name]
+        return self.default_quota
+
+    def hit(self, key: str, quota: Optional[Quota] = None, tier: Any = None, cost: int = 1) -> RateLimitResult:
+        """
+        Consomme `cost` requêtes pour `key`.
+
+        Args:
+            quota: Quota explicite (prioritaire sur tier)
+            tier: Tier d'abonnement, résolu via tier_quotas
+        """
+        quota = quota or self.quota_for(tier)
+        if quota is None:
+            return UNLIMITED
+        storage_key = f"{self.namespace}:{key}:{quota.key_suffix}"
+        interval, tolerance = quota.emission_interval, quota.tolerance
+        allowed, retry_after, advance = self._update(storage_key, interval, tolerance, cost)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=quota.burst or quota.limit,
+            remaining=remaining_requests(advance, interval, tolerance) if allowed else 0,
+            retry_after=retry_after,
+            reset_after=advance,
+        )
+
+    def _update(self, storage_key: str, interval: float, tolerance: float, cost: int):
+        if self._fallback is None or time.monotonic() >= self._backend_retry_at:
+            try:
+                return self.backend.update(storage_key, interval, tolerance, cost)
+            except Exception as e:
+                logger.warning(f"⚠️ Backend rate limit indisponible, repli en mémoire: {e}")
+                self._backend_retry_at = time.monotonic() + self.backend_retry_interval
+                if self._fallback is None:
+                    self._fallback = InMemoryBackend()
+        return self._fallback.update(storage_key, interval, tolerance, cost)
+
+    def peek(self, key: str, quota: Optional[Quota] = None, tier: Any = None) -> RateLimitResult:
+        """Quota restant sans consommer de requête"""
+        return self.hit(key, quota=quota, tier=tier, cost=0)
+
+    def is_allowed(self, key: str, quota: Optional[Quota] = None, tier: Any = None) -> bool:
+        return self.hit(key, quota=quota, tier=tier).allowed
+
+    def reset(self, key: str, quota: Optional[Quota] = None, tier: Any = None) -> None:
+        """Remet à zéro la consommation d'une clé (ex. après upgrade d'abonnement)"""
+        quota = quota or self.quota_for(tier)
+        if quota is not None:
+            self.backend.reset(f"{self.namespace}:{key}:{quota.key_suffix}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.backend.get_stats() if hasattr(self.backend, "get_stats") else {}
+        fallback_active = self._fallback is not None and time.monotonic() < self._backend_retry_at
+        return {**stats, "fallback_active": fallback_active}
+
+
+def create_rate_limiter_from_env(
+    namespace: str,
+    tier_quotas: Optional[Mapping[Any, Optional[Quota]]] = None,
+    default_quota: Optional[Quota] = None,
+) -> RateLimiter:
+    """Limiteur sur le backend de l'environnement (voir create_backend_from_env)"""
+    return RateLimiter(create_backend_from_env(), tier_quotas, default_quota, namespace)
@@ -0,0 +1,123 @@
+"""
+🚦 Phoenix Rate Limit - Quotas et algorithme GCRA
+Un quota « limit requêtes par period secondes » est appliqué par GCRA
+(Generic Cell Rate Algorithm) : l'état d'une clé se réduit à un seul flottant,
+le TAT (Theoretical Arrival Time), au lieu d'une liste d'horodatages.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import NamedTuple, Optional, Tuple
+
+_PERIODS = {
+    "s": 1, "sec": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hour": 3600,
+    "d": 86400, "day": 86400,
+}
+
+# Marge flottante pour les divisions (remaining)
+_EPSILON = 1e-9
+# Tolérance de la comparaison horloge / TAT (secondes) : now + I - I peut dépasser now
+# d'un ULP ; 1 µs couvre l'arrondi d'horodatages epoch (~2e-7 s vers 2e9) comme monotonic
+TIME_EPSILON = 1e-6
+
+
+@dataclass(frozen=True)
+class Quota:
+    """
+    Quota GCRA : `limit` requêtes par `period` secondes, `burst` requêtes
+    acceptées d'affilée (par défaut `limit`, comme une fenêtre glissante).
+    """
+    limit: int
+    period: float
+    burst: Optional[int] = None
+
+    def __post_init__(self):
+        if self.limit <= 0 or self.period <= 0:
+            raise ValueError("limit et period doivent être strictement positifs")
+        if self.burst is not None and self.burst <= 0:
+            raise ValueError("burst doit être strictement positif")
+
+    @cached_property
+    def emission_interval(self) -> float:
+        """Intervalle entre deux requêtes au débit soutenu (secondes)"""
+        return self.period / self.limit
+
+    @cached_property
+    def tolerance(self) -> float:
+        """Avance maximale du TAT sur l'horloge (secondes)"""
+        return self.emission_interval * (self.burst or self.limit)
+
+    @cached_property
+    def key_suffix(self) -> str:
+        """Identifie le quota dans la clé de stockage (un TAT n'a de sens que pour un quota)"""
+        return f"{self.limit}/{self.period:g}/{self.burst or self.limit}"
+
+    @classmethod
+    def parse(cls, spec: str) -> "Quota":
+        """
+        Lit un quota textuel : "10/60" (secondes), "10/minute", "100/hour",
+        avec un burst optionnel : "10/minute:20".
+        """
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*([\d.]+|[a-z]+)\s*(?::\s*(\d+))?\s*", spec.lower())
+        if not match:
+            raise ValueError(f"Quota invalide: {spec!r}")
+        limit, period, burst = match.groups()
+        if period in _PERIODS:
+            seconds = float(_PERIODS[period])
+        else:
+            try:
+                seconds = float(period)
+            except ValueError:
+                raise ValueError(f"Période inconnue dans le quota {spec!r}") from None
+        return cls(int(limit), seconds, int(burst) if burst else None)
+
+
+class RateLimitResult(NamedTuple):
+    """Décision pour une requête (valeurs en secondes)"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+    reset_after: float = 0.0
+
+    def headers(self) -> dict:
+        """En-têtes HTTP usuels (X-RateLimit-*, Retry-After)"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(int(self.reset_after + 0.999)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(int(self.retry_after + 0.999))
+        return headers
+
+
+UNLIMITED = RateLimitResult(allowed=True, limit=-1, remaining=-1)
+
+
+def gcra(tat: Optional[float], now: float, emission_interval: float,
+         tolerance: float, cost: int = 1) -> Tuple[bool, float, float, float]:
+    """
+    Décision GCRA pure (partagée par les backends, reproduite dans le script Lua Redis).
+
+    Args:
+        tat: TAT stocké pour la clé (None = clé inconnue ou expirée)
+        cost: Nombre de requêtes consommées (0 = simple lecture)
+
+    Returns:
+        (autorisé, nouveau TAT, retry_after, avance du TAT sur l'horloge)
+    """
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + emission_interval * cost
+    allow_at = new_tat - tolerance
+    if now < allow_at - TIME_EPSILON:
+        return False, tat, allow_at - now, tat - now
+    return True, new_tat, 0.0, new_tat - now
+
+
+def remaining_requests(advance: float, emission_interval: float, tolerance: float) -> int:
+    """Requêtes encore acceptables immédiatement, pour une avance de TAT donnée"""
+    return max(0, int((tolerance - advance) / emission_interval + _EPSILON))
@@ -0,0 +1,62 @@
+"""
+Tests GCRA : arrondi flottant sur les clés neuves, burst exact et parité
+du script Lua Redis (si un serveur de test est configuré).
+"""
+
+import os
+import random
+import uuid
+
+import pytest
+
+from phoenix_rate_limit import InMemoryBackend, Quota, RateLimiter, RedisBackend
+from phoenix_rate_limit.quota import gcra
+
+
+class TestGcra:
+
+    def test_first_request_on_a_fresh_key_is_always_allowed(self):
+        rng = random.Random(42)
+        quotas = [Quota(1, 60), Quota(5, 60), Quota(20, 60), Quota(100, 3600), Quota(3, 1)]
+        for _ in range(20000):
+            quota = rng.choice(quotas)
+            # Horloges monotonic comme epoch : now + I - I peut dépasser now d'un ULP
+            now = rng.choice([rng.uniform(0, 1e4), rng.uniform(0, 2e9)])
+            allowed, _, _, _ = gcra(None, now, quota.emission_interval, quota.tolerance)
+            assert allowed, (quota, now)
+
+    def test_burst_is_exact_at_a_fixed_instant(self):
+        rng = random.Random(7)
+        for limit in (2, 5, 10, 20):
+            quota = Quota(limit, 60)
+            for _ in range(500):
+                now = rng.uniform(0, 1e4)
+                tat = None
+                decisions = []
+                for _ in range(limit + 1):
+                    allowed, tat, _, _ = gcra(tat, now, quota.emission_interval, quota.tolerance)
+                    decisions.append(allowed)
+                assert decisions == [True] * limit + [False], (limit, now)
+
+    def test_limiter_counts_every_key_independently(self):
+        clock = iter(x * 0.001 + 0.1 for x in range(10_000)).__next__
+        limiter = RateLimiter(InMemoryBackend(clock=clock), default_quota=Quota(1, 60))
+
+        assert all(limiter.hit(f"user-{i}").allowed for i in range(1000))
+        assert not limiter.hit("user-0").allowed
+
+
+@pytest.mark.skipif(
+    not os.getenv("PHOENIX_RATE_LIMIT_TEST_REDIS_URL"),
+    reason="PHOENIX_RATE_LIMIT_TEST_REDIS_URL non défini",
+)
+class TestRedisBackend:
+
+    def test_lua_script_matches_the_python_decision(self):
+        backend = RedisBackend.from_url(
+            os.environ["PHOENIX_RATE_LIMIT_TEST_REDIS_URL"], prefix=f"test:{uuid.uuid4().hex}:"
+        )
+        limiter = RateLimiter(backend, default_quota=Quota(1, 60))
+
+        assert all(limiter.hit(f"user-{i}").allowed for i in range(1000))
+        assert not limiter.hit("user-0").allowed
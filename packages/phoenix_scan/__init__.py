@@ -0,0 +1,25 @@
+"""
+🔎 Phoenix Scan - Package partagé de l'écosystème Phoenix
+Moteur de scan multi-patterns des gardes de sécurité (injections de prompt, PII, RGPD) :
+règles compilées une fois, littéraux dans un automate Aho-Corasick, regex vérifiées
+aux positions de leurs ancres littérales, tous les hits avec positions en un appel.
+"""
+
+from .anchors import extract_anchors
+from .literals import AHOCORASICK_AVAILABLE, LiteralAutomaton, trie_regex
+from .rules import ScanHit, ScanRule, literal_rules, regex_rules
+from .scanner import PatternScanner, fold_case
+
+__version__ = "1.0.0"
+__all__ = [
+    "ScanRule",
+    "ScanHit",
+    "literal_rules",
+    "regex_rules",
+    "PatternScanner",
+    "LiteralAutomaton",
+    "AHOCORASICK_AVAILABLE",
+    "extract_anchors",
+    "trie_regex",
+    "fold_case",
+]
@@ -0,0 +1,125 @@
+"""
+🔎 Phoenix Scan - Ancres littérales des regex
+Extrait d'une regex l'ensemble des préfixes littéraux par lesquels toute occurrence
+doit commencer (ex. r"(show|reveal)\\s+prompt" -> {"show", "reveal"}). Ces ancres
+rejoignent l'automate des littéraux : la regex n'est ensuite évaluée qu'aux positions
+où une de ses ancres apparaît.
+"""
+
+import re
+from typing import FrozenSet, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+# Au-delà, la regex est évaluée seule sur tout le texte
+MAX_ANCHORS_PER_RULE = 64
+MAX_CLASS_CHARS = 10
+MAX_REPEATED_CHARS = 8
+# Une ancre d'un seul caractère produirait trop de candidats
+MIN_ANCHOR_LENGTH = 2
+# Au-delà, des ancres courtes (ex. "10".."29" pour un numéro) couvrent presque tout le texte
+SHORT_ANCHOR_LENGTH = 3
+MAX_SHORT_ANCHORS = 4
+
+_REPEATS = {_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT}
+if hasattr(_sre_parse, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(_sre_parse.POSSESSIVE_REPEAT)
+
+
+def _class_chars(items) -> Optional[List[str]]:
+    """Caractères d'une petite classe [...] sans négation ni catégorie (\\d, \\s...)"""
+    chars: List[str] = []
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            chars.append(chr(av))
+        elif op is _sre_parse.RANGE:
+            low, high = av
+            chars.extend(chr(code) for code in range(low, high + 1))
+        else:
+            return None
+        if len(chars) > MAX_CLASS_CHARS:
+            return None
+    return chars
+
+
+def _extend(prefixes: Set[str], suffixes) -> Set[str]:
+    return {prefix + suffix for prefix in prefixes for suffix in suffixes}
+
+
+def _expand(items, flags: int) -> Tuple[Set[str], bool]:
+    """
+    Préfixes littéraux d'une séquence d'opérations sre
+    Returns:
+        (préfixes, complet) : complet si toute la séquence est littérale,
+        auquel cas l'appelant peut continuer la concaténation.
+    """
+    prefixes = {""}
+    for op, av in items:
+        if len(prefixes) > MAX_ANCHORS_PER_RULE:
+            return prefixes, False
+
+        if op is _sre_parse.AT:
+            # \b, ^, $ : largeur nulle, vérifiés par la regex elle-même
+            continue
+        elif op is _sre_parse.LITERAL:
+            prefixes = _extend(prefixes, [chr(av)])
+        elif op is _sre_parse.IN:
+            chars = _class_chars(av)
+            if chars is None:
+                return prefixes, False
+            prefixes = _extend(prefixes, chars)
+        elif op is _sre_parse.SUBPATTERN:
+            _group, add_flags, _del_flags, sub = av
+            if add_flags & re.IGNORECASE and not flags & re.IGNORECASE:
+                # (?i:...) dans une règle sensible à la casse : ancres non fiables au-delà
+                return prefixes, False
+            sub_prefixes, complete = _expand(sub, flags)
+            prefixes = _extend(prefixes, sub_prefixes)
+            if not complete:
+                return prefixes, False
+        elif op is _sre_parse.BRANCH:
+            alternatives = [_expand(branch, flags) for branch in av[1]]
+            prefixes = _extend(prefixes, {p for branch_prefixes, _ in alternatives for p in branch_prefixes})
+            if not all(complete for _, complete in alternatives):
+                return prefixes, False
+        elif op in _REPEATS:
+            low, high, sub = av
+            if low == 0:
+                return prefixes, False
+            sub_prefixes, complete = _expand(sub, flags)
+            if complete and len(sub_prefixes) == 1:
+                (unit,) = sub_prefixes
+                prefixes = _extend(prefixes, [unit * min(low, MAX_REPEATED_CHARS)])
+                if low == high and low <= MAX_REPEATED_CHARS:
+                    continue
+                return prefixes, False
+            prefixes = _extend(prefixes, sub_prefixes)
+            return prefixes, False
+        else:
+            return prefixes, False
+    return prefixes, True
+
+
+def extract_anchors(pattern: str, flags: int = 0) -> Tuple[Optional[FrozenSet[str]], bool]:
+    """
+    Ancres littérales d'une regex
+
+    Returns:
+        (ancres ou None si la regex doit être évaluée sur tout le texte,
+         ignore_case : ancres à chercher dans le texte en minuscules)
+    """
+    parsed = _sre_parse.parse(pattern, flags)
+    effective_flags = parsed.state.flags
+    prefixes, _ = _expand(parsed, effective_flags)
+    ignore_case = bool(effective_flags & re.IGNORECASE)
+
+    if (not prefixes or len(prefixes) > MAX_ANCHORS_PER_RULE
+            or min(len(prefix) for prefix in prefixes) < MIN_ANCHOR_LENGTH
+            or sum(len(prefix) < SHORT_ANCHOR_LENGTH for prefix in prefixes) > MAX_SHORT_ANCHORS):
+        return None, ignore_case
+    if ignore_case:
+        prefixes = {prefix.lower() for prefix in prefixes}
+    return frozenset(prefixes), ignore_case
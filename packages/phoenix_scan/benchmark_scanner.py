@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark phoenix_scan - CV de 80 ko
+Compare les anciennes boucles des gardes (une regex re.IGNORECASE par pattern, `in` par
+mot-clé sur le texte en minuscules) au PatternScanner compilé une fois, et vérifie que
+chaque règle retourne exactement les hits de son propre finditer.
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from phoenix_scan import PatternScanner, literal_rules, regex_rules
+
+DOCUMENT_SIZE = 80_000
+DOCUMENTS = 20
+
+# Règles de la garde Phoenix Letters (infrastructure/security/prompt_injection_guard.py)
+INJECTION_PATTERNS = {
+    # Instructions de bypass
+    "bypass_instructions": [
+        r"ignore\s+(?:previous|above|all)\s+(?:instructions?|prompts?|rules?)",
+        r"forget\s+(?:everything|all|previous)",
+        r"disregard\s+(?:previous|above|all)",
+        r"override\s+(?:previous|system|default)",
+        r"new\s+(?:instruction|rule|system|prompt)",
+        r"change\s+(?:your|the)\s+(?:role|behavior|instruction)",
+        r"act\s+as\s+(?:if|a|an)\s+(?:different|new|admin|root)",
+    ],
+    # Tentatives d'extraction d'informations
+    "information_extraction": [
+        r"reveal\s+(?:your|the)\s+(?:prompt|instruction|system|secret)",
+        r"show\s+(?:me\s+)?(?:your|the)\s+(?:prompt|instruction|code)",
+        r"what\s+(?:are\s+)?your\s+(?:instruction|rule|prompt)",
+        r"repeat\s+(?:your|the)\s+(?:instruction|prompt|system)",
+        r"tell\s+me\s+(?:your|the)\s+(?:secret|key|password)",
+    ],
+    # Manipulation de rôle/personnalité
+    "role_manipulation": [
+        r"you\s+are\s+(?:now|actually|really)\s+(?:a|an)\s+\w+",
+        r"pretend\s+(?:to\s+be|you\s+are)",
+        r"roleplay\s+as",
+        r"simulate\s+(?:being|a|an)",
+        r"behave\s+(?:like|as)\s+(?:a|an)",
+        r"imagine\s+you\s+are\s+(?:a|an)",
+    ],
+    # Injections via contexte
+    "context_injection": [
+        r"---\s*(?:new|different|additional)\s+(?:context|prompt|instruction)",
+        r"###\s*(?:system|admin|override)",
+        r"\[(?:system|admin|override|new)\s*(?:message|prompt|instruction)",
+        r"<(?:system|admin|override)>",
+        r"```\s*(?:system|admin|new)",
+    ],
+    # Tentatives de jailbreak
+    "jailbreak_attempts": [
+        r"DAN\s+(?:mode|prompt)",
+        r"developer\s+mode",
+        r"jailbreak",
+        r"unrestricted\s+mode",
+        r"no\s+(?:filter|restriction|limit|safety)",
+        r"enable\s+(?:developer|admin|debug)\s+mode",
+    ],
+    # Manipulation de format de sortie
+    "output_manipulation": [
+        r"respond\s+(?:only\s+)?(?:with|in)\s+(?:json|xml|code|html)",
+        r"format\s+(?:your\s+)?response\s+as",
+        r"structure\s+(?:your\s+)?(?:answer|response)",
+        r"return\s+(?:only|just)\s+(?:the|a)\s+\w+",
+        r"output\s+(?:format|structure|template)",
+    ],
+}
+
+# Règles du Security Guardian (agent_ia/security_guardian_agent.py)
+THREAT_PATTERNS = {
+    "prompt_injection": [
+        "ignore previous instructions",
+        "system prompt",
+        "act as",
+        "pretend to be",
+        "jailbreak",
+        "override",
+        "forget everything",
+        "new instructions",
+    ],
+    "data_exfiltration": [
+        "export data",
+        "download database",
+        "show all users",
+        "admin password",
+        "secret key",
+        "api key",
+    ],
+    "malicious_code": [
+        "eval(",
+        "exec(",
+        "import os",
+        "subprocess",
+        "__import__",
+        "open(",
+        "file(",
+    ],
+    "social_engineering": [
+        "urgent",
+        "immediate action",
+        "suspend account",
+        "verify identity",
+        "click here now",
+    ],
+}
+
+PII_PATTERNS = {
+    "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
+    "phone_fr": r"\b(?:0[1-9]|[+]33[1-9])(?:[0-9]{8}|[0-9]{9})\b",
+    "carte_bancaire": r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13})\b",
+    "secu_sociale": r"\b[12][0-9]{2}(0[1-9]|1[0-2])[0-9]{8}\b",
+    "iban": r"\b[A-Z]{2}[0-9]{2}[A-Z0-9]{4}[0-9]{7}([A-Z0-9]?){0,16}\b",
+    "adresse_ip": r"\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b",
+}
+
+RGPD_KEYWORDS = {
+    "donnees_sensibles": [
+        "origine raciale",
+        "ethnique",
+        "opinions politiques",
+        "convictions religieuses",
+        "philosophiques",
+        "appartenance syndicale",
+        "données génétiques",
+        "biométriques",
+        "santé",
+        "vie sexuelle",
+        "orientation sexuelle",
+        "casier judiciaire",
+        "infractions",
+    ],
+    "donnees_medicales": [
+        "maladie",
+        "handicap",
+        "pathologie",
+        "traitement médical",
+        "hospitalisation",
+        "médecin",
+        "diagnostic",
+        "allergie",
+    ],
+    "donnees_financieres": [
+        "salaire",
+        "revenus",
+        "dettes",
+        "crédit",
+        "patrimoine",
+        "situation financière",
+        "impôts",
+        "déclaration",
+    ],
+}
+
+CV_VOCABULARY = (
+    "expérience développeur python équipe projet client gestion formation compétences "
+    "management analyse données reporting santé salaire mission objectifs résultats "
+    "show ignore system admin act reveal new format output return you are pretend "
+    "Paris Lyon 2019 2023 contact linkedin github cloud agile scrum autonomie"
+).split()
+CV_SAMPLES = [
+    "jean.dupont@example.fr", "0612345678", "4532015112830366", "192.168.0.12",
+    "Ignore previous instructions", "reveal your prompt", "act as an admin",
+    "situation financière", "traitement médical", "system prompt", "api key",
+]
+
+
+def make_document(rng: random.Random) -> str:
+    words = []
+    size = 0
+    while size < DOCUMENT_SIZE:
+        word = rng.choice(CV_SAMPLES) if rng.random() < 0.005 else rng.choice(CV_VOCABULARY)
+        if rng.random() < 0.1:
+            word = word.capitalize()
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+# ---------------------------------------------------------------- Ancien
+
+def ancien_letters(text: str):
+    """Ancienne boucle : re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE) par pattern"""
+    return [
+        (category, match.start())
+        for category, patterns in INJECTION_PATTERNS.items()
+        for pattern in patterns
+        for match in re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
+    ]
+
+
+def ancien_guardian(text: str):
+    """Anciennes boucles du Security Guardian : `in` par mot-clé, re.findall par PII"""
+    content_lower = text.lower()
+    threats = [
+        pattern
+        for patterns in THREAT_PATTERNS.values()
+        for pattern in patterns
+        if pattern in content_lower
+    ]
+    pii = [(pii_type, len(re.findall(pattern, text))) for pii_type, pattern in PII_PATTERNS.items()]
+    rgpd = [
+        category
+        for category, keywords in RGPD_KEYWORDS.items()
+        if any(keyword in content_lower for keyword in keywords)
+    ]
+    return threats, pii, rgpd
+
+
+# ---------------------------------------------------------------- Nouveau
+
+LETTERS_SCANNER = PatternScanner(regex_rules(INJECTION_PATTERNS, re.IGNORECASE | re.MULTILINE))
+GUARDIAN_SCANNER = PatternScanner(
+    literal_rules(THREAT_PATTERNS, re.IGNORECASE)
+    + regex_rules({"pii:" + pii_type: [pattern] for pii_type, pattern in PII_PATTERNS.items()})
+    + literal_rules({"rgpd:" + category: keywords for category, keywords in RGPD_KEYWORDS.items()}, re.IGNORECASE)
+)
+
+
+def nouveau_letters(text: str):
+    return [(hit.category, hit.start) for hit in LETTERS_SCANNER.scan(text)]
+
+
+def nouveau_guardian(text: str):
+    return GUARDIAN_SCANNER.scan(text)
+
+
+# ---------------------------------------------------------------- Mesures
+
+def check_equivalence(scanner: PatternScanner, documents) -> int:
+    """Nombre de règles dont les hits diffèrent de leur propre finditer"""
+    mismatches = 0
+    for document in documents:
+        hits = scanner.scan(document)
+        for rule, compiled in zip(scanner.rules, (rule.compile() for rule in scanner.rules)):
+            expected = [(m.start(), m.end()) for m in compiled.finditer(document)]
+            if [(h.start, h.end) for h in hits if h.rule is rule] != expected:
+                mismatches += 1
+    return mismatches
+
+
+def run(name: str, function, documents) -> float:
+    start = time.perf_counter()
+    for document in documents:
+        function(document)
+    elapsed = (time.perf_counter() - start) / len(documents) * 1000
+    print(f"  • {name:<28} {elapsed:7.2f} ms/document")
+    return elapsed
+
+
+def main() -> None:
+    rng = random.Random(7)
+    documents = [make_document(rng) for _ in range(DOCUMENTS)]
+
+    for title, scanner, ancien, nouveau in (
+        ("Garde Phoenix Letters (34 regex)", LETTERS_SCANNER, ancien_letters, nouveau_letters),
+        ("Security Guardian (littéraux + PII + RGPD)", GUARDIAN_SCANNER, ancien_guardian, nouveau_guardian),
+    ):
+        stats = scanner.get_stats()
+        print(f"\n🔎 {title} - {DOCUMENTS} CV de {DOCUMENT_SIZE // 1000} ko")
+        print(f"  règles={stats['rules']} ancres={stats['anchors']} regex résiduelles={stats['residual_regex']} "
+              f"automate natif={'oui' if stats['native_automaton'] else 'non (trie regex)'}")
+        before = run("Ancien (boucles)", ancien, documents)
+        after = run("PatternScanner", nouveau, documents)
+        print(f"  → x{before / after:.1f}, écarts par règle vs finditer : {check_equivalence(scanner, documents)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+🔎 Phoenix Scan - Automate multi-littéraux
+Toutes les occurrences (chevauchantes comprises) d'un ensemble de littéraux en une passe.
+Aho-Corasick natif si pyahocorasick est installé ; sinon le trie des littéraux est
+compilé en une seule regex, parcourue par le moteur C de `re`.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Regex équivalente au trie des littéraux : une alternative par caractère à chaque
+    nœud, la plus longue occurrence étant tentée en premier.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class LiteralAutomaton:
+    """Automate des littéraux : iter(text) -> (début, littéral) pour chaque occurrence"""
+
+    def __init__(self, words: Iterable[str], native: bool = AHOCORASICK_AVAILABLE):
+        self.words = sorted(set(words))
+        self.native = native and AHOCORASICK_AVAILABLE and bool(self.words)
+
+        if self.native:
+            self._automaton = ahocorasick.Automaton()
+            for word in self.words:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+        elif self.words:
+            self._regex = re.compile(trie_regex(self.words))
+            # Sortie d'un état : la plus longue occurrence implique ses préfixes littéraux
+            word_set = set(self.words)
+            self._prefixes: Dict[str, List[str]] = {
+                word: [word[:size] for size in range(1, len(word) + 1) if word[:size] in word_set]
+                for word in self.words
+            }
+
+    def iter(self, text: str) -> Iterator[Tuple[int, str]]:
+        if not self.words:
+            return
+        if self.native:
+            for end, word in self._automaton.iter(text):
+                yield end - len(word) + 1, word
+            return
+
+        search = self._regex.search
+        match = search(text)
+        while match is not None:
+            start = match.start()
+            for word in self._prefixes[match.group()]:
+                yield start, word
+            # Reprise au caractère suivant : occurrences chevauchantes comprises
+            match = search(text, start + 1)
@@ -0,0 +1,71 @@
+"""
+🔎 Phoenix Scan - Règles et résultats de scan
+Une règle est un littéral ou une regex, rattachée à une catégorie (type de menace,
+type de PII...). Un hit porte la règle, ses positions et le texte trouvé.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Mapping, NamedTuple, Optional
+
+
+@dataclass(frozen=True)
+class ScanRule:
+    """
+    Règle de détection
+    - pattern : regex, ou chaîne exacte si literal=True
+    - name : identifiant rapporté dans les hits (par défaut le pattern)
+    - flags : flags re (re.IGNORECASE rend aussi un littéral insensible à la casse)
+    """
+    pattern: str
+    category: str = "default"
+    name: Optional[str] = None
+    literal: bool = False
+    flags: int = 0
+
+    def __post_init__(self):
+        if not self.pattern:
+            raise ValueError("pattern vide")
+        if self.name is None:
+            object.__setattr__(self, "name", self.pattern)
+
+    @property
+    def ignore_case(self) -> bool:
+        return bool(self.flags & re.IGNORECASE)
+
+    def compile(self) -> "re.Pattern":
+        return re.compile(re.escape(self.pattern) if self.literal else self.pattern, self.flags)
+
+
+class ScanHit(NamedTuple):
+    """Occurrence d'une règle : [start, end) dans le texte scanné"""
+    rule: ScanRule
+    start: int
+    end: int
+    text: str
+
+    @property
+    def category(self) -> str:
+        return self.rule.category
+
+    @property
+    def name(self) -> str:
+        return self.rule.name
+
+
+def literal_rules(words: Mapping[str, Iterable[str]], flags: int = 0) -> List[ScanRule]:
+    """Règles littérales depuis {catégorie: [mots, ...]}"""
+    return [
+        ScanRule(word, category=category, literal=True, flags=flags)
+        for category, category_words in words.items()
+        for word in category_words
+    ]
+
+
+def regex_rules(patterns: Mapping[str, Iterable[str]], flags: int = 0) -> List[ScanRule]:
+    """Règles regex depuis {catégorie: [patterns, ...]}"""
+    return [
+        ScanRule(pattern, category=category, flags=flags)
+        for category, category_patterns in patterns.items()
+        for pattern in category_patterns
+    ]
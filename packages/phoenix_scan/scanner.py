@@ -0,0 +1,192 @@
+"""
+🔎 Phoenix Scan - Moteur de scan multi-patterns
+Compile une fois un ensemble de règles (littéraux + regex) et retourne en un appel
+tous les hits avec leurs positions :
+- littéraux et ancres des regex dans un automate (une passe par casse)
+- regex vérifiées uniquement aux positions de leurs ancres
+- regex sans ancre exploitable évaluées seules (compilées une fois)
+
+Chaque règle se comporte comme son propre finditer : ses hits ne se chevauchent pas
+entre eux, mais les hits de règles différentes peuvent se chevaucher.
+"""
+
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .anchors import extract_anchors
+from .literals import LiteralAutomaton
+from .rules import ScanHit, ScanRule
+
+Replacement = Union[str, Callable[[ScanHit], str]]
+
+
+def fold_case(text: str) -> str:
+    """Minuscules à positions identiques (les rares caractères qui s'allongent sont conservés)"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(low if len(low) == 1 else char for char, low in ((c, c.lower()) for c in text))
+
+
+class PatternScanner:
+    """
+    Scanner compilé à partir de règles (à construire une fois, au niveau module)
+
+    Example:
+        scanner = PatternScanner(regex_rules({"bypass": [r"ignore\\s+previous"]}, re.IGNORECASE))
+        for hit in scanner.scan(text):
+            print(hit.category, hit.start, hit.text)
+    """
+
+    def __init__(self, rules: Iterable[ScanRule]):
+        self.rules: Tuple[ScanRule, ...] = tuple(rules)
+        self._compiled = [rule.compile() for rule in self.rules]
+        # Priorité d'une règle = sa première position de déclaration
+        self._priority: Dict[ScanRule, int] = {}
+        for index, rule in enumerate(self.rules):
+            self._priority.setdefault(rule, index)
+        # ancre -> [(index de règle, littéral exact : pas de vérification regex)]
+        folded_index: Dict[str, List[Tuple[int, bool]]] = {}
+        exact_index: Dict[str, List[Tuple[int, bool]]] = {}
+        self._residual: List[int] = []
+
+        for index, rule in enumerate(self.rules):
+            if rule.literal:
+                anchors, ignore_case, exact = {rule.pattern}, rule.ignore_case, True
+            else:
+                anchors, ignore_case = extract_anchors(rule.pattern, rule.flags)
+                exact = False
+                if anchors is None:
+                    self._residual.append(index)
+                    continue
+            target = folded_index if ignore_case else exact_index
+            for anchor in anchors:
+                target.setdefault(anchor.lower() if ignore_case else anchor, []).append((index, exact))
+
+        self._folded_index = folded_index
+        self._exact_index = exact_index
+        self._folded = LiteralAutomaton(folded_index) if folded_index else None
+        self._exact = LiteralAutomaton(exact_index) if exact_index else None
+
+    def _allowed(self, categories: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        if categories is None:
+            return None
+        categories = set(categories)
+        return {index for index, rule in enumerate(self.rules) if rule.category in categories}
+
+    def scan(self, text: str, categories: Optional[Iterable[str]] = None) -> List[ScanHit]:
+        """Tous les hits, triés par position puis par ordre des règles"""
+        if not text:
+            return []
+        allowed = self._allowed(categories)
+
+        candidates: List[Tuple[int, int, bool, int]] = []
+        for automaton, index, haystack in (
+            (self._folded, self._folded_index, fold_case(text) if self._folded else None),
+            (self._exact, self._exact_index, text),
+        ):
+            if automaton is None:
+                continue
+            for start, anchor in automaton.iter(haystack):
+                for rule_index, exact in index[anchor]:
+                    if allowed is None or rule_index in allowed:
+                        candidates.append((start, rule_index, exact, len(anchor)))
+        candidates.sort()
+
+        found: List[Tuple[int, int, ScanHit]] = []
+        last_end: Dict[int, int] = {}
+        previous = None
+        for start, rule_index, exact, length in candidates:
+            if (start, rule_index) == previous or start < last_end.get(rule_index, 0):
+                continue
+            previous = (start, rule_index)
+            if exact:
+                end = start + length
+                matched = text[start:end]
+            else:
+                match = self._compiled[rule_index].match(text, start)
+                if match is None:
+                    continue
+                end, matched = match.end(), match.group()
+            last_end[rule_index] = max(end, start + 1)
+            found.append((start, rule_index, ScanHit(self.rules[rule_index], start, end, matched)))
+
+        for rule_index in self._residual:
+            if allowed is None or rule_index in allowed:
+                rule = self.rules[rule_index]
+                for match in self._compiled[rule_index].finditer(text):
+                    found.append((match.start(), rule_index, ScanHit(rule, match.start(), match.end(), match.group())))
+
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [hit for _, _, hit in found]
+
+    def matched_rules(self, text: str, categories: Optional[Iterable[str]] = None) -> List[ScanRule]:
+        """Règles présentes au moins une fois, dans l'ordre de déclaration"""
+        order = {rule: index for index, rule in enumerate(self.rules)}
+        return sorted({hit.rule for hit in self.scan(text, categories)}, key=order.__getitem__)
+
+    def categories(self, text: str) -> Set[str]:
+        """Catégories présentes dans le texte"""
+        return {hit.category for hit in self.scan(text)}
+
+    def sub(
+        self,
+        text: str,
+        replacement: Replacement,
+        categories: Optional[Iterable[str]] = None,
+    ) -> Tuple[str, List[ScanHit]]:
+        """
+        Remplace les hits comme des substitutions successives dans l'ordre des règles :
+        chaque règle n'est appliquée qu'aux segments laissés par les règles déclarées avant
+        elle (un remplacement borne le segment, comme le ferait le texte de remplacement).
+        Un hit moins prioritaire ne peut donc jamais masquer une partie d'un hit plus
+        prioritaire. Sans aucun hit, un seul scan est fait.
+
+        Returns:
+            (texte remplacé, hits appliqués, par position)
+        """
+        hits = [hit for hit in self.scan(text, categories) if hit.end > hit.start]
+        if not hits:
+            return text, []
+        allowed = self._allowed(categories)
+
+        # Avant le premier remplacement, le scan donne exactement les hits de la règle
+        first = min(self._priority[hit.rule] for hit in hits)
+        # (une règle déclarée deux fois donne des hits identiques)
+        applied = list(dict.fromkeys(hit for hit in hits if self._priority[hit.rule] == first))
+        starts = [hit.start for hit in applied]
+        ends = [hit.end for hit in applied]
+
+        for rule_index in range(first + 1, len(self.rules)):
+            rule = self.rules[rule_index]
+            if self._priority[rule] != rule_index or (allowed is not None and rule_index not in allowed):
+                continue
+            found: List[ScanHit] = []
+            for gap_start, gap_end in zip([0] + ends, starts + [len(text)]):
+                if gap_end <= gap_start:
+                    continue
+                for match in self._compiled[rule_index].finditer(text[gap_start:gap_end]):
+                    if match.end() > match.start():
+                        found.append(ScanHit(rule, gap_start + match.start(), gap_start + match.end(), match.group()))
+            for hit in found:
+                slot = bisect.bisect_right(starts, hit.start)
+                starts.insert(slot, hit.start)
+                ends.insert(slot, hit.end)
+                applied.insert(slot, hit)
+
+        parts: List[str] = []
+        position = 0
+        for hit in applied:
+            parts.append(text[position:hit.start])
+            parts.append(replacement if isinstance(replacement, str) else replacement(hit))
+            position = hit.end
+        parts.append(text[position:])
+        return "".join(parts), applied
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "rules": len(self.rules),
+            "anchors": len(self._folded_index) + len(self._exact_index),
+            "residual_regex": len(self._residual),
+            "native_automaton": int(any(a is not None and a.native for a in (self._folded, self._exact))),
+        }
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Exécution depuis le monorepo sans installation : packages/ contient phoenix_scan
+PACKAGES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+if PACKAGES_DIR not in sys.path:
+    sys.path.insert(0, PACKAGES_DIR)
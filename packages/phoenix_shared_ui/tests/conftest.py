@@ -0,0 +1,13 @@
+import os
+import sys
+import types
+
+# Comme une fois installé (setup.py), phoenix_shared_ui désigne le package interne
+# phoenix_shared_ui/phoenix_shared_ui, et non le dossier du dépôt qui le contient
+PACKAGE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "phoenix_shared_ui"))
+
+if "phoenix_shared_ui" not in sys.modules:
+    package = types.ModuleType("phoenix_shared_ui")
+    package.__path__ = [PACKAGE_DIR]
+    package.__file__ = os.path.join(PACKAGE_DIR, "__init__.py")
+    sys.modules["phoenix_shared_ui"] = package